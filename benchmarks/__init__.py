@@ -0,0 +1,17 @@
+"""
+Performance benchmarks of MoviePy.
+
+The benchmarks time the hot paths of MoviePy (reading, compositing,
+effects, audio mixing, writing, analysis) on synthetic media generated
+locally, and save the timings as JSON files which can be compared between
+two versions of MoviePy (or two computers):
+
+    python -m benchmarks run -o before.json
+    # ... upgrade MoviePy ...
+    python -m benchmarks run -o after.json
+    python -m benchmarks compare before.json after.json
+
+New benchmarks are added in ``benchmarks/cases.py``.
+"""
+
+from .runner import run_benchmarks, save_results, load_results, compare_results
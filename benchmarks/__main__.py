@@ -0,0 +1,57 @@
+"""
+Command line of the benchmarks:
+
+    python -m benchmarks run [-o results.json] [-k resize -k rotate]
+                             [--repeat 3] [--quick] [--folder FOLDER]
+    python -m benchmarks compare old.json new.json
+"""
+
+import os
+import sys
+import argparse
+import tempfile
+
+from .runner import (run_benchmarks, save_results, load_results,
+                     compare_results)
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m benchmarks",
+                                     description="MoviePy benchmarks")
+    commands = parser.add_subparsers(dest='command')
+
+    run = commands.add_parser('run', help="run the benchmarks")
+    run.add_argument('-o', '--output', default=None,
+                     help="JSON file where the results are saved")
+    run.add_argument('-k', dest='select', action='append', default=None,
+                     help="only run the benchmarks whose name contains this")
+    run.add_argument('--repeat', type=int, default=3)
+    run.add_argument('--quick', action='store_true',
+                     help="only the first value of each parameter")
+    run.add_argument('--folder', default=os.path.join(tempfile.gettempdir(),
+                                                      "moviepy_benchmarks"),
+                     help="where the synthetic media are generated")
+
+    compare = commands.add_parser('compare', help="compare two results")
+    compare.add_argument('old')
+    compare.add_argument('new')
+    compare.add_argument('--threshold', type=float, default=0.1)
+
+    args = parser.parse_args()
+    if args.command == 'run':
+        results = run_benchmarks(args.folder, select=args.select,
+                                 repeat=args.repeat, quick=args.quick)
+        if args.output is not None:
+            save_results(results, args.output)
+        if results['failures']:
+            print("%d benchmarks failed." % len(results['failures']))
+            sys.exit(1)
+    elif args.command == 'compare':
+        print(compare_results(load_results(args.old), load_results(args.new),
+                              args.threshold))
+    else:
+        parser.print_help()
+
+
+if __name__ == "__main__":
+    main()
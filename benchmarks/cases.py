@@ -0,0 +1,210 @@
+"""
+The benchmarks.
+
+A benchmark is a function decorated with ``@benchmark(**params)``, where
+``params`` gives the list of values of each of its parameters: it is run
+for every combination of values. It receives the ``Fixtures`` and one
+value of each parameter, prepares whatever is not measured, and returns
+the function to time. This function returns the number of items
+processed (frames, samples...) so that a throughput can be computed, or
+None.
+"""
+
+import numpy as np
+
+from moviepy.video.io.VideoFileClip import VideoFileClip
+from moviepy.video.VideoClip import ColorClip
+from moviepy.video.compositing.CompositeVideoClip import CompositeVideoClip
+from moviepy.video.compositing.concatenate import concatenate_videoclips
+from moviepy.video.tools.drawing import blit
+from moviepy.video.tools.cuts import FramesMatches
+from moviepy.audio.AudioClip import AudioClip, CompositeAudioClip
+import moviepy.video.fx.all as vfx
+
+from .fixtures import RESOLUTIONS, noise_image, noise_clip, color_clips
+
+
+BENCHMARKS = []
+
+
+def benchmark(**params):
+    """ Registers a benchmark (see the docstring of this module). """
+    def decorator(f):
+        BENCHMARKS.append((f.__name__, f, params))
+        return f
+    return decorator
+
+
+# READING
+
+@benchmark(resolution=['240p', '720p', '1080p'],
+           codec=['libx264', 'mpeg4', 'mjpeg'])
+def reader_sequential(fixtures, resolution, codec):
+    """ Reads 2 seconds of frames in order. """
+    clip = VideoFileClip(fixtures.video(resolution, codec), audio=False)
+
+    def run():
+        return len([f for f in clip.subclip(1, 3).iter_frames()])
+    return run
+
+
+@benchmark(resolution=['240p', '720p', '1080p'],
+           codec=['libx264', 'mpeg4', 'mjpeg'])
+def reader_random(fixtures, resolution, codec):
+    """ Reads 20 frames at random times (fixed seed). """
+    clip = VideoFileClip(fixtures.video(resolution, codec), audio=False)
+    times = np.random.RandomState(0).uniform(0, clip.duracion - 0.1, 20)
+
+    def run():
+        for t in times:
+            clip.get_frame(t)
+        return len(times)
+    return run
+
+
+# COMPOSITING
+
+@benchmark(resolution=['720p', '1080p'], masked=[False, True])
+def blit_images(fixtures, resolution, masked):
+    """ Blits a quarter-size image on a frame, 50 times. """
+    w, h = RESOLUTIONS[resolution]
+    background = noise_image((w, h), seed=0)
+    picture = noise_image((w // 2, h // 2), seed=1)
+    mask = (np.random.RandomState(2).rand(h // 2, w // 2)
+            if masked else None)
+
+    def run():
+        for i in range(50):
+            blit(picture, background, pos=[i, i], mask=mask)
+        return 50
+    return run
+
+
+@benchmark(layers=[2, 8, 32], opacity=[1, 0.5])
+def composite_layers(fixtures, layers, opacity):
+    """ Composes N quarter-size layers over a 720p background. """
+    w, h = RESOLUTIONS['720p']
+    clips = [ColorClip((w, h), col=(0, 0, 0))]
+    for i in range(layers):
+        layer = noise_clip((w // 4, h // 4), seed=i)
+        layer = layer.set_position((i * 37 % w, i * 23 % h))
+        if opacity != 1:
+            layer = layer.set_opacity(opacity)
+        clips.append(layer)
+    clip = CompositeVideoClip(clips, tamano=(w, h)).set_duracion(1)
+
+    def run():
+        for t in np.arange(0, 1, 0.1):
+            clip.get_frame(t)
+        return 10
+    return run
+
+
+@benchmark(clips=[10, 100], method=['chain', 'compose'])
+def concatenate_clips(fixtures, clips, method):
+    """ Renders all the frames of N concatenated 0.25s clips. """
+    clip = concatenate_videoclips(color_clips(clips, (320, 240), 0.25),
+                                  method=method)
+
+    def run():
+        return len([f for f in clip.iter_frames(fps=24)])
+    return run
+
+
+# EFFECTS
+
+@benchmark(resolution=['720p', '1080p'], scale=[0.5, 1.5])
+def resize(fixtures, resolution, scale):
+    """ Resizes 10 frames. """
+    clip = noise_clip(RESOLUTIONS[resolution], duracion=1).fx(vfx.resize, scale)
+
+    def run():
+        for t in np.arange(0, 1, 0.1):
+            clip.get_frame(t)
+        return 10
+    return run
+
+
+@benchmark(resolution=['720p', '1080p'], angle=[30, 45])
+def rotate(fixtures, resolution, angle):
+    """ Rotates 10 frames. (Right angles are not measured: they only
+    return a view of the frame.) """
+    clip = noise_clip(RESOLUTIONS[resolution], duracion=1).fx(vfx.rotate, angle)
+
+    def run():
+        for t in np.arange(0, 1, 0.1):
+            clip.get_frame(t)
+        return 10
+    return run
+
+
+@benchmark(resolution=['720p', '1080p'], nframes=[4, 16])
+def motion_blur(fixtures, resolution, nframes):
+    """ Blurs 30 consecutive frames of a 60fps video. """
+    clip = VideoFileClip(fixtures.video(resolution, 'libx264', fps=60),
+                         audio=False).fx(vfx.motion_blur, nframes=nframes)
+
+    def run():
+        for t in np.arange(0, 0.5, 1.0 / 60):
+            clip.get_frame(t)
+        return 30
+    return run
+
+
+# AUDIO
+
+@benchmark(tracks=[2, 16])
+def audio_mixing(fixtures, tracks):
+    """ Mixes N stereo sine tracks of 10 seconds. """
+    def sine(freq):
+        return lambda t: np.array([np.sin(2 * np.pi * freq * t),
+                                   np.sin(2 * np.pi * 1.5 * freq * t)]).T
+    clips = [AudioClip(sine(220 + 20 * i), duracion=10).set_start(0.5 * i)
+             for i in range(tracks)]
+    clip = CompositeAudioClip(clips).set_duracion(10)
+
+    def run():
+        return len(clip.to_soundarray(fps=44100))
+    return run
+
+
+# WRITING
+
+@benchmark(resolution=['240p', '720p'], audio=[False, True])
+def write_videofile(fixtures, resolution, audio):
+    """ Exports 2 seconds of a video file with libx264. """
+    clip = VideoFileClip(fixtures.video(resolution, 'libx264')).subclip(1, 3)
+    output = fixtures.output('write_videofile_%s.mp4' % resolution)
+
+    def run():
+        clip.write_videofile(output, audio=audio, verbose=False,
+                             preset='ultrafast')
+        return int(clip.duracion * clip.fps)
+    return run
+
+
+@benchmark(program=['imageio', 'ffmpeg', 'numpy', 'ffmpeg_palette'])
+def write_gif(fixtures, program):
+    """ Exports 2 seconds of a 240p video file as a GIF. """
+    clip = VideoFileClip(fixtures.video('240p', 'libx264'),
+                         audio=False).subclip(1, 3).set_fps(12)
+    output = fixtures.output('write_gif_%s.gif' % program)
+
+    def run():
+        clip.write_gif(output, program=program, verbose=False)
+        return int(clip.duracion * clip.fps)
+    return run
+
+
+# ANALYSIS
+
+@benchmark(fps=[12, 24])
+def frames_matches(fixtures, fps):
+    """ Finds the matching frames of 2 seconds of a 240p video. """
+    clip = VideoFileClip(fixtures.video('240p', 'libx264'),
+                         audio=False).subclip(0, 2)
+
+    def run():
+        FramesMatches.from_clip(clip, dist_thr=10, max_d=1, fps=fps)
+        return int(clip.duracion * fps)
+    return run
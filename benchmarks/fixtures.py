@@ -0,0 +1,89 @@
+"""
+Deterministic synthetic media for the benchmarks.
+
+The video files are generated once by ffmpeg from its ``lavfi`` sources
+(``testsrc`` for the picture, ``sine`` for the sound), so that every
+computer benchmarks exactly the same content. The in-memory sources
+(noise images, color clips) use a fixed random seed.
+"""
+
+import os
+
+import numpy as np
+
+from moviepy.config import get_setting
+from moviepy.tools import subprocess_call
+from moviepy.video.VideoClip import VideoClip, ColorClip
+
+
+RESOLUTIONS = {'240p': (320, 240),
+               '720p': (1280, 720),
+               '1080p': (1920, 1080)}
+
+# codec: (extension, pixel format, audio codec)
+CODECS = {'libx264': ('.mp4', 'yuv420p', 'aac'),
+          'mpeg4': ('.mp4', 'yuv420p', 'aac'),
+          'mjpeg': ('.avi', 'yuvj420p', 'pcm_s16le')}
+
+
+class Fixtures:
+    """ Generates (once) and returns the media used by the benchmarks.
+
+    Parameters
+    -----------
+
+    folder
+      Folder where the generated files are kept between two runs.
+    """
+
+    def __init__(self, folder):
+        self.folder = folder
+        for sub in ['media', 'out']:
+            path = os.path.join(folder, sub)
+            if not os.path.exists(path):
+                os.makedirs(path)
+
+    def video(self, resolution='240p', codec='libx264', duracion=5, fps=24):
+        """ Returns the name of a ``testsrc`` video file with a 440Hz sound
+        (generated if needed). """
+        w, h = RESOLUTIONS[resolution]
+        ext, pix_fmt, audio_codec = CODECS[codec]
+        name = os.path.join(self.folder, 'media', 'testsrc_%s_%s_%ds_%dfps%s'
+                            % (resolution, codec, duracion, fps, ext))
+        if os.path.exists(name):
+            return name
+        tempname = name[:-len(ext)] + '.part' + ext
+        cmd = [get_setting("FFMPEG_BINARY"), '-y',
+               '-f', 'lavfi', '-i', 'testsrc=size=%dx%d:rate=%d:duration=%d'
+               % (w, h, fps, duracion),
+               '-f', 'lavfi', '-i', 'sine=frequency=440:sample_rate=44100'
+               ':duration=%d' % duracion,
+               '-vcodec', codec, '-pix_fmt', pix_fmt, '-g', str(2 * fps),
+               '-acodec', audio_codec, '-threads', '1',
+               '-fflags', '+bitexact', tempname]
+        subprocess_call(cmd, verbose=False)
+        os.rename(tempname, name)
+        return name
+
+    def output(self, name):
+        """ Name of a file written by a benchmark. """
+        return os.path.join(self.folder, 'out', name)
+
+
+def noise_image(tamano, seed=0):
+    """ A HxWx3 random image, always the same for a given seed. """
+    w, h = tamano
+    return np.random.RandomState(seed).randint(0, 256, (h, w, 3)).astype('uint8')
+
+
+def noise_clip(tamano, duracion=None, seed=0):
+    """ A VideoClip showing ``noise_image``. Unlike an ImageClip, the
+    effects applied to it are computed again for every frame. """
+    image = noise_image(tamano, seed)
+    return VideoClip(lambda t: image, duracion=duracion)
+
+
+def color_clips(n, tamano, duracion):
+    """ ``n`` ColorClips of different (but always the same) colors. """
+    colors = np.random.RandomState(0).randint(0, 256, (n, 3))
+    return [ColorClip(tamano, col=tuple(c), duracion=duracion) for c in colors]
@@ -0,0 +1,182 @@
+"""
+Runs the benchmarks, saves their results as JSON and compares results.
+"""
+
+import os
+import sys
+import json
+import time
+import platform
+import datetime
+import itertools
+import traceback
+import subprocess as sp
+from contextlib import contextmanager
+
+import numpy as np
+
+from moviepy.version import __version__
+from moviepy.config import get_setting
+
+from .fixtures import Fixtures
+from .cases import BENCHMARKS
+
+
+# Changing the format of the results files increments this.
+RESULTS_VERSION = 1
+
+
+@contextmanager
+def _silence():
+    """ Hides the progress bars and messages printed on stderr. """
+    stderr = sys.stderr
+    with open(os.devnull, 'w') as devnull:
+        sys.stderr = devnull
+        try:
+            yield
+        finally:
+            sys.stderr = stderr
+
+
+def _ffmpeg_version():
+    try:
+        out = sp.check_output([get_setting("FFMPEG_BINARY"), '-version'])
+        return out.decode('utf8').splitlines()[0]
+    except (OSError, sp.CalledProcessError):
+        return None
+
+
+def expand(params, quick=False):
+    """ Returns the list of all the combinations of the parameters (as
+    dicts). With ``quick``, only the first value of each parameter is
+    used. """
+    names = sorted(params)
+    values = [params[n][:1] if quick else params[n] for n in names]
+    return [dict(zip(names, combination))
+            for combination in itertools.product(*values)]
+
+
+def run_benchmarks(folder, select=None, repeat=3, quick=False,
+                   verbose=True):
+    """ Runs the benchmarks and returns the results as a dict.
+
+    Parameters
+    -----------
+
+    folder
+      Folder where the synthetic media are generated (and kept for the
+      next runs) and where the benchmarks write their files.
+
+    select
+      If provided, only the benchmarks whose name contains one of these
+      strings are run.
+
+    repeat
+      Each benchmark is run once to warm up (open the files, fill the
+      caches...) then ``repeat`` times.
+
+    quick
+      Only run each benchmark with the first value of each parameter.
+
+    A benchmark which raises an error is recorded in the ``failures`` of
+    the results (with the traceback) and the next benchmarks are run.
+    """
+    fixtures = Fixtures(folder)
+    results = []
+    failures = []
+    for (name, f, params) in BENCHMARKS:
+        if select and not any(s in name for s in select):
+            continue
+        for kw in expand(params, quick):
+            label = name + "".join([" %s=%s" % (k, kw[k]) for k in sorted(kw)])
+            if verbose:
+                print(label)
+            try:
+                with _silence():
+                    run = f(fixtures, **kw)
+                    items = run()
+                    times = []
+                    for i in range(repeat):
+                        t0 = time.time()
+                        run()
+                        times.append(time.time() - t0)
+            except Exception as err:
+                failures.append({'name': name, 'params': kw,
+                                 'error': traceback.format_exc()})
+                if verbose:
+                    print("    FAILED: %s: %s" % (type(err).__name__, err))
+                continue
+            best = min(times)
+            result = {'name': name, 'params': kw, 'times': times,
+                      'best': best, 'median': float(np.median(times)),
+                      'items': items,
+                      'throughput': (items / best) if (items and best) else None}
+            results.append(result)
+            if verbose:
+                print("    best %.04fs, median %.04fs%s" % (
+                    best, result['median'],
+                    ", %.01f/s" % result['throughput']
+                    if result['throughput'] else ""))
+
+    return {'version': RESULTS_VERSION,
+            'moviepy': __version__,
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'ffmpeg': _ffmpeg_version(),
+            'platform': platform.platform(),
+            'processor': platform.processor(),
+            'date': datetime.datetime.now().isoformat(),
+            'repeat': repeat,
+            'results': results,
+            'failures': failures}
+
+
+def save_results(results, filename):
+    with open(filename, 'w') as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+
+
+def load_results(filename):
+    with open(filename) as f:
+        results = json.load(f)
+    if results.get('version', None) != RESULTS_VERSION:
+        raise ValueError("Unsupported benchmark results version in %s."
+                         % filename)
+    return results
+
+
+def compare_results(old, new, threshold=0.1):
+    """ Returns a text table comparing the best times of two results (as
+    returned by ``run_benchmarks`` or ``load_results``). The lines where
+    the time changed by more than ``threshold`` (10%) are marked. """
+
+    def key(result):
+        return (result['name'], json.dumps(result['params'], sort_keys=True))
+
+    def label(result):
+        return result['name'] + "".join([" %s=%s" % (k, result['params'][k])
+                                         for k in sorted(result['params'])])
+
+    old_times = dict([(key(r), r['best']) for r in old['results']])
+    lines = ["%-60s %10s %10s %8s" % ("benchmark", "old (s)", "new (s)",
+                                      "ratio")]
+    for result in new['results']:
+        before = old_times.get(key(result), None)
+        if before is None:
+            lines.append("%-60s %10s %10.04f" % (label(result), "-",
+                                                 result['best']))
+            continue
+        ratio = result['best'] / before if before else float('inf')
+        mark = ""
+        if ratio > 1 + threshold:
+            mark = "  slower"
+        elif ratio < 1 - threshold:
+            mark = "  faster"
+        lines.append("%-60s %10.04f %10.04f %8.02f%s" % (
+            label(result), before, result['best'], ratio, mark))
+    for failure in new.get('failures', []):
+        before = old_times.get(key(failure), None)
+        lines.append("%-60s %10s %10s" % (
+            label(failure), "-" if before is None else "%.04f" % before,
+            "FAILED"))
+    return "\n".join(lines)
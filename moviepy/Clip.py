@@ -12,7 +12,8 @@ from moviepy.decorators import ( apply_to_mask,
                                  requires_duration,
                                  outplace,
                                  convert_to_seconds,
-                                 use_clip_fps_by_default)
+                                 use_clip_fps_by_default,
+                                 recorded)
 from tqdm import tqdm
 
 class Clip:
@@ -45,6 +46,12 @@ class Clip:
     
     _TEMP_FILES_PREFIX = 'TEMP_MPY_'
 
+    # Attributes which don't define the clip's content (memoized frames,
+    # soundtrack, methods instrumented by moviepy.profiler...), ignored by
+    # the render cache (see video.io.render_cache)
+    render_ignore = ('memoized_t', 'memoized_frame', 'memoize_frame', 'audio',
+                     'get_frame', 'blit_on')
+
     def __init__(self):
 
         self.inicia = 0
@@ -94,6 +101,7 @@ class Clip:
         else:
             return self.make_frame(t)
 
+    @recorded
     def fl(self, fun, apply_to=[] , keep_duration=True):
         """ General processing of a clip.
 
@@ -153,6 +161,7 @@ class Clip:
 
     
     
+    @recorded
     def fl_time(self, t_func, apply_to=[], keep_duration=False):
         """
         Returns a Clip instance playing the content of the current clip
@@ -190,6 +199,7 @@ class Clip:
     
     
     
+    @recorded
     def fx(self, func, *args, **kwargs):
         """
         
@@ -216,6 +226,7 @@ class Clip:
             
     
     
+    @recorded
     @apply_to_mask
     @apply_to_audio
     @convert_to_seconds(['t'])
@@ -247,6 +258,7 @@ class Clip:
     
     
     
+    @recorded
     @apply_to_mask
     @apply_to_audio
     @convert_to_seconds(['t'])
@@ -268,6 +280,7 @@ class Clip:
 
 
     
+    @recorded
     @apply_to_mask
     @apply_to_audio
     @convert_to_seconds(['t'])
@@ -293,6 +306,7 @@ class Clip:
             self.inicia = self.fin - t
 
 
+    @recorded
     @outplace
     def set_make_frame(self, make_frame):
         """
@@ -301,6 +315,7 @@ class Clip:
         """
         self.make_frame = make_frame
 
+    @recorded
     @outplace
     def set_fps(self, fps):
         """ Returns a copia of the clip with a new default fps for functions like
@@ -308,11 +323,13 @@ class Clip:
         self.fps = fps
 
 
+    @recorded
     @outplace
     def set_ismask(self, ismask):
         """ Says wheter the clip is a mask or not (ismask is a boolean)""" 
         self.ismask = ismask
 
+    @recorded
     @outplace
     def set_memoize(self, memoize):
         """ Sets wheter the clip should keep the last frame read in memory """ 
@@ -353,6 +370,7 @@ class Clip:
     
 
 
+    @recorded
     @convert_to_seconds(['t_start', 't_end'])
     @apply_to_mask
     @apply_to_audio
@@ -386,6 +404,13 @@ class Clip:
 
         newclip = self.fl_time(lambda t: t + t_start, apply_to=[])
 
+        source = getattr(self, 'source', None)
+        if (source is not None) and (source[3] is self.make_frame):
+            # a cut of a sound file is still a cut of the sound file
+            filename, start, codec, _ = source
+            newclip.source = (filename, start + t_start, codec,
+                              newclip.make_frame)
+
         if (t_end is None) and (self.duracion is not None):
         
             t_end = self.duracion
@@ -409,6 +434,7 @@ class Clip:
         return newclip
 
     
+    @recorded
     @apply_to_mask
     @apply_to_audio
     @convert_to_seconds(['ta', 'tb'])
@@ -440,7 +466,7 @@ class Clip:
     @requires_duration
     @use_clip_fps_by_default
     def iter_frames(self, fps=None, with_times = False, progress_bar=False,
-                    dtype=None):
+                    dtype=None, profile=None):
         """ Iterates over all the frames of the clip.
         
         Returns each frame of the clip as a HxWxN np.array,
@@ -454,6 +480,11 @@ class Clip:
         clip already has a ``fps`` attribute.
 
         Use dtype="uint8" when using the pictures to write video, images... 
+
+        With ``profile=True`` the time spent in each node of the clip graph
+        is measured and printed when the iteration is over. ``profile``
+        can also be a prefix for the report files, or a RenderProfiler
+        (see ``moviepy.profiler``).
         
         Examples
         ---------
@@ -466,23 +497,28 @@ class Clip:
                      for frame in myclip.iter_frames()])
         """
 
+        from moviepy.profiler import get_profiler, profiling
+        profiler, prefix = get_profiler(profile)
+
         def generator():
-        
-            for t in np.arange(0, self.duracion, 1.0/fps):
-        
-                frame = self.get_frame(t)
-        
-                if (dtype is not None) and (frame.dtype != dtype):
-        
-                    frame = frame.astype(dtype)
 
-                if with_times:
-        
-                    yield t, frame
-        
-                else:
-        
-                    yield frame
+            with profiling(profiler, self, 'iter_frames', prefix):
+
+                for t in np.arange(0, self.duracion, 1.0/fps):
+
+                    frame = self.get_frame(t)
+
+                    if (dtype is not None) and (frame.dtype != dtype):
+
+                        frame = frame.astype(dtype)
+
+                    if with_times:
+
+                        yield t, frame
+
+                    else:
+
+                        yield frame
         
         if progress_bar:
         
@@ -1,7 +1,7 @@
 import os
 import numpy as np
 from moviepy.audio.io.ffmpeg_audiowriter import ffmpeg_audiowrite
-from moviepy.decorators import requires_duration
+from moviepy.decorators import requires_duration, recorded
 from moviepy.tools import (deprecated_version_of,
                            extensions_dict)
 
@@ -42,6 +42,7 @@ class AudioClip(Clip):
                      
     """
     
+    @recorded
     def __init__(self, make_frame = None, duracion=None):
         Clip.__init__(self)
         if make_frame is not None:
@@ -54,6 +55,18 @@ class AudioClip(Clip):
         if duracion is not None:
             self.duracion = duracion
             self.fin = duracion
+
+    def passthrough_source(self):
+        """ Returns ``(filename, t_start, codec)`` if the sound of the clip
+        is an unmodified extract of an audio or video file, starting at time
+        ``t_start`` in the file and encoded with the (ffmpeg) ``codec``.
+        Returns None if the sound is not read from a file or has been
+        transformed (effects, speed changes, concatenations...).
+        """
+        source = getattr(self, 'source', None)
+        if (source is None) or (source[3] is not self.make_frame):
+            return None
+        return source[:3]
     
     @requires_duration
     def iter_chunks(self, chunksize=None, chunk_duration=None, fps=None,
@@ -110,8 +123,8 @@ class AudioClip(Clip):
         max_duration = 1.0 * buffersize / fps
         if (tt is None):
             if self.duracion>max_duration:
-                return stacker(self.iter_chunks(fps=fps, quantize=quantize, nbytes=2,
-                                                 chunksize=buffersize))
+                return stacker(list(self.iter_chunks(fps=fps, quantize=quantize,
+                                                     nbytes=2, chunksize=buffersize)))
             else:
                 tt = np.arange(0, self.duracion, 1.0/fps)
         """
@@ -149,7 +162,7 @@ class AudioClip(Clip):
     def write_audiofile(self,filename, fps=44100, nbytes=2,
                      buffersize=2000, codec=None,
                      bitrate=None, ffmpeg_params=None,
-                     write_logfile=False, verbose=True):
+                     write_logfile=False, verbose=True, telemetry=None):
         """ Writes an audio file from the AudioClip.
 
 
@@ -187,6 +200,9 @@ class AudioClip(Clip):
         verbose
           If True, displays informations
 
+        telemetry
+          A function which receives the progress of the export as events
+          (dicts) instead of the progress bar. See ``moviepy.telemetry``.
 
         """
 
@@ -201,7 +217,8 @@ class AudioClip(Clip):
 
         return ffmpeg_audiowrite(self, filename, fps, nbytes, buffersize,
                       codec=codec, bitrate=bitrate, write_logfile=write_logfile,
-                      verbose=verbose, ffmpeg_params=ffmpeg_params)
+                      verbose=verbose, ffmpeg_params=ffmpeg_params,
+                      telemetry=telemetry)
 
 ###
 #
@@ -228,6 +245,7 @@ class AudioArrayClip(AudioClip):
     
     """
     
+    @recorded
     def __init__(self, array, fps):
         
         Clip.__init__(self)
@@ -273,6 +291,7 @@ class CompositeAudioClip(AudioClip):
     
     """
 
+    @recorded
     def __init__(self, clips):
 
         Clip.__init__(self)
@@ -303,6 +322,66 @@ class CompositeAudioClip(AudioClip):
         self.make_frame = make_frame
 
 
+class AudioLoopClip(AudioClip):
+
+    """ Audio clip playing an audio clip in a loop.
+
+    The time of the clip is mapped to the time of the looped clip with a
+    modulo, so the cost of the clip does not depend on the number of
+    loops. The chunks of sound which cross the end of a loop are split
+    into parts which are each read from a single range of the looped
+    clip, in order.
+
+    Parameters
+    ------------
+
+    clip
+      The audio clip to loop. It must have a ``duracion``.
+
+    nloops
+      Number of times the clip is played.
+
+    duracion
+      Total duracion of the clip, which can be provided instead of
+      ``nloops``. If neither is provided, the clip loops indefinitely.
+
+    """
+
+    @recorded
+    def __init__(self, clip, nloops=None, duracion=None):
+
+        Clip.__init__(self)
+        if clip.duracion is None:
+            raise ValueError("MoviePy error: only clips with a duracion "
+                             "can be looped.")
+        self.clip = clip
+        self.nchannels = clip.nchannels
+        if hasattr(clip, 'fps'):
+            self.fps = clip.fps
+        period = clip.duracion
+
+        if (duracion is None) and (nloops is not None):
+            duracion = nloops * period
+        if duracion is not None:
+            self.duracion = duracion
+            self.fin = duracion
+
+        def make_frame(t):
+            if not isinstance(t, np.ndarray):
+                return clip.get_frame(t % period)
+            # the chunk is split where it goes from one loop to another
+            loops = np.floor(t / period)
+            tt = t - loops * period
+            cuts = np.nonzero(np.diff(loops))[0] + 1
+            if len(cuts) == 0:
+                return clip.get_frame(tt)
+            return np.concatenate([clip.get_frame(part)
+                                   for part in np.split(tt, cuts)])
+
+        self.make_frame = make_frame
+
+
+@recorded
 def concatenate_audioclips(clips):
     durations = [c.duracion for c in clips]
     tt = np.cumsum([0]+durations) # inicia times, and fin time.
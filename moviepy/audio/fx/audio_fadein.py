@@ -1,6 +1,7 @@
-from moviepy.decorators import audio_video_fx
+from moviepy.decorators import audio_video_fx, recorded
 import numpy as np
 
+@recorded
 @audio_video_fx
 def audio_fadein(clip, duracion):
     """ Return an audio (or video) clip that is first mute, then the
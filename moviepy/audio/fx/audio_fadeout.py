@@ -1,6 +1,7 @@
-from moviepy.decorators import audio_video_fx, requires_duration
+from moviepy.decorators import audio_video_fx, requires_duration, recorded
 import numpy as np
 
+@recorded
 @audio_video_fx
 @requires_duration
 def audio_fadeout(clip, duracion):
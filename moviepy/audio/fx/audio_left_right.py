@@ -1,5 +1,7 @@
 import numpy as np
+from moviepy.decorators import recorded
 
+@recorded
 def audio_left_right(audioclip, left=1, right=1, merge=False):
     """
     NOT YET FINISHED 
@@ -1,10 +1,12 @@
-from ..AudioClip import concatenate_audioclips
+from ..AudioClip import AudioLoopClip
+from moviepy.decorators import recorded
 
+@recorded
 def audio_loop(audioclip, nloops=None, duracion=None):
     """ Loops over an audio clip.
 
     Returns an audio clip that plays the given clip either
-    `nloops` times, or during `duracion` seconds.
+    `nloops` times, or during `duracion` seconds (see ``AudioLoopClip``).
 
     Examples
     ========
@@ -17,12 +19,4 @@ def audio_loop(audioclip, nloops=None, duracion=None):
 
     """
 
-    if duracion is not None:
-
-        nloops = int( duracion/ audioclip.duracion)+1
-        return concatenate_audioclips(nloops*[audioclip]).set_duracion(duracion)
-    
-    else:
-
-        return concatenate_audioclips(nloops*[audioclip])
-    
+    return AudioLoopClip(audioclip, nloops, duracion)
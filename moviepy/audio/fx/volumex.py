@@ -1,5 +1,6 @@
-from moviepy.decorators import audio_video_fx
+from moviepy.decorators import audio_video_fx, recorded
 
+@recorded
 @audio_video_fx
 def volumex(clip, factor):
     """ Returns a clip with audio volume multiplied by the
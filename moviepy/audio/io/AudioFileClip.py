@@ -4,6 +4,7 @@ import numpy as np
 
 from moviepy.audio.AudioClip import AudioClip
 from moviepy.audio.io.readers import FFMPEG_AudioReader
+from moviepy.decorators import recorded
 
 class AudioFileClip(AudioClip):
 
@@ -53,6 +54,7 @@ class AudioFileClip(AudioClip):
     
     """
 
+    @recorded
     def __init__(self, filename, buffersize=200000, nbytes=2, fps=44100):
         
 
@@ -70,6 +72,11 @@ class AudioFileClip(AudioClip):
         
         self.make_frame =  lambda t: reader.get_frame(t)
         self.nchannels = reader.nchannels
+
+        # As long as the make_frame is this one (or the one of a subclip),
+        # the sound can be copied from the file, see passthrough_source.
+        self.source = (filename, 0, reader.infos.get('audio_codec', 'unknown'),
+                       self.make_frame)
     
     
     def coreader(self):
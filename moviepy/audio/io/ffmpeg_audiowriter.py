@@ -3,6 +3,7 @@ import numpy as np
 import subprocess as sp
 
 import os
+import time
 try:
     from subprocess import DEVNULL # py3k
 except ImportError:
@@ -12,7 +13,7 @@ from tqdm import tqdm
 from moviepy.config import get_setting
 from moviepy.decorators import requires_duration
 
-from moviepy.tools import verbose_print
+from moviepy.telemetry import RenderMonitor, pipe_pending
 
 
 
@@ -136,10 +137,13 @@ class FFMPEG_AudioWriter:
 def ffmpeg_audiowrite(clip, filename, fps, nbytes, buffersize,
                       codec='libvorbis', bitrate=None,
                       write_logfile = False, verbose=True,
-                      ffmpeg_params=None):
+                      ffmpeg_params=None, telemetry=None):
     """
     A function that wraps the FFMPEG_AudioWriter to write an AudioClip
     to a file.
+
+    The progress is shown with a progress bar, or sent to the ``telemetry``
+    callable if provided (see moviepy.telemetry).
     """
 
     if write_logfile:
@@ -147,7 +151,9 @@ def ffmpeg_audiowrite(clip, filename, fps, nbytes, buffersize,
     else:
         logfile = None
 
-    verbose_print(verbose, "[MoviePy] Writing audio in %s\n"%filename)
+    monitor = RenderMonitor(telemetry, 'audio', filename,
+                            int(fps*clip.duracion), unit='samples')
+    monitor.message(verbose, "[MoviePy] Writing audio in %s\n"%filename)
 
     writer = FFMPEG_AudioWriter(filename, fps, nbytes, clip.nchannels,
                                 codec=codec, bitrate=bitrate,
@@ -156,10 +162,18 @@ def ffmpeg_audiowrite(clip, filename, fps, nbytes, buffersize,
 
     
     
-    for chunk in clip.iter_chunks(chunksize=buffersize,
-                                  progress_bar=True, quantize=True,
-                                  nbytes= nbytes, fps=fps):
-        writer.write_frames(chunk)
+    try:
+        for chunk in clip.iter_chunks(chunksize=buffersize, quantize=True,
+                                      nbytes= nbytes, fps=fps):
+            t0 = time.time()
+            writer.write_frames(chunk)
+            pending = pipe_pending(writer.proc.stdin)
+            monitor.update(len(chunk), blocked=time.time() - t0,
+                           queue_depth=(None if pending is None else
+                                        pending // max(1, chunk.nbytes)))
+    except Exception as err:
+        monitor.fail(err)
+        raise
 
     """
     totalsize = int(fps*clip.duracion)
@@ -181,4 +195,5 @@ def ffmpeg_audiowrite(clip, filename, fps, nbytes, buffersize,
     if write_logfile:
         logfile.close()
 
-    verbose_print(verbose, "[MoviePy] Done.\n")
+    monitor.message(verbose, "[MoviePy] Done.\n")
+    monitor.close()
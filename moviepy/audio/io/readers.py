@@ -2,7 +2,8 @@ import subprocess as sp
 import re
 
 import numpy as np
-from moviepy.tools import cvsecs
+from moviepy.tools import cvsecs, file_key
+from moviepy.telemetry import count
 
 from moviepy.video.io.ffmpeg_reader import ffmpeg_parse_infos
 from moviepy.config import get_setting
@@ -42,6 +43,12 @@ class FFMPEG_AudioReader:
       Desired number of bytes (1,2,4) in the signal that will be
       received from ffmpeg
 
+    The buffer at the start of the file is kept (``head``), and replaced
+    by the buffer at a position to which the reader jumps back twice (the
+    start of a loop): when the reader jumps back there again, this buffer
+    is used while ffmpeg, restarted at once after it, seeks in the
+    background.
+
     """
 
     def __init__(self, filename, buffersize, print_infos=False,
@@ -66,8 +73,12 @@ class FFMPEG_AudioReader:
         self.buffersize= min( self.nframes+1, buffersize )
         self.buffer= None
         self.buffer_startframe = 1
+        self.head = None
         self.initialize()
         self.buffer_around(1)
+        # (startframe, buffer) kept for loops, and last backward jump
+        self.head = (self.buffer_startframe, self.buffer)
+        self.last_jump = self.buffer_startframe
 
 
 
@@ -101,6 +112,7 @@ class FFMPEG_AudioReader:
             popen_params["creationflags"] = 0x08000000
 
         self.proc = sp.Popen( cmd, **popen_params)
+        count('decoder_spawns')
 
         self.pos = np.round(self.fps*starttime)
 
@@ -119,8 +131,13 @@ class FFMPEG_AudioReader:
         dt = {1: 'int8',2:'int16',4:'int32'}[self.nbytes]
         result = np.fromstring(s, dtype=dt)
         result = (1.0*result / 2**(8*self.nbytes-1)).\
-                                 reshape((len(result)/self.nchannels,
+                                 reshape((len(result)//self.nchannels,
                                           self.nchannels))
+        if len(result) < chunksize:
+            # end of the file (the durations found by ffmpeg may be a bit
+            # longer than the sound): silence
+            result = np.vstack([result, np.zeros((chunksize - len(result),
+                                                  self.nchannels))])
         #self.proc.stdout.flush()
         self.pos = self.pos+chunksize
         return result
@@ -146,6 +163,10 @@ class FFMPEG_AudioReader:
 
 
 
+    def render_key(self, t_start=None, t_end=None):
+        """ Identifies the sound read, see video.io.render_cache. """
+        return (file_key(self.filename), self.fps, self.nbytes, self.nchannels)
+
     def close_proc(self):
         if hasattr(self, 'proc') and self.proc is not None:
             self.proc.terminate()
@@ -215,6 +236,11 @@ class FFMPEG_AudioReader:
         # inicia-frame for the buffer
         new_bufferstart = max(0,  framenumber - self.buffersize // 2)
 
+        if (self.head is not None) and (new_bufferstart == self.head[0]):
+            # the pipe is restarted right after the head, if needed
+            self.buffer_startframe, self.buffer = self.head
+            self.seek(self.head[0] + len(self.head[1]))
+            return
 
         if (self.buffer is not None):
             current_f_end  = self.buffer_startframe + self.buffersize
@@ -222,13 +248,18 @@ class FFMPEG_AudioReader:
                         current_f_end  <
                                new_bufferstart + self.buffersize):
                 # We already have one bit of what must be read
-                conserved = current_f_end - new_bufferstart + 1
+                conserved = current_f_end - new_bufferstart
                 chunksize = self.buffersize-conserved
                 array = self.read_chunk(chunksize)
                 self.buffer = np.vstack([self.buffer[-conserved:], array])
             else:
                 self.seek(new_bufferstart)
                 self.buffer =  self.read_chunk(self.buffersize)
+                if new_bufferstart < self.buffer_startframe:
+                    if new_bufferstart == self.last_jump:
+                        # second jump to this position: probably a loop
+                        self.head = (new_bufferstart, self.buffer)
+                    self.last_jump = new_bufferstart
         else:
             self.seek(new_bufferstart)
             self.buffer =  self.read_chunk(self.buffersize)
@@ -105,6 +105,29 @@ def add_mask_if_none(f, clip, *a, **k):
 
 
 
+@decorator.decorator
+def use_proxies(f, *a, **k):
+    """ Runs f with the clips reading the proxies of their video files
+    (if they have ready proxies). See ``moviepy.video.io.proxies``. """
+    from moviepy.video.io.proxies import proxy_mode
+    with proxy_mode():
+        return f(*a, **k)
+
+
+
+@decorator.decorator
+def recorded(f, *a, **k):
+    """ Records how the clip returned by f (or initialized by f, for the
+    constructors) was made, so that it can be described in a Timeline.
+    Only in a ``moviepy.timeline.recording()`` context. """
+    result = f(*a, **k)
+    from moviepy.timeline import record, recording_enabled
+    if recording_enabled():
+        record(f, a, k, result)
+    return result
+
+
+
 @decorator.decorator
 def use_clip_fps_by_default(f, clip, *a, **k):
     """ Will use clip.fps if no fps=... is provided in **k """
@@ -21,12 +21,15 @@ clip.preview().
 
 from .video.io.VideoFileClip import VideoFileClip
 from .video.io.ImageSequenceClip import ImageSequenceClip
+from .video.io.framestore import FrameStoreClip
+from .video.io.RawVideoClip import RawVideoClip
 from .video.io.downloader import download_webfile
 from .video.VideoClip import VideoClip, ImageClip, ColorClip, TextClip
 from .video.compositing.CompositeVideoClip import CompositeVideoClip, clips_array
 from .video.compositing.concatenate import concatenate_videoclips, concatenate # concatenate=deprecated
 
-from .audio.AudioClip import AudioClip, CompositeAudioClip, concatenate_audioclips
+from .audio.AudioClip import (AudioClip, CompositeAudioClip, AudioLoopClip,
+                              concatenate_audioclips)
 from .audio.io.AudioFileClip import AudioFileClip
 
 # FX
@@ -41,6 +44,9 @@ import moviepy.video.tools as videotools
 import moviepy.video.io.ffmpeg_tools as ffmpeg_tools
 from .video.io.html_tools import ipython_display
 from .tools import cvsecs
+from .timeline import Timeline, recording, register_function
+from .video.io.render_spool import RenderSpool
+from .profiler import RenderProfiler
 
 try:
     from .video.io.sliders import sliders
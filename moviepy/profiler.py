@@ -0,0 +1,306 @@
+"""
+This module implements RenderProfiler, which measures where the time goes
+when the frames of a clip are computed.
+
+When a clip is profiled (``write_videofile(..., profile=True)``,
+``iter_frames(..., profile=True)``, or ``with profiling(profiler, clip)``)
+the ``get_frame`` of every node of its clip graph is instrumented: the
+clips (including the masks and the soundtracks), the file readers and the
+``blit_on`` of the composited clips, plus the encoder pipe when a video
+file is written. For each node the profiler records:
+
+- the inclusive time: time spent in the node's ``get_frame``,
+- the exclusive time: the same minus the time spent in the nodes it calls
+  (e.g. the time of an effect itself, without the decoding of its source),
+- the number of calls,
+- the number of bytes of the frames produced by the node.
+
+At the end, ``report()`` gives the call tree with these figures, and
+``folded()`` gives the stacks in the 'folded' format read by flamegraph
+tools (``flamegraph.pl``, speedscope, inferno...). ``save(prefix)``
+writes both in ``prefix.txt`` and ``prefix.folded``.
+
+>>> clip.write_videofile("out.mp4", profile=True)
+>>> # writes out.mp4.profile.txt and out.mp4.profile.folded
+"""
+
+import os
+import time
+import types
+import threading
+import functools
+from contextlib import contextmanager
+
+import numpy as np
+
+from moviepy.Clip import Clip
+from moviepy.tools import is_string
+
+
+# Methods instrumented on the objects of the clip graph which are not
+# clips but define them (readers, proxies...).
+_READER_METHODS = ('get_frame',)
+
+
+class _Node:
+    """ Statistics of one instrumented method. """
+
+    def __init__(self, label):
+        self.label = label
+        self.inclusive = 0.0
+        self.exclusive = 0.0
+        self.calls = 0
+        self.nbytes = 0
+
+
+class RenderProfiler:
+    """ Collects the time spent in each node of a clip graph.
+
+    See the docstring of module ``moviepy.profiler``. A same profiler can
+    be used for several renders, its figures are then added up.
+    """
+
+    def __init__(self):
+        self.nodes = []
+        self.paths = {}  # (label, label...) -> [inclusive, exclusive, calls]
+        self.total = 0.0
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._attached = []
+        self._counts = {}
+
+    # INSTRUMENTATION
+
+    def instrument(self, obj, name, label):
+        """ Replaces the method ``name`` of the object ``obj`` by a version
+        which records its calls under ``label``. The original method is
+        restored by ``detach``. """
+        original = getattr(obj, name)
+        node = _Node(label)
+        self.nodes.append(node)
+
+        @functools.wraps(original)
+        def wrapper(*args, **kwargs):
+            return self._call(node, original, args, kwargs)
+
+        # lets the render cache hash the object as if it wasn't profiled
+        wrapper.profiler_node = node
+        obj.__dict__[name] = wrapper
+        self._attached.append((obj, name))
+        return node
+
+    def attach(self, clip):
+        """ Instruments all the nodes of the clip graph of ``clip``. """
+        seen = set()
+        stack = [clip]
+        while stack:
+            obj = stack.pop()
+            if id(obj) in seen:
+                continue
+            seen.add(id(obj))
+
+            if isinstance(obj, Clip):
+                label = self._label(obj)
+                self.instrument(obj, 'get_frame', label)
+                if callable(getattr(type(obj), 'blit_on', None)):
+                    self.instrument(obj, 'blit_on', label + " blit_on")
+                children = list(obj.__dict__.values())
+            elif isinstance(obj, (list, tuple, set, frozenset)):
+                children = list(obj)
+            elif isinstance(obj, dict):
+                children = list(obj.values())
+            elif isinstance(obj, types.FunctionType):
+                children = []
+                for cell in (obj.__closure__ or []):
+                    try:
+                        children.append(cell.cell_contents)
+                    except ValueError:  # empty cell
+                        pass
+                children += list(obj.__defaults__ or ())
+            elif isinstance(obj, types.MethodType):
+                children = [obj.__self__, obj.__func__]
+            elif isinstance(obj, functools.partial):
+                children = ([obj.func] + list(obj.args) +
+                            list((obj.keywords or {}).values()))
+            elif (isinstance(obj, (np.ndarray, np.generic, type,
+                                   types.ModuleType, RenderProfiler)) or
+                  not hasattr(obj, '__dict__')):
+                children = []
+            else:
+                for name in _READER_METHODS:
+                    if callable(getattr(type(obj), name, None)):
+                        self.instrument(obj, name, self._label(obj))
+                children = list(obj.__dict__.values())
+
+            stack.extend(children)
+
+    def detach(self):
+        """ Restores all the methods instrumented by the profiler. """
+        for (obj, name) in self._attached:
+            obj.__dict__.pop(name, None)
+        self._attached = []
+
+    def _label(self, obj):
+        """ Name of a node in the reports, e.g. 'VideoClip#3 (resize)'. """
+        cls = type(obj).__name__
+        n = self._counts[cls] = self._counts.get(cls, -1) + 1
+        label = "%s#%d" % (cls, n)
+        if getattr(obj, 'ismask', False):
+            label = "mask " + label
+        filename = getattr(obj, 'filename', None)
+        if is_string(filename):
+            return label + " (%s)" % os.path.basename(filename)
+        from moviepy.timeline import _recipes
+        recipe = _recipes.get(obj, None) if isinstance(obj, Clip) else None
+        if recipe is not None and recipe.method is not None:
+            label += " (%s)" % recipe.method
+        elif recipe is not None:
+            name = recipe.function.split(':')[-1]
+            if name != cls:
+                label += " (%s)" % name
+        return label
+
+    # MEASURES
+
+    def _stack(self):
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def _call(self, node, f, args, kwargs):
+        stack = self._stack()
+        entry = [node, 0.0]  # node, time spent in the nodes called
+        stack.append(entry)
+        t0 = time.perf_counter()
+        try:
+            result = f(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - t0
+            stack.pop()
+            self._record(stack, node, elapsed, elapsed - entry[1])
+            if stack:
+                stack[-1][1] += elapsed
+        node.nbytes += getattr(result, 'nbytes', 0)
+        return result
+
+    def _record(self, stack, node, inclusive, exclusive):
+        path = tuple([e[0].label for e in stack]) + (node.label,)
+        recursive = any(e[0] is node for e in stack)
+        with self._lock:
+            node.calls += 1
+            node.exclusive += exclusive
+            if not recursive:
+                node.inclusive += inclusive
+            stats = self.paths.setdefault(path, [0.0, 0.0, 0])
+            stats[0] += inclusive
+            stats[1] += exclusive
+            stats[2] += 1
+
+    @contextmanager
+    def session(self, clip, label='render'):
+        """ Context in which the clip graph of ``clip`` is instrumented.
+        The time spent in the context is recorded under ``label``. """
+        self.attach(clip)
+        node = _Node(label)
+        self.nodes.append(node)
+        stack = self._stack()
+        entry = [node, 0.0]
+        stack.append(entry)
+        t0 = time.perf_counter()
+        try:
+            yield self
+        finally:
+            elapsed = time.perf_counter() - t0
+            stack.remove(entry)
+            self._record(stack, node, elapsed, elapsed - entry[1])
+            self.total += elapsed
+            self.detach()
+
+    # REPORTS
+
+    def report(self):
+        """ Returns the call tree (and a list of the nodes by exclusive
+        time) as a text table. """
+        lines = ["%10s %10s %8s %10s  %s" % ("incl. (s)", "excl. (s)",
+                                             "calls", "MB out", "node")]
+        nbytes = dict([(n.label, n.nbytes) for n in self.nodes])
+
+        children = {}
+        for path in self.paths:
+            children.setdefault(path[:-1], []).append(path)
+
+        def walk(path, depth):
+            incl, excl, calls = self.paths[path]
+            mb = nbytes.get(path[-1], 0) / 1e6
+            lines.append("%10.03f %10.03f %8d %10s  %s%s" % (
+                incl, excl, calls, ("%.01f" % mb) if mb else "-",
+                "  " * depth, path[-1]))
+            for child in sorted(children.get(path, []),
+                                key=lambda p: -self.paths[p][0]):
+                walk(child, depth + 1)
+
+        for root in sorted(children.get((), []),
+                           key=lambda p: -self.paths[p][0]):
+            walk(root, 0)
+
+        lines += ["", "%10s %10s %8s  %s" % ("excl. (s)", "incl. (s)",
+                                            "calls", "node")]
+        for node in sorted(self.nodes, key=lambda n: -n.exclusive):
+            if node.calls:
+                lines.append("%10.03f %10.03f %8d  %s" % (
+                    node.exclusive, node.inclusive, node.calls, node.label))
+        return "\n".join(lines)
+
+    def folded(self):
+        """ Returns the stacks in the 'folded' format of flamegraphs: one
+        line 'root;child;grandchild microseconds' per stack, the value
+        being the exclusive time of the last node of the stack. """
+        lines = []
+        for path in sorted(self.paths):
+            us = int(1e6 * self.paths[path][1])
+            if us > 0:
+                lines.append("%s %d" % (";".join([p.replace(';', ',')
+                                                  for p in path]), us))
+        return "\n".join(lines) + "\n"
+
+    def save(self, prefix):
+        """ Writes ``prefix.txt`` (the report) and ``prefix.folded`` (for
+        flamegraph tools). """
+        with open(prefix + ".txt", 'w') as f:
+            f.write(self.report() + "\n")
+        with open(prefix + ".folded", 'w') as f:
+            f.write(self.folded())
+
+
+def get_profiler(profile, prefix=None):
+    """ Interprets the ``profile`` parameter of the rendering functions.
+
+    Returns ``(profiler, prefix)``: ``profile`` can be None/False (no
+    profiling), a RenderProfiler (used as is, nothing is saved), True (the
+    results are saved under ``prefix``, or printed if it is None) or a
+    string (the results are saved under this prefix).
+    """
+    if (profile is None) or (profile is False):
+        return None, None
+    if isinstance(profile, RenderProfiler):
+        return profile, None
+    if profile is True:
+        return RenderProfiler(), prefix if prefix is not None else True
+    return RenderProfiler(), profile
+
+
+@contextmanager
+def profiling(profiler, clip, label='render', prefix=None):
+    """ Context in which ``clip`` is profiled by ``profiler`` (nothing is
+    done if ``profiler`` is None). At the end, the results are saved
+    under ``prefix`` if it is a string, or printed if it is True. """
+    if profiler is None:
+        yield None
+        return
+    with profiler.session(clip, label):
+        yield profiler
+    if prefix is True:
+        print(profiler.report())
+    elif prefix is not None:
+        profiler.save(prefix)
@@ -0,0 +1,275 @@
+"""
+This module implements the telemetry of the exports (``write_videofile``,
+``write_audiofile``, ``write_gif``, ``write_images_sequence``...).
+
+By default the progress of an export is shown with a tqdm progress bar.
+When a ``telemetry`` callable is given to an export function, the
+progress bar is replaced by events sent to this callable. Each event is a
+dict with the following keys:
+
+- ``event``: 'start', 'progress', 'message', 'done' or 'error'.
+- ``task``: what is being written ('video', 'audio', 'gif', 'images',
+  'segments', 'framestore').
+- ``filename``: the file being written.
+- ``time``: time of the event (``time.time()``).
+- ``unit``, ``total``, ``done``: the export is done when ``done`` (frames,
+  samples...) reaches ``total``.
+- ``elapsed``: seconds since the start of the export.
+- ``fps``: average speed since the start, in units (frames, samples...)
+  per second, and ``instant_fps``, the speed since the previous event.
+- ``pipe_blocked``: seconds spent waiting for the encoder (ffmpeg,
+  ImageMagick...) to accept the data.
+- ``queue_depth``: number of frames (or chunks) sent to the encoder and
+  not yet read by it, when this can be known (POSIX pipes), else None.
+- ``decoder_respawns``: number of ffmpeg decoding processes started by
+  the readers for this export (each seek backwards or far forward
+  restarts a decoder). Only the decoders started by the thread of the
+  export (and by the threads it attached, see ``RenderMonitor.attach``)
+  are counted, so exports running in parallel don't count each other's
+  decoders.
+- ``peak_rss``: maximum memory used by the process so far (bytes), if
+  known.
+- ``message``: the text, for 'message' and 'error' events.
+
+The 'progress' events are sent at most every ``RenderMonitor.interval``
+seconds. The messages of the exports are printed (if ``verbose``) when
+there is no ``telemetry`` callable, else they are sent as 'message'
+events. ``JSONLinesSink`` is a ready-made telemetry callable which
+appends the events to a file:
+
+>>> clip.write_videofile("out.mp4", telemetry=JSONLinesSink("out.jsonl"))
+"""
+
+import sys
+import json
+import time
+import threading
+import weakref
+
+from tqdm import tqdm
+
+from moviepy.tools import verbose_print
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+try:
+    import fcntl
+    import termios
+    import array
+except ImportError:  # Windows
+    fcntl = None
+
+
+# Number of ffmpeg processes started by the readers (see the readers'
+# ``initialize`` methods), in the whole process.
+counters = {'decoder_spawns': 0}
+_counters_lock = threading.Lock()
+
+# The keys of the events.
+EVENT_KEYS = ('event', 'task', 'filename', 'time', 'unit', 'total', 'done',
+              'elapsed', 'fps', 'instant_fps', 'pipe_blocked',
+              'queue_depth', 'decoder_respawns', 'peak_rss', 'message')
+
+# The monitors of the exports running in the current thread.
+_active = threading.local()
+
+
+def _active_monitors():
+    monitors = getattr(_active, 'monitors', None)
+    if monitors is None:
+        monitors = _active.monitors = weakref.WeakSet()
+    return monitors
+
+
+def count(name, n=1):
+    """ Increments the counter ``name`` of ``telemetry.counters`` and
+    of the monitors of the exports running in the current thread. """
+    monitors = list(_active_monitors())
+    with _counters_lock:
+        counters[name] = counters.get(name, 0) + n
+        for monitor in monitors:
+            monitor.counters[name] = monitor.counters.get(name, 0) + n
+
+
+def peak_rss():
+    """ Maximum resident memory of the process so far (in bytes), or None
+    if it can't be known on this platform. """
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on Mac OS
+    return rss if sys.platform == 'darwin' else 1024 * rss
+
+
+def pipe_pending(fileobj):
+    """ Number of bytes written in the pipe ``fileobj`` which have not
+    been read yet by the process at the other end, or None if this can't
+    be known. """
+    if fcntl is None:
+        return None
+    try:
+        buf = array.array('i', [0])
+        fcntl.ioctl(fileobj.fileno(), termios.FIONREAD, buf)
+        return buf[0]
+    except (IOError, OSError, ValueError, AttributeError):
+        return None
+
+
+class RenderMonitor:
+    """ Follows the progress of an export and reports it with a tqdm
+    progress bar (if ``telemetry`` is None) or as events sent to the
+    ``telemetry`` callable (see the docstring of ``moviepy.telemetry``).
+
+    Parameters
+    -----------
+
+    telemetry
+      None or a function called with each event (a dict).
+
+    task
+      What is written ('video', 'audio', 'gif'...).
+
+    filename
+      Name of the file written.
+
+    total
+      Number of units (frames, samples...) to write.
+
+    unit
+      Name of the units, for the events.
+
+    progress_bar
+      If False, no progress bar is shown when ``telemetry`` is None.
+    """
+
+    # Minimal interval (in seconds) between two 'progress' events
+    interval = 0.5
+
+    def __init__(self, telemetry, task, filename, total, unit='frames',
+                 progress_bar=True):
+
+        self.telemetry = telemetry
+        self.task = task
+        self.filename = filename
+        self.total = total
+        self.unit = unit
+        self.done = 0
+        self.pipe_blocked = 0.0
+        self.queue_depth = None
+        self.start = time.time()
+        self.last = (self.start, 0)  # time and done at the last event
+        self.counters = {}  # see count()
+        self.attach()
+
+        if telemetry is None:
+            self.bar = tqdm(total=total) if progress_bar else None
+        else:
+            self.bar = None
+            self.emit('start')
+
+    def emit(self, event, message=None):
+        """ Sends an event to the telemetry callable (if any). """
+        if self.telemetry is None:
+            return
+        now = time.time()
+        elapsed = now - self.start
+        last_time, last_done = self.last
+        self.telemetry({
+            'event': event, 'task': self.task, 'filename': self.filename,
+            'time': now, 'unit': self.unit, 'total': self.total,
+            'done': self.done, 'elapsed': elapsed,
+            'fps': (self.done / elapsed) if elapsed else None,
+            'instant_fps': ((self.done - last_done) / (now - last_time)
+                            if now > last_time else None),
+            'pipe_blocked': self.pipe_blocked,
+            'queue_depth': self.queue_depth,
+            'decoder_respawns': self.counters.get('decoder_spawns', 0),
+            'peak_rss': peak_rss(),
+            'message': message})
+        self.last = (now, self.done)
+
+    def attach(self):
+        """ Counts the decoders started by the current thread for this
+        export. The thread which makes the monitor is attached, the other
+        threads working for the export (e.g. feeding the sound) must call
+        this. """
+        _active_monitors().add(self)
+
+    def detach(self):
+        """ Stops counting the decoders of the current thread. """
+        _active_monitors().discard(self)
+
+    def message(self, verbose, text):
+        """ Prints ``text`` if ``verbose`` (like ``verbose_print``), or
+        sends it as a 'message' event if there is a telemetry callable. """
+        if self.telemetry is None:
+            verbose_print(verbose, text)
+        else:
+            self.emit('message', text)
+
+    def update(self, n=1, blocked=0, queue_depth=None):
+        """ Records that ``n`` more units were written, after waiting
+        ``blocked`` seconds for the encoder. """
+        self.done += n
+        self.pipe_blocked += blocked
+        if queue_depth is not None:
+            self.queue_depth = queue_depth
+        if self.bar is not None:
+            self.bar.update(n)
+        elif ((self.telemetry is not None) and
+              ((time.time() - self.last[0] >= self.interval) or
+               (self.done >= self.total))):
+            self.emit('progress')
+
+    def close(self):
+        """ Ends a successful export. """
+        if self.bar is not None:
+            self.bar.close()
+        self.emit('done')
+        self.detach()
+
+    def fail(self, err):
+        """ Ends an export which failed with the exception ``err``. """
+        if self.bar is not None:
+            self.bar.close()
+        self.emit('error', str(err))
+        self.detach()
+
+
+def send_message(telemetry, verbose, task, filename, text):
+    """ Same as ``RenderMonitor.message``, for the messages sent out of
+    the monitored part of an export (before or after it). """
+    if telemetry is None:
+        verbose_print(verbose, text)
+    else:
+        event = dict.fromkeys(EVENT_KEYS)
+        event.update(event='message', task=task, filename=filename,
+                     time=time.time(), message=text)
+        telemetry(event)
+
+
+class JSONLinesSink:
+    """ Telemetry callable which appends the events to a file, one JSON
+    object per line, and also keeps the last event of each task in
+    ``self.last``.
+
+    Parameters
+    -----------
+
+    filename
+      The file in which the events are appended.
+    """
+
+    def __init__(self, filename):
+        self.filename = filename
+        self.last = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, event):
+        with self._lock:
+            self.last[event['task']] = event
+            with open(self.filename, 'a') as f:
+                f.write(json.dumps(event) + "\n")
@@ -0,0 +1,349 @@
+"""
+This module implements Timeline, a declarative and serializable
+description of a clip graph.
+
+MoviePy's clips are made of closures (the ``make_frame`` of a clip calls
+the ``get_frame`` of other clips, through the functions passed to ``fl``,
+``fl_image``...) so they cannot be pickled or sent to another process.
+However, in a ``recording()`` context, each clip made by the constructors
+of MoviePy's clips, by their methods (``subclip``, ``set_pos``, ``fx``...),
+by the effects of ``vfx``/``afx`` or by the compositing functions records
+*how* it was made (this is what the ``@recorded`` decorator does). A
+Timeline gathers these recipes: the sources, effects with their
+parameters, timings, positions and compositions. It can be saved as JSON
+or pickled, and ``build`` rebuilds the same clip by replaying the recipes.
+
+>>> with recording():
+>>>     clip = VideoFileClip("video.mp4").subclip(10, 20).resize(0.5)
+>>>     final = CompositeVideoClip([clip, title.set_start(2)])
+>>> data = Timeline.from_clip(final).to_json()
+>>> # ... in another process or on another computer:
+>>> final = Timeline.from_json(data).build()
+
+The functions given as parameters (to ``fl``, ``fl_image``,
+``VideoClip(make_frame)``, ``set_pos``, etc.) must be importable
+module-level functions, or be registered with ``register_function``
+under the same name in all the processes:
+
+>>> @register_function
+>>> def sepia(im):
+>>>     ...
+>>> clip.fl_image(sepia)
+
+Clips modified after their creation by direct attribute assignments
+(e.g. ``clip.fps = 24`` instead of ``clip.set_fps(24)``) cannot be
+described and raise an error in ``Timeline.from_clip``.
+"""
+
+import base64
+import importlib
+import json
+import functools
+import threading
+import weakref
+from contextlib import contextmanager
+
+import numpy as np
+
+from moviepy.Clip import Clip
+from moviepy.tools import is_string
+
+
+# How each clip was made (weak keys: the recipes die with the clips).
+_recipes = weakref.WeakKeyDictionary()
+
+# Whether the clips made in the current thread are recorded.
+_recording = threading.local()
+
+# Functions registered with register_function, by name and by id.
+_functions = {}
+_function_names = {}
+
+
+@contextmanager
+def recording(enabled=True):
+    """ Context in which the clips made in the current thread record how
+    they were made, so that they can be described with
+    ``Timeline.from_clip`` (also after the end of the context).
+
+    >>> with recording():
+    >>>     clip = VideoFileClip("video.mp4").subclip(10, 20)
+    """
+    previous = recording_enabled()
+    _recording.enabled = enabled
+    try:
+        yield
+    finally:
+        _recording.enabled = previous
+
+
+def recording_enabled():
+    """ True if the clips made in the current thread are recorded. """
+    return getattr(_recording, 'enabled', False)
+
+
+class Recipe:
+    """ How a clip was made: ``function(*args, **kwargs)`` if ``method`` is
+    None, else ``args[0].method(*args[1:], **kwargs)``. ``attributes`` is
+    a shallow copy of the attributes of the clip right after it was made.
+    """
+
+    def __init__(self, function, method, args, kwargs, attributes):
+        self.function = function
+        self.method = method
+        self.args = args
+        self.kwargs = kwargs
+        self.attributes = attributes
+
+
+def _attributes(clip):
+    ignored = getattr(clip, 'render_ignore', ())
+    return dict([(k, v) for (k, v) in clip.__dict__.items()
+                 if k not in ignored])
+
+
+def record(f, args, kwargs, result):
+    """ Records that the clip ``result`` was made by calling the
+    function ``f`` with ``args`` and ``kwargs``. See ``@recorded``. """
+    name = getattr(f, '__qualname__', f.__name__)
+    is_method = ('.' in name) and ('<locals>' not in name)
+
+    if f.__name__ == '__init__':
+        clip = args[0]
+        cls = name.rsplit('.', 1)[0]
+        if (type(clip).__name__ != cls) or (type(clip).__module__ != f.__module__):
+            # __init__ of a parent class, called by the __init__ of a
+            # subclass: only the subclass' __init__ describes the clip.
+            return
+        path = "%s:%s" % (f.__module__, cls)
+        recipe = Recipe(path, None, args[1:], kwargs, None)
+    elif any(result is a for a in args):
+        # returned one of its clips unchanged: it keeps its own recipe
+        return
+    elif is_method:
+        clip = result
+        recipe = Recipe(None, f.__name__, args, kwargs, None)
+    else:
+        clip = result
+        recipe = Recipe("%s:%s" % (f.__module__, f.__name__), None,
+                        args, kwargs, None)
+
+    if isinstance(clip, Clip):
+        recipe.attributes = _attributes(clip)
+        _recipes[clip] = recipe
+
+
+def register_function(f, name=None):
+    """ Registers the function ``f`` (under the name ``name``, by default
+    its module and name) so that it can be used in Timelines.
+
+    Can be used as a decorator. The same function must be registered
+    under the same name in the process which builds the Timeline.
+    """
+    if name is None:
+        name = "%s:%s" % (f.__module__, f.__name__)
+    _functions[name] = f
+    _function_names[id(f)] = name
+    return f
+
+
+def _function_name(f):
+    """ Returns a name from which f can be found again, or None. """
+    if id(f) in _function_names:
+        return _function_names[id(f)]
+    module = getattr(f, '__module__', None)
+    name = getattr(f, '__qualname__', getattr(f, '__name__', None))
+    if (module is None) or (name is None) or ('<' in name):
+        return None
+    path = "%s:%s" % (module, name)
+    try:
+        found = _find_function(path)
+    except (ImportError, AttributeError):
+        return None
+    return path if (found is f) else None
+
+
+def _find_function(path):
+    if path in _functions:
+        return _functions[path]
+    module, name = path.split(':')
+    obj = importlib.import_module(module)
+    for part in name.split('.'):
+        obj = getattr(obj, part)
+    return obj
+
+
+class Timeline:
+    """ Serializable description of a clip graph.
+
+    Use ``Timeline.from_clip(clip)`` to describe a clip, and ``build()``
+    to make the clip again from the description. A Timeline can be
+    converted to JSON (``to_json``/``from_json``) and pickled.
+
+    Parameters
+    -----------
+
+    data
+      The description, as a dict of simple values (see ``to_dict``).
+    """
+
+    VERSION = 1
+
+    def __init__(self, data):
+        if data.get('version', None) != Timeline.VERSION:
+            raise ValueError("MoviePy error: unsupported Timeline version "
+                             "%s." % data.get('version', None))
+        self.data = data
+
+    @staticmethod
+    def from_clip(clip):
+        """ Returns the Timeline describing how ``clip`` was made. """
+        encoder = _Encoder()
+        root = encoder.encode(clip)
+        return Timeline({'version': Timeline.VERSION,
+                         'nodes': encoder.nodes,
+                         'root': root})
+
+    def to_dict(self):
+        """ Returns the description as a dict of lists, strings and
+        numbers, which can be saved in any format. """
+        return self.data
+
+    def to_json(self, **kwargs):
+        """ Returns the description as a JSON string. The keyword
+        arguments are passed to ``json.dumps`` (e.g. ``indent=2``). """
+        return json.dumps(self.data, **kwargs)
+
+    @staticmethod
+    def from_json(s):
+        """ Makes a Timeline from a string returned by ``to_json``. """
+        return Timeline(json.loads(s))
+
+    def build(self):
+        """ Makes the clip described by the Timeline. Clips used several
+        times in the graph are only made once. The clips made are recorded,
+        so the result can be described by a Timeline again. """
+        clips = []
+        decode = lambda value: _decode(value, clips)
+        with recording():
+            for node in self.data['nodes']:
+                args = [decode(a) for a in node['args']]
+                kwargs = dict([(k, decode(v))
+                               for (k, v) in node['kwargs'].items()])
+                if node['method'] is None:
+                    clip = _find_function(node['function'])(*args, **kwargs)
+                else:
+                    clip = getattr(args[0], node['method'])(*args[1:],
+                                                            **kwargs)
+                clips.append(clip)
+        return decode(self.data['root'])
+
+
+class _Encoder:
+    """ Converts clip graphs into lists of nodes (see Timeline). """
+
+    def __init__(self):
+        self.nodes = []
+        self.indices = {}
+        self.keep = []  # keeps the encoded objects alive (their id is used)
+
+    def encode(self, value):
+
+        if (value is None) or isinstance(value, (bool, int, float)):
+            return value
+        if is_string(value):
+            return value
+        if isinstance(value, list):
+            return [self.encode(e) for e in value]
+        if isinstance(value, tuple):
+            return {'tuple': [self.encode(e) for e in value]}
+        if isinstance(value, dict):
+            return {'dict': [[self.encode(k), self.encode(v)]
+                             for (k, v) in value.items()]}
+        if isinstance(value, bytes):
+            return {'bytes': base64.b64encode(value).decode('ascii')}
+        if isinstance(value, np.generic):
+            return {'scalar': value.item(), 'dtype': value.dtype.str}
+        if isinstance(value, np.ndarray):
+            arr = np.ascontiguousarray(value)
+            return {'array': base64.b64encode(arr.tobytes()).decode('ascii'),
+                    'dtype': arr.dtype.str, 'shape': list(arr.shape)}
+        if isinstance(value, Clip):
+            return {'clip': self.encode_clip(value)}
+        if isinstance(value, functools.partial):
+            return {'partial': self.encode(value.func),
+                    'args': self.encode(list(value.args)),
+                    'kwargs': self.encode(value.keywords or {})}
+        if callable(value):
+            name = _function_name(value)
+            if name is None:
+                raise ValueError(
+                    "MoviePy error: the function %s cannot be used in a "
+                    "Timeline. Use a module-level function or register it "
+                    "with moviepy.timeline.register_function." % repr(value))
+            return {'function': name}
+
+        raise ValueError("MoviePy error: values of type %s cannot be used "
+                         "in a Timeline." % type(value).__name__)
+
+    def encode_clip(self, clip):
+
+        if id(clip) in self.indices:
+            return self.indices[id(clip)]
+
+        recipe = _recipes.get(clip, None)
+        if recipe is None:
+            raise ValueError(
+                "MoviePy error: no recipe for a %s of the clip graph. It was "
+                "made outside of a moviepy.timeline.recording() context, or "
+                "by a function or method which is not recorded (see "
+                "moviepy.timeline)." % type(clip).__name__)
+
+        attributes = _attributes(clip)
+        for name in sorted(set(attributes) | set(recipe.attributes)):
+            if attributes.get(name, None) is not recipe.attributes.get(name, None):
+                raise ValueError(
+                    "MoviePy error: the attribute '%s' of a %s was modified "
+                    "after the clip was made, this can't be described in a "
+                    "Timeline. Use the clip's methods (set_fps, set_pos...) "
+                    "instead." % (name, type(clip).__name__))
+
+        node = {'function': recipe.function,
+                'method': recipe.method,
+                'args': [self.encode(a) for a in recipe.args],
+                'kwargs': dict([(k, self.encode(v))
+                                for (k, v) in recipe.kwargs.items()])}
+        self.keep.append(clip)
+        self.indices[id(clip)] = len(self.nodes)
+        self.nodes.append(node)
+        return self.indices[id(clip)]
+
+
+def _decode(value, clips):
+
+    if isinstance(value, list):
+        return [_decode(e, clips) for e in value]
+    if not isinstance(value, dict):
+        return value
+    if 'clip' in value:
+        return clips[value['clip']]
+    if 'tuple' in value:
+        return tuple([_decode(e, clips) for e in value['tuple']])
+    if 'dict' in value:
+        return dict([(_decode(k, clips), _decode(v, clips))
+                     for (k, v) in value['dict']])
+    if 'bytes' in value:
+        return base64.b64decode(value['bytes'])
+    if 'scalar' in value:
+        return np.dtype(value['dtype']).type(value['scalar'])
+    if 'array' in value:
+        arr = np.frombuffer(base64.b64decode(value['array']),
+                            dtype=np.dtype(value['dtype']))
+        return arr.reshape(value['shape']).copy()
+    if 'partial' in value:
+        return functools.partial(_decode(value['partial'], clips),
+                                 *_decode(value['args'], clips),
+                                 **_decode(value['kwargs'], clips))
+    if 'function' in value:
+        return _find_function(value['function'])
+    raise ValueError("MoviePy error: invalid Timeline value %s." % value)
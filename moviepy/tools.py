@@ -59,6 +59,13 @@ def is_string(obj):
     except NameError:
         return isinstance(obj, str)
 
+def file_key(filename):
+    """ Returns (absolute path, tamano, modification time) of a file, which
+    identifies its content in caches (see video.io.render_cache). """
+    path = os.path.abspath(filename)
+    stat = os.stat(path)
+    return (path, stat.st_size, stat.st_mtime)
+
 def cvsecs(time):
     """ Will convert any time into seconds.
     Here are the accepted formats:
@@ -152,6 +159,17 @@ extensions_dict = { "mp4":  {'type':'video', 'codec':['libx264','libmpeg4']},
 for ext in ["jpg", "jpeg", "png", "bmp", "tiff"]:
     extensions_dict[ext] = {'type':'image'}
 
+# Audio codecs (as named by ffmpeg) of the audio streams which can be copied
+# without re-encoding into a video file with the given extension.
+audio_copy_codecs = { "mp4":  ['aac', 'mp3', 'ac3', 'alac'],
+                      "mov":  ['aac', 'mp3', 'ac3', 'alac',
+                               'pcm_s16le', 'pcm_s24le', 'pcm_s32le'],
+                      "mkv":  ['aac', 'mp3', 'ac3', 'alac', 'vorbis', 'opus',
+                               'flac', 'pcm_s16le', 'pcm_s24le', 'pcm_s32le'],
+                      "avi":  ['mp3', 'ac3', 'pcm_s16le'],
+                      "ogv":  ['vorbis', 'opus', 'flac'],
+                      "webm": ['vorbis', 'opus'] }
+
 def find_extension(codec):
     for ext,infos in extensions_dict.items():
         if ('codec' in infos) and codec in infos['codec']:
@@ -8,10 +8,9 @@ main subclasses:
 import os
 import subprocess as sp
 import multiprocessing
-import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from copia import copia
 
-from tqdm import tqdm
 import numpy as np
 
 from imageio import imread, imsave
@@ -19,18 +18,26 @@ from imageio import imread, imsave
 import moviepy.audio.io as aio
 from .io.ffmpeg_writer import ffmpeg_write_image, ffmpeg_write_video
 from .io.ffmpeg_tools import ffmpeg_merge_video_audio
+from .io.render_cache import write_video_segments
+from .io.gif_encoder import write_gif_with_numpy
 from .io.gif_writers import (write_gif,
                              write_gif_with_tempfiles,
-                             write_gif_with_image_io)
+                             write_gif_with_image_io,
+                             write_gif_with_palette)
 from .tools.drawing import blit
+from .tools import text_rendering
+from .tools.text_rendering import render_text
+from .tools.resampling import build_pyramid, sample_pyramid
+from .tools.temporal import FrameWindow
 from ..Clip import Clip
+from ..profiler import get_profiler, profiling
+from ..telemetry import RenderMonitor, send_message
 from ..config import get_setting
 
-from ..tools import (subprocess_call,
-                     verbose_print,
-                     is_string,
+from ..tools import (is_string,
                      deprecated_version_of,
-                     extensions_dict, find_extension)
+                     extensions_dict, find_extension,
+                     audio_copy_codecs)
 
 from ..decorators import (apply_to_mask,
                           requires_duration,
@@ -38,7 +45,8 @@ from ..decorators import (apply_to_mask,
                           add_mask_if_none,
                           convert_to_seconds,
                           convert_masks_to_RGB,
-                          use_clip_fps_by_default)
+                          use_clip_fps_by_default,
+                          recorded)
 
 try:
     from subprocess import DEVNULL  # py3k
@@ -93,6 +101,7 @@ class VideoClip(Clip):
 
     """
 
+    @recorded
     def __init__(self, make_frame=None, ismask=False, duracion=None,
                  has_constant_size=True):
         Clip.__init__(self)
@@ -159,7 +168,10 @@ class VideoClip(Clip):
                         temp_audiofile=None,
                         rewrite_audio=True, remove_temp=True,
                         write_logfile=False, verbose=True,
-                        threads=None, ffmpeg_params=None):
+                        threads=None, ffmpeg_params=None,
+                        audio_passthrough=False, render_cache=None,
+                        segment_duration=10, render_spool=None,
+                        profile=None, telemetry=None):
 
         """Write the clip to a videofile.
 
@@ -221,7 +233,10 @@ class VideoClip(Clip):
 
         temp_audiofile
           the name of the temporary audiofile to be generated and
-          incorporated in the the movie, if any.
+          incorporated in the the movie, if any. By default (and except
+          on Windows) no temporary audiofile is written: the sound is
+          computed in a separate thread and sent directly to ffmpeg,
+          which encodes the audio and the video at the same time.
 
         audio_codec
           Which audio codec should be used. Examples are 'libmp3lame'
@@ -256,6 +271,49 @@ class VideoClip(Clip):
           These will be files ending with '.log' with the name of the
           output file in them.
 
+        audio_passthrough
+          If True and the audio of the clip is an unmodified
+          extract of a sound or video file (for instance the audio of a
+          subclip of a VideoFileClip), this extract is copied from the
+          file without being decoded and re-encoded, provided that no
+          ``audio_codec`` or ``audio_bitrate`` is specified and that its
+          codec is supported by the video format. The sound then keeps the
+          codec, bitrate and frame rate of the file (``audio_fps`` and
+          ``audio_nbytes`` are ignored). Default is False.
+
+        render_cache
+          Name of a folder used as a render cache. The video is then
+          rendered by independent segments of ``segment_duration`` seconds,
+          kept in this folder and joined without re-encoding. When the video
+          is exported again, the segments whose content did not change (same
+          sources, effects, positions, codec...) are reused instead of being
+          rendered. See ``moviepy.video.io.render_cache``. The folder is
+          never emptied by MoviePy.
+
+        segment_duration
+          Duration (in seconds) of the segments of the render cache or
+          of the render spool.
+
+        render_spool
+          A ``RenderSpool`` (see ``moviepy.video.io.render_spool``). The
+          video is then split into segments of ``segment_duration`` seconds
+          which are rendered in parallel by the workers of the spool (local
+          processes or other computers), and joined without re-encoding.
+
+        profile
+          If True, the time spent in each node of the clip graph (readers,
+          effects, compositing, masks, audio, encoder pipe...) is measured,
+          and a report and a flamegraph file are written next to the video
+          (``filename.profile.txt`` and ``filename.profile.folded``). Can
+          also be another prefix for these files, or a RenderProfiler. See
+          ``moviepy.profiler``. Not available with ``render_spool`` (raises
+          a ValueError). With ``render_cache``, only the segments which
+          are not in the cache are rendered, and profiled.
+
+        telemetry
+          A function which receives the progress of the export (frames
+          done, speed, time spent waiting for ffmpeg, memory...) as events
+          (dicts) instead of the progress bars. See ``moviepy.telemetry``.
 
 
         Examples
@@ -267,6 +325,11 @@ class VideoClip(Clip):
 
         """
 
+        if (render_spool is not None) and profile:
+            raise ValueError("MoviePy error: a render with a render_spool "
+                             "can't be profiled (the frames are computed "
+                             "by the workers of the spool).")
+
         name, ext = os.path.splitext(os.path.basename(filename))
         ext = ext[1:].lower()
 
@@ -279,6 +342,15 @@ class VideoClip(Clip):
                                  "with the filename. Provide the 'codec' parameter in "
                                  "write_videofile.")
 
+        # Unmodified sound read from a file: copy it from the file.
+        audio_source = None
+        if (audio_passthrough and (audio == True) and (self.audio is not None)
+                and (audio_codec is None) and (audio_bitrate is None)):
+            audio_source = self.audio.passthrough_source()
+            if ((audio_source is not None) and
+                    (audio_source[2] not in audio_copy_codecs.get(ext, []))):
+                audio_source = None
+
         if audio_codec is None:
             if (ext in ['ogv', 'webm']):
                 audio_codec = 'libvorbis'
@@ -290,10 +362,22 @@ class VideoClip(Clip):
             audio_codec = 'pcm_s32le'
 
         audiofile = audio if is_string(audio) else None
+        audio_start = audio_duration = None
+        if audio_source is not None:
+            audiofile, audio_start, _ = audio_source
+            audio_duration = self.duracion
+            if self.audio.duracion is not None:
+                audio_duration = min(audio_duration, self.audio.duracion)
         make_audio = ((audiofile is None) and (audio == True) and
                       (self.audio is not None))
 
-        if make_audio:
+        # Without temporary file, the audio is piped to ffmpeg while the
+        # frames are written (needs os.pipe file descriptors inheritance).
+        pipe_audio = (make_audio and (temp_audiofile is None) and
+                      (render_cache is None) and (render_spool is None) and
+                      (os.name != 'nt'))
+
+        if make_audio and not pipe_audio:
             # The audio will be the clip's audio
             if temp_audiofile is not None:
                 audiofile = temp_audiofile
@@ -320,34 +404,67 @@ class VideoClip(Clip):
         # enough cpu for multiprocessing ? USELESS RIGHT NOW, WILL COME AGAIN
         # enough_cpu = (multiprocessing.cpu_count() > 1)
 
-        verbose_print(verbose, "[MoviePy] >>>> Building video %s\n" % filename)
-
-        if make_audio:
-            self.audio.write_audiofile(audiofile, audio_fps,
-                                       audio_nbytes, audio_bufsize,
-                                       audio_codec, bitrate=audio_bitrate,
-                                       write_logfile=write_logfile,
-                                       verbose=verbose)
-
-        ffmpeg_write_video(self, filename, fps, codec,
-                           bitrate=bitrate,
-                           preset=preset,
-                           write_logfile=write_logfile,
-                           audiofile = audiofile,
-                           verbose=verbose, threads=threads,
-                           ffmpeg_params=ffmpeg_params)
-
-        if remove_temp and make_audio:
+        send_message(telemetry, verbose, 'video', filename,
+                     "[MoviePy] >>>> Building video %s\n" % filename)
+
+        profiler, prefix = get_profiler(profile, filename + ".profile")
+
+        with profiling(profiler, self, 'write_videofile', prefix):
+
+            if make_audio and not pipe_audio:
+                self.audio.write_audiofile(audiofile, audio_fps,
+                                           audio_nbytes, audio_bufsize,
+                                           audio_codec, bitrate=audio_bitrate,
+                                           write_logfile=write_logfile,
+                                           verbose=verbose,
+                                           telemetry=telemetry)
+
+            if render_spool is not None:
+                render_spool.render(self, filename, fps, segment_duration, codec,
+                                    bitrate=bitrate, preset=preset,
+                                    audiofile=audiofile, audio_start=audio_start,
+                                    audio_duration=audio_duration,
+                                    verbose=verbose, threads=threads,
+                                    ffmpeg_params=ffmpeg_params,
+                                    telemetry=telemetry)
+            elif render_cache is not None:
+                write_video_segments(self, filename, fps, render_cache,
+                                     segment_duration, codec, bitrate=bitrate,
+                                     preset=preset, audiofile=audiofile,
+                                     audio_start=audio_start,
+                                     audio_duration=audio_duration,
+                                     verbose=verbose, threads=threads,
+                                     ffmpeg_params=ffmpeg_params,
+                                     profiler=profiler, telemetry=telemetry)
+            else:
+                ffmpeg_write_video(self, filename, fps, codec,
+                                 bitrate=bitrate,
+                                 preset=preset,
+                                 write_logfile=write_logfile,
+                                 audiofile = audiofile,
+                                 audio_start=audio_start,
+                                 audio_duration=audio_duration,
+                                 verbose=verbose, threads=threads,
+                                 ffmpeg_params=ffmpeg_params,
+                                 audioclip=self.audio if pipe_audio else None,
+                                 audio_fps=audio_fps, audio_nbytes=audio_nbytes,
+                                 audio_codec=audio_codec,
+                                 audio_bitrate=audio_bitrate,
+                                 audio_bufsize=audio_bufsize,
+                                 profiler=profiler, telemetry=telemetry)
+
+        if remove_temp and make_audio and not pipe_audio:
             os.remove(audiofile)
 
-        verbose_print(verbose, "[MoviePy] >>>> Video ready: %s \n\n"%filename)
+        send_message(telemetry, verbose, 'video', filename,
+                     "[MoviePy] >>>> Video ready: %s \n\n" % filename)
 
 
     @requires_duration
     @use_clip_fps_by_default
     @convert_masks_to_RGB
     def write_images_sequence(self, nameformat, fps=None, verbose=True,
-                              withmask=True):
+                              withmask=True, telemetry=None):
         """ Writes the videoclip to a sequence of image files.
 
 
@@ -371,6 +488,10 @@ class VideoClip(Clip):
         verbose
           Verbose output ?
 
+        telemetry
+          A function which receives the progress of the export as events
+          (dicts) instead of the progress bar. See ``moviepy.telemetry``.
+
 
         Returns
         --------
@@ -386,19 +507,21 @@ class VideoClip(Clip):
 
         """
 
-        verbose_print(verbose, "[MoviePy] Writing frames %s." % (nameformat))
-
         tt = np.arange(0, self.duracion, 1.0 / fps)
 
+        monitor = RenderMonitor(telemetry, 'images', nameformat, len(tt))
+        monitor.message(verbose, "[MoviePy] Writing frames %s." % (nameformat))
+
         filenames = []
-        total = int(self.duracion / fps) + 1
-        for i, t in tqdm(enumerate(tt), total=total):
+        for i, t in enumerate(tt):
             name = nameformat % i
             filenames.append(name)
             self.save_frame(name, t, withmask=withmask)
+            monitor.update(1)
 
-        verbose_print(verbose,
-                      "[MoviePy]: Done writing frames %s.\n\n" % (nameformat))
+        monitor.message(verbose,
+                        "[MoviePy]: Done writing frames %s.\n\n" % (nameformat))
+        monitor.close()
 
         return filenames
 
@@ -408,7 +531,10 @@ class VideoClip(Clip):
     @convert_masks_to_RGB
     def write_gif(self, filename, fps=None, program='imageio',
                   opt='wu', fuzz=1, verbose=True,
-                  loop=0, dispose=False, colors=None, tempfiles=False):
+                  loop=0, dispose=False, colors=None, tempfiles=False,
+                  dither='sierra2_4a', bayer_scale=2, stats_mode='full',
+                  diff_mode='rectangle', palette_fps=None,
+                  cache_frames=False, withmask=True, telemetry=None):
         """ Write the VideoClip to a GIF file.
 
         Converts a VideoClip into an animated GIF using ImageMagick
@@ -428,7 +554,11 @@ class VideoClip(Clip):
 
         program
           Software to use for the conversion, either 'imageio' (this will use
-          the library FreeImage through ImageIO), or 'ImageMagick', or 'ffmpeg'.
+          the library FreeImage through ImageIO), or 'ImageMagick', or 'ffmpeg',
+          or 'numpy' (MoviePy's own encoder, with a global palette and
+          inter-frame optimization, see ``moviepy.video.io.gif_encoder``),
+          or 'ffmpeg_palette' (two passes of ffmpeg, one to compute the
+          palette and one to write the GIF: fast and good-looking).
 
         opt
           Optimalization to apply. If program='imageio', opt must be either 'wu'
@@ -440,6 +570,40 @@ class VideoClip(Clip):
           the colors that are less than fuzz% different are in fact
           the same.
 
+        dither
+          (ffmpeg_palette only) Dithering used to map the frames to the
+          palette, e.g. 'sierra2_4a' (default), 'floyd_steinberg', 'bayer'
+          or 'none'.
+
+        bayer_scale
+          (ffmpeg_palette only) Scale of the pattern (0 to 5) when
+          ``dither='bayer'``.
+
+        stats_mode
+          (ffmpeg_palette only) 'full' to compute the palette on the whole
+          frames, 'diff' to favor the parts of the frames which move.
+
+        diff_mode
+          (ffmpeg_palette only) 'rectangle' to only re-encode the rectangle
+          which changed between two frames, or None.
+
+        palette_fps
+          (ffmpeg_palette only) Frames per second of the first pass (the
+          palette is computed on fewer frames when it is lower than fps).
+
+        cache_frames
+          (ffmpeg_palette only) If True, the frames computed for the first
+          pass are kept in a temporary file on disk for the second pass,
+          instead of being computed twice.
+
+        withmask
+          (ffmpeg_palette only) If True and the clip has a mask, the
+          transparent parts of the clip are transparent in the GIF.
+
+        telemetry
+          A function which receives the progress of the export as events
+          (dicts) instead of the progress bar. See ``moviepy.telemetry``.
+
 
         Notes
         -----
@@ -456,25 +620,62 @@ class VideoClip(Clip):
         # A little sketchy at the moment, maybe move all that in write_gif,
         #  refactor a little... we will see.
 
-        if program == 'imageio':
+        if program == 'numpy':
+            write_gif_with_numpy(self, filename, fps=fps, colors=colors,
+                                 loop=loop, verbose=verbose,
+                                 telemetry=telemetry)
+
+        elif program == 'ffmpeg_palette':
+            write_gif_with_palette(self, filename, fps=fps, colors=colors,
+                                   loop=loop, dither=dither,
+                                   bayer_scale=bayer_scale,
+                                   stats_mode=stats_mode,
+                                   diff_mode=diff_mode,
+                                   palette_fps=palette_fps,
+                                   cache_frames=cache_frames,
+                                   withmask=withmask, verbose=verbose,
+                                   telemetry=telemetry)
+
+        elif program == 'imageio':
             write_gif_with_image_io(self, filename, fps=fps, opt=opt, loop=loop,
-                                    verbose=verbose, colors=colors)
+                                    verbose=verbose, colors=colors,
+                                    telemetry=telemetry)
         
         elif tempfiles:
             write_gif_with_tempfiles(self, filename, fps=fps,
                                      program=program, opt=opt, fuzz=fuzz,
                                      verbose=verbose,
-                                     loop=loop, dispose=dispose, colors=colors)
+                                     loop=loop, dispose=dispose, colors=colors,
+                                     telemetry=telemetry)
         else:
             write_gif(self, filename, fps=fps, program=program,
                       opt=opt, fuzz=fuzz, verbose=verbose, loop=loop,
-                      dispose=dispose, colors=colors)
+                      dispose=dispose, colors=colors, telemetry=telemetry)
+
+    def write_framestore(self, filename, fps=None, chunk_frames=16,
+                         compression=None, withmask=True, verbose=True,
+                         telemetry=None):
+        """ Writes the frames (and the mask) of the clip without loss in a
+        frame store, which can be read back with ``FrameStoreClip``.
+
+        Meant to cache expensive clips between the steps of a work. See
+        ``moviepy.video.io.framestore.write_framestore`` for the
+        parameters.
+
+        >>> stabilized.write_framestore("stabilized.frames")
+        >>> clip = FrameStoreClip("stabilized.frames")
+        """
+        from .io.framestore import write_framestore
+        write_framestore(self, filename, fps=fps, chunk_frames=chunk_frames,
+                         compression=compression, withmask=withmask,
+                         verbose=verbose, telemetry=telemetry)
 
     # -----------------------------------------------------------------
     # F I L T E R I N G
 
 
 
+    @recorded
     def subfx(self, fx, ta=0, tb=None, **kwargs):
         """ Apply a transformation to a part of the clip.
 
@@ -505,6 +706,7 @@ class VideoClip(Clip):
     # IMAGE FILTERS
 
 
+    @recorded
     def fl_image(self, image_func, apply_to=[]):
         """
         Modifies the images of a clip by replacing the frame
@@ -512,6 +714,66 @@ class VideoClip(Clip):
         """
         return self.fl(lambda gf, t: image_func(gf(t)), apply_to)
 
+    @recorded
+    def fl_temporal(self, fun, nframes, step, start=0, apply_to=[]):
+        """ Temporal filter: each frame is computed from several frames of
+        the clip around it.
+
+        The frame at time t becomes ``fun(window, t)``, where ``window`` is
+        a ``FrameWindow`` (see ``moviepy.video.tools.temporal``) holding
+        the ``nframes`` frames of the clip at times ``t + start``,
+        ``t + start + step``, etc. (rounded to a grid of period ``step``).
+        The frames are only read once, and ``window.mean()`` or
+        ``window.sum()`` are updated from the frames entering and leaving
+        the window, so a long window costs about as much as a short one.
+
+        The frames returned by ``fun`` (float arrays) are rounded to uint8
+        for clips which are not masks.
+
+        >>> # mean of the frame and of the 4 frames before it
+        >>> blurred = clip.fl_temporal(lambda w, t: w.mean(), 5,
+        ...                            1.0 / clip.fps, -4.0 / clip.fps)
+
+        Parameters
+        -----------
+
+        fun
+          A function (window, t -> frame).
+
+        nframes
+          Number of frames of the window.
+
+        step
+          Time between two frames of the window, in seconds.
+
+        start
+          Time of the first frame of the window, relatively to t.
+
+        apply_to
+          Can be ``'mask'`` to apply the same filter to the mask.
+        """
+
+        window = FrameWindow(self.get_frame, nframes, step)
+        ismask = self.ismask
+
+        def fl(gf, t):
+            with window.lock:
+                window.move(t + start)
+                frame = fun(window, t)
+            if ismask:
+                # (window.sum() is the running sum of the window)
+                return np.array(frame)
+            frame = np.asarray(frame)
+            return (frame if frame.dtype == np.uint8 else
+                    np.clip(frame + 0.5, 0, 255).astype('uint8'))
+
+        newclip = self.fl(fl)
+        if isinstance(apply_to, str):
+            apply_to = [apply_to]
+        if ('mask' in apply_to) and (self.mask is not None):
+            newclip.mask = self.mask.fl_temporal(fun, nframes, step, start)
+        return newclip
+
     # --------------------------------------------------------------
     # C O M P O S I T I N G
 
@@ -532,10 +794,15 @@ class VideoClip(Clip):
 
         # GET IMAGE AND MASK IF ANY
 
-        img = self.get_frame(ct)
-        mask = (None if (self.mask is None) else
-                self.mask.get_frame(ct))
-        hi, wi = img.shape[:2]
+        # Zooms on images (see fx.resize) only compute the visible part
+        zoom = getattr(self.make_frame, 'zoom_source', None)
+        if zoom is not None:
+            wi, hi = zoom_size = zoom[1](ct)
+        else:
+            img = self.get_frame(ct)
+            mask = (None if (self.mask is None) else
+                    self.mask.get_frame(ct))
+            hi, wi = img.shape[:2]
 
         # SET POSITION
 
@@ -565,11 +832,28 @@ class VideoClip(Clip):
             D = {'top': 0, 'center': (hf - hi) / 2, 'bottom': hf - hi}
             pos[1] = D[pos[1]]
 
-        pos = map(int, pos)
+        pos = list(map(int, pos))
+
+        if zoom is not None:
+            x1, y1 = max(0, -pos[0]), max(0, -pos[1])
+            x2, y2 = min(wi, wf - pos[0]), min(hi, hf - pos[1])
+            if (x1 >= x2) or (y1 >= y2):
+                return picture
+            window = (x1, y1, x2, y2)
+            img = zoom[0].sample(zoom_size, window)
+            mask = None
+            if self.mask is not None:
+                mask_zoom = getattr(self.mask.make_frame, 'zoom_source', None)
+                if mask_zoom is not None:
+                    mask = mask_zoom[0].sample(mask_zoom[1](ct), window)
+                else:
+                    mask = self.mask.get_frame(ct)[y1:y2, x1:x2]
+            pos = [pos[0] + x1, pos[1] + y1]
 
         return blit(img, picture, pos, mask=mask, ismask=self.ismask)
 
 
+    @recorded
     def add_mask(self):
         """ Add a mask VideoClip to the VideoClip.
 
@@ -589,6 +873,7 @@ class VideoClip(Clip):
             return self.set_mask(mask.set_duracion(self.duracion))
 
 
+    @recorded
     def on_color(self, tamano=None, color=(0, 0, 0), pos=None,
                  col_opacity=None):
         """ Place the clip on a colored background.
@@ -642,6 +927,7 @@ class VideoClip(Clip):
         return result
 
 
+    @recorded
     @outplace
     def set_make_frame(self, mf):
         """ Change the clip's ``get_frame``.
@@ -653,6 +939,7 @@ class VideoClip(Clip):
         self.tamano = self.get_frame(0).shape[:2][::-1]
 
 
+    @recorded
     @outplace
     def set_audio(self, audioclip):
         """ Attach an AudioClip to the VideoClip.
@@ -663,6 +950,7 @@ class VideoClip(Clip):
         self.audio = audioclip
 
 
+    @recorded
     @outplace
     def set_mask(self, mask):
         """ Set the clip's mask.
@@ -673,6 +961,7 @@ class VideoClip(Clip):
         self.mask = mask
 
 
+    @recorded
     @add_mask_if_none
     @outplace
     def set_opacity(self, op):
@@ -685,6 +974,7 @@ class VideoClip(Clip):
         self.mask = self.mask.fl_image(lambda pic: op * pic)
 
 
+    @recorded
     @apply_to_mask
     @outplace
     def set_position(self, pos, relative=False):
@@ -724,6 +1014,7 @@ class VideoClip(Clip):
 
 
 
+    @recorded
     @convert_to_seconds(['t'])
     def to_ImageClip(self, t=0, with_mask=True):
         """
@@ -737,6 +1028,7 @@ class VideoClip(Clip):
         return newclip
 
 
+    @recorded
     def to_mask(self, canal=0):
         """
         Returns a mask a video clip made from the clip.
@@ -750,6 +1042,7 @@ class VideoClip(Clip):
             return newclip
 
 
+    @recorded
     def to_RGB(self):
         """
         Returns a non-mask video clip made from the mask video clip.
@@ -766,6 +1059,7 @@ class VideoClip(Clip):
     # Audio
 
 
+    @recorded
     @outplace
     def without_audio(self):
         """ Remove the clip's audio.
@@ -776,6 +1070,7 @@ class VideoClip(Clip):
         self.audio = None
 
 
+    @recorded
     @outplace
     def afx(self, fun, *a, **k):
         """ Transform the clip's audio.
@@ -807,6 +1102,7 @@ class DataVideoClip(VideoClip):
     ---------
     """
 
+    @recorded
     def __init__(self, data, data_to_frame, fps, ismask=False,
                  has_constant_size=True):
         self.data = data
@@ -854,6 +1150,7 @@ class UpdatedVideoClip(VideoClip):
     """
     
     
+    @recorded
     def __init__(self, world, ismask=False, duracion=None):
         
         self.world = world
@@ -913,7 +1210,9 @@ class ImageClip(VideoClip):
 
     """
 
+    render_ignore = VideoClip.render_ignore + ('pyramid_levels',)
 
+    @recorded
     def __init__(self, img, ismask=False, transparent=True,
                  fromalpha=False, duracion=None):
 
@@ -941,8 +1240,29 @@ class ImageClip(VideoClip):
         self.make_frame = lambda t: img
         self.tamano = img.shape[:2][::-1]
         self.img = img
+        self.pyramid_levels = None
+
+
+    def pyramid(self):
+        """ Returns the levels of the pyramid of the image (the image
+        reduced by 1, 2, 4, 8...), computed at the first call. See
+        ``moviepy.video.tools.resampling.build_pyramid``. """
+        levels = getattr(self, 'pyramid_levels', None)
+        if (levels is None) or (levels[0] is not self.img):
+            levels = self.pyramid_levels = build_pyramid(self.img)
+        return levels
+
 
+    def sample(self, newsize, window=None):
+        """ Returns the image resized to ``newsize`` = (width, height), or
+        only the rectangle ``window`` = (x1, y1, x2, y2) of the resized
+        image, computed from the closest level of the pyramid of the
+        image, so that the cost depends on the size of the result. Used
+        by ``resize`` for zooms (sizes changing with time). """
+        return sample_pyramid(self.pyramid(), newsize, window)
 
+
+    @recorded
     def fl(self, fl, apply_to=[], keep_duration=True):
         """ General transformation filter.
 
@@ -955,9 +1275,11 @@ class ImageClip(VideoClip):
         newclip = VideoClip.fl(self, fl, apply_to=apply_to,
                                keep_duration=keep_duration)
         newclip.__class__ = VideoClip
+        newclip.__dict__.pop('pyramid_levels', None)
         return newclip
 
 
+    @recorded
     @outplace
     def fl_image(self, image_func, apply_to=[]):
         """ Image-transformation filter.
@@ -980,6 +1302,7 @@ class ImageClip(VideoClip):
                     setattr(self, attr, new_a)
 
 
+    @recorded
     @outplace
     def fl_time(self, time_func, apply_to=['mask', 'audio'],
                 keep_duration=False):
@@ -1033,6 +1356,7 @@ class ColorClip(ImageClip):
     """
 
 
+    @recorded
     def __init__(self, tamano, col=(0, 0, 0), ismask=False, duracion=None):
         w, h = tamano
         shape = (h, w) if np.isscalar(col) else (h, w, len(col))
@@ -1040,11 +1364,17 @@ class ColorClip(ImageClip):
                            ismask=ismask, duracion=duracion)
 
 
+# Results of TextClip.list, by argument
+_text_lists = {}
+
+
 class TextClip(ImageClip):
     """ Class for autogenerated text clips.
 
     Creates an ImageClip originating from a script-generated text image.
-    Requires ImageMagick.
+    The text is rendered with Pillow, or with ImageMagick if Pillow is not
+    installed or can't render it (see ``renderer``). The pictures are
+    cached, see ``moviepy.video.tools.text_rendering``.
 
     Parameters
     -----------
@@ -1072,7 +1402,8 @@ class TextClip(ImageClip):
 
     font
       Name of the font to use. See ``TextClip.list('font')`` for
-      the list of fonts you can use on your computer.
+      the list of fonts you can use on your computer. Can also be the
+      name of a font file (.ttf, .otf).
 
     stroke_color
       Color of the stroke (=contour line) of the text. If ``None``,
@@ -1102,92 +1433,73 @@ class TextClip(ImageClip):
       ``True`` (default) if you want to take into account the
       transparency in the image.
 
+    renderer
+      'auto' (default: Pillow if it can render the text, else
+      ImageMagick), 'pillow' or 'imagemagick'.
+
+    cache
+      If True (default), a text already rendered with the same parameters
+      is taken from the cache instead of being rendered again.
+
     """
 
+    render_ignore = Clip.render_ignore + ('txt',)
 
+    @recorded
     def __init__(self, txt=None, filename=None, tamano=None, color='black',
                  bg_color='transparent', fontsize=None, font='Courier',
                  stroke_color=None, stroke_width=1, method='label',
                  kerning=None, align='center', interline=None,
                  tempfilename=None, temptxt=None,
                  transparent=True, remove_temp=True,
-                 print_cmd=False):
-
-
-        if txt is not None:
-            if temptxt is None:
-                temptxt_fd, temptxt = tempfile.mkstemp(suffix='.txt')
-                try:  # only in Python3 will this work
-                    os.write(temptxt_fd, bytes(txt, 'UTF8'))
-                except TypeError:  # oops, fall back to Python2
-                    os.write(temptxt_fd, txt)
-                os.close(temptxt_fd)
-            txt = '@' + temptxt
-        else:
-            # use a file instead of a text.
-            txt = "@%" + filename
-
-        if tamano is not None:
-            tamano = ('' if tamano[0] is None else str(tamano[0]),
-                    '' if tamano[1] is None else str(tamano[1]))
-
-        cmd = ( [get_setting("IMAGEMAGICK_BINARY"),
-               "-background", bg_color,
-               "-fill", color,
-               "-font", font])
-
-        if fontsize is not None:
-            cmd += ["-pointsize", "%d" % fontsize]
-        if kerning is not None:
-            cmd += ["-kerning", "%0.1f" % kerning]
-        if stroke_color is not None:
-            cmd += ["-stroke", stroke_color, "-strokewidth",
-                    "%.01f" % stroke_width]
-        if tamano is not None:
-            cmd += ["-tamano", "%sx%s" % (tamano[0], tamano[1])]
-        if align is not None:
-            cmd += ["-gravity", align]
-        if interline is not None:
-            cmd += ["-interline-spacing", "%d" % interline]
-
-        if tempfilename is None:
-            tempfile_fd, tempfilename = tempfile.mkstemp(suffix='.png')
-            os.close(tempfile_fd)
-
-        cmd += ["%s:%s" % (method, txt),
-                "-type", "truecolormatte", "PNG32:%s" % tempfilename]
-
-        if print_cmd:
-            print( " ".join(cmd) )
-        
-        try:
-            subprocess_call(cmd, verbose=False )
-        except (IOError,OSError) as err:
-            error = ("MoviePy Error: creation of %s failed because "
-              "of the following error:\n\n%s.\n\n."%(filename, str(err))
-               + ("This error can be due to the fact that "
-                    "ImageMagick is not installed on your computer, or "
-                    "(for Windows users) that you didn't specify the "
-                    "path to the ImageMagick binary in file conf.py, or."
-                    "that the path you specified is incorrect" ))
-            raise IOError(error)
-
-        ImageClip.__init__(self, tempfilename, transparent=transparent)
+                 print_cmd=False, renderer='auto', cache=True):
+
+        img = render_text(
+            txt, filename, renderer=renderer, cache=cache,
+            tamano=tamano, color=color, bg_color=bg_color,
+            fontsize=fontsize, font=font, stroke_color=stroke_color,
+            stroke_width=stroke_width, method=method, kerning=kerning,
+            align=align, interline=interline,
+            imagemagick_params=dict(tempfilename=tempfilename,
+                                    temptxt=temptxt, remove_temp=remove_temp,
+                                    print_cmd=print_cmd))
+
+        ImageClip.__init__(self, img, transparent=transparent)
         self.txt = txt
         self.color = color
         self.stroke_color = stroke_color
 
-        if remove_temp:
-            if os.path.exists(tempfilename):
-                os.remove(tempfilename)
-            if os.path.exists(temptxt):
-                os.remove(temptxt)
+    @staticmethod
+    def batch(texts, threads=None, **kwargs):
+        """ Returns the TextClips of a list of texts, all with the
+        parameters ``kwargs`` (see ``TextClip``), rendered in a pool of
+        ``threads`` threads (by default, one per CPU).
 
+        >>> clips = TextClip.batch(credits_lines, fontsize=30, color='white')
+        """
+        if threads is None:
+            threads = multiprocessing.cpu_count()
+        with ThreadPoolExecutor(threads) as pool:
+            return list(pool.map(lambda txt: TextClip(txt, **kwargs), texts))
 
     @staticmethod
     def list(arg):
         """ Returns the list of all valid entries for the argument of
-        ``TextClip`` given (can be ``font``, ``color``, etc...) """
+        ``TextClip`` given (can be ``font``, ``color``, etc...)
+
+        These are the fonts and colors known to Pillow if it is
+        installed, else the ones known to ImageMagick. """
+
+        if arg in _text_lists:
+            return list(_text_lists[arg])
+
+        if text_rendering.PIL_FOUND and arg in ('font', 'color'):
+            if arg == 'font':
+                result = sorted(text_rendering.font_files().keys())
+            else:
+                result = sorted(text_rendering.ImageColor.colormap.keys())
+            _text_lists[arg] = result
+            return list(result)
 
         popen_params = {"stdout": sp.PIPE,
                         "stderr": DEVNULL,
@@ -1199,12 +1511,16 @@ class TextClip(ImageClip):
         process = sp.Popen([get_setting("IMAGEMAGICK_BINARY"),
                             '-list', arg], **popen_params)
         result = process.communicate()[0]
-        lines = result.splitlines()
+        lines = result.decode('utf8').splitlines()
 
         if arg == 'font':
-            return [l[8:] for l in lines if l.startswith("  Font:")]
+            result = [l[8:] for l in lines if l.startswith("  Font:")]
         elif arg == 'color':
-            return [l.split(" ")[1] for l in lines[2:]]
+            result = [l.split(" ")[1] for l in lines[2:]]
+        else:
+            return None
+        _text_lists[arg] = result
+        return list(result)
 
     @staticmethod
     def search(string, arg):
@@ -1,6 +1,8 @@
 import numpy as np
 from moviepy.video.VideoClip import VideoClip, ColorClip
 from moviepy.audio.AudioClip import CompositeAudioClip
+from moviepy.video.io.render_cache import clip_range, plays_between
+from moviepy.decorators import recorded
 
 #  CompositeVideoClip
 
@@ -45,6 +47,7 @@ class CompositeVideoClip(VideoClip):
 
     """
 
+    @recorded
     def __init__(self, clips, tamano=None, bg_color=None, use_bgclip=False,
                  ismask=False):
 
@@ -110,6 +113,18 @@ class CompositeVideoClip(VideoClip):
                     f = c.blit_on(f, t)
             return f
 
+        def render_key(t_start, t_end):
+            """ Only the clips playing between t_start and t_end define
+                the frames (see video.io.render_cache). """
+            return (self.tamano, self.ismask, self.bg_color,
+                    clip_range(self.bg, t_start, t_end),
+                    [(type(c).__name__, c.ismask, c.inicia, c.fin, c.pos,
+                      c.relative_pos,
+                      clip_range(c.mask, t_start, t_end, c.inicia),
+                      clip_range(c, t_start, t_end, c.inicia))
+                     for c in self.clips if plays_between(c, t_start, t_end)])
+
+        make_frame.render_key = render_key
         self.make_frame = make_frame
 
     def playing_clips(self, t=0):
@@ -119,6 +134,7 @@ class CompositeVideoClip(VideoClip):
 
 
 
+@recorded
 def clips_array(array, rows_widths=None, cols_widths=None,
                 bg_color = None):
 
@@ -6,7 +6,10 @@ from moviepy.video.compositing.CompositeVideoClip import CompositeVideoClip
 from moviepy.audio.AudioClip import CompositeAudioClip
 
 from moviepy.video.compositing.on_color import on_color 
+from moviepy.video.io.render_cache import clip_range, plays_between
+from moviepy.decorators import recorded
 
+@recorded
 def concatenate_videoclips(clips, method="chain", transition=None,
                            bg_color=None, ismask=False, padding = 0):
     """ Concatenates several video clips
@@ -82,6 +85,15 @@ def concatenate_videoclips(clips, method="chain", transition=None,
         def make_frame(t):
             i = max([i for i, e in enumerate(tt) if e <= t])
             return clips[i].get_frame(t - tt[i])
+
+        def render_key(t_start, t_end):
+            """ Only the clips playing between t_start and t_end define
+                the frames (see video.io.render_cache). """
+            return [(tt[i], tt[i+1], clip_range(c, t_start, t_end, tt[i]))
+                    for i, c in enumerate(clips)
+                    if plays_between(c, t_start, t_end, tt[i], tt[i+1])]
+
+        make_frame.render_key = render_key
         
         result = VideoClip(ismask = ismask, make_frame = make_frame)
         if any([c.mask is not None for c in clips]):
@@ -1,6 +1,8 @@
 from moviepy.video.VideoClip import ColorClip
 from moviepy.video.compositing.CompositeVideoClip import CompositeVideoClip
+from moviepy.decorators import recorded
 
+@recorded
 def on_color(clip, tamano=None, color=(0, 0, 0), pos=None, col_opacity=None):
     """ 
     Returns a clip made of the current clip overlaid on a color
@@ -4,11 +4,12 @@ to be used with clip.fx. There are available as transfx.crossfadein etc.
 if you load them with ``from moviepy.all import *``
 """
 
-from moviepy.decorators import requires_duration, add_mask_if_none
+from moviepy.decorators import requires_duration, add_mask_if_none, recorded
 from .CompositeVideoClip import CompositeVideoClip
 from moviepy.video.fx.fadein import fadein
 from moviepy.video.fx.fadeout import fadeout
 
+@recorded
 @add_mask_if_none
 def crossfadein(clip, duracion):
     """ Makes the clip appear progressively, over ``duracion`` seconds.
@@ -19,6 +20,7 @@ def crossfadein(clip, duracion):
     return newclip
 
 
+@recorded
 @requires_duration
 @add_mask_if_none
 def crossfadeout(clip, duracion):
@@ -32,6 +34,7 @@ def crossfadeout(clip, duracion):
 
 
 
+@recorded
 def slide_in(clip, duracion, side):
     """ Makes the clip arrive from one side of the pantalla.
 
@@ -71,6 +74,7 @@ def slide_in(clip, duracion, side):
 
 
 
+@recorded
 @requires_duration
 def slide_out(clip, duracion, side):
     """ Makes the clip go away by one side of the pantalla.
@@ -120,6 +124,7 @@ def slide_out(clip, duracion, side):
 
 
 
+@recorded
 @requires_duration
 def make_loopable(clip, cross_duration):
     """ Makes the clip fade in progressively at its own fin, this way
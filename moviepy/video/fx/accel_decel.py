@@ -1,3 +1,5 @@
+from moviepy.decorators import recorded
+
 def f_accel_decel(t, old_d, new_d, abruptness=1, soonness=1.0):
     """
     abruptness
@@ -19,6 +21,7 @@ def f_accel_decel(t, old_d, new_d, abruptness=1, soonness=1.0):
     return old_d*_f((t/new_d)**soonness)
 
 
+@recorded
 def accel_decel(clip, new_duration=None, abruptness=1.0, soonness=1.0):
     """
 
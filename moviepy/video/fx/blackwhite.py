@@ -1,5 +1,7 @@
 import numpy as np
+from moviepy.decorators import recorded
 
+@recorded
 def blackwhite(clip, RGB = [1,1,1], preserve_luminosity=True):
     """ Desaturates the picture, makes it black and white.
     Parameter RGB allows to set weights for the different color
@@ -1,3 +1,6 @@
+from moviepy.decorators import recorded
+
+@recorded
 def blink(clip, d_on, d_off):
     """
     Makes the clip blink. At each blink it will be displayed ``d_on``
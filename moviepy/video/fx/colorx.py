@@ -1,5 +1,7 @@
 import numpy as np
+from moviepy.decorators import recorded
 
+@recorded
 def colorx(clip, factor):
     """ multiplies the clip's colors by the given factor, can be used
         to decrease or increase the clip's brightness (is that the
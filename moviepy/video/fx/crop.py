@@ -1,3 +1,6 @@
+from moviepy.decorators import recorded
+
+@recorded
 def crop(clip, x1=None, y1=None, x2=None, y2=None,
          width = None, height=None,
          x_center= None, y_center=None):
@@ -59,6 +62,31 @@ def crop(clip, x1=None, y1=None, x2=None, y2=None,
     if y2 is None:
         y2 = clip.tamano[1]
     
+    zoom = getattr(clip.make_frame, 'zoom_source', None)
+    if (zoom is not None) and min(x1, y1, x2, y2) >= 0:
+        return _crop_zoom(clip, zoom, int(x1), int(y1), int(x2), int(y2))
+
     return clip.fl_image(
             lambda pic: pic[int(y1):int(y2), int(x1):int(x2)],
             apply_to=['mask'])
+
+
+def _crop_zoom(clip, zoom, x1, y1, x2, y2):
+    """ Crop of a zoom on an image (see ``fx.resize``): only the cropped
+    region of the resized image is computed, from the pyramid of the
+    image. """
+
+    source, sizes = zoom
+
+    def fun(gf, t):
+        w, h = newsize = sizes(t)
+        X2, Y2 = min(x2, w), min(y2, h)
+        X1, Y1 = min(x1, X2), min(y1, Y2)
+        if (X1 == X2) or (Y1 == Y2):
+            return source.sample(newsize)[Y1:Y2, X1:X2]
+        return source.sample(newsize, (X1, Y1, X2, Y2))
+
+    newclip = clip.fl(fun)
+    if clip.mask is not None:
+        newclip.mask = crop(clip.mask, x1, y1, x2, y2)
+    return newclip
@@ -1,7 +1,8 @@
 import numpy as np
 
-from moviepy.decorators import apply_to_mask
+from moviepy.decorators import apply_to_mask, recorded
 
+@recorded
 @apply_to_mask
 def even_size(clip):
     """ Crops the clip to make dimensions even.
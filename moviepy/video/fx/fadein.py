@@ -1,5 +1,8 @@
 import numpy as np                                                        
+from moviepy.video.tools.yuv import YUVFrame
+from moviepy.decorators import recorded
 
+@recorded
 def fadein(clip, duracion, initial_color=None):
     """
     Makes the clip progressively appear from some color (black by default),
@@ -19,6 +22,9 @@ def fadein(clip, duracion, initial_color=None):
             return gf(t)
         else:
             fading = (1.0*t/duracion) 
-            return fading*gf(t) + (1-fading)*initial_color
+            frame = gf(t)
+            if isinstance(frame, YUVFrame):
+                return frame.fade(fading, initial_color)
+            return fading*frame + (1-fading)*initial_color
 
     return clip.fl(fl)
\ No newline at end of file
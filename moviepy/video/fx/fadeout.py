@@ -1,6 +1,8 @@
-from moviepy.decorators import requires_duration
+from moviepy.decorators import requires_duration, recorded
 import numpy as np
+from moviepy.video.tools.yuv import YUVFrame
 
+@recorded
 @requires_duration
 def fadeout(clip, duracion, final_color=None):
     """
@@ -21,7 +23,10 @@ def fadeout(clip, duracion, final_color=None):
             return gf(t)
         else:
             fading = 1.0 * (clip.duracion - t) / duracion
-            return fading*gf(t) + (1-fading)*final_color
+            frame = gf(t)
+            if isinstance(frame, YUVFrame):
+                return frame.fade(fading, final_color)
+            return fading*frame + (1-fading)*final_color
 
     return clip.fl(fl)
 
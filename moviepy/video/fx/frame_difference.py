@@ -0,0 +1,34 @@
+import numpy as np
+
+from moviepy.decorators import recorded, use_clip_fps_by_default
+
+
+@recorded
+@use_clip_fps_by_default
+def frame_difference(clip, gain=1.0, absolute=True, fps=None):
+    """ Replaces each frame by its difference with the previous frame,
+    which shows what moves in the clip.
+
+    Parameters
+    -----------
+
+    gain
+      The difference is multiplied by this factor.
+
+    absolute
+      If True, the frames show the absolute value of the difference
+      (black where nothing changes). Else, they show the difference
+      around the gray (128, 128, 128).
+
+    fps
+      The previous frame is taken 1/fps seconds before. Default is the
+      clip's fps.
+    """
+
+    def fl(window, t):
+        previous, frame = window.frames()
+        diff = gain * (frame - previous)
+        return np.abs(diff) if absolute else 128 + diff
+
+    step = 1.0 / fps
+    return clip.fl_temporal(fl, 2, step, start=-step)
@@ -1,7 +1,8 @@
-from moviepy.decorators import requires_duration
+from moviepy.decorators import requires_duration, recorded
 from moviepy.video.VideoClip import ImageClip
 from moviepy.video.compositing.concatenate import concatenate_videoclips
 
+@recorded
 @requires_duration
 def freeze(clip, t=0, freeze_duration=None, total_duration=None,
            padding_end=0):
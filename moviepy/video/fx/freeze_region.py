@@ -1,9 +1,10 @@
-from moviepy.decorators import apply_to_mask
+from moviepy.decorators import apply_to_mask, recorded
 from .crop import crop
 from moviepy.video.compositing.CompositeVideoClip import CompositeVideoClip
 
 
 #@apply_to_mask
+@recorded
 def freeze_region(clip, t=0, region=None, outside_region=None, mask=None):
     """ Freezes one region of the clip while the rest remains animated.
     
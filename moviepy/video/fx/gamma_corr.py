@@ -1,4 +1,6 @@
+from moviepy.decorators import recorded
 
+@recorded
 def gamma_corr(clip, gamma):
     """ Gamma-correction of a video clip """
     def fl(im):
@@ -1,4 +1,5 @@
 import numpy as np
+from moviepy.decorators import recorded
 
 
 #------- CHECKING DEPENDENCIES ----------------------------------------- 
@@ -10,6 +11,7 @@ except:
 #-----------------------------------------------------------------------
 
 
+@recorded
 def headblur(clip,fx,fy,r_zone,r_blur=None):
     """
     Returns a filter that will blurr a moving part (a head ?) of
@@ -1,3 +1,6 @@
+from moviepy.decorators import recorded
+
+@recorded
 def invert_colors(clip):
     """ Returns the color-inversed clip.
 
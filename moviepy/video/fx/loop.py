@@ -1,8 +1,11 @@
 from moviepy.decorators import (apply_to_mask,
                                  apply_to_audio,
-                                 requires_duration)
+                                 requires_duration,
+                                 recorded)
+from moviepy.audio.AudioClip import AudioClip, AudioLoopClip
 
 
+@recorded
 @requires_duration
 @apply_to_mask
 @apply_to_audio
@@ -10,6 +13,10 @@ def loop(self, n=None, duracion=None):
     """
     Returns a clip that plays the current clip in an infinite loop.
     Ideal for clips coming from gifs.
+
+    The sound of the clip is looped with an ``AudioLoopClip``. The video
+    files read in a loop keep the frames of the start of the loop, see
+    ``FFMPEG_VideoReader``.
     
     Parameters
     ------------
@@ -20,6 +27,8 @@ def loop(self, n=None, duracion=None):
     duracion
       Total duracion of the clip. Can be specified instead of n.
     """
+    if isinstance(self, AudioClip):
+        return AudioLoopClip(self, n, duracion)
     result = self.fl_time(lambda t: t % self.duracion)
     if n:
         duracion = n*self.duracion
@@ -1,3 +1,6 @@
+from moviepy.decorators import recorded
+
+@recorded
 def lum_contrast(clip, lum = 0, contrast=0, contrast_thr=127):
     """ luminosity-contrast correction of a clip """
     
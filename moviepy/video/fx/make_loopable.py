@@ -1,6 +1,8 @@
 import moviepy.video.compositing.transitions as transfx
 from moviepy.video.compositing.CompositeVideoClip import CompositeVideoClip
+from moviepy.decorators import recorded
 
+@recorded
 def make_loopable(clip, cross):
     """
     Makes the clip fade in progressively at its own fin, this way
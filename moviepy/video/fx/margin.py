@@ -1,8 +1,9 @@
 import numpy as np
-from moviepy.decorators import apply_to_mask
+from moviepy.decorators import apply_to_mask, recorded
 from moviepy.video.VideoClip import ImageClip
 
 
+@recorded
 @apply_to_mask
 def margin(clip, mar=None, left=0, right=0, top=0,
            bottom=0, color=(0, 0, 0), opacity = 1.0):
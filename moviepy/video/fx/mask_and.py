@@ -1,6 +1,8 @@
 import numpy as np
 from ..VideoClip import ImageClip
+from moviepy.decorators import recorded
 
+@recorded
 def mask_and(clip, other_clip):
     """ Returns the logical 'and' (min) between two masks.
         other_clip can be a mask clip or a picture (np.array).
@@ -1,5 +1,7 @@
 import numpy as np
+from moviepy.decorators import recorded
 
+@recorded
 def mask_color(clip, color=[0,0,0], thr=0, s=1):
     """ Returns a new clip with a mask for transparency where the original
     clip is of the given color.
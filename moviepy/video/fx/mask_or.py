@@ -1,6 +1,8 @@
 import numpy as np
 from ..VideoClip import ImageClip
+from moviepy.decorators import recorded
 
+@recorded
 def mask_or(clip, other_clip):
     """ Returns the logical 'or' (max) between two masks.
         other_clip can be a mask clip or a picture (np.array).
@@ -0,0 +1,34 @@
+from moviepy.decorators import recorded, use_clip_fps_by_default
+
+
+@recorded
+@use_clip_fps_by_default
+def motion_blur(clip, nframes=4, fps=None, apply_to_mask=True):
+    """ Replaces each frame at time t by the mean of the `nframes` frames
+    at times t, t-1/fps, t-2/fps... like a camera whose shutter stays open
+    for `nframes/fps` seconds.
+
+    Parameters
+    -----------
+
+    nframes
+      Number of frames averaged.
+
+    fps
+      Number of frames per second averaged. Default is the clip's fps
+      (each frame is averaged with the frames before it). For clips
+      computed at any time (not read from a file), a higher fps gives a
+      smoother blur over a shorter exposure.
+
+    apply_to_mask
+      If True, the mask of the clip (if any) is blurred too.
+
+    The mean is updated from one frame to the next with the frames
+    entering and leaving the exposure (see ``VideoClip.fl_temporal``), so
+    that its cost does not depend on ``nframes``.
+    """
+
+    step = 1.0 / fps
+    return clip.fl_temporal(lambda window, t: window.mean(), nframes, step,
+                            start=-(nframes - 1) * step,
+                            apply_to=(['mask'] if apply_to_mask else []))
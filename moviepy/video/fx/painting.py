@@ -12,6 +12,7 @@ except:
 
 
 import numpy as np
+from moviepy.decorators import recorded
 
 def to_painting(image,saturation = 1.4,black = 0.006):
     """ transforms any photo into some kind of painting """
@@ -20,6 +21,7 @@ def to_painting(image,saturation = 1.4,black = 0.006):
     painting = saturation*image-darkening
     return np.maximum(0,np.minimum(255,painting)).astype('uint8')
     
+@recorded
 def painting(clip, saturation = 1.4,black = 0.006):
     """
     Transforms any photo into some kind of painting. Saturation
@@ -1,63 +1,19 @@
-resize_possible = True
-
-try:
-    # TRY USING OpenCV AS RESIZER
-    #raise ImportError #debugging
-    import cv2
-    import numpy as np
-    def resizer (pic, newsize):
-        lx, ly = int(newsize[0]), int(newsize[1])
-        if lx > pic.shape[1] or ly > pic.shape[0]:
-            # For upsizing use linear for good quality & decent speed
-            interpolation = cv2.INTER_LINEAR
-        else:
-            # For dowsizing use area to prevent aliasing
-            interpolation = cv2.INTER_AREA
-        return cv2.resize(+pic.astype('uint8'), (lx, ly),
-                          interpolation=interpolation)
+import numpy as np
 
-    resizer.origin = "cv2"
-                
-except ImportError:
-    
-    
-    try:
-        # TRY USING PIL/PILLOW AS RESIZER
-        from PIL import Image
-        import numpy as np
-        def resizer(pic, newsize):
-            newsize = list(map(int, newsize))[::-1]
-            shape = pic.shape
-            if len(shape)==3:
-                newshape = (newsize[0],newsize[1], shape[2] )
-            else:
-                newshape = (newsize[0],newsize[1])
-                
-            pilim = Image.fromarray(pic)
-            resized_pil = pilim.resize(newsize[::-1], Image.ANTIALIAS)
-            #arr = np.fromstring(resized_pil.tostring(), dtype='uint8')
-            #arr.reshape(newshape)
-            return np.array(resized_pil)
-            
-        resizer.origin = "PIL"
-            
-    except ImportError:
-        # TRY USING SCIPY AS RESIZER
-        try:
-            from scipy.misc import imresize
-            resizer = lambda pic, newsize : imresize(pic,
-                                            map(int, newsize[::-1]))
-            resizer.origin = "Scipy"
-                                               
-        except ImportError:
-            resize_possible = False
-            
-        
-        
-    
-from moviepy.decorators import apply_to_mask
-   
+from moviepy.decorators import apply_to_mask, recorded
+from moviepy.video.VideoClip import ImageClip
+from moviepy.video.tools.resampling import resample, CV2_FOUND, PIL_FOUND
+
+
+def resizer(pic, newsize):
+    """ Resizes the frame ``pic`` to ``newsize`` = (width, height). See
+    ``moviepy.video.tools.resampling``. """
+    return resample(pic, newsize)
 
+resizer.origin = ("cv2" if CV2_FOUND else "PIL" if PIL_FOUND else "numpy")
+
+
+@recorded
 def resize(clip, newsize=None, height=None, width=None, apply_to_mask=True):
     """ 
     Returns a video clip that is a resized version of the clip.
@@ -103,15 +59,16 @@ def resize(clip, newsize=None, height=None, width=None, apply_to_mask=True):
         if hasattr(newsize, "__call__"):
             
             newsize2 = lambda t : trans_newsize(newsize(t))
+
+            if isinstance(clip, ImageClip):
+                return _zoom(clip, newsize2, apply_to_mask)
             
             if clip.ismask:
                 
-                fun = lambda gf,t: (1.0*resizer((255 * gf(t)).astype('uint8'),
-                                                 newsize2(t))/255)
+                fun = lambda gf,t: resample(gf(t), newsize2(t))
             else:
                 
-                fun = lambda gf,t: resizer(gf(t).astype('uint8'),
-                                          newsize2(t))
+                fun = lambda gf,t: resample(_to_uint8(gf(t)), newsize2(t))
                 
             return clip.fl(fun, keep_duration=True,
                            apply_to= (["mask"] if apply_to_mask else []))
@@ -143,11 +100,13 @@ def resize(clip, newsize=None, height=None, width=None, apply_to_mask=True):
         
     # From here, the resizing is constant (not a function of time), tamano=newsize
 
+    # The taps of the resizing are computed once (see resampling), and the
+    # masks are resized as floats.
     if clip.ismask:
-        fl = lambda pic: 1.0*resizer((255 * pic).astype('uint8'), newsize)/255.0
+        fl = lambda pic: resample(pic, newsize)
             
     else:
-        fl = lambda pic: resizer(pic.astype('uint8'), newsize)
+        fl = lambda pic: resample(_to_uint8(pic), newsize)
 
     newclip = clip.fl_image(fl)
 
@@ -157,9 +116,36 @@ def resize(clip, newsize=None, height=None, width=None, apply_to_mask=True):
     return newclip
 
 
-if not resize_possible:
-    
-    doc = resize.__doc__
-    def resize(clip, newsize=None, height=None, width=None):
-        raise ImportError("fx resize needs OpenCV or Scipy or PIL")
-    resize.__doc__ = doc
+def _to_uint8(pic):
+    pic = np.asarray(pic)
+    return pic if pic.dtype == np.uint8 else pic.astype('uint8')
+
+
+def _zoom(clip, newsize, apply_to_mask):
+    """ Resizing of an ImageClip with a size changing with time: each
+    frame is resized from the closest level of the pyramid of the image
+    (see ``ImageClip.sample``). A mask which is not an ImageClip is
+    resized frame by frame.
+
+    The ``make_frame`` of the result has a ``zoom_source`` attribute
+    (image clip, function of time giving the size), so that a crop of the
+    result (``fx.crop``) or its blit in a composition (``blit_on``) only
+    computes the pixels it needs. Any other transformation of the result
+    has a new ``make_frame``, without it.
+    """
+
+    def sizes(t):
+        w, h = newsize(t)
+        return (max(1, int(w)), max(1, int(h)))
+
+    newclip = clip.fl(lambda gf, t: clip.sample(sizes(t)),
+                      keep_duration=True)
+    newclip.make_frame.zoom_source = (clip, sizes)
+
+    if apply_to_mask and clip.mask is not None:
+        if isinstance(clip.mask, ImageClip):
+            newclip.mask = _zoom(clip.mask, newsize, False)
+        else:  # e.g. the mask of a fade
+            newclip.mask = resize(clip.mask, sizes, apply_to_mask=False)
+
+    return newclip
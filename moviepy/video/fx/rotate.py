@@ -1,14 +1,24 @@
-from moviepy.decorators import apply_to_mask
+import threading
+
 import numpy as np
-try:
-    from PIL import Image
-    PIL_FOUND = True
-    def pil_rotater(pic, angle, resample, expand):
-        return np.array( Image.fromarray(pic).rotate(angle, expand=expand,
-                                                     resample=resample))
-except ImportError:
-    PIL_FOUND = False
 
+from moviepy.decorators import recorded
+from moviepy.video.tools.warping import get_rotation
+
+
+def _right_angle_rotation(im, a, transpo):
+    """ Rotations by 90, -90 or 180 degrees with expand (no resampling),
+    or None for the other angles. """
+    if a == 90:
+        return np.transpose(im, axes=transpo)[::-1]
+    elif a == -90:
+        return np.transpose(im, axes=transpo)[:,::-1]
+    elif a in [180, -180]:
+        return im[::-1,::-1]
+    return None
+
+
+@recorded
 def rotate(clip, angle, unit='deg', resample="bicubic", expand=True):
     """
     Change unit to 'rad' to define angles as radians.
@@ -33,39 +43,56 @@ def rotate(clip, angle, unit='deg', resample="bicubic", expand=True):
       One of "nearest", "bilinear", or "bicubic".
 
     expand
-      Only applIf False, the clip will maintain the same True, the clip will be resized so that the whole
+      If True, the clip is enlarged so that the whole rotated frame is
+      visible. If False, the clip keeps the same size.
+
+    The clip and its mask are rotated together. The sampling of a
+    rotation is computed once for each angle (see
+    ``moviepy.video.tools.warping``), so a constant rotation only costs a
+    few gathers per frame.
     """
-    
-    resample = {"bilinear": Image.BILINEAR,
-                "nearest": Image.NEAREST,
-                "bicubic": Image.BICUBIC}[resample]
+
+    if resample not in ("nearest", "bilinear", "bicubic"):
+        raise ValueError('MoviePy error: resample should be "nearest", '
+                         '"bilinear" or "bicubic", not %s.' % resample)
 
     if not hasattr(angle, '__call__'):
         # if angle is a constant, convert to a constant function
         a = +angle
         angle = lambda t: a
 
-    transpo = [1,0] if clip.ismask else [1,0,2]
+    mask = clip.mask
+    # (t, frame, mask) last computed in each thread, for the mask
+    last = threading.local()
 
-    def fl(gf, t):
+    def rotated(t):
+        """ The rotated frame and mask (or None) at time t. """
+        result = getattr(last, 'result', None)
+        if (result is not None) and (result[0] == t):
+            return result[1:]
 
         a = angle(t)
-        im = gf(t)
-
         if unit == 'rad':
             a = 360.0*a/(2*np.pi)
-        
-        if (a==90) and expand:
-            return np.transpose(im, axes=transpo)[::-1]
-        elif (a==-90) and expand:
-            return np.transpose(im, axes=transpo)[:,::-1]
-        elif (a in [180, -180]) and expand:
-            return im[::-1,::-1]
-        elif not PIL_FOUND:
-            raise ValueError('Without "Pillow" installed, only angles 90, -90,'
-                             '180 are supported, please install "Pillow" with'
-                             "pip install pillow")
+
+        im = clip.get_frame(t)
+        m = None if (mask is None) else mask.get_frame(t)
+        transpo = [1,0] if im.ndim == 2 else [1,0,2]
+        new_im = _right_angle_rotation(im, a, transpo) if expand else None
+        if new_im is not None:
+            new_m = (None if (m is None) else
+                     _right_angle_rotation(m, a, [1,0]))
         else:
-            return pil_rotater(im, a, resample=resample, expand=expand)
+            warp = get_rotation(im.shape[1::-1], a, expand, resample)
+            if m is None:
+                new_im, new_m = warp(im), None
+            else:
+                new_im, new_m = warp(im, m)
+
+        last.result = (t, new_im, new_m)
+        return new_im, new_m
 
-    return clip.fl(fl, apply_to=["mask"])
\ No newline at end of file
+    newclip = clip.fl(lambda gf, t: rotated(t)[0])
+    if mask is not None:
+        newclip.mask = mask.fl(lambda gf, t: rotated(t)[1])
+    return newclip
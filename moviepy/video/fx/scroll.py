@@ -1,5 +1,7 @@
 import numpy as np
+from moviepy.decorators import recorded
 
+@recorded
 def scroll(clip, h=None, w=None, x_speed=0, y_speed=0,
            x_start=0, y_start=0, apply_to="mask"):
     """ Scrolls horizontally or vertically a clip, e.g. to make fin
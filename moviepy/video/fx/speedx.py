@@ -1,6 +1,7 @@
-from moviepy.decorators import apply_to_mask,apply_to_audio
+from moviepy.decorators import apply_to_mask,apply_to_audio, recorded
 
 
+@recorded
 def speedx(clip, factor = None, final_duration=None):
     """
     Returns a clip playing the current clip but at a speed multiplied
@@ -1,12 +1,17 @@
-import numpy as np
+from moviepy.decorators import recorded
  
+@recorded
 def supersample(clip, d, nframes):
     """ Replaces each frame at time t by the mean of `nframes` equally spaced frames
-    taken in the interval [t-d, t+d]. This results in motion blur."""
-    
-    def fl(gf, t):
-        tt = np.linspace(t-d, t+d, nframes)
-        avg = np.mean(1.0*np.array([gf(t_) for t_ in tt], dtype='uint16'), axis=0)
-        return avg.astype("uint8")
+    taken in the interval [t-d, t+d]. This results in motion blur.
 
-    return clip.fl(fl)
\ No newline at end of file
+    The frames are taken on a grid of times (period ``2*d/(nframes-1)``)
+    shared by all the frames, so that consecutive frames reuse the frames
+    they have in common (see ``VideoClip.fl_temporal``). With ``d=0`` or
+    ``nframes=1`` the clip is returned unchanged."""
+
+    if (d == 0) or (nframes == 1):
+        return clip
+    step = 2.0 * d / max(1, nframes - 1)
+    return clip.fl_temporal(lambda window, t: window.mean(), nframes, step,
+                            start=-d)
@@ -0,0 +1,56 @@
+import numpy as np
+
+from moviepy.decorators import recorded, use_clip_fps_by_default
+
+
+@recorded
+@use_clip_fps_by_default
+def temporal_denoise(clip, radius=2, sigma=None, threshold=None, fps=None):
+    """ Reduces the noise of the clip by averaging each frame with the
+    `radius` frames before and after it.
+
+    Parameters
+    -----------
+
+    radius
+      Number of frames taken before and after each frame.
+
+    sigma
+      If provided, the frames are weighted by a gaussian of standard
+      deviation ``sigma`` (in frames) instead of having the same weight.
+
+    threshold
+      If provided, the pixels of the other frames which differ from the
+      pixel of the frame by more than ``threshold`` (out of 255) are not
+      averaged (the pixel of the frame is used instead). This avoids the
+      trails behind moving objects, at the cost of more computations.
+
+    fps
+      Number of frames per second of the frames averaged. Default is the
+      clip's fps.
+    """
+
+    nframes = 2 * radius + 1
+    offsets = np.arange(-radius, radius + 1)
+    if sigma is None:
+        weights = np.ones(nframes)
+    else:
+        weights = np.exp(-0.5 * (offsets / float(sigma)) ** 2)
+    weights = weights / weights.sum()
+
+    def fl(window, t):
+        if threshold is not None:
+            frames = window.frames()
+            center = frames[radius]
+            result = weights[radius] * center
+            for k, frame in enumerate(frames):
+                if k != radius:
+                    far = np.abs(frame - center) > threshold
+                    result += weights[k] * np.where(far, center, frame)
+            return result
+        if sigma is None:
+            return window.mean()
+        return window.weighted_sum(weights)
+
+    step = 1.0 / fps
+    return clip.fl_temporal(fl, nframes, step, start=-radius * step)
@@ -1,7 +1,9 @@
 from moviepy.decorators import (apply_to_mask, apply_to_audio,
-                                 requires_duration)
+                                 requires_duration,
+                                 recorded)
 
 
+@recorded
 @requires_duration
 @apply_to_mask
 @apply_to_audio
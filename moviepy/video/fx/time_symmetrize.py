@@ -1,8 +1,10 @@
 from moviepy.decorators import (apply_to_mask, apply_to_audio,
-                                 requires_duration)
+                                 requires_duration,
+                                 recorded)
 from moviepy.video.compositing.concatenate import concatenate_videoclips
 from .time_mirror import time_mirror
 
+@recorded
 @requires_duration
 @apply_to_mask
 def time_symmetrize(clip):
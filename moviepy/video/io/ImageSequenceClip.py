@@ -1,8 +1,102 @@
 import os
+import bisect
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
 import numpy as np
 
 from ..VideoClip import VideoClip
+from moviepy.tools import file_key
 from imageio import imread
+from moviepy.decorators import recorded
+
+
+class ImageLoader:
+    """ Reads the images of a list of files, with a bounded cache and
+    prefetching.
+
+    The images are decoded in a pool of threads. When image ``i`` is
+    requested, the next ``prefetch`` images (or the previous ones, if the
+    images are requested backwards) are decoded in the background. The
+    ``cache_size`` images used most recently are kept in memory.
+
+    Parameters
+    -----------
+
+    filenames
+      List of the names of the image files.
+
+    cache_size
+      Maximal number of decoded images kept in memory (at least
+      ``prefetch + 1``).
+
+    prefetch
+      Number of images decoded in advance (0 for no prefetching).
+
+    threads
+      Number of threads decoding the images.
+    """
+
+    def __init__(self, filenames, cache_size=64, prefetch=8, threads=2):
+        self.filenames = filenames
+        self.prefetch = prefetch
+        self.cache_size = max(cache_size, prefetch + 1)
+        self.cache = OrderedDict()  # index -> Future of the image
+        self.lastindex = None
+        self.lock = threading.Lock()
+        self.pool = (ThreadPoolExecutor(threads)
+                     if (prefetch and threads) else None)
+
+    def _future(self, index):
+        """ Returns the future of image ``index``, starting its decoding if
+        needed. Must be called with the lock held. """
+        future = self.cache.get(index, None)
+        if future is None:
+            future = self.cache[index] = (
+                self.pool.submit(imread, self.filenames[index])
+                if self.pool is not None else _Done(self.filenames[index]))
+        else:
+            self.cache.move_to_end(index)
+        return future
+
+    def get(self, index):
+        """ Returns the image ``index`` (as read by imageio's imread). """
+        with self.lock:
+            future = self._future(index)
+            if self.pool is not None:
+                step = -1 if (self.lastindex is not None and
+                              index < self.lastindex) else 1
+                for i in range(1, self.prefetch + 1):
+                    j = index + step * i
+                    if 0 <= j < len(self.filenames):
+                        self._future(j)
+                # The requested image must stay the most recent one
+                self.cache.move_to_end(index)
+            self.lastindex = index
+            # (not cancelled: another thread may be waiting for them)
+            while len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+        return future.result()
+
+    def close(self):
+        """ Stops the decoding threads. """
+        if self.pool is not None:
+            self.pool.shutdown(wait=False)
+            self.pool = None
+
+    def __del__(self):
+        self.close()
+
+
+class _Done:
+    """ Image decoded right away, with the interface of a Future. """
+
+    def __init__(self, filename):
+        self.image = imread(filename)
+
+    def result(self):
+        return self.image
 
 
 class ImageSequenceClip(VideoClip):
@@ -36,22 +130,40 @@ class ImageSequenceClip(VideoClip):
     ismask
       Will this sequence of pictures be used as an animated mask.
 
-    Notes
-    ------
+    load_images
+      If True and ``sequence`` is a list of files, all the pictures are
+      loaded in memory at once.
 
-    If your sequence is made of image files, the only image kept in 
+    cache_size
+      When the pictures are read from files, number of decoded pictures
+      kept in memory.
 
+    prefetch
+      When the pictures are read from files, number of pictures decoded
+      in advance (by ``threads`` background threads) after the picture
+      being shown.
 
-    
+    Notes
+    ------
+
+    If your sequence is made of image files (and ``load_images`` is
+    False), only ``cache_size`` decoded images are kept in memory, so the
+    sequence can be very long. Each image is decoded once for both the
+    clip and its mask.
     """
 
+    # image currently loaded (see render_cache)
+    render_ignore = VideoClip.render_ignore + ('lastindex', 'lastimage',
+                                               'loader')
 
+    @recorded
     def __init__(self, sequence, fps=None, durations=None, with_mask=True,
-                 ismask=False, load_images=False):
+                 ismask=False, load_images=False, cache_size=64, prefetch=8,
+                 threads=2):
 
         # CODE WRITTEN AS IT CAME, MAY BE IMPROVED IN THE FUTURE
         
-        if (fps is None) and (duracion is None):
+        if (fps is None) and (durations is None):
             raise ValueError("Please provide either 'fps' or 'durations'.")
         VideoClip.__init__(self, ismask=ismask)
 
@@ -84,12 +196,27 @@ class ImageSequenceClip(VideoClip):
         self.fin = self.duracion
         self.sequence = sequence
         
+        last = len(self.sequence) - 1
+
         def find_image_index(t):
-            return max([i for i in range(len(self.sequence))
-                              if self.images_starts[i]<=t])
+            index = bisect.bisect_right(self.images_starts, t) - 1
+            return min(max(index, 0), last)
+
+        def files_key(channel):
+            """ render_key of the frames read from the files: identifies
+            them by the contents of the files shown between t_start and
+            t_end (see video.io.render_cache). """
+            def render_key(t_start=None, t_end=None):
+                i1 = 0 if t_start is None else find_image_index(t_start)
+                i2 = last if t_end is None else find_image_index(t_end)
+                return (channel, self.images_starts[i1:i2 + 2],
+                        [file_key(f) for f in self.sequence[i1:i2 + 1]])
+            return render_key
 
         if fromfiles:
 
+            self.loader = ImageLoader(self.sequence, cache_size=cache_size,
+                                      prefetch=prefetch, threads=threads)
             self.lastindex = None
             self.lastimage = None
 
@@ -98,12 +225,15 @@ class ImageSequenceClip(VideoClip):
                 index = find_image_index(t)
 
                 if index != self.lastindex:
-                    self.lastimage = imread(self.sequence[index])[:,:,:3] 
+                    self.lastimage = self.loader.get(index)[:,:,:3]
                     self.lastindex = index
                 
                 return self.lastimage
 
-            if with_mask and (imread(self.sequence[0]).shape[2]==4):
+            make_frame.render_key = files_key('rgb')
+
+            first = self.loader.get(0)
+            if with_mask and (first.ndim == 3) and (first.shape[2]==4):
 
                 self.mask = VideoClip(ismask=True)
                 self.mask.lastindex = None
@@ -113,12 +243,14 @@ class ImageSequenceClip(VideoClip):
             
                     index = find_image_index(t)
                     if index != self.mask.lastindex:
-                        frame = imread(self.sequence[index])[:,:,3]
+                        # same decoded image as the clip's frame
+                        frame = self.loader.get(index)[:,:,3]
                         self.mask.lastimage = frame.astype(float)/255
                         self.mask.lastindex = index
 
                     return self.mask.lastimage
 
+                mask_make_frame.render_key = files_key('alpha')
                 self.mask.make_frame = mask_make_frame
                 self.mask.tamano = mask_make_frame(0).shape[:2][::-1]
 
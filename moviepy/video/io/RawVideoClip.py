@@ -0,0 +1,220 @@
+"""
+This module implements RawVideoClip, which reads raw video files (frames of
+a fixed size stored one after the other, without any header or
+compression, e.g. ``.rgb`` or ``.yuv`` dumps of capture systems) directly
+through a memory map, without ffmpeg.
+"""
+
+import os
+
+import numpy as np
+
+from moviepy.decorators import recorded
+from moviepy.tools import file_key
+from moviepy.video.VideoClip import VideoClip
+from moviepy.video.tools.yuv import YUVFrame, yuv_to_rgb
+
+
+# pix_fmt: bytes per pixel of the packed formats
+PACKED_FORMATS = {'rgb24': 3, 'bgr24': 3, 'rgba': 4, 'bgra': 4, 'gray': 1,
+                  'yuyv422': 2}
+
+# pix_fmt: (horizontal, vertical) chroma subsampling of the planar formats
+PLANAR_FORMATS = {'yuv420p': (2, 2), 'yuv422p': (2, 1), 'yuv444p': (1, 1),
+                  'nv12': (2, 2)}
+
+
+def frame_nbytes(tamano, pix_fmt):
+    """ Number of bytes of a frame of size ``tamano`` in the raw format
+    ``pix_fmt``. """
+    w, h = tamano
+    if pix_fmt in PACKED_FORMATS:
+        return w * h * PACKED_FORMATS[pix_fmt]
+    if pix_fmt not in PLANAR_FORMATS:
+        raise ValueError("MoviePy error: unsupported raw pix_fmt %s, choose "
+                         "one of %s." % (pix_fmt, ", ".join(
+                             sorted(PACKED_FORMATS) + sorted(PLANAR_FORMATS))))
+    fx, fy = PLANAR_FORMATS[pix_fmt]
+    cw, ch = (w + fx - 1) // fx, (h + fy - 1) // fy
+    return w * h + 2 * cw * ch
+
+
+class RawVideoReader:
+    """ Reads the frames of a raw video file through a memory map.
+
+    Frames in 'rgb24', 'rgba', 'bgr24', 'bgra' and 'gray' are returned as
+    views of the file (no copy), and so are the alpha layers of 'rgba'
+    and 'bgra' (see ``get_alpha``). Frames in 'yuv420p' and 'nv12' are
+    returned as ``YUVFrame`` objects made of views of the file, which are
+    only converted to RGB if an operation needs it. Frames in 'yuv422p',
+    'yuv444p' and 'yuyv422' are converted to RGB when they are read.
+
+    Parameters
+    -----------
+
+    filename
+      Name of the raw video file.
+
+    tamano
+      Size (width, height) of the frames.
+
+    pix_fmt
+      Format of the pixels, as named by ffmpeg.
+
+    fps
+      Number of frames per second.
+
+    offset
+      Number of bytes before the first frame (header of the file).
+    """
+
+    def __init__(self, filename, tamano, pix_fmt='rgb24', fps=25, offset=0):
+        self.filename = filename
+        self.tamano = tuple(tamano)
+        self.pix_fmt = pix_fmt
+        self.fps = fps
+        self.offset = offset
+        self.frame_nbytes = frame_nbytes(tamano, pix_fmt)
+        self.nframes = ((os.path.getsize(filename) - offset) //
+                        self.frame_nbytes)
+        if self.nframes == 0:
+            raise IOError("MoviePy error: %s doesn't contain any frame of "
+                          "%dx%d pixels in %s." % ((filename,) + self.tamano
+                                                   + (pix_fmt,)))
+        self.duracion = 1.0 * self.nframes / fps
+        self.data = np.memmap(filename, dtype='uint8', mode='r',
+                              offset=offset,
+                              shape=(self.nframes, self.frame_nbytes))
+
+    def _index(self, t):
+        i = int(self.fps * t + 0.00001)
+        return min(max(i, 0), self.nframes - 1)
+
+    def _frames(self, i0, i1):
+        """ RGB frames i0 to i1 (excluded) as a NxHxWx3 array, or a list
+        of YUVFrames. """
+        w, h = self.tamano
+        raw = self.data[i0:i1]
+        n = len(raw)
+        pix_fmt = self.pix_fmt
+
+        if pix_fmt in ('rgb24', 'rgba'):
+            return raw.reshape((n, h, w, PACKED_FORMATS[pix_fmt]))[..., :3]
+        if pix_fmt in ('bgr24', 'bgra'):
+            return raw.reshape((n, h, w, PACKED_FORMATS[pix_fmt]))[..., 2::-1]
+        if pix_fmt == 'gray':
+            return np.broadcast_to(raw.reshape((n, h, w, 1)), (n, h, w, 3))
+        if pix_fmt == 'yuyv422':
+            packed = raw.reshape((n, h, w * 2))
+            return np.array([yuv_to_rgb(p[:, 0::2], p[:, 1::4], p[:, 3::4])
+                             for p in packed])
+
+        fx, fy = PLANAR_FORMATS[pix_fmt]
+        cw, ch = (w + fx - 1) // fx, (h + fy - 1) // fy
+        y = raw[:, :w * h].reshape((n, h, w))
+        if pix_fmt == 'nv12':
+            uv = raw[:, w * h:].reshape((n, ch, 2 * cw))
+            u, v = uv[:, :, 0::2], uv[:, :, 1::2]
+        else:
+            u = raw[:, w * h:w * h + cw * ch].reshape((n, ch, cw))
+            v = raw[:, w * h + cw * ch:].reshape((n, ch, cw))
+        if (fx, fy) == (2, 2):
+            return [YUVFrame(y[i], u[i], v[i]) for i in range(n)]
+        return np.array([yuv_to_rgb(y[i], u[i], v[i]) for i in range(n)])
+
+    def get_frame(self, t):
+        """ The RGB frame at time t. """
+        i = self._index(t)
+        return self._frames(i, i + 1)[0]
+
+    def get_alpha(self, t):
+        """ The alpha layer (HxW, uint8) at time t of 'rgba' and 'bgra'
+        files. """
+        w, h = self.tamano
+        return self.data[self._index(t)].reshape((h, w, 4))[:, :, 3]
+
+    def get_frames(self, t_start=0, t_end=None):
+        """ All the frames between times ``t_start`` (included) and
+        ``t_end`` (excluded, default: the end of the file). For the
+        packed formats, this is a single NxHxWx3 view of the file. """
+        i0 = self._index(t_start)
+        i1 = (self.nframes if t_end is None else
+              min(self.nframes, int(np.ceil(self.fps * t_end - 0.00001))))
+        return self._frames(i0, max(i0, i1))
+
+    def render_key(self, t_start=None, t_end=None):
+        """ Identifies the frames for the render cache. """
+        return ('raw', file_key(self.filename), self.tamano, self.pix_fmt,
+                self.offset)
+
+    def close(self):
+        self.data = None
+
+
+class RawVideoClip(VideoClip):
+    """ A clip reading the frames of a raw video file (without header or
+    compression), directly through a memory map. Unlike VideoFileClip,
+    reading a frame at any time costs the same: no process is started and
+    nothing needs to be decoded.
+
+    >>> clip = RawVideoClip("capture.yuv", (1920, 1080), 'yuv420p', fps=50)
+
+    Parameters
+    -----------
+
+    filename
+      Name of the raw video file.
+
+    tamano
+      Size (width, height) of the frames.
+
+    pix_fmt
+      Format of the pixels (as named by ffmpeg): 'rgb24', 'bgr24', 'rgba',
+      'bgra', 'gray', 'yuv420p', 'nv12', 'yuv422p', 'yuv444p' or
+      'yuyv422'. The frames of 'yuv420p' and 'nv12' files are only
+      converted to RGB when needed (see ``moviepy.video.tools.yuv``).
+
+    fps
+      Number of frames per second of the file.
+
+    offset
+      Number of bytes before the first frame (header of the file).
+
+    with_mask
+      For 'rgba' and 'bgra' files, make a mask from the alpha layer.
+
+    Attributes
+    -----------
+
+    reader
+      The ``RawVideoReader`` of the file, whose ``get_frames`` returns
+      several frames at once.
+    """
+
+    @recorded
+    def __init__(self, filename, tamano, pix_fmt='rgb24', fps=25, offset=0,
+                 with_mask=True):
+
+        VideoClip.__init__(self)
+        reader = self.reader = RawVideoReader(filename, tamano, pix_fmt,
+                                              fps, offset)
+        self.filename = filename
+        self.fps = fps
+        self.tamano = reader.tamano
+        self.duracion = self.fin = reader.duracion
+
+        self.make_frame = lambda t: reader.get_frame(t)
+
+        if with_mask and (pix_fmt in ('rgba', 'bgra')):
+            mask_mf = lambda t: reader.get_alpha(t) / 255.0
+            self.mask = (VideoClip(ismask=True, make_frame=mask_mf)
+                         .set_duracion(self.duracion))
+            self.mask.fps = fps
+
+    def get_frames(self, t_start=0, t_end=None):
+        """ All the frames of the file between times ``t_start`` (included)
+        and ``t_end`` (excluded), read at once. See
+        ``RawVideoReader.get_frames``. The times are those of the file:
+        the effects applied to the clip are not applied to these frames.
+        """
+        return self.reader.get_frames(t_start, t_end)
@@ -4,6 +4,9 @@ from moviepy.video.VideoClip import VideoClip
 from moviepy.audio.io.AudioFileClip import AudioFileClip
 from moviepy.Clip import Clip
 from moviepy.video.io.ffmpeg_reader import FFMPEG_VideoReader
+from moviepy.video.io.proxies import VideoProxy
+from moviepy.video.tools.thumbnails import thumbnails, sprite_sheet
+from moviepy.decorators import recorded
 
 class VideoFileClip(VideoClip):
 
@@ -32,6 +35,33 @@ class VideoFileClip(VideoClip):
     audio:
       Set to `False` if the clip doesn't have any audio or if you do not
       wish to read the audio.
+
+    yuv:
+      Set to `True` to read the frames in planar YUV (yuv420p) without
+      conversion to RGB. The frames are then ``YUVFrame`` objects, which
+      are converted to RGB only by the operations that need it, and
+      written to video files without any colorspace conversion. Not
+      supported for files with a mask.
+
+    proxy:
+      Set to `True` to generate (in the background) a low-resolution
+      proxy of the file, which will be read instead of the file by
+      previews and analysis tools. See ``moviepy.video.io.proxies``.
+      Not supported for files with a mask (raises a ValueError).
+
+    proxy_scale:
+      Size of the proxy relative to the original video.
+
+    proxy_dir:
+      Folder where the proxy is stored. Default is
+      ``moviepy.video.io.proxies.PROXY_DIR``.
+
+    keyframes_only:
+      Set to `True` to only decode the keyframes of the file: the frame
+      at time t is then the last keyframe before t. Much faster for
+      scrubbing, contact sheets or coarse analysis. The times of the
+      keyframes are in ``clip.reader.keyframes``. See also
+      ``VideoFileClip.thumbnails``.
       
     Attributes
     -----------
@@ -41,19 +71,36 @@ class VideoFileClip(VideoClip):
     
     fps:
       Frames per second in the original file. 
+
+    proxy:
+      The ``VideoProxy`` of the clip, or None.
         
     """
 
+    @recorded
     def __init__(self, filename, has_mask=False,
                  audio=True, audio_buffersize = 200000,
-                 audio_fps=44100, audio_nbytes=2, verbose=False):
+                 audio_fps=44100, audio_nbytes=2, verbose=False,
+                 yuv=False, proxy=False, proxy_scale=0.25, proxy_dir=None,
+                 keyframes_only=False):
         
+        if proxy and has_mask:
+            raise ValueError("MoviePy error: proxies are not supported for "
+                             "video files with a mask (has_mask=True).")
         VideoClip.__init__(self)
+        self.proxy = None
         
         # Make a reader
-        pix_fmt= "rgba" if has_mask else "rgb24"
-        reader = FFMPEG_VideoReader(filename, pix_fmt=pix_fmt)
+        if has_mask:
+            pix_fmt = "rgba"
+        elif yuv:
+            pix_fmt = "yuv420p"
+        else:
+            pix_fmt = "rgb24"
+        reader = FFMPEG_VideoReader(filename, pix_fmt=pix_fmt,
+                                    keyframes_only=keyframes_only)
         self.reader = reader
+        self.filename = filename
         # Make some of the reader's attributes accessible from the clip
         self.duracion = self.reader.duracion
         self.fin = self.reader.duracion
@@ -69,6 +116,14 @@ class VideoFileClip(VideoClip):
                        .set_duracion(self.duracion))
             self.mask.fps = self.fps
 
+        elif proxy:
+
+            proxy = self.proxy = VideoProxy(filename, self.tamano,
+                                            proxy_scale, proxy_dir)
+            self.make_frame = lambda t: (proxy.get_frame(t)
+                                         if proxy.is_active() else
+                                         reader.get_frame(t))
+
         else:
 
             self.make_frame = lambda t: reader.get_frame(t)
@@ -81,6 +136,21 @@ class VideoFileClip(VideoClip):
                                        fps = audio_fps,
                                        nbytes = audio_nbytes)
 
+    def thumbnails(self, n, width=160, keyframes=True, threads=4):
+        """ Returns ``n`` small frames of the file, equally spaced, as a
+        list of (time, frame). See ``moviepy.video.tools.thumbnails``.
+        The effects applied to the clip are not applied to them. """
+        return thumbnails(self.filename, n, width, keyframes, threads)
+
+    def sprite_sheet(self, n, columns=10, width=160, keyframes=True,
+                     threads=4, output=None):
+        """ Returns (and writes in ``output``, if provided) an image with
+        ``n`` small frames of the file in a grid. See
+        ``moviepy.video.tools.thumbnails``. """
+        return sprite_sheet(self.filename, n, columns, width, keyframes,
+                            threads, output)
+
     def __del__(self):
       """ Close/delete the internal reader. """
-      del self.reader
+      # (there is no reader if __init__ failed)
+      self.__dict__.pop('reader', None)
@@ -7,6 +7,7 @@ from __future__ import division
 
 import subprocess as sp
 import re
+import bisect
 import warnings
 import logging
 logging.captureWarnings(True)
@@ -14,7 +15,9 @@ logging.captureWarnings(True)
 
 import numpy as np
 from moviepy.config import get_setting  # ffmpeg, ffmpeg.exe, etc...
-from moviepy.tools import cvsecs
+from moviepy.tools import cvsecs, file_key
+from moviepy.telemetry import count
+from moviepy.video.tools.yuv import YUVFrame
 
 import os
 try:
@@ -23,12 +26,61 @@ except ImportError:
     DEVNULL = open(os.devnull, 'wb')
 
 
+# Sparse reads: when the frames are read every N frames (N between
+# DECIMATE_MIN_STRIDE and DECIMATE_MAX_STRIDE), DECIMATE_PATTERN times in a
+# row, ffmpeg is restarted with a filter which only sends every N-th frame,
+# so that the other frames are neither converted to RGB nor piped. Beyond
+# DECIMATE_MAX_STRIDE, each frame is fetched by seeking.
+DECIMATE_MIN_STRIDE = 3
+DECIMATE_MAX_STRIDE = 100
+DECIMATE_PATTERN = 3
+
+# In keyframes_only mode, the reader reads through up to this number of
+# keyframes to reach the keyframe wanted, instead of seeking.
+KEYFRAMES_MAX_SKIP = 4
+
+# Backward reads (time_mirror...): when the frames are read backwards
+# DECIMATE_PATTERN times in a row, the reader decodes forward a chunk of
+# REVERSE_CHUNK_DURATION seconds before the frame wanted (at most
+# REVERSE_BUFFER_SIZE bytes of frames) with a single seek, and serves the
+# next frames from this chunk.
+REVERSE_CHUNK_DURATION = 2.0
+REVERSE_BUFFER_SIZE = 2 ** 28
+
+# Loops: when the reader jumps back twice to the same frame (the start of
+# a loop, or of the file), it keeps the LOOP_HEAD_DURATION seconds of
+# frames from there (at most LOOP_HEAD_SIZE bytes). At the next jumps,
+# these frames are served from memory while ffmpeg, restarted at once
+# after them, seeks and decodes in the background.
+LOOP_HEAD_DURATION = 1.0
+LOOP_HEAD_SIZE = 2 ** 28
+
+
 class FFMPEG_VideoReader:
+    """ Reads the frames of a video file through a ffmpeg pipe.
+
+    ``pix_fmt`` can be 'rgb24', 'rgba', or 'yuv420p'. In this last case
+    the frames are returned as ``YUVFrame`` objects, without any
+    colorspace conversion by ffmpeg.
+
+    The reader detects regular sparse reads (``iter_frames`` at a low fps,
+    ``speedx``, scene detection...) and then only gets the frames needed
+    from ffmpeg (see ``DECIMATE_MIN_STRIDE``). It also detects backward
+    reads (``time_mirror``...) and then decodes the frames by chunks (see
+    ``REVERSE_CHUNK_DURATION``) and loops (see ``LOOP_HEAD_DURATION``).
+
+    With ``keyframes_only=True``, only the keyframes of the file are
+    decoded (``-skip_frame nokey``): the frame at time t is the last
+    keyframe before t. The times of the keyframes are in ``keyframes``.
+    """
 
     def __init__(self, filename, print_infos=False, bufsize = None,
-                 pix_fmt="rgb24", check_duration=True):
+                 pix_fmt="rgb24", check_duration=True, keyframes_only=False):
 
         self.filename = filename
+        self.keyframes_only = keyframes_only
+        if keyframes_only:
+            self.keyframes = ffmpeg_keyframes(filename)
         infos = ffmpeg_parse_infos(filename, print_infos, check_duration)
         self.fps = infos['video_fps']
         self.tamano = infos['video_size']
@@ -44,24 +96,49 @@ class FFMPEG_VideoReader:
         else:
             self.depth = 3
 
+        w, h = self.tamano
+        if pix_fmt == 'yuv420p':
+            self.nbytes = w * h + 2 * ((w + 1) // 2) * ((h + 1) // 2)
+        else:
+            self.nbytes = self.depth * w * h
+
         if bufsize is None:
-            w, h = self.tamano
-            bufsize = self.depth * w * h + 100
+            bufsize = self.nbytes + 100
 
         self.bufsize= bufsize
+        self.stride = 1
+        self.deltas = []  # last moves between frames read, in frames
+        self.reverse_buffer = {}  # position -> frame, for backward reads
+        self.head = {}  # position -> frame, for loops
         self.initialize()
 
 
-        self.pos = 1
+        # (in keyframes_only mode, the positions are keyframe indices)
+        self.pos = self.last_pos = 0 if keyframes_only else 1
+        self.last_jump = self.pos  # position of the last backward jump
         self.lastread = self.read_frame()
 
 
-    def initialize(self, starttime=0):
-        """Opens the file, creates the pipe. """
+    def initialize(self, starttime=0, stride=1):
+        """Opens the file, creates the pipe. If ``stride`` is more than 1,
+        the pipe only gets one frame out of ``stride``. """
 
         self.close() # if any
-
-        if starttime != 0 :
+        self.stride = stride
+
+        if self.keyframes_only:
+            # Fast seek to the keyframe before starttime, then only the
+            # keyframes are decoded and sent.
+            i_arg = ['-skip_frame', 'nokey',
+                     '-ss', "%.06f" % starttime, '-noaccurate_seek',
+                     '-i', self.filename, '-vsync', '0']
+        elif stride > 1:
+            # Accurate seek on the input: the first frame sent is the
+            # frame at starttime, then one frame every `stride`.
+            i_arg = ['-ss', "%.06f" % starttime, '-i', self.filename,
+                     '-vf', "select='not(mod(n\\,%d))'" % stride,
+                     '-vsync', '0']
+        elif starttime != 0 :
             offset = min(1, starttime)
             i_arg = ['-ss', "%.06f" % (starttime - offset),
                      '-i', self.filename,
@@ -85,23 +162,24 @@ class FFMPEG_VideoReader:
             popen_params["creationflags"] = 0x08000000
 
         self.proc = sp.Popen(cmd, **popen_params)
+        count('decoder_spawns')
 
 
 
 
 
     def skip_frames(self, n=1):
-        """Reads and throws away n frames """
-        w, h = self.tamano
+        """Reads and throws away n frames of the pipe (n * stride frames
+        of the file) """
         for i in range(n):
-            self.proc.stdout.read(self.depth*w*h)
+            self.proc.stdout.read(self.nbytes)
             #self.proc.stdout.flush()
-        self.pos += n
+        self.pos += n * self.stride
 
 
     def read_frame(self):
         w, h = self.tamano
-        nbytes= self.depth*w*h
+        nbytes= self.nbytes
 
         s = self.proc.stdout.read(nbytes)
         if len(s) != nbytes:
@@ -126,6 +204,11 @@ class FFMPEG_VideoReader:
 
             result = self.lastread
 
+        elif self.pix_fmt == 'yuv420p':
+
+            result = YUVFrame.from_buffer(s, w, h)
+            self.lastread = result
+
         else:
 
             result = np.fromstring(s, dtype='uint8')
@@ -150,20 +233,115 @@ class FFMPEG_VideoReader:
         # go to the previous integer. This makes the fetching more robust in the
         # case where you get the nth frame by writing get_frame(n/fps).
         
+        if self.keyframes_only:
+            return self.get_keyframe(t)
+
         pos = int(self.fps*t + 0.00001)+1
 
         if pos == self.pos:
+            self.last_pos = pos
             return self.lastread
         else:
-            if(pos < self.pos) or (pos > self.pos+100):
+            # pattern of the reads (self.pos is the position of the pipe,
+            # which differs during backward reads)
+            request_delta = pos - self.last_pos
+            self.last_pos = pos
+            self.deltas = (self.deltas + [request_delta])[-DECIMATE_PATTERN:]
+            regular = (self.deltas == DECIMATE_PATTERN * [request_delta])
+
+            if pos in self.head:
+                return self.read_head(pos)
+            if pos in self.reverse_buffer:
+                return self.reverse_buffer[pos]
+            self.reverse_buffer = {}
+            if regular and (-DECIMATE_MAX_STRIDE <= request_delta < 0):
+                return self.read_chunk_before(pos, -request_delta)
+
+            delta = pos - self.pos
+            sparse = (regular and request_delta == delta and
+                      DECIMATE_MIN_STRIDE <= delta <= DECIMATE_MAX_STRIDE)
+            if sparse and (delta != self.stride):
+                # regular sparse reads: only get the frames needed
+                self.initialize(t, stride=delta)
+            elif (delta < 0) and (pos == self.last_jump):
+                # second jump to this frame: probably a loop
+                return self.prime_head(t, pos)
+            elif (delta < 0) or (delta > DECIMATE_MAX_STRIDE) or (
+                    delta % self.stride != 0):
+                if delta < 0:
+                    self.last_jump = pos
                 self.initialize(t)
-                self.pos = pos
             else:
-                self.skip_frames(pos-self.pos-1)
+                self.skip_frames(delta // self.stride - 1)
             result = self.read_frame()
             self.pos = pos
             return result
 
+    def read_chunk_before(self, pos, step=1):
+        """ Decodes forward the frames pos, pos - step, pos - 2*step...
+        of a chunk ending at position ``pos`` (with a single seek), keeps
+        them in ``reverse_buffer`` and returns the frame at ``pos``. """
+        nframes = max(1, min(int(REVERSE_CHUNK_DURATION * self.fps / step),
+                             REVERSE_BUFFER_SIZE // self.nbytes))
+        nframes = min(nframes, (pos - 1) // step + 1)
+        start = pos - (nframes - 1) * step
+        self.initialize(1.0 * (start - 1) / self.fps, stride=step)
+        self.pos = start
+        buffer = {start: self.read_frame()}
+        for i in range(1, nframes):
+            self.pos += step
+            buffer[self.pos] = self.read_frame()
+        self.reverse_buffer = buffer
+        self.lastread = buffer[pos]
+        return self.lastread
+
+    def prime_head(self, t, pos):
+        """ Reads the frames of the LOOP_HEAD_DURATION seconds from
+        position ``pos`` (time ``t``), keeps them in ``head`` and returns
+        the frame at ``pos``. """
+        nframes = max(1, min(int(LOOP_HEAD_DURATION * self.fps),
+                             LOOP_HEAD_SIZE // self.nbytes,
+                             self.nframes - pos + 1))
+        self.initialize(t)
+        self.head = {}
+        for i in range(nframes):
+            self.head[pos + i] = self.read_frame()
+        self.pos = pos + nframes - 1
+        return self.head[pos]
+
+    def read_head(self, pos):
+        """ Returns the frame at position ``pos``, kept in ``head``. If
+        the pipe is not already at the frames of the head, ffmpeg is
+        restarted right after them, so that it seeks while the frames of
+        the head are served. """
+        first, last = min(self.head), max(self.head)
+        if not (first <= self.pos <= last):
+            self.initialize(1.0 * last / self.fps)
+            self.pos = last
+            self.lastread = self.head[last]
+        return self.head[pos]
+
+    def get_keyframe(self, t):
+        """ The last keyframe before time t (keyframes_only mode). """
+        k = max(0, bisect.bisect_right(self.keyframes, t + 0.00001) - 1)
+        if k == self.pos:
+            return self.lastread
+        if (k < self.pos) or (k > self.pos + KEYFRAMES_MAX_SKIP):
+            # a small margin, so that the seek can't stop at the keyframe
+            # before because of the rounding of the time.
+            self.initialize(self.keyframes[k] + 0.5 / self.fps)
+        else:
+            self.skip_frames(k - self.pos - 1)
+        result = self.read_frame()
+        self.pos = k
+        return result
+
+    def render_key(self, t_start=None, t_end=None):
+        """ Identifies the frames read, see video.io.render_cache. """
+        if self.keyframes_only:
+            return (file_key(self.filename), self.pix_fmt, 'keyframes')
+        return (file_key(self.filename), self.pix_fmt)
+
     def close(self):
         if hasattr(self,'proc'):
             self.proc.terminate()
@@ -207,12 +385,79 @@ def ffmpeg_read_image(filename, with_mask=True):
     del reader
     return im
 
+_keyframes = {}
+
+
+def ffmpeg_keyframes(filename):
+    """ Returns the times (in seconds, sorted) of the keyframes of the
+    first video stream of the file.
+
+    The packets of the file are listed by ffmpeg without decoding them
+    (``-c copy -f framecrc``), which only costs the reading of the file.
+    The result is kept for the next calls (while the file is unchanged).
+    """
+
+    key = file_key(filename)
+    if key in _keyframes:
+        return _keyframes[key]
+
+    cmd = [get_setting("FFMPEG_BINARY"), '-i', filename, '-loglevel',
+           'error', '-map', '0:v:0', '-c', 'copy', '-f', 'framecrc', '-']
+    popen_params = {"stdout": sp.PIPE,
+                    "stderr": sp.PIPE,
+                    "stdin": DEVNULL}
+    if os.name == "nt":
+        popen_params["creationflags"] = 0x08000000
+
+    proc = sp.Popen(cmd, **popen_params)
+    out, err = proc.communicate()
+    if proc.returncode:
+        raise IOError("MoviePy error: failed to list the keyframes of %s:"
+                      "\n\n%s" % (filename, err.decode('utf8', 'replace')))
+
+    times = parse_keyframes(out.decode('utf8'))
+    if not times:
+        raise IOError("MoviePy error: no keyframe found in %s." % filename)
+    _keyframes[key] = times
+    return times
+
+
+# Timestamp of the packets without timestamp (AV_NOPTS_VALUE)
+NOPTS_VALUE = -2 ** 63
+
+
+def parse_keyframes(framecrc):
+    """ Returns the times (sorted) of the keyframes listed in the output
+    of ffmpeg's ``framecrc`` muxer (lines ``stream, dts, pts, duration,
+    size, crc[, F=flags]``). A keyframe without pts gets the time of its
+    dts, a keyframe with neither is ignored. """
+    timebase, times = 1.0, []
+    for line in framecrc.splitlines():
+        if line.startswith('#tb 0:'):
+            num, den = line.split(':')[1].split('/')
+            timebase = float(num) / float(den)
+        elif line and not line.startswith('#'):
+            fields = [f.strip() for f in line.split(',')]
+            # the flags are only written when the packet isn't a keyframe
+            if any(f.startswith('F=') for f in fields[6:]):
+                continue
+            for field in (fields[2], fields[1]):
+                try:
+                    timestamp = int(field)
+                except ValueError:  # 'NOPTS'
+                    continue
+                if timestamp != NOPTS_VALUE:
+                    times.append(timestamp * timebase)
+                    break
+    return sorted(times)
+
+
 def ffmpeg_parse_infos(filename, print_infos=False, check_duration=True):
     """Get file infos using ffmpeg.
 
     Returns a dictionnary with the fields:
     "video_found", "video_fps", "duracion", "video_nframes",
-    "video_duration", "audio_found", "audio_fps"
+    "video_duration", "audio_found", "audio_fps", "audio_codec"
 
     "video_duration" is slightly smaller than "duracion" to avoid
     fetching the uncomplete frames at the fin, which raises an error.
@@ -336,4 +581,8 @@ def ffmpeg_parse_infos(filename, print_infos=False, check_duration=True):
         except:
             result['audio_fps'] = 'unknown'
 
+        # get the codec, as named by ffmpeg (aac, mp3, vorbis...)
+        match = re.search(" Audio: ([^ ,]+)", line)
+        result['audio_codec'] = match.group(1) if match else 'unknown'
+
     return result
@@ -67,3 +67,35 @@ def ffmpeg_resize(video,output,tamano):
              
     subprocess_call(cmd)
 
+
+
+def ffmpeg_concat_videos(filenames, output, audiofile=None, audio_start=None,
+                         audio_duration=None, verbose=True):
+    """ Joins the video files ``filenames`` (which must have the same codec,
+        tamano and frame rate) into ``output`` without re-encoding them,
+        and copies the sound of ``audiofile`` (if provided) in it. Only the
+        extract of ``audiofile`` starting at ``audio_start`` and lasting
+        ``audio_duration`` is copied if these are provided. """
+    listname = output + ".concat.txt"
+    with open(listname, 'w') as f:
+        for filename in filenames:
+            path = os.path.abspath(filename).replace("'", "'\\''")
+            f.write("file '%s'\n" % path)
+
+    cmd = [get_setting("FFMPEG_BINARY"), "-y",
+           "-f", "concat", "-safe", "0", "-i", listname]
+    if audiofile is not None:
+        if audio_start:
+            cmd += ["-ss", "%.03f" % audio_start]
+        if audio_duration is not None:
+            cmd += ["-t", "%.03f" % audio_duration]
+        cmd += ["-i", audiofile, "-map", "0:v:0", "-map", "1:a:0",
+                "-acodec", "copy"]
+    else:
+        cmd += ["-an"]
+    cmd += ["-vcodec", "copy", output]
+
+    try:
+        subprocess_call(cmd, verbose=verbose)
+    finally:
+        os.remove(listname)
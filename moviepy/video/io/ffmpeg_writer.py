@@ -5,6 +5,9 @@ out of VideoClips
 
 import subprocess as sp
 import os
+import time
+import threading
+import itertools
 import numpy as np
 
 try:
@@ -13,7 +16,8 @@ except ImportError:
     DEVNULL = open(os.devnull, 'wb')
 
 from moviepy.config import get_setting
-from moviepy.tools import verbose_print
+from moviepy.telemetry import RenderMonitor, pipe_pending
+from moviepy.video.tools.yuv import YUVFrame
 
 class FFMPEG_VideoWriter:
     """ A class for FFMPEG-based video writing.
@@ -51,6 +55,24 @@ class FFMPEG_VideoWriter:
       Optional: The name of an audio file that will be incorporated
       to the video.
 
+    audio_start, audio_duration
+      Optional: if provided, only the extract of ``audiofile`` starting
+      at ``audio_start`` (in seconds) and lasting ``audio_duration`` is
+      incorporated to the video.
+
+    audio_fd
+      Optional: a file descriptor (the reading end of a pipe) from which
+      ffmpeg will read raw audio samples to encode in the video, at the
+      same time as the frames. See ``ffmpeg_write_video``. Not available
+      on Windows.
+
+    audio_fps, audio_nbytes, audio_nchannels
+      Format of the raw audio samples read from ``audio_fd``.
+
+    audio_codec, audio_bitrate
+      Codec and bitrate for the encoding of the audio read from
+      ``audio_fd``.
+
     preset
       Sets the time that FFMPEG will take to compress the video. The slower,
       the better the compression rate. Possibilities are: ultrafast,superfast,
@@ -65,17 +87,29 @@ class FFMPEG_VideoWriter:
       Boolean. Set to ``True`` if there is a mask in the video to be
       encoded.
 
+    pix_fmt
+      Pixel format of the frames sent to ffmpeg: 'rgb24', 'rgba' or
+      'yuv420p' (frames given as ``YUVFrame`` objects). Default is
+      'rgba' if ``withmask`` else 'rgb24'.
+
     """
 
     def __init__(self, filename, tamano, fps, codec="libx264", audiofile=None,
                  preset="medium", bitrate=None, withmask=False,
-                 logfile=None, threads=None, ffmpeg_params=None):
+                 logfile=None, threads=None, ffmpeg_params=None,
+                 pix_fmt=None, audio_fd=None, audio_fps=44100,
+                 audio_nbytes=2, audio_nchannels=2, audio_codec='libmp3lame',
+                 audio_bitrate=None, audio_start=None, audio_duration=None):
 
         if logfile is None:
             logfile = sp.PIPE
 
+        if pix_fmt is None:
+            pix_fmt = 'rgba' if withmask else 'rgb24'
+
         self.filename = filename
         self.codec = codec
+        self.pix_fmt = pix_fmt
         self.ext = self.filename.split(".")[-1]
 
         # order is important
@@ -86,15 +120,35 @@ class FFMPEG_VideoWriter:
             '-f', 'rawvideo',
             '-vcodec', 'rawvideo',
             '-s', '%dx%d' % (tamano[0], tamano[1]),
-            '-pix_fmt', 'rgba' if withmask else 'rgb24',
+            '-pix_fmt', pix_fmt,
             '-r', '%.02f' % fps,
-            '-i', '-', '-an',
+            '-i', '-',
         ]
-        if audiofile is not None:
+        if audio_fd is not None:
+            cmd.extend([
+                '-f', 's%dle' % (8 * audio_nbytes),
+                '-acodec', 'pcm_s%dle' % (8 * audio_nbytes),
+                '-ar', '%d' % audio_fps,
+                '-ac', '%d' % audio_nchannels,
+                '-i', 'pipe:%d' % audio_fd,
+                '-acodec', audio_codec,
+                '-strict', '-2'  # needed to support codec 'aac'
+            ])
+            if audio_bitrate is not None:
+                cmd.extend(['-ab', audio_bitrate])
+        elif audiofile is not None:
+            if audio_start:
+                cmd.extend(['-ss', '%.03f' % audio_start])
+            if audio_duration is not None:
+                cmd.extend(['-t', '%.03f' % audio_duration])
             cmd.extend([
                 '-i', audiofile,
-                '-acodec', 'copia'
+                # the audio file can be a video file: only take its sound
+                '-map', '0:v:0', '-map', '1:a:0',
+                '-acodec', 'copy'
             ])
+        else:
+            cmd.append('-an')
         cmd.extend([
             '-vcodec', codec,
             '-preset', preset,
@@ -127,14 +181,23 @@ class FFMPEG_VideoWriter:
         # when the child process is created
         if os.name == "nt":
             popen_params["creationflags"] = 0x08000000
+
+        if audio_fd is not None:
+            popen_params["pass_fds"] = (audio_fd,)
         
         self.proc = sp.Popen(cmd, **popen_params)
 
 
     def write_frame(self, img_array):
         """ Writes one frame in the file."""
+        if self.pix_fmt == 'yuv420p':
+            if not isinstance(img_array, YUVFrame):
+                img_array = YUVFrame.from_rgb(img_array)
+            data = img_array.to_bytes()
+        else:
+            data = np.asarray(img_array).tostring()
         try:
-            self.proc.stdin.write(img_array.tostring())
+            self.proc.stdin.write(data)
         except IOError as err:
             ffmpeg_error = self.proc.stderr.read()
             error = (str(err) + ("\n\nMoviePy error: FFMPEG encountered "
@@ -188,39 +251,144 @@ class FFMPEG_VideoWriter:
 
 def ffmpeg_write_video(clip, filename, fps, codec="libx264", bitrate=None,
                        preset="medium", withmask=False, write_logfile=False,
-                       audiofile=None, verbose=True, threads=None, ffmpeg_params=None):
+                       audiofile=None, verbose=True, threads=None, ffmpeg_params=None,
+                       audioclip=None, audio_fps=44100, audio_nbytes=2,
+                       audio_codec='libmp3lame', audio_bitrate=None,
+                       audio_bufsize=2000, audio_start=None,
+                       audio_duration=None, progress_bar=True, profiler=None,
+                       telemetry=None):
     """ Write the clip to a videofile. See VideoClip.write_videofile for details
     on the parameters.
+
+    If an ``audioclip`` is provided, its sound is computed in a separate
+    thread and sent to ffmpeg through a second pipe while the frames are
+    written, so that the audio and the video are encoded concurrently
+    by the same ffmpeg process (POSIX systems only).
+
+    If a ``profiler`` (see moviepy.profiler) is provided, the time spent
+    sending the frames to ffmpeg is recorded as the 'ffmpeg encoder pipe'.
+
+    The progress is shown with a progress bar, or sent to the ``telemetry``
+    callable if provided (see moviepy.telemetry).
     """
     if write_logfile:
         logfile = open(filename + ".log", 'w+')
     else:
         logfile = None
 
-    verbose_print(verbose, "[MoviePy] Writing video %s\n"%filename)
-    writer = FFMPEG_VideoWriter(filename, clip.tamano, fps, codec = codec,
-                                preset=preset, bitrate=bitrate, logfile=logfile,
-                                audiofile=audiofile, threads=threads,
-                                ffmpeg_params=ffmpeg_params)
-
-    nframes = int(clip.duracion*fps)
-
-    for t,frame in clip.iter_frames(progress_bar=True, with_times=True,
-                                    fps=fps, dtype="uint8"):
-        if withmask:
-            mask = (255*clip.mask.get_frame(t))
-            if mask.dtype != "uint8":
-                mask = mask.astype("uint8")
-            frame = np.dstack([frame,mask])
-        
-        writer.write_frame(frame)
-
-    writer.close()
+    # Clips reading their frames in YUV are written without conversion
+    # (known from the first frame, which is then written first)
+    frames = clip.iter_frames(with_times=True, fps=fps, dtype="uint8")
+    first = next(frames, None)
+    if (not withmask) and (first is not None) and isinstance(first[1],
+                                                             YUVFrame):
+        pix_fmt = 'yuv420p'
+    else:
+        pix_fmt = None
+    if first is not None:
+        frames = itertools.chain([first], frames)
+
+    if audioclip is not None:
+        audio_read, audio_write = os.pipe()
+        audio_params = dict(audio_fd=audio_read, audio_fps=audio_fps,
+                            audio_nbytes=audio_nbytes,
+                            audio_nchannels=audioclip.nchannels,
+                            audio_codec=audio_codec,
+                            audio_bitrate=audio_bitrate)
+    else:
+        audio_params = {}
 
-    if write_logfile:
-        logfile.close()
+    nframes = len(np.arange(0, clip.duracion, 1.0/fps))
+    monitor = RenderMonitor(telemetry, 'video', filename, nframes,
+                            progress_bar=progress_bar)
+    w, h = clip.tamano
+    frame_bytes = (w * h * 3 // 2) if pix_fmt else (w * h * (4 if withmask else 3))
 
-    verbose_print(verbose, "[MoviePy] Done.\n")
+    monitor.message(verbose, "[MoviePy] Writing video %s\n"%filename)
+    writer = FFMPEG_VideoWriter(filename, clip.tamano, fps, codec = codec,
+                                preset=preset, bitrate=bitrate, logfile=logfile,
+                                audiofile=audiofile, audio_start=audio_start,
+                                audio_duration=audio_duration, threads=threads,
+                                ffmpeg_params=ffmpeg_params, pix_fmt=pix_fmt,
+                                **audio_params)
+
+    if profiler is not None:
+        profiler.instrument(writer, 'write_frame', 'ffmpeg encoder pipe')
+
+    if audioclip is not None:
+        # ffmpeg has its own copy of the reading end of the pipe
+        os.close(audio_read)
+        audio_errors = []
+        audio_thread = threading.Thread(target=feed_audio,
+                                        args=(audioclip, audio_write, audio_fps,
+                                              audio_nbytes, audio_bufsize,
+                                              audio_errors, monitor))
+        audio_thread.daemon = True
+        audio_thread.start()
+
+    try:
+
+        for t,frame in frames:
+            if withmask:
+                mask = (255*clip.mask.get_frame(t))
+                if mask.dtype != "uint8":
+                    mask = mask.astype("uint8")
+                frame = np.dstack([frame,mask])
+
+            t0 = time.time()
+            writer.write_frame(frame)
+            pending = pipe_pending(writer.proc.stdin)
+            monitor.update(1, blocked=time.time() - t0,
+                           queue_depth=(None if pending is None else
+                                        pending // frame_bytes))
+
+        writer.close()
+
+        if audioclip is not None:
+            audio_thread.join()
+            if audio_errors:
+                raise IOError("MoviePy error: the audio of %s could not be "
+                              "written:\n\n%s" % (filename, audio_errors[0]))
+
+    except Exception as err:
+        monitor.fail(err)
+        raise
+
+    finally:
+        if hasattr(writer, 'proc'):
+            # The render failed: ffmpeg is stopped, which also ends the
+            # audio thread (its writes in the pipe fail).
+            writer.proc.kill()
+            try:
+                writer.close()
+            except IOError:
+                pass
+        if audioclip is not None:
+            audio_thread.join()
+        if write_logfile:
+            logfile.close()
+
+    monitor.message(verbose, "[MoviePy] Done.\n")
+    monitor.close()
+
+
+def feed_audio(audioclip, fd, fps, nbytes, buffersize, errors,
+               monitor=None):
+    """ Writes the raw sound of ``audioclip`` in the file descriptor ``fd``
+    (the writing end of a pipe), then closes it. Exceptions are stored in
+    the list ``errors``. Meant to run in a thread, see ffmpeg_write_video.
+    The audio decoders started are counted by ``monitor``.
+    """
+    if monitor is not None:
+        monitor.attach()
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            for chunk in audioclip.iter_chunks(chunksize=buffersize,
+                                               quantize=True, nbytes=nbytes,
+                                               fps=fps):
+                f.write(chunk.tostring())
+    except Exception as err:
+        errors.append(err)
 
 
 def ffmpeg_write_image(filename, image, logfile=False):
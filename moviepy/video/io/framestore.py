@@ -0,0 +1,328 @@
+"""
+This module implements the frame stores: files which keep the frames (and
+masks) of a clip without any loss, to be read back quickly and in any
+order. They are meant to cache expensive intermediate clips between the
+stages of a pipeline (stabilized, painted, tracked clips...):
+
+>>> expensive_clip.write_framestore("stage1.frames")
+>>> clip = FrameStoreClip("stage1.frames")
+
+File format
+------------
+
+- A header: the magic string ``MPFRAMES``, the version of the format and
+  the offset of the index (little-endian uint32 and uint64).
+- The chunks. Each chunk holds ``chunk_frames`` consecutive frames: the
+  frames (uint8 HxWx3 for RGB clips, float32 HxW for mask clips) then,
+  if the clip has a mask, the masks (float32, HxW), the masks starting at a
+  multiple of 16 bytes. The chunk is then optionally compressed ('zlib'
+  or 'lz4'). The chunks start at multiples of 4096 bytes.
+- The index, in JSON: the size, fps, number of frames, data type and
+  shape of the frames, compression, and the offset and number of bytes
+  of each chunk.
+
+Finding the chunk of a frame only needs the index. Uncompressed chunks
+are read through a memory map, compressed chunks are decompressed and
+the last ones are kept in memory. The frames returned are copies, which
+can be modified. The files are written under a temporary name then
+renamed, and never modified afterwards, so any number of processes can
+read them at the same time.
+"""
+
+import os
+import json
+import zlib
+import struct
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from moviepy.decorators import (requires_duration, use_clip_fps_by_default,
+                                recorded)
+from moviepy.tools import file_key
+from moviepy.telemetry import RenderMonitor
+from moviepy.video.VideoClip import VideoClip
+
+try:
+    import lz4.frame
+    LZ4_FOUND = True
+except ImportError:
+    LZ4_FOUND = False
+
+
+MAGIC = b'MPFRAMES'
+VERSION = 2
+HEADER = struct.Struct('<8sIQ')
+CHUNK_ALIGN = 4096
+MASK_ALIGN = 16
+
+
+def _align(n, alignment):
+    return ((n + alignment - 1) // alignment) * alignment
+
+
+def _compress(data, compression, level):
+    if compression is None:
+        return data
+    if compression == 'zlib':
+        return zlib.compress(data, level)
+    if compression == 'lz4':
+        return lz4.frame.compress(data)
+    raise ValueError("MoviePy error: unknown frame store compression %s, "
+                     "use None, 'zlib' or 'lz4'." % compression)
+
+
+def _decompress(data, compression):
+    if compression == 'zlib':
+        return zlib.decompress(data)
+    if compression == 'lz4':
+        if not LZ4_FOUND:
+            raise ImportError("Reading this frame store requires lz4, "
+                              "installed with e.g. 'pip install lz4'")
+        return lz4.frame.decompress(data)
+    return data
+
+
+@requires_duration
+@use_clip_fps_by_default
+def write_framestore(clip, filename, fps=None, chunk_frames=16,
+                     compression=None, level=1, withmask=True,
+                     verbose=True, telemetry=None):
+    """ Writes the frames (and the mask) of the clip in a frame store (see
+    the docstring of module ``moviepy.video.io.framestore``).
+
+    Parameters
+    -----------
+
+    filename
+      Name of the frame store file.
+
+    fps
+      Number of frames per second stored. Default is the clip's ``fps``.
+
+    chunk_frames
+      Number of frames per chunk. Small chunks make random accesses to
+      compressed stores faster, big chunks compress better.
+
+    compression
+      None (the chunks are memory-mapped when read), 'zlib' or 'lz4'
+      (requires the lz4 library, faster than zlib).
+
+    level
+      Compression level of zlib (1 to 9).
+
+    withmask
+      If True and the clip has a mask, the mask is stored too.
+
+    telemetry
+      A function which receives the progress of the export as events
+      (dicts) instead of the progress bar. See ``moviepy.telemetry``.
+    """
+
+    if (compression == 'lz4') and not LZ4_FOUND:
+        raise ImportError("Writing a frame store with lz4 compression "
+                          "requires lz4, installed with e.g. "
+                          "'pip install lz4'")
+    _compress(b'', compression, level)  # checks the compression
+
+    withmask = withmask and (clip.mask is not None)
+    w, h = clip.tamano
+    tt = np.arange(0, clip.duracion, 1.0 / fps)
+    chunks = []
+    # like in the video files: RGB frames in uint8, masks in float32
+    if clip.ismask:
+        dtype, shape = np.dtype('float32'), (h, w)
+    else:
+        dtype, shape = np.dtype('uint8'), (h, w, 3)
+
+    monitor = RenderMonitor(telemetry, 'framestore', filename, len(tt))
+    monitor.message(verbose, "[MoviePy] Writing frame store %s" % filename)
+
+    tempname = filename + '.part%d' % os.getpid()
+    try:
+        with open(tempname, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, VERSION, 0))
+            for i0 in range(0, len(tt), chunk_frames):
+                times = tt[i0:i0 + chunk_frames]
+                frames = np.empty((len(times),) + shape, dtype=dtype)
+                for i, t in enumerate(times):
+                    frame = np.asarray(clip.get_frame(t))
+                    if (dtype == np.uint8) and (frame.dtype != np.uint8):
+                        frame = np.clip(frame + 0.5, 0, 255)
+                    frames[i] = frame
+                data = frames.tobytes()
+                if withmask:
+                    masks = np.array([clip.mask.get_frame(t) for t in times],
+                                     dtype='float32')
+                    data += b'\0' * (_align(len(data), MASK_ALIGN) - len(data))
+                    data += masks.tobytes()
+                data = _compress(data, compression, level)
+
+                offset = _align(f.tell(), CHUNK_ALIGN)
+                f.seek(offset)
+                f.write(data)
+                chunks.append((offset, len(data)))
+                monitor.update(len(times))
+
+            index_offset = f.tell()
+            f.write(json.dumps({
+                'tamano': [w, h], 'fps': fps, 'nframes': len(tt),
+                'dtype': dtype.str, 'shape': list(shape),
+                'ismask': clip.ismask, 'chunk_frames': chunk_frames,
+                'compression': compression, 'mask': withmask,
+                'chunks': chunks}).encode('utf8'))
+            f.seek(0)
+            f.write(HEADER.pack(MAGIC, VERSION, index_offset))
+        os.rename(tempname, filename)
+    except Exception as err:
+        monitor.fail(err)
+        if os.path.exists(tempname):
+            os.remove(tempname)
+        raise
+
+    monitor.message(verbose, "[MoviePy] >>>> File %s is ready !" % filename)
+    monitor.close()
+
+
+class FrameStoreReader:
+    """ Reads the frames of a frame store file.
+
+    Parameters
+    -----------
+
+    filename
+      Name of the frame store.
+
+    cache_chunks
+      Number of decompressed chunks kept in memory (compressed stores
+      only).
+    """
+
+    def __init__(self, filename, cache_chunks=2):
+        self.filename = filename
+        with open(filename, 'rb') as f:
+            magic, version, index_offset = HEADER.unpack(
+                f.read(HEADER.size))
+            if magic != MAGIC:
+                raise IOError("MoviePy error: %s is not a frame store."
+                              % filename)
+            if version > VERSION:
+                raise IOError("MoviePy error: %s was written by a more "
+                              "recent version of MoviePy." % filename)
+            f.seek(index_offset)
+            infos = json.loads(f.read().decode('utf8'))
+
+        self.infos = infos
+        self.tamano = tuple(infos['tamano'])
+        self.fps = infos['fps']
+        self.nframes = infos['nframes']
+        self.duracion = 1.0 * self.nframes / self.fps
+        # (version 1: RGB frames only)
+        self.dtype = np.dtype(infos.get('dtype', 'uint8'))
+        self.shape = tuple(infos.get('shape', self.tamano[::-1] + (3,)))
+        self.ismask = infos.get('ismask', False)
+        self.chunk_frames = infos['chunk_frames']
+        self.compression = infos['compression']
+        self.has_mask = infos['mask']
+        self.chunks = infos['chunks']
+        self.cache_chunks = cache_chunks
+        self.cache = OrderedDict()
+        self.lock = threading.Lock()
+        self.data = np.memmap(filename, dtype='uint8', mode='r')
+
+    def _chunk(self, k):
+        """ Returns the frames and the masks (or None) of chunk ``k``. """
+        with self.lock:
+            if k in self.cache:
+                self.cache.move_to_end(k)
+                return self.cache[k]
+        offset, nbytes = self.chunks[k]
+        data = self.data[offset:offset + nbytes]
+        if self.compression is not None:
+            data = np.frombuffer(_decompress(data.tobytes(),
+                                             self.compression),
+                                 dtype='uint8')
+        n = min(self.chunk_frames, self.nframes - k * self.chunk_frames)
+        w, h = self.tamano
+        frames_nbytes = n * int(np.prod(self.shape)) * self.dtype.itemsize
+        frames = (data[:frames_nbytes].view(self.dtype)
+                  .reshape((n,) + self.shape))
+        masks = None
+        if self.has_mask:
+            start = _align(frames_nbytes, MASK_ALIGN)
+            masks = (data[start:start + 4 * n * h * w].view('float32')
+                     .reshape((n, h, w)))
+        if self.compression is not None:
+            with self.lock:
+                self.cache[k] = (frames, masks)
+                while len(self.cache) > self.cache_chunks:
+                    self.cache.popitem(last=False)
+        return frames, masks
+
+    def _index(self, t):
+        i = int(self.fps * t + 0.00001)
+        return min(max(i, 0), self.nframes - 1)
+
+    def get_frame(self, t):
+        """ The frame at time t (a copy). """
+        i = self._index(t)
+        frames = self._chunk(i // self.chunk_frames)[0]
+        return np.array(frames[i % self.chunk_frames])
+
+    def get_mask(self, t):
+        """ The mask at time t (a copy). """
+        i = self._index(t)
+        masks = self._chunk(i // self.chunk_frames)[1]
+        return np.array(masks[i % self.chunk_frames])
+
+    def render_key(self, t_start=None, t_end=None):
+        """ Identifies the frames for the render cache. """
+        return ('framestore', file_key(self.filename))
+
+    def close(self):
+        self.cache.clear()
+        self.data = None
+
+
+class FrameStoreClip(VideoClip):
+    """ A clip reading its frames (and mask) from a frame store written by
+    ``write_framestore``.
+
+    Parameters
+    -----------
+
+    filename
+      Name of the frame store.
+
+    with_mask
+      If True and the store has masks, the clip gets its mask.
+
+    cache_chunks
+      Number of decompressed chunks kept in memory (compressed stores
+      only).
+
+    Attributes
+    -----------
+
+    reader
+      The ``FrameStoreReader`` of the file.
+    """
+
+    @recorded
+    def __init__(self, filename, with_mask=True, cache_chunks=2):
+
+        reader = FrameStoreReader(filename, cache_chunks)
+        VideoClip.__init__(self, ismask=reader.ismask)
+        self.reader = reader
+        self.filename = filename
+        self.fps = reader.fps
+        self.tamano = reader.tamano
+        self.duracion = self.fin = reader.duracion
+        self.make_frame = lambda t: reader.get_frame(t)
+
+        if with_mask and reader.has_mask:
+            self.mask = VideoClip(ismask=True,
+                                  make_frame=lambda t: reader.get_mask(t))
+            self.mask = self.mask.set_duracion(self.duracion)
+            self.mask.fps = self.fps
@@ -0,0 +1,367 @@
+"""
+This module implements a GIF encoder written with Numpy, used by
+``write_gif(..., program='numpy')``.
+
+Unlike the other GIF writers, it doesn't need ImageMagick and it doesn't
+quantize each frame independently:
+
+- One global palette is computed for the whole GIF, by median cut
+  (refined by a few k-means iterations) on the pixels of a sample of
+  frames.
+- Pixels are mapped to the palette with a precomputed lookup cube (the
+  nearest palette color of every 6-bit RGB cell), which is a simple
+  array indexing.
+- Each frame only stores the rectangle which changed since the previous
+  frame, where the unchanged pixels are transparent (which compresses
+  much better), and identical frames are merged into longer ones.
+- The quantization and the LZW compression of the frames are done in a
+  pool of processes.
+"""
+
+import struct
+import multiprocessing
+
+import numpy as np
+
+from moviepy.decorators import requires_duration, use_clip_fps_by_default
+from moviepy.telemetry import RenderMonitor
+
+
+# Bits per channel of the lookup cube
+CUBE_BITS = 6
+
+
+# PALETTE
+
+def median_cut(pixels, ncolors):
+    """ Returns a palette (Nx3 float array, N <= ncolors) for the Mx3 array
+    of ``pixels``, by median cut. """
+
+    def box_range(b):
+        return (b.max(axis=0) - b.min(axis=0)) if len(b) > 1 else np.zeros(3)
+
+    boxes = [pixels]
+    ranges = [box_range(pixels)]
+    scores = [ranges[0].max() * np.sqrt(len(pixels))]
+    while len(boxes) < ncolors:
+        i = int(np.argmax(scores))
+        if scores[i] == 0:
+            break  # only boxes of identical pixels left
+        box, rng = boxes.pop(i), ranges.pop(i)
+        scores.pop(i)
+        channel = int(np.argmax(rng))
+        order = np.argsort(box[:, channel], kind='mergesort')
+        half = len(box) // 2
+        for b in [box[order[:half]], box[order[half:]]]:
+            boxes.append(b)
+            ranges.append(box_range(b))
+            scores.append(ranges[-1].max() * np.sqrt(len(b)))
+    return np.array([b.mean(axis=0) for b in boxes])
+
+
+def nearest(colors, palette, chunksize=8192):
+    """ Index of the nearest palette color of each color (Mx3 array). """
+    palette = palette.astype('float32')
+    p2 = (palette ** 2).sum(axis=1)
+    result = np.empty(len(colors), dtype='uint8')
+    for i in range(0, len(colors), chunksize):
+        c = colors[i:i + chunksize].astype('float32')
+        # |c - p|^2 = |c|^2 - 2 c.p + |p|^2, |c|^2 doesn't change the argmin
+        dist = p2[None, :] - 2 * c.dot(palette.T)
+        result[i:i + chunksize] = dist.argmin(axis=1)
+    return result
+
+
+def make_palette(frames, ncolors=255, npixels=100000, kmeans_iter=3):
+    """ Computes a palette of at most ``ncolors`` colors for the frames.
+
+    ``npixels`` pixels are sampled (evenly) in the frames, a palette is
+    computed by median cut, then refined by ``kmeans_iter`` iterations of
+    k-means. Returns a Nx3 uint8 array.
+    """
+    pixels = np.vstack([f[:, :, :3].reshape((-1, 3)) for f in frames])
+    step = max(1, len(pixels) // npixels)
+    pixels = pixels[::step].astype('float32')
+
+    palette = median_cut(pixels, ncolors)
+    for i in range(kmeans_iter):
+        labels = nearest(pixels, palette)
+        counts = np.bincount(labels, minlength=len(palette))
+        for channel in range(3):
+            sums = np.bincount(labels, weights=pixels[:, channel],
+                               minlength=len(palette))
+            used = counts > 0
+            palette[used, channel] = sums[used] / counts[used]
+    return np.clip(np.round(palette), 0, 255).astype('uint8')
+
+
+def make_cube(palette):
+    """ Lookup cube: with ``s = 8 - CUBE_BITS``, ``cube[r >> s, g >> s,
+    b >> s]`` is the index of the palette color nearest to (r, g, b). """
+    n = 1 << CUBE_BITS
+    shift = 8 - CUBE_BITS
+    centers = (np.arange(n) << shift) + (1 << shift) // 2
+    grid = np.stack(np.meshgrid(centers, centers, centers, indexing='ij'),
+                    axis=-1).reshape((-1, 3))
+    return nearest(grid, palette).reshape((n, n, n))
+
+
+def quantize(frame, cube):
+    """ Maps the HxWx3 RGB frame to the palette of the cube. """
+    shift = 8 - CUBE_BITS
+    f = frame[:, :, :3] >> shift
+    return cube[f[:, :, 0], f[:, :, 1], f[:, :, 2]]
+
+
+# LZW COMPRESSION
+
+def lzw_encode(indices, min_code_size):
+    """ Compresses a sequence of color indices (bytes) with the LZW variant
+    of the GIF format. Returns the compressed bytes. """
+    clear = 1 << min_code_size
+    eoi = clear + 1
+    out = bytearray()
+    buf = 0  # bits waiting to be written
+    nbits = 0
+
+    code_size = min_code_size + 1
+    next_code = eoi + 1
+    table = {}
+
+    # The clear code is always emitted first
+    buf |= clear << nbits
+    nbits += code_size
+
+    data = bytes(indices)
+    if not data:
+        prefix = None
+    else:
+        prefix = data[0]
+    for k in data[1:]:
+        key = (prefix << 8) | k
+        code = table.get(key, None)
+        if code is not None:
+            prefix = code
+            continue
+        buf |= prefix << nbits
+        nbits += code_size
+        while nbits >= 8:
+            out.append(buf & 0xFF)
+            buf >>= 8
+            nbits -= 8
+        if next_code < 4096:
+            table[key] = next_code
+            next_code += 1
+            if next_code > (1 << code_size) and code_size < 12:
+                code_size += 1
+        else:
+            buf |= clear << nbits
+            nbits += code_size
+            table = {}
+            code_size = min_code_size + 1
+            next_code = eoi + 1
+        prefix = k
+
+    if prefix is not None:
+        buf |= prefix << nbits
+        nbits += code_size
+    buf |= eoi << nbits
+    nbits += code_size
+    while nbits > 0:
+        out.append(buf & 0xFF)
+        buf >>= 8
+        nbits -= 8
+    return bytes(out)
+
+
+def sub_blocks(data):
+    """ Splits data into the <=255 bytes sub-blocks of the GIF format. """
+    blocks = [struct.pack('B', len(data[i:i + 255])) + data[i:i + 255]
+              for i in range(0, len(data), 255)]
+    return b''.join(blocks) + b'\x00'
+
+
+# FRAMES
+
+_cube = [None]
+
+
+def _init_worker(cube):
+    _cube[0] = cube
+
+
+def encode_frame(args):
+    """ Encodes a frame, given the previous frame (or None).
+
+    Returns ``(rect, data)`` where rect is the (x, y, w, h) of the region
+    which changed, and data the LZW-compressed indices of this region
+    (unchanged pixels of the region are transparent). If ``transparent``
+    is None, the whole frame is stored. Returns ``(None, None)`` if the
+    frame is identical to the previous one. Meant to be called in the
+    process pool of ``write_gif_with_numpy``.
+    """
+    frame, previous, transparent, min_code_size = args
+    cube = _cube[0]
+    indices = quantize(frame, cube)
+    h, w = indices.shape
+    rect = (0, 0, w, h)
+
+    if previous is not None:
+        changed = indices != quantize(previous, cube)
+        rows = np.flatnonzero(changed.any(axis=1))
+        if len(rows) == 0:
+            return None, None
+    if previous is not None and transparent is not None:
+        cols = np.flatnonzero(changed.any(axis=0))
+        y0, y1 = rows[0], rows[-1] + 1
+        x0, x1 = cols[0], cols[-1] + 1
+        rect = (int(x0), int(y0), int(x1 - x0), int(y1 - y0))
+        indices = indices[y0:y1, x0:x1].copy()
+        indices[~changed[y0:y1, x0:x1]] = transparent
+
+    return rect, lzw_encode(indices.tobytes(), min_code_size)
+
+
+class _GIFWriter:
+    """ Writes the blocks of a GIF file. """
+
+    def __init__(self, filename, tamano, palette, loop, transparent):
+        self.file = open(filename, 'wb')
+        self.transparent = transparent
+        w, h = tamano
+
+        # Size of the color table: 2**(size_code+1) >= len(palette)
+        size_code = max(0, int(np.ceil(np.log2(max(2, len(palette))))) - 1)
+        table = np.zeros((2 ** (size_code + 1), 3), dtype='uint8')
+        table[:len(palette)] = palette
+        self.min_code_size = max(2, size_code + 1)
+
+        self.file.write(b'GIF89a')
+        self.file.write(struct.pack('<HHBBB', w, h, 0xF0 | size_code, 0, 0))
+        self.file.write(table.tobytes())
+        if loop is not None:
+            self.file.write(b'\x21\xFF\x0BNETSCAPE2.0' +
+                            struct.pack('<BBH', 3, 1, loop) + b'\x00')
+
+    def write_frame(self, rect, data, delay):
+        """ ``delay`` in hundredths of seconds. """
+        flags = (1 << 2)  # disposal: keep the frame under the next one
+        index = 0
+        if self.transparent is not None:
+            flags |= 1
+            index = self.transparent
+        self.file.write(b'\x21\xF9\x04' +
+                        struct.pack('<BHB', flags, delay, index) + b'\x00')
+        x, y, w, h = rect
+        self.file.write(b'\x2C' + struct.pack('<HHHHB', x, y, w, h, 0))
+        self.file.write(struct.pack('B', self.min_code_size))
+        self.file.write(sub_blocks(data))
+
+    def close(self):
+        self.file.write(b'\x3B')
+        self.file.close()
+
+
+@requires_duration
+@use_clip_fps_by_default
+def write_gif_with_numpy(clip, filename, fps=None, colors=None, loop=0,
+                         optimize=True, sample_frames=16, processes=None,
+                         verbose=True, telemetry=None):
+    """ Writes the clip to a GIF file with the Numpy encoder of this
+    module (see its docstring).
+
+    Parameters
+    -----------
+
+    colors
+      Number of colors of the palette (at most 256, default 256).
+
+    loop
+      Number of loops of the GIF (0 for an infinite loop, None for no
+      loop).
+
+    optimize
+      If True, the frames only store the pixels which changed since the
+      previous frame (one color of the palette is then used for the
+      transparency). Otherwise the frames are stored whole. In both cases
+      identical frames are merged.
+
+    sample_frames
+      Number of frames (evenly spread in the clip) used to compute the
+      palette.
+
+    processes
+      Number of processes used to quantize and compress the frames (by
+      default, one per CPU). With 1, everything is done in this process.
+
+    Masks are ignored: the GIF is opaque.
+    """
+    if colors is None:
+        colors = 256
+    ncolors = colors - 1 if optimize else colors
+
+    tt = np.arange(0, clip.duracion, 1.0 / fps)
+    monitor = RenderMonitor(telemetry, 'gif', filename, len(tt))
+    monitor.message(verbose, "\n[MoviePy] Building file %s with the numpy "
+                    "GIF encoder\n" % filename)
+
+    samples = [clip.get_frame(t).astype('uint8') for t in
+               tt[np.linspace(0, len(tt) - 1,
+                              min(sample_frames, len(tt))).astype(int)]]
+    palette = make_palette(samples, ncolors)
+    cube = make_cube(palette)
+    transparent = None
+    if optimize:
+        # The transparent color is an extra color of the palette
+        transparent = len(palette)
+        palette = np.vstack([palette, np.zeros((1, 3), dtype='uint8')])
+
+    writer = _GIFWriter(filename, clip.tamano, palette, loop, transparent)
+
+    if processes is None:
+        processes = multiprocessing.cpu_count()
+    if processes > 1:
+        pool = multiprocessing.Pool(processes, _init_worker, (cube,))
+        encode = pool.map
+    else:
+        pool = None
+        _init_worker(cube)
+        encode = lambda f, tasks: [f(task) for task in tasks]
+
+    # Exact timing: frame i ends at round(100 * (i + 1) / fps) hundredths
+    ends = np.round(100.0 * np.arange(1, len(tt) + 1) / fps).astype(int)
+
+    try:
+        pending = None  # last encoded frame, written when its delay is known
+        previous = None
+        batch_size = 4 * processes
+        for i0 in range(0, len(tt), batch_size):
+            tasks = []
+            for i in range(i0, min(i0 + batch_size, len(tt))):
+                frame = clip.get_frame(tt[i]).astype('uint8')
+                tasks.append((frame, previous, transparent,
+                              writer.min_code_size))
+                previous = frame
+            for i, (rect, data) in zip(range(i0, len(tt)),
+                                       encode(encode_frame, tasks)):
+                start = ends[i - 1] if i else 0
+                if rect is None:  # identical frame: the previous one lasts
+                    pending[2] += ends[i] - start
+                else:
+                    if pending is not None:
+                        writer.write_frame(*pending)
+                    pending = [rect, data, ends[i] - start]
+                monitor.update(1)
+        if pending is not None:
+            writer.write_frame(*pending)
+        writer.close()
+    except Exception as err:
+        monitor.fail(err)
+        raise
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+
+    monitor.message(verbose, "[MoviePy] >>>> File %s is ready !" % filename)
+    monitor.close()
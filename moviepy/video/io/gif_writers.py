@@ -1,9 +1,11 @@
 import os
+import time
+import tempfile
 import subprocess as sp
-from tqdm import tqdm
 from moviepy.config import get_setting
 from moviepy.decorators import (requires_duration,use_clip_fps_by_default)
-from moviepy.tools import verbose_print, subprocess_call
+from moviepy.tools import subprocess_call
+from moviepy.telemetry import RenderMonitor, pipe_pending
 import numpy as np
 
 try:
@@ -25,7 +27,7 @@ except ImportError:
 @use_clip_fps_by_default
 def write_gif_with_tempfiles(clip, filename, fps=None, program= 'ImageMagick',
        opt="OptimizeTransparency", fuzz=1, verbose=True,
-       loop=0, dispose=True, colors=None, tempfiles=False):
+       loop=0, dispose=True, colors=None, tempfiles=False, telemetry=None):
     """ Write the VideoClip to a GIF file.
 
 
@@ -41,22 +43,23 @@ def write_gif_with_tempfiles(clip, filename, fps=None, program= 'ImageMagick',
 
     tempfiles = []
 
-    verbose_print(verbose, "\n[MoviePy] Building file %s\n"%filename
-                  +40*"-"+"\n")
+    monitor = RenderMonitor(telemetry, 'gif', filename, len(tt))
+    monitor.message(verbose, "\n[MoviePy] Building file %s\n"%filename
+                    +40*"-"+"\n")
 
-    verbose_print(verbose, "[MoviePy] Generating GIF frames...\n")
+    monitor.message(verbose, "[MoviePy] Generating GIF frames...\n")
 
-    total = int(clip.duracion*fps)+1
-    for i, t in tqdm(enumerate(tt), total=total):
+    for i, t in enumerate(tt):
 
         name = "%s_GIFTEMP%04d.png"%(fileName, i+1)
         tempfiles.append(name)
         clip.save_frame(name, t, withmask=True)
+        monitor.update(1)
 
     delay = int(100.0/fps)
 
     if program == "ImageMagick":
-        verbose_print(verbose, "[MoviePy] Optimizing GIF with ImageMagick... ")
+        monitor.message(verbose, "[MoviePy] Optimizing GIF with ImageMagick... ")
         cmd = [get_setting("IMAGEMAGICK_BINARY"),
               '-delay' , '%d'%delay,
               "-dispose" ,"%d"%(2 if dispose else 1),
@@ -77,8 +80,10 @@ def write_gif_with_tempfiles(clip, filename, fps=None, program= 'ImageMagick',
                filename]
 
     try:
+        t0 = time.time()
         subprocess_call( cmd, verbose = verbose )
-        verbose_print(verbose, "[MoviePy] GIF %s is ready."%filename)
+        monitor.pipe_blocked += time.time() - t0
+        monitor.message(verbose, "[MoviePy] GIF %s is ready."%filename)
 
     except (IOError,OSError) as err:
 
@@ -91,8 +96,11 @@ def write_gif_with_tempfiles(clip, filename, fps=None, program= 'ImageMagick',
                 "(for Windows users) that you didn't specify the "
                 "path to the ImageMagick binary in file conf.py." )
 
+        monitor.fail(error)
         raise IOError(error)
 
+    monitor.close()
+
     for f in tempfiles:
         os.remove(f)
 
@@ -102,7 +110,7 @@ def write_gif_with_tempfiles(clip, filename, fps=None, program= 'ImageMagick',
 @use_clip_fps_by_default
 def write_gif(clip, filename, fps=None, program= 'ImageMagick',
            opt="OptimizeTransparency", fuzz=1, verbose=True, withmask=True,
-           loop=0, dispose=True, colors=None):
+           loop=0, dispose=True, colors=None, telemetry=None):
     """ Write the VideoClip to a GIF file, without temporary files.
 
     Converts a VideoClip into an animated GIF using ImageMagick
@@ -221,17 +229,24 @@ def write_gif(clip, filename, fps=None, program= 'ImageMagick',
             proc3 = sp.Popen(cmd3, **popen_params)
 
     # We send all the frames to the first process
-    verbose_print(verbose, "\n[MoviePy] >>>> Building file %s\n"%filename)
-    verbose_print(verbose, "[MoviePy] Generating GIF frames...\n")
+    monitor = RenderMonitor(telemetry, 'gif', filename,
+                            len(np.arange(0, clip.duracion, 1.0/fps)))
+    monitor.message(verbose, "\n[MoviePy] >>>> Building file %s\n"%filename)
+    monitor.message(verbose, "[MoviePy] Generating GIF frames...\n")
 
     try:
 
-        for t,frame in clip.iter_frames(fps=fps, progress_bar=True,
-                                        with_times=True,  dtype="uint8"):
+        for t,frame in clip.iter_frames(fps=fps, with_times=True,
+                                        dtype="uint8"):
             if withmask:
                 mask = 255 * clip.mask.get_frame(t)
                 frame = np.dstack([frame, mask]).astype('uint8')
+            t0 = time.time()
             proc1.stdin.write(frame.tostring())
+            pending = pipe_pending(proc1.stdin)
+            monitor.update(1, blocked=time.time() - t0,
+                           queue_depth=(None if pending is None else
+                                        pending // frame.nbytes))
 
     except IOError as err:
 
@@ -244,20 +259,203 @@ def write_gif(clip, filename, fps=None, program= 'ImageMagick',
                 "(for Windows users) that you didn't specify the "
                 "path to the ImageMagick binary in file conf.py." )
 
+        monitor.fail(error)
         raise IOError(error)
     if program == 'ImageMagick':
-        verbose_print(verbose, "[MoviePy] Optimizing the GIF with ImageMagick...\n")
+        monitor.message(verbose, "[MoviePy] Optimizing the GIF with ImageMagick...\n")
+    t0 = time.time()
     proc1.stdin.close()
     proc1.wait()
     if program == 'ImageMagick':
         proc2.wait()
         if opt:
             proc3.wait()
-    verbose_print(verbose, "[MoviePy] >>>> File %s is ready !"%filename)
+    monitor.pipe_blocked += time.time() - t0
+    monitor.message(verbose, "[MoviePy] >>>> File %s is ready !"%filename)
+    monitor.close()
+
+
+@requires_duration
+@use_clip_fps_by_default
+def write_gif_with_palette(clip, filename, fps=None, colors=None, loop=0,
+                           dither='sierra2_4a', bayer_scale=2,
+                           stats_mode='full', diff_mode='rectangle',
+                           palette_fps=None, cache_frames=False,
+                           withmask=True, verbose=True, telemetry=None):
+    """ Write the VideoClip to a GIF file with ffmpeg, in two passes.
+
+    The frames are first streamed to ffmpeg's ``palettegen`` filter, which
+    computes the best palette for the whole clip, then streamed again to
+    the ``paletteuse`` filter, which maps them to this palette (with
+    dithering). This gives GIFs as good as ImageMagick's, at the speed of
+    ffmpeg, and only one frame is in memory at a time.
+
+    Parameters
+    -----------
+
+    colors
+      Maximal number of colors of the palette (at most 256).
+
+    loop
+      Number of times the GIF is played again (0: forever, -1: played
+      once).
+
+    dither
+      Dithering of ``paletteuse``: 'sierra2_4a' (default), 'sierra2',
+      'floyd_steinberg', 'bayer', 'heckbert', 'sierra3', 'burkes',
+      'atkinson' or 'none'.
+
+    bayer_scale
+      Scale of the pattern (0 to 5) when ``dither='bayer'``. Lower values
+      give more visible patterns but smaller files.
+
+    stats_mode
+      'full' to compute the palette on the whole frames, 'diff' to favor
+      the parts of the frames which move (better for clips with a static
+      background).
+
+    diff_mode
+      'rectangle' to only re-encode the rectangle which changed between
+      two frames (smaller files), or None.
+
+    palette_fps
+      Frames per second of the first pass. The palette is computed on
+      fewer frames (faster) when it is lower than ``fps``. Ignored if
+      ``cache_frames`` is used.
+
+    cache_frames
+      If True, the frames generated for the first pass are also written
+      in a temporary raw file (on disk), and read back for the second
+      pass instead of being computed again. Use it when computing the
+      frames is expensive. Can also be the name of the folder of the
+      temporary file.
+
+    withmask
+      If True and the clip has a mask, the transparent parts of the clip
+      are transparent in the GIF.
+    """
+
+    if clip.mask is None:
+        withmask = False
+    pix_fmt = 'rgba' if withmask else 'rgb24'
+    tt = np.arange(0, clip.duracion, 1.0/fps)
+    if cache_frames or (palette_fps is None):
+        palette_tt = tt
+    else:
+        palette_tt = np.arange(0, clip.duracion, 1.0/palette_fps)
+
+    def get_frame(t):
+        frame = clip.get_frame(t)
+        if withmask:
+            mask = 255 * clip.mask.get_frame(t)
+            frame = np.dstack([frame, mask])
+        return frame.astype('uint8')
+
+    def input_cmd(rate):
+        return [get_setting("FFMPEG_BINARY"), '-y', '-loglevel', 'error',
+                '-f', 'rawvideo', '-vcodec', 'rawvideo',
+                '-r', "%.02f"%rate, '-s', "%dx%d"%(clip.w, clip.h),
+                '-pix_fmt', pix_fmt, '-i', '-']
+
+    def stream(cmd, frames):
+        """ Sends the frames to a ffmpeg process running ``cmd``. """
+        popen_params = {"stdout": DEVNULL, "stderr": sp.PIPE,
+                        "stdin": sp.PIPE}
+        if os.name == "nt":
+            popen_params["creationflags"] = 0x08000000
+        proc = sp.Popen(cmd, **popen_params)
+        try:
+            for frame in frames:
+                t0 = time.time()
+                proc.stdin.write(frame.tobytes())
+                pending = pipe_pending(proc.stdin)
+                monitor.update(1, blocked=time.time() - t0,
+                               queue_depth=(None if pending is None else
+                                            pending // frame.nbytes))
+            proc.stdin.close()
+        except IOError as err:
+            proc.kill()
+            proc.wait()
+            raise IOError("MoviePy error: creation of %s failed because of "
+                          "the following error:\n\n%s\n\nFFMPEG said:"
+                          "\n\n%s" % (filename, err,
+                                        proc.stderr.read().decode('utf8')))
+        ffmpeg_error = proc.stderr.read().decode('utf8')
+        if proc.wait() != 0:
+            raise IOError("MoviePy error: creation of %s failed, "
+                          "FFMPEG said:\n\n%s" % (filename, ffmpeg_error))
+
+    handle, palette = tempfile.mkstemp(suffix='.png')
+    os.close(handle)
+    cache = None
+    if cache_frames:
+        handle, cache = tempfile.mkstemp(
+            suffix='.rgb', dir=(cache_frames if cache_frames is not True
+                                else None))
+        os.close(handle)
+
+    def first_pass_frames():
+        f = open(cache, 'wb') if cache else None
+        try:
+            for t in palette_tt:
+                frame = get_frame(t)
+                if f is not None:
+                    f.write(frame.tobytes())
+                yield frame
+        finally:
+            if f is not None:
+                f.close()
+
+    def second_pass_frames():
+        if not cache:
+            for t in tt:
+                yield get_frame(t)
+            return
+        shape = (clip.h, clip.w, 4 if withmask else 3)
+        nbytes = shape[0] * shape[1] * shape[2]
+        with open(cache, 'rb') as f:
+            for t in tt:
+                yield np.frombuffer(f.read(nbytes), dtype='uint8').reshape(shape)
+
+    palettegen = "palettegen=stats_mode=%s" % stats_mode
+    if colors is not None:
+        palettegen += ":max_colors=%d" % colors
+    if not withmask:
+        palettegen += ":reserve_transparent=0"
+    paletteuse = "paletteuse=dither=%s" % dither
+    if dither == 'bayer':
+        paletteuse += ":bayer_scale=%d" % bayer_scale
+    if diff_mode is not None:
+        paletteuse += ":diff_mode=%s" % diff_mode
+
+    monitor = RenderMonitor(telemetry, 'gif', filename,
+                            len(palette_tt) + len(tt))
+    monitor.message(verbose, "\n[MoviePy] >>>> Building file %s\n"%filename)
+    try:
+        monitor.message(verbose, "[MoviePy] Computing the palette...\n")
+        stream(input_cmd(palette_fps if palette_tt is not tt else fps) +
+               ['-vf', palettegen, '-update', '1', '-frames:v', '1',
+                palette], first_pass_frames())
+        monitor.message(verbose, "[MoviePy] Writing the GIF frames...\n")
+        stream(input_cmd(fps) + ['-i', palette,
+                                 '-lavfi', "[0:v][1:v]" + paletteuse,
+                                 '-loop', '%d'%loop, '-r', "%.02f"%fps,
+                                 '-f', 'gif', filename],
+               second_pass_frames())
+    except Exception as err:
+        monitor.fail(err)
+        raise
+    finally:
+        for f in [palette, cache]:
+            if f is not None and os.path.exists(f):
+                os.remove(f)
+
+    monitor.message(verbose, "[MoviePy] >>>> File %s is ready !"%filename)
+    monitor.close()
 
 
 def write_gif_with_image_io(clip, filename, fps=None, opt='wu', loop=0,
-                            colors=None, verbose=True):
+                            colors=None, verbose=True, telemetry=None):
     """
     Writes the gif with the Python library ImageIO (calls FreeImage).
     
@@ -284,8 +482,15 @@ def write_gif_with_image_io(clip, filename, fps=None, opt='wu', loop=0,
     writer = imageio.save(filename, duracion=1.0/fps,
                           quantizer=quantizer, palettesize=colors)
 
-    verbose_print(verbose, "\n[MoviePy] Building file %s with imageio\n"%filename)
+    monitor = RenderMonitor(telemetry, 'gif', filename,
+                            len(np.arange(0, clip.duracion, 1.0/fps)))
+    monitor.message(verbose, "\n[MoviePy] Building file %s with imageio\n"%filename)
     
-    for frame in clip.iter_frames(fps=fps, progress_bar=True, dtype='uint8'):
+    for frame in clip.iter_frames(fps=fps, dtype='uint8'):
 
+        t0 = time.time()
         writer.append_data(frame)
+        monitor.update(1, blocked=time.time() - t0)
+
+    writer.close()
+    monitor.close()
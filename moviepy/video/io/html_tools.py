@@ -12,6 +12,7 @@ A function to embed images/videos/audio in the IPython Notebook
 import os
 from base64 import b64encode
 from moviepy.tools import extensions_dict
+from moviepy.decorators import use_proxies
 
 from ..VideoClip import VideoClip, ImageClip
 from moviepy.audio.AudioClip import AudioClip
@@ -154,6 +155,7 @@ def html_embed(clip, filetype=None, maxduration=60, rd_kwargs=None,
     return result
 
 
+@use_proxies
 def ipython_display(clip, filetype=None, maxduration=60, t=None, fps=None,
                     rd_kwargs=None, center=True, **html_kwargs):
     """
@@ -4,7 +4,8 @@ import time
 import pygame as pg
 import numpy as np
 
-from moviepy.decorators import (requires_duration, convert_masks_to_RGB)
+from moviepy.decorators import (requires_duration, convert_masks_to_RGB,
+                                 use_proxies)
 from moviepy.tools import cvsecs
 
 
@@ -20,6 +21,7 @@ def imdisplay(imarray, pantalla=None):
     pg.display.flip()
 
 
+@use_proxies
 @convert_masks_to_RGB
 def show(clip, t=0, with_mask=True, interactive=False):
     """
@@ -63,6 +65,7 @@ def show(clip, t=0, with_mask=True, interactive=False):
             time.sleep(.03)
 
 @requires_duration
+@use_proxies
 @convert_masks_to_RGB
 def preview(clip, fps=15, audio=True, audio_fps=22050,
              audio_buffersize=3000, audio_nbytes=2):
@@ -0,0 +1,190 @@
+"""
+This module implements low-resolution proxies of video files.
+
+A proxy is a small, intra-frame encoded (MJPEG) copy of a video file,
+generated in the background by ffmpeg and stored in a cache directory.
+When a ``VideoFileClip`` is created with ``proxy=True``, the functions
+made for interactive work or analysis (``preview``, ``show``,
+``ipython_display``, ``sliders``, ``detect_scenes``,
+``FramesMatches.from_clip``) read the frames of the proxy instead of
+the frames of the original file, as soon as the proxy is ready. This is
+done in ``proxy_mode``, which only applies to the thread where it is
+set: a preview in one thread does not change what a render in another
+thread reads.
+
+Frames read from a proxy are scaled back to the size of the original
+video (by pixel repetition) so that positions, crops, etc. of the clips
+are not affected. All other operations, in particular ``write_videofile``,
+keep reading the original files.
+"""
+
+import os
+import hashlib
+import tempfile
+import threading
+from contextlib import contextmanager
+
+import numpy as np
+
+from moviepy.config import get_setting
+from moviepy.tools import subprocess_call
+from .ffmpeg_reader import FFMPEG_VideoReader
+
+
+# Default folder where the proxies are stored.
+# You can overwrite it with
+# >>> moviepy.video.io.proxies.PROXY_DIR = "/some/fast/disk"
+PROXY_DIR = os.path.join(tempfile.gettempdir(), "moviepy_proxies")
+
+# Proxies are only read in the threads where ``enabled`` is set, see
+# ``proxy_mode``.
+_proxy_mode = threading.local()
+
+# Background generation jobs, one per proxy file (shared between clips).
+_jobs = {}
+_jobs_lock = threading.Lock()
+
+
+@contextmanager
+def proxy_mode(enabled=True):
+    """ Context in which the clips read their proxies (if ready), in the
+    current thread only.
+
+    >>> with proxy_mode():
+    >>>     clip.show(10.5) # reads the proxy of clip's video file
+    """
+    previous = proxy_mode_enabled()
+    _proxy_mode.enabled = enabled
+    try:
+        yield
+    finally:
+        _proxy_mode.enabled = previous
+
+
+def proxy_mode_enabled():
+    """ True if the proxies are read in the current thread. """
+    return getattr(_proxy_mode, 'enabled', False)
+
+
+def proxy_filename(filename, scale=0.25, proxy_dir=None):
+    """ Returns the name of the proxy file of ``filename``.
+
+    The name depends on the path, size and modification time of the
+    source, so that a modified source gets a new proxy.
+    """
+    if proxy_dir is None:
+        proxy_dir = PROXY_DIR
+    path = os.path.abspath(filename)
+    stat = os.stat(path)
+    key = "%s|%d|%d|%.04f" % (path, stat.st_size, stat.st_mtime, scale)
+    digest = hashlib.sha1(key.encode('utf8')).hexdigest()[:16]
+    name = os.path.splitext(os.path.basename(filename))[0]
+    return os.path.join(proxy_dir, "%s_proxy_%s.avi" % (name, digest))
+
+
+def make_proxy(filename, tamano, scale=0.25, proxy_dir=None):
+    """ Starts the generation of the proxy of ``filename`` in the background.
+
+    Returns the name of the proxy file. Nothing is done if the proxy
+    already exists or is being generated. ``tamano`` is the (width, height)
+    of the source video.
+    """
+    proxyname = proxy_filename(filename, scale, proxy_dir)
+
+    with _jobs_lock:
+        job = _jobs.get(proxyname, None)
+        if os.path.exists(proxyname) or (job is not None and job.is_alive()):
+            return proxyname
+
+        directory = os.path.dirname(proxyname)
+        if not os.path.exists(directory):
+            os.makedirs(directory)
+
+        w, h = [max(2, 2 * int(scale * d / 2)) for d in tamano]
+        tempname = proxyname[:-4] + ".part.avi"
+        cmd = [get_setting("FFMPEG_BINARY"), '-y',
+               '-i', filename, '-an',
+               '-vf', 'scale=%d:%d' % (w, h),
+               '-vcodec', 'mjpeg', '-q:v', '3',
+               '-pix_fmt', 'yuvj420p',
+               tempname]
+
+        def generate():
+            try:
+                subprocess_call(cmd, verbose=False, errorprint=False)
+                os.rename(tempname, proxyname)
+            except (IOError, OSError):
+                if os.path.exists(tempname):
+                    os.remove(tempname)
+
+        thread = threading.Thread(target=generate)
+        thread.daemon = True
+        _jobs[proxyname] = thread
+        thread.start()
+
+    return proxyname
+
+
+class VideoProxy:
+    """ Reads the proxy of a video file, once it has been generated.
+
+    Parameters
+    -----------
+
+    filename
+      Name of the original video file.
+
+    tamano
+      Size (width, height) of the original video. Frames read from the
+      proxy are scaled back to this size.
+
+    scale
+      Size of the proxy relative to the original video.
+
+    proxy_dir
+      Folder where the proxy is stored (default ``PROXY_DIR``).
+    """
+
+    def __init__(self, filename, tamano, scale=0.25, proxy_dir=None):
+
+        self.filename = filename
+        self.tamano = tamano
+        self.proxyname = make_proxy(filename, tamano, scale, proxy_dir)
+        self.reader = None
+        self.ready = False
+
+    def is_ready(self):
+        """ Returns True if the proxy file has been generated. """
+        if not self.ready:
+            self.ready = os.path.exists(self.proxyname)
+        return self.ready
+
+    def wait(self):
+        """ Waits until the proxy is generated (if it is being generated). """
+        job = _jobs.get(self.proxyname, None)
+        if job is not None:
+            job.join()
+
+    def is_active(self):
+        """ True if the frames should currently be read from the proxy. """
+        return proxy_mode_enabled() and self.is_ready()
+
+    def get_frame(self, t):
+        """ Returns the frame at time t, at the size of the original video. """
+        if self.reader is None:
+            self.reader = FFMPEG_VideoReader(self.proxyname)
+            pw, ph = self.reader.tamano
+            w, h = self.tamano
+            self.rows = (np.arange(h) * ph) // h
+            self.cols = (np.arange(w) * pw) // w
+        frame = self.reader.get_frame(t)
+        return frame.take(self.rows, axis=0).take(self.cols, axis=1)
+
+    def render_key(self, t_start=None, t_end=None):
+        """ Identifies the proxy, see video.io.render_cache. """
+        return self.proxyname
+
+    def close(self):
+        if self.reader is not None:
+            self.reader.close()
+            self.reader = None
@@ -0,0 +1,387 @@
+"""
+This module implements the render cache of ``write_videofile``.
+
+When a render cache folder is given, the video is encoded as a series of
+independent segments of a few seconds (each one starting with a keyframe),
+which are then joined without re-encoding by ffmpeg's concat demuxer.
+Each segment file is named after a hash of everything that determines its
+frames: the part of the clip graph which plays during the segment (source
+files with their size and modification time, effects and their
+parameters, positions...), the frame rate, the codec, etc. When a video
+is exported again, the segments whose hash did not change are simply
+reused, so that only the modified parts of the video are rendered.
+
+Hashing protocol
+-----------------
+
+``clip_hash`` walks the objects recursively: numbers, strings, arrays,
+lists, dicts, functions (code, default arguments, closures and the
+globals they use), partial functions, methods and objects are hashed
+from their contents. The globals used by the functions of the user
+(including those of the lambdas and comprehensions they contain) are
+hashed by value, so that changing a global dict of parameters changes
+the hash. The functions of MoviePy, of the standard library and of the
+installed packages are hashed by their code, and of their globals only
+the functions and constants are followed (their module-level caches are
+not part of the frames). Objects whose content cannot be hashed (files,
+locks, processes...) raise a ValueError: give them a ``render_key``, or
+don't use the render cache for this clip.
+
+Objects (or functions) can describe themselves by defining a
+``render_key(t_start=None, t_end=None)`` method (or attribute). The value
+returned, which must be hashable by ``clip_hash``, replaces the object in
+the hash. For instance the readers return the name, size and modification
+time of their file. ``t_start`` and ``t_end``, when known, are the limits
+of the time range for which the frames are needed, so that
+``CompositeVideoClip`` or ``concatenate_videoclips`` can only describe
+the clips playing in that range.
+
+Clip attributes listed in the ``render_ignore`` class attribute of the
+clip (memoized frames, soundtrack, temporary files...) are not hashed.
+"""
+
+import os
+import time
+import binascii
+import hashlib
+import struct
+import types
+import functools
+import itertools
+import sys
+import sysconfig
+
+import numpy as np
+
+from moviepy.Clip import Clip
+from moviepy.telemetry import RenderMonitor, pipe_pending
+from moviepy.video.tools.yuv import YUVFrame
+from .ffmpeg_writer import FFMPEG_VideoWriter
+from .ffmpeg_tools import ffmpeg_concat_videos
+
+
+# Changing this invalidates all the segments of existing caches.
+CACHE_VERSION = 3
+
+# Folders of the standard library and of the installed packages.
+LIBRARY_PATHS = tuple(set([sysconfig.get_paths()[name] for name in
+                           ('stdlib', 'platstdlib', 'purelib', 'platlib')]))
+
+
+class ClipRange:
+    """ Stands for the frames of ``clip`` between times ``t_start`` and
+    ``t_end`` (included) in ``clip_hash``. """
+
+    def __init__(self, clip, t_start=None, t_end=None):
+        self.clip = clip
+        self.t_start = t_start
+        self.t_end = t_end
+
+
+def clip_range(clip, t_start, t_end, offset=0):
+    """ Returns the ClipRange of ``clip`` for the times ``t_start-offset``
+    to ``t_end-offset`` (or for all times if they are None). Returns None
+    if clip is None. """
+    if clip is None:
+        return None
+    if t_start is None or t_end is None:
+        return ClipRange(clip)
+    return ClipRange(clip, t_start - offset, t_end - offset)
+
+
+def plays_between(clip, t_start, t_end, clip_start=None, clip_end=None):
+    """ Returns True if ``clip`` (whose inicia and fin in the composition
+    are ``clip_start`` and ``clip_end``, by default ``clip.inicia`` and
+    ``clip.fin``) plays at some time between ``t_start`` and ``t_end``.
+    Always True if t_start or t_end is None. """
+    if t_start is None or t_end is None:
+        return True
+    if clip_start is None:
+        clip_start, clip_end = clip.inicia, clip.fin
+    return (clip_start <= t_end) and ((clip_end is None) or
+                                      (clip_end > t_start))
+
+
+def clip_hash(obj, t_start=None, t_end=None):
+    """ Returns a hash (hexadecimal string) of any object, which stays the
+    same between two sessions as long as the content of the object is the
+    same. If ``obj`` is a clip, the hash identifies its frames between
+    times ``t_start`` and ``t_end``. See the docstring of this module. """
+    if isinstance(obj, Clip):
+        obj = ClipRange(obj, t_start, t_end)
+    return ClipHasher().hexdigest(obj)
+
+
+class ClipHasher:
+    """ Computes the hashes of the clip protocol (see ``clip_hash``).
+
+    The hashes of the objects met are memoized (by id), so a same hasher
+    can be used to hash many segments of the same clip efficiently, as
+    long as the objects are not modified in the meantime.
+    """
+
+    def __init__(self):
+        self.memo = {}
+        self.keep = []  # keeps the hashed objects alive (their id is used)
+
+    def hexdigest(self, obj):
+        return binascii.hexlify(self.digest(obj)).decode('ascii')
+
+    def digest(self, obj):
+
+        if (obj is None) or isinstance(obj, (bool, int, float, complex)):
+            return self._hash(type(obj).__name__, repr(obj))
+        if isinstance(obj, (str, bytes)):
+            return self._hash(type(obj).__name__, obj)
+        if isinstance(obj, (np.ndarray, np.generic)):
+            arr = np.ascontiguousarray(obj)
+            return self._hash('array', str(arr.dtype), repr(arr.shape),
+                              arr.view('uint8').data if arr.size else b'')
+
+        if isinstance(obj, ClipRange):
+            key = (id(obj.clip), obj.t_start, obj.t_end)
+            compute = lambda: self._digest_clip_range(obj)
+            target = obj.clip
+        else:
+            key = (id(obj), None, None)
+            compute = lambda: self._digest_object(obj)
+            target = obj
+
+        if key in self.memo:
+            result = self.memo[key]
+            # None means that we are in a cycle of references
+            return self._hash('cycle') if result is None else result
+
+        self.memo[key] = None
+        self.keep.append(target)
+        result = self.memo[key] = compute()
+        return result
+
+    def _hash(self, *parts):
+        h = hashlib.sha1()
+        for part in parts:
+            if not isinstance(part, (bytes, memoryview)):
+                part = part.encode('utf8')
+            part = bytes(part)
+            h.update(struct.pack('<Q', len(part)))
+            h.update(part)
+        return h.digest()
+
+    def _seq(self, name, items):
+        return self._hash(name, *[self.digest(e) for e in items])
+
+    def _digest_clip_range(self, cr):
+        """ The frames of a clip only depend on its make_frame. """
+        clip = cr.clip
+        key = getattr(clip.make_frame, 'render_key', None)
+        if key is not None:
+            return self._hash('frames', self.digest(key(cr.t_start, cr.t_end)))
+        return self._hash('frames', self.digest(clip.make_frame))
+
+    def _digest_object(self, obj):
+
+        if isinstance(obj, YUVFrame):
+            return self._hash('yuv', self.digest(obj.y), self.digest(obj.u),
+                              self.digest(obj.v))
+
+        key = getattr(obj, 'render_key', None)
+        if (key is not None) and not isinstance(obj, type):
+            return self._hash('key', type(obj).__name__,
+                              self.digest(key(None, None)))
+
+        if isinstance(obj, (list, tuple)):
+            return self._seq(type(obj).__name__, obj)
+        if isinstance(obj, dict):
+            items = sorted([(self.digest(k), self.digest(v))
+                            for (k, v) in obj.items()])
+            return self._hash('dict', *[k + v for (k, v) in items])
+        if isinstance(obj, (set, frozenset)):
+            return self._hash('set', *sorted([self.digest(e) for e in obj]))
+
+        if isinstance(obj, types.ModuleType):
+            return self._hash('module', obj.__name__)
+        if isinstance(obj, type):
+            return self._hash('class', obj.__module__, obj.__name__)
+        if isinstance(obj, types.FunctionType):
+            return self._digest_function(obj)
+        if isinstance(obj, types.MethodType):
+            return self._hash('method', self.digest(obj.__func__),
+                              self.digest(obj.__self__))
+        if isinstance(obj, types.CodeType):
+            return self._digest_code(obj)
+        if isinstance(obj, functools.partial):
+            return self._hash('partial', self.digest(obj.func),
+                              self.digest(obj.args),
+                              self.digest(obj.keywords or {}))
+        if isinstance(obj, (types.BuiltinFunctionType, np.ufunc)):
+            owner = getattr(obj, '__self__', None)
+            owner = (None if isinstance(owner, types.ModuleType) else owner)
+            return self._hash('builtin', str(getattr(obj, '__module__', '')),
+                              obj.__name__, self.digest(owner))
+        if hasattr(obj, '__dict__'):
+            ignored = getattr(obj, 'render_ignore', ())
+            # (the methods instrumented by a profiler are left out)
+            attrs = dict([(k, v) for (k, v) in obj.__dict__.items()
+                          if (k not in ignored) and
+                          not hasattr(v, 'profiler_node')])
+            return self._hash('object', type(obj).__module__,
+                              type(obj).__name__, self.digest(attrs))
+
+        raise ValueError("MoviePy error: the render cache cannot hash "
+                         "an object of type %s.%s used by the clip. Give "
+                         "it a render_key method (see "
+                         "moviepy.video.io.render_cache) or write the clip "
+                         "without render cache." % (type(obj).__module__,
+                                                    type(obj).__name__))
+
+    def _digest_code(self, code):
+        return self._hash('code', code.co_code, repr(code.co_names),
+                          self._seq('consts', code.co_consts))
+
+    def _digest_function(self, f):
+        code = f.__code__
+        closure = []
+        for cell in (f.__closure__ or []):
+            try:
+                contents = cell.cell_contents
+            except ValueError:  # empty cell
+                closure.append(self._hash('empty'))
+            else:
+                closure.append(self.digest(contents))
+        # Globals used by the function and by the code it contains
+        library = is_library_function(f)
+        glob = []
+        for name in sorted(code_names(code)):
+            if name in f.__globals__:
+                value = f.__globals__[name]
+                if (not library) or isinstance(
+                        value, (types.FunctionType, types.ModuleType, type,
+                                bool, int, float, str, tuple, np.ndarray)):
+                    glob.append((name, value))
+                else:
+                    glob.append((name, type(value)))
+        return self._hash('function', self._digest_code(code),
+                          self.digest(f.__defaults__),
+                          self.digest(f.__kwdefaults__ or {}),
+                          self._hash('closure', *closure),
+                          self._seq('globals', glob))
+
+
+def code_names(code):
+    """ The global names used by the code object ``code`` and by the code
+    objects it contains (lambdas, comprehensions, nested functions). """
+    names = set(code.co_names)
+    for const in code.co_consts:
+        if isinstance(const, types.CodeType):
+            names |= code_names(const)
+    return names
+
+
+def is_library_function(f):
+    """ True if the function ``f`` comes from MoviePy, the standard
+    library or an installed package (not from the user's code). """
+    module_name = getattr(f, '__module__', None) or ''
+    if module_name.split('.')[0] == 'moviepy':
+        return True
+    filename = getattr(sys.modules.get(module_name, None), '__file__', None)
+    return (filename is not None) and os.path.abspath(filename).startswith(
+        LIBRARY_PATHS)
+
+
+def segment_bounds(duracion, fps, segment_duration):
+    """ Splits the frames of a clip of duracion ``duracion`` written at
+    ``fps`` frames per second into segments of ``segment_duration`` seconds.
+    Returns the list of the (first frame, last frame + 1) of the segments.
+    """
+    nframes = len(np.arange(0, duracion, 1.0 / fps))
+    per_segment = max(1, int(round(segment_duration * fps)))
+    return [(n, min(n + per_segment, nframes))
+            for n in range(0, nframes, per_segment)]
+
+
+def write_video_segments(clip, filename, fps, cache_dir, segment_duration=10,
+                         codec="libx264", bitrate=None, preset="medium",
+                         audiofile=None, audio_start=None, audio_duration=None,
+                         verbose=True, threads=None, ffmpeg_params=None,
+                         profiler=None, telemetry=None):
+    """ Writes the clip to a videofile using the render cache ``cache_dir``.
+
+    The frames are rendered by segments of ``segment_duration`` seconds,
+    which are reused from the cache folder when an identical segment has
+    already been rendered. The segments are then concatenated (with the
+    audio, if any) into ``filename``. If a ``profiler`` is provided, the
+    time spent writing the frames of the segments is recorded under
+    'ffmpeg encoder pipe' (see ``ffmpeg_write_video``). See
+    ``write_videofile`` for the other parameters.
+    """
+
+    if not os.path.exists(cache_dir):
+        os.makedirs(cache_dir)
+
+    ext = os.path.splitext(filename)[1]
+    tamano = tuple(clip.tamano)
+
+    bounds = segment_bounds(clip.duracion, fps, segment_duration)
+
+    hasher = ClipHasher()
+    settings = hasher.digest((CACHE_VERSION, ext, tamano, fps, codec, bitrate,
+                              preset, ffmpeg_params))
+
+    segments = []
+    for (n_start, n_end) in bounds:
+        t_start, t_end = 1.0 * n_start / fps, 1.0 * (n_end - 1) / fps
+        key = hasher.hexdigest((settings, n_start, n_end,
+                                ClipRange(clip, t_start, t_end)))
+        segments.append(os.path.join(cache_dir, key + ext))
+
+    missing = [i for i, name in enumerate(segments)
+               if not os.path.exists(name)]
+
+    monitor = RenderMonitor(telemetry, 'video', filename,
+                            sum([bounds[i][1] - bounds[i][0] for i in missing]))
+    monitor.message(verbose, "[MoviePy] Writing video %s (%d segments, %d "
+                    "reused from the render cache)\n" % (
+                        filename, len(segments), len(segments) - len(missing)))
+    w, h = tamano
+
+    try:
+        for i in missing:
+            n_start, n_end = bounds[i]
+            tempname = segments[i][:-len(ext)] + ".part" + ext
+            frames = (clip.get_frame(1.0 * n / fps)
+                      for n in range(n_start, n_end))
+            first = next(frames)
+            # Segments read in YUV are written without conversion (the
+            # type of the frames is given by the readers, which are part
+            # of the hash of the segment).
+            pix_fmt = 'yuv420p' if isinstance(first, YUVFrame) else None
+            frame_bytes = (w * h * 3 // 2) if pix_fmt else (w * h * 3)
+            writer = FFMPEG_VideoWriter(tempname, tamano, fps, codec=codec,
+                                        preset=preset, bitrate=bitrate,
+                                        threads=threads,
+                                        ffmpeg_params=ffmpeg_params,
+                                        pix_fmt=pix_fmt)
+            if profiler is not None:
+                profiler.instrument(writer, 'write_frame',
+                                    'ffmpeg encoder pipe')
+            for frame in itertools.chain([first], frames):
+                if pix_fmt is None and frame.dtype != "uint8":
+                    frame = frame.astype("uint8")
+                t0 = time.time()
+                writer.write_frame(frame)
+                pending = pipe_pending(writer.proc.stdin)
+                monitor.update(1, blocked=time.time() - t0,
+                               queue_depth=(None if pending is None else
+                                            pending // frame_bytes))
+            writer.close()
+            os.rename(tempname, segments[i])
+
+        ffmpeg_concat_videos(segments, filename, audiofile=audiofile,
+                             audio_start=audio_start,
+                             audio_duration=audio_duration, verbose=False)
+    except Exception as err:
+        monitor.fail(err)
+        raise
+
+    monitor.message(verbose, "[MoviePy] Done.\n")
+    monitor.close()
@@ -0,0 +1,427 @@
+"""
+This module implements RenderSpool, which distributes the rendering of a
+video over several processes or computers.
+
+The coordinator (``write_videofile(..., render_spool=spool)``) splits the
+video into segments of a few seconds and publishes them as tasks in a
+spool folder. Workers, on any computer which sees the spool folder (NFS,
+SMB... share) pull the tasks one by one, render the frames of each
+segment with ``ffmpeg_write_video`` and write the resulting piece in the
+spool. The coordinator waits for all the pieces, puts back in the queue
+the segments whose rendering failed (or whose worker stopped answering),
+and finally joins the pieces (with the audio) without re-encoding them.
+
+Start a worker on each computer with
+
+>>> python -m moviepy.video.io.render_spool /shared/spool
+
+or from Python with ``RenderSpool("/shared/spool").work()``.
+
+The clip is sent to the workers as a ``moviepy.timeline.Timeline``, so
+the whole clip graph must be describable by a Timeline (it must be made
+in a ``moviepy.timeline.recording()`` context). Every worker
+rebuilds the clip: the source files must have the same paths on all the
+computers, and the functions registered with ``register_function`` must
+also be registered in the workers.
+
+Layout of the spool folder
+---------------------------
+
+Each export is a ``job`` folder in the spool, containing:
+
+- ``job.json``: the Timeline of the clip and the settings of the export.
+- ``todo/``: one JSON file per segment waiting for a worker. A worker
+  claims a segment by moving its file to ``claimed/``, with the id of the
+  worker added to the name (renames are atomic, so only one worker gets
+  it), and touches it while rendering. A worker only removes its own
+  claims, so a segment put back in the queue and claimed by another
+  worker is left alone.
+- ``failed/``: the segments whose rendering failed, with the error.
+- ``pieces/``: the rendered segments.
+- ``finished``: created by the coordinator when workers must leave the job.
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import threading
+import traceback
+import uuid
+import multiprocessing
+
+from moviepy.timeline import Timeline
+from moviepy.telemetry import RenderMonitor
+from .ffmpeg_writer import ffmpeg_write_video
+from .ffmpeg_tools import ffmpeg_concat_videos
+from .render_cache import segment_bounds
+
+
+def _write_json(filename, data):
+    """ Writes ``data`` in ``filename`` atomically (readers never see a
+    half-written file). """
+    tempname = filename + ".part"
+    with open(tempname, 'w') as f:
+        json.dump(data, f)
+    os.rename(tempname, filename)
+
+
+def _read_json(filename):
+    with open(filename) as f:
+        return json.load(f)
+
+
+def _claim_name(name, worker):
+    """ Name of the claim of task file ``name`` by ``worker``. """
+    return "%s.%s.json" % (name[:-len('.json')], worker)
+
+
+def _task_name(claim_name):
+    """ Name of the task file of a claim (see ``_claim_name``). """
+    return claim_name.split('.')[0] + '.json'
+
+
+def _tasks(folder):
+    """ Names of the task files in ``folder`` (empty if it is missing). """
+    try:
+        names = os.listdir(folder)
+    except OSError:
+        return []
+    return sorted([n for n in names if n.endswith('.json')])
+
+
+class RenderSpool:
+    """ Pull-based queue of video segments, stored in a shared folder.
+
+    See the docstring of module ``moviepy.video.io.render_spool``.
+
+    Parameters
+    -----------
+
+    directory
+      Folder of the spool. It must be visible (at the same path or not)
+      by the coordinator and by all the workers.
+
+    local_workers
+      Number of worker processes started on this computer by the
+      coordinator for each export. With 0, the segments are only rendered
+      by the workers started separately.
+
+    max_retries
+      Number of times a segment is rendered again after a failure before
+      the export is abandoned.
+
+    timeout
+      A segment whose worker gave no sign of life for ``timeout`` seconds
+      (crashed or disconnected computer) is put back in the queue. The
+      timeout of the coordinator is written in the job, and the workers
+      (local or not) signal that they are alive every ``timeout/4``
+      seconds.
+
+    poll
+      Interval (in seconds) between two checks of the spool, for the
+      coordinator and for the idle workers.
+
+    idle_timeout
+      The export is abandoned if no worker renders any of its segments
+      during ``idle_timeout`` seconds (e.g. with ``local_workers=0`` and
+      no worker started). None to wait for the workers forever.
+    """
+
+    def __init__(self, directory, local_workers=0, max_retries=3,
+                 timeout=60, poll=1.0, idle_timeout=300):
+
+        self.directory = directory
+        self.local_workers = local_workers
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.poll = poll
+        self.idle_timeout = idle_timeout
+        # Written in the names of the claims of this worker.
+        self.worker_id = uuid.uuid4().hex
+
+    def render(self, clip, filename, fps, segment_duration=10,
+               codec="libx264", bitrate=None, preset="medium",
+               audiofile=None, audio_start=None, audio_duration=None,
+               verbose=True, threads=None, ffmpeg_params=None,
+               telemetry=None):
+        """ Writes the clip to a videofile, rendered by the workers.
+
+        The clip is split into segments of ``segment_duration`` seconds,
+        which are published in the spool. Returns when the segments have
+        been rendered and joined (with the sound of ``audiofile``, if
+        any) into ``filename``. See ``write_videofile`` for the other
+        parameters. The job folder is removed from the spool after a
+        success, and kept (with the errors in ``failed/``) after a failure.
+        """
+
+        ext = os.path.splitext(filename)[1]
+        bounds = segment_bounds(clip.duracion, fps, segment_duration)
+        settings = {'fps': fps, 'codec': codec, 'bitrate': bitrate,
+                    'preset': preset, 'threads': threads,
+                    'ffmpeg_params': ffmpeg_params, 'ext': ext,
+                    'timeout': self.timeout}
+
+        job = uuid.uuid4().hex
+        jobdir = os.path.join(self.directory, job)
+        for folder in ['todo', 'claimed', 'failed', 'pieces']:
+            os.makedirs(os.path.join(jobdir, folder))
+        _write_json(os.path.join(jobdir, 'job.json'),
+                    {'timeline': Timeline.from_clip(clip).to_dict(),
+                     'settings': settings})
+        for i, (n_start, n_end) in enumerate(bounds):
+            _write_json(os.path.join(jobdir, 'todo', '%05d.json' % i),
+                        {'index': i, 'n_start': n_start, 'n_end': n_end,
+                         'attempts': 0})
+
+        monitor = RenderMonitor(telemetry, 'segments', filename, len(bounds),
+                                unit='segments')
+        monitor.message(verbose, "[MoviePy] Writing video %s (%d segments, "
+                        "job %s)\n" % (filename, len(bounds), job))
+
+        workers = [multiprocessing.Process(target=_work,
+                                           args=(self.directory, job,
+                                                 self.poll))
+                   for i in range(self.local_workers)]
+        for worker in workers:
+            worker.daemon = True
+            worker.start()
+
+        pieces = [os.path.join(jobdir, 'pieces', '%05d%s' % (i, ext))
+                  for i in range(len(bounds))]
+        try:
+            self._wait(jobdir, pieces, monitor)
+            ffmpeg_concat_videos(pieces, filename, audiofile=audiofile,
+                                 audio_start=audio_start,
+                                 audio_duration=audio_duration, verbose=False)
+        except Exception as err:
+            monitor.fail(err)
+            raise
+        finally:
+            open(os.path.join(jobdir, 'finished'), 'w').close()
+            for worker in workers:
+                worker.join()
+
+        shutil.rmtree(jobdir, ignore_errors=True)
+
+        monitor.message(verbose, "[MoviePy] Done.\n")
+        monitor.close()
+
+    def _wait(self, jobdir, pieces, monitor):
+        """ Waits until all the pieces are rendered, requeuing the failed
+        and abandoned segments. """
+        done = 0
+        last_activity = time.time()
+        while done < len(pieces):
+            time.sleep(self.poll)
+            busy = self._requeue(jobdir)
+
+            n = len([p for p in pieces if os.path.exists(p)])
+            monitor.update(n - done)
+            if busy or (n > done):
+                last_activity = time.time()
+            elif ((self.idle_timeout is not None) and
+                  (time.time() - last_activity > self.idle_timeout)):
+                raise IOError("MoviePy error: no worker rendered a segment "
+                              "of the video during %s seconds. Start workers "
+                              "with 'python -m moviepy.video.io.render_spool "
+                              "%s' or use local_workers." % (
+                                  self.idle_timeout, self.directory))
+            done = n
+
+    def _requeue(self, jobdir):
+        """ Puts back in the queue the failed segments and the segments
+        whose worker stopped answering. Raises an error if a segment
+        failed too many times. Returns True if segments are being
+        rendered. """
+        todo = os.path.join(jobdir, 'todo')
+        claimed = os.path.join(jobdir, 'claimed')
+        failed = os.path.join(jobdir, 'failed')
+
+        for name in _tasks(failed):
+            task = _read_json(os.path.join(failed, name))
+            if task['attempts'] > self.max_retries:
+                raise IOError("MoviePy error: the segment %d of the video "
+                              "could not be rendered (%d attempts). The "
+                              "last error was:\n\n%s" % (
+                                  task['index'], task['attempts'],
+                                  task['error']))
+            _write_json(os.path.join(todo, name), task)
+            os.remove(os.path.join(failed, name))
+
+        busy = False
+        now = time.time()
+        for name in _tasks(claimed):
+            try:
+                if now - os.stat(os.path.join(claimed, name)).st_mtime > self.timeout:
+                    os.rename(os.path.join(claimed, name),
+                              os.path.join(todo, _task_name(name)))
+                else:
+                    busy = True
+            except OSError:  # the worker finished in the meantime
+                pass
+        return busy
+
+    def work(self, job=None, stop_when_idle=False):
+        """ Renders segments of the spool until stopped.
+
+        If ``job`` is provided, only the segments of this job are rendered
+        and the method returns when the job is finished. Otherwise the
+        segments of all the jobs are rendered, forever (or until there is
+        no more segment to render if ``stop_when_idle`` is True).
+        """
+        clips = {}
+        while True:
+            if job is not None:
+                jobdir = os.path.join(self.directory, job)
+                if not os.path.exists(os.path.join(jobdir, 'job.json')):
+                    return
+                if os.path.exists(os.path.join(jobdir, 'finished')):
+                    return
+                jobs = [job]
+            else:
+                jobs = self._jobs()
+                for name in list(clips):
+                    if name not in jobs:
+                        del clips[name]
+
+            claimed = None
+            for name in jobs:
+                claimed = self._claim(name)
+                if claimed is not None:
+                    break
+
+            if claimed is None:
+                if stop_when_idle:
+                    return
+                time.sleep(self.poll)
+                continue
+
+            self._render_task(name, claimed, clips)
+
+    def _jobs(self):
+        """ Names of the jobs of the spool which are not finished. """
+        try:
+            names = sorted(os.listdir(self.directory))
+        except OSError:
+            return []
+        jobdirs = [(n, os.path.join(self.directory, n)) for n in names]
+        return [n for (n, d) in jobdirs
+                if os.path.exists(os.path.join(d, 'job.json')) and
+                not os.path.exists(os.path.join(d, 'finished'))]
+
+    def _claim(self, job):
+        """ Claims a segment of the job. Returns the name of its claim
+        file, or None if there is no segment waiting. """
+        jobdir = os.path.join(self.directory, job)
+        for name in _tasks(os.path.join(jobdir, 'todo')):
+            claim = _claim_name(name, self.worker_id)
+            try:
+                os.rename(os.path.join(jobdir, 'todo', name),
+                          os.path.join(jobdir, 'claimed', claim))
+            except OSError:  # another worker was faster
+                continue
+            try:
+                # the task file kept the time at which it was queued
+                os.utime(os.path.join(jobdir, 'claimed', claim), None)
+            except OSError:  # already put back in the queue
+                continue
+            return claim
+        return None
+
+    def _render_task(self, job, claim_name, clips):
+        """ Renders the segment claimed with the claim file
+        ``claim_name`` of the job. """
+        jobdir = os.path.join(self.directory, job)
+        claim = os.path.join(jobdir, 'claimed', claim_name)
+        name = _task_name(claim_name)
+        try:
+            task = _read_json(claim)
+        except (IOError, OSError, ValueError):  # already put back in the queue
+            return
+
+        # The claims are touched often enough for the timeout of the
+        # coordinator, which is in the settings of the job.
+        data = None
+        if job in clips:
+            settings = clips[job][1]
+        else:
+            try:
+                data = _read_json(os.path.join(jobdir, 'job.json'))
+                settings = data['settings']
+            except (IOError, OSError, ValueError, KeyError):
+                settings = {}  # the error is reported below
+        interval = max(0.1, settings.get('timeout', self.timeout) / 4.0)
+
+        stop = threading.Event()
+
+        def heartbeat():
+            while not stop.wait(interval):
+                try:
+                    os.utime(claim, None)
+                except OSError:
+                    return
+
+        thread = threading.Thread(target=heartbeat)
+        thread.daemon = True
+        thread.start()
+
+        try:
+            if job not in clips:
+                if data is None:
+                    data = _read_json(os.path.join(jobdir, 'job.json'))
+                clips[job] = (Timeline(data['timeline']).build(),
+                              data['settings'])
+            clip, settings = clips[job]
+            self._render_segment(clip, settings, jobdir, task)
+            error = None
+        except Exception:
+            error = traceback.format_exc()
+        finally:
+            stop.set()
+            thread.join()
+
+        try:
+            # The claim has the id of this worker in its name: this only
+            # fails if the segment was put back in the queue (it may be
+            # rendered by another worker now).
+            os.remove(claim)
+        except OSError:
+            return
+        if error is not None:
+            task['attempts'] += 1
+            task['error'] = error
+            try:
+                _write_json(os.path.join(jobdir, 'failed', name), task)
+            except (IOError, OSError):  # the job was abandoned
+                pass
+
+    def _render_segment(self, clip, settings, jobdir, task):
+        fps, ext = settings['fps'], settings['ext']
+        n = task['n_end'] - task['n_start']
+        t_start = 1.0 * task['n_start'] / fps
+        # Half a frame before the frame after the segment, so that the
+        # segment has exactly n frames.
+        t_end = min(clip.duracion, t_start + (n - 0.5) / fps)
+        piece = os.path.join(jobdir, 'pieces', '%05d%s' % (task['index'], ext))
+        tempname = piece[:-len(ext)] + ".part" + ext
+        ffmpeg_write_video(clip.subclip(t_start, t_end), tempname, fps,
+                           settings['codec'], bitrate=settings['bitrate'],
+                           preset=settings['preset'], verbose=False,
+                           threads=settings['threads'],
+                           ffmpeg_params=settings['ffmpeg_params'],
+                           progress_bar=False)
+        os.rename(tempname, piece)
+
+
+def _work(directory, job, poll):
+    """ Target of the local worker processes. """
+    RenderSpool(directory, poll=poll).work(job)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        print("Usage: python -m moviepy.video.io.render_spool SPOOL_FOLDER")
+        sys.exit(1)
+    RenderSpool(sys.argv[1]).work()
@@ -1,6 +1,8 @@
 import matplotlib.pyplot as plt
 from matplotlib.widgets import Slider, Button
+from moviepy.decorators import use_proxies
 
+@use_proxies
 def sliders(f, sliders_properties, wait_for_validation = False):
     """ A light GUI to manually explore and tune the outputs of 
         a function.
@@ -2,7 +2,7 @@
 the cuts in MoviePy """
 
 from collections import defaultdict
-from moviepy.decorators import use_clip_fps_by_default
+from moviepy.decorators import use_clip_fps_by_default, use_proxies
 import numpy as np
 
 @use_clip_fps_by_default
@@ -97,6 +97,7 @@ class FramesMatches(list):
         
     
     @staticmethod
+    @use_proxies
     def from_clip(clip, dist_thr, max_d, fps=None):
         """ Finds all the frames tht look alike in a clip, for instance to make a
         looping gif.
@@ -272,6 +273,7 @@ class FramesMatches(list):
 
 
 
+@use_proxies
 @use_clip_fps_by_default
 def detect_scenes(clip=None, luminosities=None, thr=10,
                   progress_bar=False, fps=None):
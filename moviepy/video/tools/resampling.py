@@ -0,0 +1,226 @@
+"""
+This module implements the resizing of frames used by ``fx.resize``.
+
+Resizing a frame from a size to another is a separable operation: each
+pixel of the result is a weighted sum of a few pixels of the same row,
+then of the same column, of the original frame. A ``Resampler`` computes
+these pixels and weights (the 'taps') once for a given pair of sizes, and
+applies them to any number of frames of that size, RGB or masks (float
+arrays, resized without conversion to uint8). The taps are those of a
+triangle filter, scaled to the reduction when reducing, which gives
+bilinear interpolation when enlarging and antialiased (area-like)
+results when reducing.
+
+For still images resized differently at each frame (zooms), a pyramid of
+the image reduced by 2, 4, 8... (see ``build_pyramid``) is computed
+once, and each frame is resized from the level closest to its size, so
+that the cost depends on the size of the result, not of the image.
+
+When OpenCV is installed, the resizing is done by ``cv2.resize``, with
+the interpolation chosen once for each pair of sizes. Else, uint8 frames
+are resized by Pillow (if installed) with the same triangle filter
+('bilinear'), which is faster than Numpy for them.
+"""
+
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+try:
+    import cv2
+    CV2_FOUND = True
+except ImportError:
+    CV2_FOUND = False
+
+try:
+    from PIL import Image
+    PIL_FOUND = True
+except ImportError:
+    PIL_FOUND = False
+
+
+# Number of Resamplers kept by ``get_resampler`` (sizes used recently).
+RESAMPLERS_CACHE_SIZE = 16
+
+_resamplers = OrderedDict()
+_resamplers_lock = threading.Lock()
+
+
+def taps(n_in, n_out, start=0, end=None):
+    """ Returns the indices (N x K ints) and weights (N x K floats) of
+    the pixels of a line of ``n_in`` pixels which make each pixel of the
+    resized line of ``n_out`` pixels, or only the pixels ``start`` to
+    ``end`` (excluded) of the resized line. """
+    end = n_out if end is None else end
+    scale = 1.0 * n_in / n_out
+    support = max(1.0, scale)  # radius of the triangle filter
+    centers = (np.arange(start, end) + 0.5) * scale - 0.5
+    first = np.floor(centers - support).astype(int) + 1
+    k = int(np.ceil(2 * support)) + 1
+    indices = first[:, None] + np.arange(k)[None, :]
+    weights = np.maximum(0, 1 - np.abs(indices - centers[:, None]) / support)
+    weights /= weights.sum(axis=1)[:, None]
+    # Pixels out of the line are replaced by the border pixels
+    indices = np.clip(indices, 0, n_in - 1)
+    # Drop the columns of weights always null
+    used = weights.max(axis=0) > 0
+    return indices[:, used], weights[:, used].astype('float32')
+
+
+class Resampler:
+    """ Resizes frames of size ``src_size`` into frames of size
+    ``dst_size`` (sizes given as (width, height)).
+
+    If a ``window`` (x1, y1, x2, y2) is given, only this rectangle of the
+    resized frame is computed (from the pixels of the original frame it
+    needs): this is a crop done before the resizing.
+
+    The taps are computed once, at creation. The intermediate arrays are
+    allocated once per thread and reused for all the frames.
+    """
+
+    def __init__(self, src_size, dst_size, window=None):
+        self.src_size = tuple(src_size)
+        self.dst_size = tuple(dst_size)
+        (w, h), (nw, nh) = self.src_size, self.dst_size
+        self.window = None if window is None else tuple(window)
+        x1, y1, x2, y2 = (0, 0, nw, nh) if window is None else window
+        self.out_size = (x2 - x1, y2 - y1)
+        self.x_taps = taps(w, nw, x1, x2)
+        self.y_taps = taps(h, nh, y1, y2)
+        # window of the original frame (floats) for Pillow
+        self.box = (x1 * w / float(nw), y1 * h / float(nh),
+                    x2 * w / float(nw), y2 * h / float(nh))
+        self.enlarges = (nw > w) or (nh > h)
+        self._buffers = threading.local()
+
+    def _buffer(self, name, shape):
+        buf = getattr(self._buffers, name, None)
+        if buf is None or buf.shape != shape:
+            buf = np.empty(shape, dtype='float32')
+            setattr(self._buffers, name, buf)
+        return buf
+
+    def _pass(self, pic, axis, indices, weights, name):
+        """ Resizes the array ``pic`` (float32) along ``axis``. """
+        shape = list(pic.shape)
+        shape[axis] = len(indices)
+        shape = tuple(shape)
+        acc = self._buffer(name, shape)
+        tmp = self._buffer(name + '_tmp', shape)
+        wshape = [1] * pic.ndim
+        wshape[axis] = len(indices)
+        acc[...] = 0
+        for k in range(indices.shape[1]):
+            np.take(pic, indices[:, k], axis=axis, out=tmp, mode='clip')
+            tmp *= weights[:, k].reshape(wshape)
+            acc += tmp
+        return acc
+
+    def __call__(self, pic):
+        """ Returns the resized frame: uint8 for an uint8 frame (RGB),
+        float32 for a float frame (mask). """
+        if CV2_FOUND and self.window is None:
+            interpolation = (cv2.INTER_LINEAR if self.enlarges
+                             else cv2.INTER_AREA)
+            src = pic if pic.dtype in (np.uint8, np.float32) else (
+                pic.astype('float32'))
+            return cv2.resize(src, self.dst_size,
+                              interpolation=interpolation)
+
+        pic = np.asarray(pic)
+        if PIL_FOUND and pic.dtype == np.uint8 and (
+                pic.ndim == 2 or pic.shape[2] in (3, 4)):
+            return np.asarray(Image.fromarray(pic).resize(
+                self.out_size, Image.BILINEAR, box=self.box))
+
+        if pic.shape[1::-1] != self.src_size:
+            raise ValueError("MoviePy error: this Resampler resizes frames "
+                             "of size %s, not %s." % (self.src_size,
+                                                      pic.shape[1::-1]))
+        src = pic.astype('float32', copy=False)
+        x_indices, x_weights = self.x_taps
+        y_indices, y_weights = self.y_taps
+        # The pass which reduces the most is done first
+        if len(x_indices) * pic.shape[0] <= len(y_indices) * pic.shape[1]:
+            tmp = self._pass(src, 1, x_indices, x_weights, 'x')
+            result = self._pass(tmp, 0, y_indices, y_weights, 'y')
+        else:
+            tmp = self._pass(src, 0, y_indices, y_weights, 'y')
+            result = self._pass(tmp, 1, x_indices, x_weights, 'x')
+        # The result is a new array: frames may be kept by the caller
+        if pic.dtype == np.uint8:
+            return np.clip(result + 0.5, 0, 255).astype('uint8')
+        return result.copy()
+
+    def resize_with_mask(self, pic, mask):
+        """ Resizes a frame and its mask (same size) at once. """
+        return self(pic), self(mask)
+
+
+def get_resampler(src_size, dst_size, window=None):
+    """ Returns a Resampler from ``src_size`` to ``dst_size``, reusing the
+    Resamplers of the sizes used recently. """
+    key = (tuple(map(int, src_size)), tuple(map(int, dst_size)),
+           None if window is None else tuple(map(int, window)))
+    with _resamplers_lock:
+        resampler = _resamplers.get(key, None)
+        if resampler is not None:
+            _resamplers.move_to_end(key)
+            return resampler
+    resampler = Resampler(*key)
+    with _resamplers_lock:
+        _resamplers[key] = resampler
+        while len(_resamplers) > RESAMPLERS_CACHE_SIZE:
+            _resamplers.popitem(last=False)
+    return resampler
+
+
+def resample(pic, newsize, mask=None, window=None):
+    """ Resizes the frame ``pic`` (and its mask, if given) to
+    ``newsize`` = (width, height), or only the rectangle ``window`` =
+    (x1, y1, x2, y2) of the resized frame. Returns the resized frame, or
+    the resized frame and mask. """
+    newsize = (max(1, int(newsize[0])), max(1, int(newsize[1])))
+    resampler = get_resampler(pic.shape[1::-1], newsize, window)
+    if mask is None:
+        return resampler(pic)
+    return resampler.resize_with_mask(pic, mask)
+
+
+# PYRAMIDS
+
+def build_pyramid(img, min_size=16):
+    """ Returns the list of the levels of the pyramid of the image
+    ``img``: the image, the image reduced by 2 (each pixel is the mean of
+    2x2 pixels), by 4, etc. until one side is smaller than
+    ``min_size``. """
+    levels = [img]
+    while min(levels[-1].shape[:2]) >= 2 * min_size:
+        last = levels[-1]
+        h, w = last.shape[:2]
+        pad = [(0, h % 2), (0, w % 2)] + [(0, 0)] * (last.ndim - 2)
+        if h % 2 or w % 2:
+            last = np.pad(last, pad, 'edge')
+        h, w = last.shape[:2]
+        blocks = last.reshape((h // 2, 2, w // 2, 2) + last.shape[2:])
+        if img.dtype == np.uint8:
+            level = ((blocks.astype('uint16').sum(axis=(1, 3)) + 2) // 4)
+            levels.append(level.astype('uint8'))
+        else:
+            levels.append(blocks.astype('float32').mean(axis=(1, 3)))
+    return levels
+
+
+def sample_pyramid(levels, newsize, window=None):
+    """ Resizes the image of the pyramid ``levels`` (see
+    ``build_pyramid``) to ``newsize``, or only the rectangle ``window``
+    of the resized image, from the smallest level which is at least as
+    big as ``newsize`` (so that it is reduced by less than 2). """
+    w, h = levels[0].shape[1::-1]
+    scale = min(1.0 * newsize[0] / w, 1.0 * newsize[1] / h)
+    k = 0
+    while (k + 1 < len(levels)) and (scale * 2 ** (k + 1) <= 1):
+        k += 1
+    return resample(levels[k], newsize, window=window)
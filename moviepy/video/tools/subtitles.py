@@ -1,10 +1,14 @@
 """ Experimental module for subtitles support. """
 
 import re
+import bisect
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
 import numpy as np
 from moviepy.video.VideoClip import VideoClip, TextClip
 from moviepy.tools import cvsecs
-from moviepy.decorators import convert_to_seconds
 
 
 class SubtitlesClip(VideoClip):
@@ -12,7 +16,9 @@ class SubtitlesClip(VideoClip):
     
     One particularity of this class is that the images of the
     subtitle texts are not generated beforehand, but only if
-    needed.
+    needed: the text clips of the subtitles shown are generated (along
+    with the ``lookahead`` next ones, in a background thread) and the
+    last ``cache_size`` ones are kept.
 
     Parameters
     ==========
@@ -20,6 +26,18 @@ class SubtitlesClip(VideoClip):
     subtitles
       Either the name of a file, or a list
 
+    make_textclip
+      Function returning the TextClip of a text.
+
+    lookahead
+      Number of upcoming subtitles whose text clips are generated in
+      advance, in a background thread (0 to generate them only when
+      they are shown).
+
+    cache_size
+      Maximal number of text clips kept in memory. The clips of the
+      subtitles which are over are dropped first.
+
     Examples
     =========
     
@@ -34,16 +52,35 @@ class SubtitlesClip(VideoClip):
     
     """
 
-    def __init__(self, subtitles, make_textclip=None):
+    # generated text clips and the objects generating them
+    render_ignore = VideoClip.render_ignore + ('textclips', 'lock', 'pool',
+                                               'last_lookup')
+
+    def __init__(self, subtitles, make_textclip=None, lookahead=2,
+                 cache_size=32):
         
         VideoClip.__init__(self, has_constant_size=False)
 
         if isinstance( subtitles, str):
             subtitles = file_to_subtitles(subtitles)
 
-        subtitles = [(map(cvsecs, tt),txt) for tt, txt in subtitles]
+        subtitles = [(tuple(map(cvsecs, tt)),txt) for tt, txt in subtitles]
+        # sorted by start time (sort is stable: same order for equal starts)
+        subtitles = sorted(subtitles, key=lambda sub: sub[0][0])
         self.subtitles = subtitles
-        self.textclips = dict()
+
+        # Index of the intervals: starts, and max of the ends of the
+        # subtitles up to each one (the subtitles may overlap).
+        self.starts = [ta for ((ta, tb), txt) in subtitles]
+        self.max_ends = list(np.maximum.accumulate(
+            [tb for ((ta, tb), txt) in subtitles]))
+
+        self.textclips = OrderedDict()  # index of subtitle -> Future
+        self.lock = threading.Lock()
+        self.lookahead = lookahead
+        self.cache_size = max(cache_size, lookahead + 1)
+        self.pool = ThreadPoolExecutor(1) if lookahead else None
+        self.last_lookup = (None, None)
 
         if make_textclip is None:
 
@@ -55,38 +92,79 @@ class SubtitlesClip(VideoClip):
         self.inicia=0
         self.duracion = max([tb for ((ta,tb), txt) in self.subtitles])
         self.fin=self.duracion
-        
-        def add_textclip_if_none(t):
-            """ Will generate a textclip if it hasn't been generated asked
-            to generate it yet. If there is no subtitle to show at t, return
-            false. """
-            sub =[((ta,tb),txt) for ((ta,tb),txt) in self.textclips.keys()
-                   if (ta<=t<tb)]
-            if sub == []:
-                sub = [((ta,tb),txt) for ((ta,tb),txt) in self.subtitles if
-                       (ta<=t<tb)]
-                if sub == []:
-                    return False
-            sub = sub[0]
-            if sub not in self.textclips.keys():
-                self.textclips[sub] = self.make_textclip(sub[1])
-
-            return sub
 
         def make_frame(t):
-            sub = add_textclip_if_none(t)
-            return (self.textclips[sub].get_frame(t) if sub
+            textclip = self.textclip_at(t)
+            return (textclip.get_frame(t) if textclip is not None
                     else np.array([[[0,0,0]]]))
 
         def make_mask_frame(t):
-            sub = add_textclip_if_none(t)
-            return (self.textclips[sub].mask.get_frame(t) if sub
+            textclip = self.textclip_at(t)
+            return (textclip.mask.get_frame(t) if textclip is not None
                     else np.array([[0]]))
         
         self.make_frame = make_frame
         hasmask = (self.make_textclip('T').mask is not None)
         self.mask = (VideoClip(make_mask_frame, ismask=True) if hasmask else None)
 
+    def find_subtitle(self, t):
+        """ Returns the index of the subtitle shown at time t (the first one
+        if several subtitles overlap), or None. """
+        i = bisect.bisect_right(self.starts, t) - 1
+        found = None
+        while i >= 0 and self.max_ends[i] > t:
+            (ta, tb), txt = self.subtitles[i]
+            if ta <= t < tb:
+                found = i
+            i -= 1
+        return found
+
+    def textclip_at(self, t):
+        """ Returns the text clip shown at time t, or None. The clip and
+        its mask share the same lookup for a given t. """
+        last_t, index = self.last_lookup
+        if last_t != t:
+            index = self.find_subtitle(t)
+            self.last_lookup = (t, index)
+        if index is None:
+            return None
+
+        with self.lock:
+            future = self._get(index)
+            for i in range(index + 1, min(index + 1 + self.lookahead,
+                                          len(self.subtitles))):
+                self._get(i, background=True)
+            self.textclips.move_to_end(index)
+            self._evict(t)
+        return future.result()
+
+    def _get(self, index, background=False):
+        """ Returns the future of the text clip of a subtitle, starting its
+        generation if needed. Must be called with the lock held. """
+        future = self.textclips.get(index, None)
+        if future is None:
+            txt = self.subtitles[index][1]
+            if background:
+                future = self.pool.submit(self.make_textclip, txt)
+            else:
+                future = _Done(self.make_textclip(txt))
+            self.textclips[index] = future
+        return future
+
+    def _evict(self, t):
+        """ Drops the text clips beyond ``cache_size``, those of the
+        subtitles which are over first, then the least recently used.
+        The futures dropped are not cancelled: another thread may be
+        waiting for them. """
+        excess = len(self.textclips) - self.cache_size
+        if excess <= 0:
+            return
+        past = [i for i in self.textclips if self.subtitles[i][0][1] <= t]
+        for i in past[:excess]:
+            self.textclips.pop(i)
+        while len(self.textclips) > self.cache_size:
+            self.textclips.popitem(last=False)
+
     def in_subclip(self, t_start= None, t_end= None):
         """ Returns a sequence of [(t1,t2), txt] covering all the given subclip
         from t_start to t_end. The first and last times will be cropped so as
@@ -119,12 +197,13 @@ class SubtitlesClip(VideoClip):
 
     def __str__(self):
 
-        def to_srt(sub_element):
+        def to_srt(i, sub_element):
             (ta, tb), txt = sub_element
             fta, ftb = map(time_to_string, (ta, tb))
-            return "%s - %s\n%s"%(fta, ftb, txt)
+            return "%d\n%s --> %s\n%s"%(i + 1, fta, ftb, txt)
         
-        return "\n\n".join(map(to_srt, self.subtitles))
+        return "\n\n".join([to_srt(i, sub) for i, sub
+                             in enumerate(self.subtitles)]) + "\n"
     
 
 
@@ -139,6 +218,23 @@ class SubtitlesClip(VideoClip):
             f.write(str(self))
 
 
+class _Done:
+    """ Text clip generated right away, with the interface of a Future. """
+
+    def __init__(self, textclip):
+        self.textclip = textclip
+
+    def result(self):
+        return self.textclip
+
+
+def time_to_string(t):
+    """ Formats a time in seconds as in the SRT files: '01:02:03,456'. """
+    ms = int(round(1000 * t))
+    return "%02d:%02d:%02d,%03d" % (ms // 3600000, (ms // 60000) % 60,
+                                    (ms // 1000) % 60, ms % 1000)
+
+
 def file_to_subtitles(filename):
     """ Converts a srt file into subtitles.
 
@@ -157,10 +253,13 @@ def file_to_subtitles(filename):
     for line in lines:
         times = re.findall("([0-9]*:[0-9]*:[0-9]*,[0-9]*)", line)
         if times != []:
-            current_times = map(cvsecs, times)
+            current_times = tuple(map(cvsecs, times))
         elif line.strip() == '':
-            times_texts.append((current_times, current_text.strip('\n')))
+            if current_times is not None:
+                times_texts.append((current_times, current_text.strip('\n')))
             current_times, current_text = None, ""
         elif current_times is not None:
             current_text = current_text + line
+    if current_times is not None:  # no blank line after the last subtitle
+        times_texts.append((current_times, current_text.strip('\n')))
     return times_texts
@@ -0,0 +1,151 @@
+"""
+This module implements the sliding windows of frames used by the temporal
+filters (``VideoClip.fl_temporal``, ``fx.supersample``, ``fx.motion_blur``,
+``fx.temporal_denoise``, ``fx.frame_difference``).
+
+A temporal filter computes each frame from several frames of the clip
+around it. The frames of a ``FrameWindow`` are taken on a fixed grid of
+times (every ``step`` seconds), so that successive frames of the result
+share most of their frames: only the frames entering the window are read,
+and the sum of the frames of the window is updated with the frames
+entering and leaving it, instead of being recomputed.
+
+The frames of uint8 clips are kept as float32 arrays: their sums are exact
+(they are sums of integers), so the running sums never drift.
+"""
+
+import threading
+
+import numpy as np
+
+
+# The running sums of float frames (masks) are recomputed after this
+# number of updates, to bound the rounding errors.
+RECOMPUTE_EVERY = 64
+
+
+class FrameWindow:
+    """ Window of ``nframes`` frames of a clip taken every ``step``
+    seconds, sliding along the clip.
+
+    The window is placed with ``move(t)``: its frames are then the frames
+    at times ``(i + k) * step``, k = 0... nframes-1, where ``i * step`` is
+    the time of the grid closest to ``t``. Times before 0 are replaced by 0.
+
+    Parameters
+    -----------
+
+    get_frame
+      Function (t -> frame) giving the frames of the clip.
+
+    nframes
+      Number of frames in the window.
+
+    step
+      Time between two frames of the window, in seconds.
+
+    Attributes
+    -----------
+
+    first
+      Index (on the grid) of the first frame of the window.
+
+    reads
+      Number of frames read from the clip so far.
+    """
+
+    def __init__(self, get_frame, nframes, step):
+        if nframes < 1 or step <= 0:
+            raise ValueError("MoviePy error: a frame window needs at least "
+                             "one frame and a positive step.")
+        self.get_frame = get_frame
+        self.nframes = nframes
+        self.step = step
+        self.first = None
+        self.reads = 0
+        self.cache = {}  # index -> frame of the windows
+        self.lock = threading.Lock()
+        self._sum = None
+        self._sum_first = None
+        self._updates = 0
+
+    def render_key(self, t_start=None, t_end=None):
+        """ Identifies the frames of the window, see
+        video.io.render_cache. """
+        return (self.get_frame, self.nframes, self.step)
+
+    def index(self, t):
+        """ Index of the time of the grid closest to ``t``. """
+        return int(np.floor(1.0 * t / self.step + 0.5))
+
+    def move(self, t):
+        """ Places the window so that its first frame is at time ``t``
+        (rounded to the grid). """
+        previous, self.first = self.first, self.index(t)
+        if previous is None:
+            previous = self.first
+        # keeps the frames of the previous window, for the running sum
+        lo = min(previous, self.first)
+        hi = max(previous, self.first) + self.nframes
+        for i in list(self.cache):
+            if not (lo <= i < hi):
+                del self.cache[i]
+
+    def frame(self, i):
+        """ The frame of index ``i`` of the grid, as a float array. """
+        frame = self.cache.get(i, None)
+        if frame is None:
+            frame = np.asarray(self.get_frame(max(0, i * self.step)))
+            dtype = 'float32' if frame.dtype == np.uint8 else 'float64'
+            frame = self.cache[i] = frame.astype(dtype)
+            self.reads += 1
+        return frame
+
+    def frames(self):
+        """ The list of the frames of the window (float arrays, not to be
+        modified), from the earliest to the latest. """
+        return [self.frame(i) for i in range(self.first,
+                                             self.first + self.nframes)]
+
+    def sum(self):
+        """ The sum of the frames of the window (a float array, not to be
+        modified). Only the frames which entered or left the window since
+        the last call are added or subtracted. """
+        first, n = self.first, self.nframes
+        shift = None if self._sum is None else first - self._sum_first
+        if (shift is None) or (abs(shift) >= n) or (
+                self._updates >= RECOMPUTE_EVERY):
+            frames = self.frames()
+            self._sum = np.array(frames[0])
+            for frame in frames[1:]:
+                self._sum += frame
+            self._updates = 0
+        elif shift != 0:
+            old = self._sum_first
+            # frames leaving the window, then frames entering it
+            leaving = (range(old, first) if shift > 0 else
+                       range(first + n, old + n))
+            entering = (range(old + n, first + n) if shift > 0 else
+                        range(first, old))
+            for i in leaving:
+                self._sum -= self.frame(i)
+            for i in entering:
+                self._sum += self.frame(i)
+            self._updates += 1
+        self._sum_first = first
+        return self._sum
+
+    def mean(self):
+        """ The mean of the frames of the window (a new float array). """
+        return self.sum() / self.nframes
+
+    def weighted_sum(self, weights):
+        """ The sum of the frames of the window multiplied by the
+        ``weights`` (one per frame, from the earliest to the latest). """
+        result = None
+        for w, frame in zip(weights, self.frames()):
+            if w == 0:
+                continue
+            result = w * frame if (result is None) else result + w * frame
+        return (np.zeros_like(self.frame(self.first)) if result is None
+                else result)
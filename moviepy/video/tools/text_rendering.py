@@ -0,0 +1,427 @@
+"""
+This module implements the rendering of the pictures of ``TextClip``.
+
+The texts are rendered in the Python process with Pillow (FreeType), or
+with ImageMagick when Pillow is not installed or can't render the text
+(font or color unknown to Pillow). The rendered pictures are kept in a
+cache, indexed by a hash of everything that determines the picture (text,
+font file, size, colors, stroke, layout), so that a same text is rendered
+only once:
+
+- in memory (the ``TEXT_CACHE_SIZE`` pictures used most recently),
+- and on disk, in the folder ``TEXT_CACHE_DIR`` if it is set:
+
+>>> import moviepy.video.tools.text_rendering as text_rendering
+>>> text_rendering.TEXT_CACHE_DIR = "/some/folder"
+"""
+
+import os
+import json
+import hashlib
+import tempfile
+import threading
+from collections import OrderedDict
+
+import numpy as np
+from imageio import imread
+
+from moviepy.config import get_setting
+from moviepy.tools import subprocess_call, file_key
+
+try:
+    from PIL import Image, ImageDraw, ImageFont, ImageColor
+    PIL_FOUND = True
+except ImportError:
+    PIL_FOUND = False
+
+
+# Changing this invalidates the pictures cached on disk.
+CACHE_VERSION = 1
+
+# Number of pictures kept in memory.
+TEXT_CACHE_SIZE = 256
+
+# Folder where the pictures are also kept, or None.
+TEXT_CACHE_DIR = None
+
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+# Folders searched for font files by ``find_font``.
+FONT_DIRS = ['/usr/share/fonts', '/usr/local/share/fonts',
+             os.path.expanduser('~/.fonts'),
+             os.path.expanduser('~/.local/share/fonts'),
+             '/Library/Fonts', '/System/Library/Fonts',
+             os.path.expanduser('~/Library/Fonts'),
+             os.path.join(os.environ.get('WINDIR', 'C:\\Windows'), 'Fonts')]
+
+# Fonts used for the names of the classic PostScript fonts (as ImageMagick
+# does), in order of preference.
+FONT_ALIASES = {
+    'courier': ['couriernew', 'cour', 'nimbusmonops-regular',
+                'nimbusmono-regular', 'liberationmono-regular', 'freemono',
+                'dejavusansmono'],
+    'helvetica': ['helvetica', 'arial', 'nimbussans-regular',
+                  'liberationsans-regular', 'freesans', 'dejavusans'],
+    'arial': ['arial', 'liberationsans-regular', 'nimbussans-regular',
+              'freesans', 'dejavusans'],
+    'times': ['timesnewroman', 'times', 'nimbusroman-regular',
+              'liberationserif-regular', 'freeserif', 'dejavuserif'],
+}
+
+_fonts = {}  # normalized name -> font file, filled by ``font_files``
+
+
+class TextRenderingError(Exception):
+    """ Raised when Pillow can't render a text (the text is then rendered
+    by ImageMagick, if possible). """
+    pass
+
+
+# FONTS AND COLORS
+
+def _normalize(name):
+    return "".join([c for c in name.lower() if c not in " -_"])
+
+
+def font_files():
+    """ Returns a dict (normalized font name -> font file) of the fonts
+    found in the ``FONT_DIRS``. The folders are only scanned once. """
+    if not _fonts:
+        for folder in FONT_DIRS:
+            for root, dirs, files in os.walk(folder):
+                for f in sorted(files):
+                    name, ext = os.path.splitext(f)
+                    if ext.lower() in ('.ttf', '.otf', '.ttc'):
+                        _fonts.setdefault(_normalize(name),
+                                          os.path.join(root, f))
+    return _fonts
+
+
+def find_font(font):
+    """ Returns the file of a font given by name ('DejaVu-Sans',
+    'Courier'...) or by file name. Raises TextRenderingError if the font
+    can't be found. """
+    if os.path.isfile(font):
+        return font
+    fonts = font_files()
+    name = _normalize(font)
+    aliases = [_normalize(a) for a in FONT_ALIASES.get(name, [])]
+    for candidate in [name, name + 'regular'] + aliases:
+        if candidate in fonts:
+            return fonts[candidate]
+    raise TextRenderingError("font %s not found" % font)
+
+
+def parse_color(color):
+    """ Returns the RGBA tuple of a color given by name, '#rrggbb',
+    'rgb(r,g,b)'..., or 'transparent'. """
+    if color in (None, 'none', 'transparent'):
+        return (0, 0, 0, 0)
+    try:
+        rgba = ImageColor.getcolor(color, 'RGBA')
+    except ValueError:
+        raise TextRenderingError("color %s unknown" % color)
+    return tuple(rgba)
+
+
+# RENDERING WITH PILLOW
+
+def _layout(txt, fnt, width, kerning, interline, caption):
+    """ Returns the lines of the text (wrapped in ``width`` pixels for
+    captions), the width of each line, and the height of a line. """
+
+    def line_width(line):
+        if kerning is None:
+            return fnt.getlength(line)
+        return (sum([fnt.getlength(c) for c in line]) +
+                kerning * max(0, len(line) - 1))
+
+    lines = []
+    for paragraph in txt.split('\n'):
+        if not (caption and width):
+            lines.append(paragraph)
+            continue
+        line = None
+        for word in paragraph.split(' '):
+            longer = word if line is None else line + ' ' + word
+            if (line is not None) and (line_width(longer) > width):
+                lines.append(line)
+                line = word
+            else:
+                line = longer
+        lines.append(line or '')
+
+    ascent, descent = fnt.getmetrics()
+    line_height = ascent + descent + (interline or 0)
+    return lines, [line_width(l) for l in lines], line_height
+
+
+def render_text_pillow(txt, tamano=None, color='black',
+                       bg_color='transparent', fontsize=None,
+                       font='Courier', stroke_color=None, stroke_width=1,
+                       method='label', kerning=None, align='center',
+                       interline=None):
+    """ Renders a text with Pillow, see ``TextClip`` for the parameters.
+    Returns a HxWx4 RGBA array. """
+
+    if not PIL_FOUND:
+        raise TextRenderingError("Pillow is not installed")
+
+    fontfile = find_font(font)
+    fill, bg = parse_color(color), parse_color(bg_color)
+    stroke = parse_color(stroke_color) if stroke_color is not None else None
+    sw = int(round(stroke_width)) if stroke is not None else 0
+    w, h = tamano if tamano is not None else (None, None)
+    caption = (method == 'caption')
+
+    def layout(size):
+        fnt = ImageFont.truetype(fontfile, size)
+        return (fnt,) + _layout(txt, fnt, w and (w - 2 * sw), kerning,
+                                interline, caption)
+
+    if fontsize is None and (w or h):
+        # Largest font size for which the text fits in the picture
+        def fits(size):
+            fnt, lines, widths, line_height = layout(size)
+            return (((w is None) or (max(widths) + 2 * sw <= w)) and
+                    ((h is None) or (len(lines) * line_height + 2 * sw <= h)))
+        lo, hi = 1, 2
+        while fits(hi) and hi < 2048:
+            lo, hi = hi, 2 * hi
+        while hi - lo > 1:
+            mid = (lo + hi) // 2
+            lo, hi = (mid, hi) if fits(mid) else (lo, mid)
+        fontsize = lo
+    elif fontsize is None:
+        fontsize = 12
+
+    fnt, lines, widths, line_height = layout(fontsize)
+    block_w = int(np.ceil(max(widths))) + 2 * sw
+    block_h = len(lines) * line_height + 2 * sw
+    W = w or block_w
+    H = h or block_h
+
+    gravity = (align or 'center').lower()
+    halign = ('left' if 'west' in gravity else
+              'right' if 'east' in gravity else 'center')
+    y0 = (0 if 'north' in gravity else
+          H - block_h if 'south' in gravity else (H - block_h) // 2)
+
+    # Coverage of the text, and of the text with its stroke
+    text_cov = Image.new('L', (W, H), 0)
+    stroke_cov = Image.new('L', (W, H), 0)
+    drawings = [(ImageDraw.Draw(text_cov), 0)]
+    if sw:
+        drawings.append((ImageDraw.Draw(stroke_cov), sw))
+
+    for i, (line, lw) in enumerate(zip(lines, widths)):
+        x = (sw if halign == 'left' else
+             W - sw - lw if halign == 'right' else (W - lw) / 2.0)
+        y = y0 + sw + i * line_height
+        for draw, width in drawings:
+            if kerning is None:
+                draw.text((x, y), line, font=fnt, fill=255,
+                          stroke_width=width, stroke_fill=255)
+            else:
+                xc = x
+                for c in line:
+                    draw.text((xc, y), c, font=fnt, fill=255,
+                              stroke_width=width, stroke_fill=255)
+                    xc += fnt.getlength(c) + kerning
+
+    # Composition of the background, stroke, and text
+    rgb = np.zeros((H, W, 3), dtype='float32')
+    rgb[:] = bg[:3]
+    alpha = np.full((H, W), bg[3] / 255.0, dtype='float32')
+    layers = [(stroke_cov, stroke)] if sw else []
+    layers.append((text_cov, fill))
+    for cov, col in layers:
+        a = (np.asarray(cov, dtype='float32') / 255) * (col[3] / 255.0)
+        new_alpha = a + alpha * (1 - a)
+        safe = np.maximum(new_alpha, 1e-6)[:, :, None]
+        rgb = (np.array(col[:3], dtype='float32') * a[:, :, None] +
+               rgb * (alpha * (1 - a))[:, :, None]) / safe
+        alpha = new_alpha
+
+    result = np.empty((H, W, 4), dtype='uint8')
+    result[:, :, :3] = np.clip(rgb + 0.5, 0, 255)
+    result[:, :, 3] = np.clip(255 * alpha + 0.5, 0, 255)
+    return result
+
+
+# RENDERING WITH IMAGEMAGICK
+
+def render_text_imagemagick(txt=None, filename=None, tamano=None,
+                            color='black', bg_color='transparent',
+                            fontsize=None, font='Courier', stroke_color=None,
+                            stroke_width=1, method='label', kerning=None,
+                            align='center', interline=None,
+                            tempfilename=None, temptxt=None,
+                            remove_temp=True, print_cmd=False):
+    """ Renders a text (or the text of file ``filename``) with
+    ImageMagick, see ``TextClip`` for the parameters. Returns a HxWx4
+    RGBA array. """
+
+    if txt is not None:
+        if temptxt is None:
+            temptxt_fd, temptxt = tempfile.mkstemp(suffix='.txt')
+            try:  # only in Python3 will this work
+                os.write(temptxt_fd, bytes(txt, 'UTF8'))
+            except TypeError:  # oops, fall back to Python2
+                os.write(temptxt_fd, txt)
+            os.close(temptxt_fd)
+        txt = '@' + temptxt
+    else:
+        # use a file instead of a text.
+        txt = "@%" + filename
+
+    if tamano is not None:
+        tamano = ('' if tamano[0] is None else str(tamano[0]),
+                  '' if tamano[1] is None else str(tamano[1]))
+
+    cmd = ([get_setting("IMAGEMAGICK_BINARY"),
+            "-background", bg_color,
+            "-fill", color,
+            "-font", font])
+
+    if fontsize is not None:
+        cmd += ["-pointsize", "%d" % fontsize]
+    if kerning is not None:
+        cmd += ["-kerning", "%0.1f" % kerning]
+    if stroke_color is not None:
+        cmd += ["-stroke", stroke_color, "-strokewidth",
+                "%.01f" % stroke_width]
+    if tamano is not None:
+        cmd += ["-size", "%sx%s" % (tamano[0], tamano[1])]
+    if align is not None:
+        cmd += ["-gravity", align]
+    if interline is not None:
+        cmd += ["-interline-spacing", "%d" % interline]
+
+    if tempfilename is None:
+        tempfile_fd, tempfilename = tempfile.mkstemp(suffix='.png')
+        os.close(tempfile_fd)
+
+    cmd += ["%s:%s" % (method, txt),
+            "-type", "truecolormatte", "PNG32:%s" % tempfilename]
+
+    if print_cmd:
+        print(" ".join(cmd))
+
+    try:
+        subprocess_call(cmd, verbose=False)
+    except (IOError, OSError) as err:
+        error = ("MoviePy Error: creation of %s failed because "
+                 "of the following error:\n\n%s.\n\n." % (filename, str(err))
+                 + ("This error can be due to the fact that "
+                    "ImageMagick is not installed on your computer, or "
+                    "(for Windows users) that you didn't specify the "
+                    "path to the ImageMagick binary in file conf.py, or."
+                    "that the path you specified is incorrect"))
+        raise IOError(error)
+
+    img = imread(tempfilename)
+
+    if remove_temp:
+        if os.path.exists(tempfilename):
+            os.remove(tempfilename)
+        if (temptxt is not None) and os.path.exists(temptxt):
+            os.remove(temptxt)
+
+    return img
+
+
+# CACHE
+
+def text_key(renderer, txt, style):
+    """ Hash of everything that determines the picture of a text. """
+    font = style.get('font')
+    if renderer == 'pillow':
+        font = file_key(find_font(font))
+    description = [CACHE_VERSION, renderer, txt,
+                   sorted([(k, v) for (k, v) in style.items()
+                           if k != 'font']), font]
+    return hashlib.sha1(json.dumps(description, default=str)
+                        .encode('utf8')).hexdigest()
+
+
+def _cache_get(key):
+    with _cache_lock:
+        if key in _cache:
+            _cache.move_to_end(key)
+            return _cache[key]
+    if TEXT_CACHE_DIR is not None:
+        path = os.path.join(TEXT_CACHE_DIR, key + '.npy')
+        if os.path.exists(path):
+            img = np.load(path)
+            _cache_put(key, img, to_disk=False)
+            return img
+    return None
+
+
+def _cache_put(key, img, to_disk=True):
+    img.flags.writeable = False  # the pictures are shared
+    with _cache_lock:
+        _cache[key] = img
+        while len(_cache) > TEXT_CACHE_SIZE:
+            _cache.popitem(last=False)
+    if to_disk and (TEXT_CACHE_DIR is not None):
+        if not os.path.exists(TEXT_CACHE_DIR):
+            os.makedirs(TEXT_CACHE_DIR)
+        path = os.path.join(TEXT_CACHE_DIR, key + '.npy')
+        temp = "%s.%d.%d.npy" % (path[:-4], os.getpid(),
+                                 threading.current_thread().ident)
+        np.save(temp, img)
+        os.rename(temp, path)
+
+
+def clear_text_cache():
+    """ Empties the cache of the pictures in memory (not on disk). """
+    with _cache_lock:
+        _cache.clear()
+
+
+def render_text(txt=None, filename=None, renderer='auto', cache=True,
+                imagemagick_params=None, **style):
+    """ Returns the HxWx4 RGBA picture of a text (or of the text of file
+    ``filename``), from the cache if it was already rendered.
+
+    ``renderer`` is 'pillow', 'imagemagick', or 'auto' (Pillow if it can
+    render the text, else ImageMagick). ``style`` contains the other
+    parameters of ``TextClip`` (tamano, color, font...).
+    ``imagemagick_params`` are the parameters only used by ImageMagick
+    (tempfilename, temptxt, remove_temp, print_cmd). Returns a copy of
+    the cached picture, which can be modified.
+    """
+    if renderer not in ('auto', 'pillow', 'imagemagick'):
+        raise ValueError("MoviePy error: renderer must be 'auto', 'pillow' "
+                         "or 'imagemagick', not %s" % renderer)
+
+    content = txt
+    if content is None:
+        with open(filename, 'rb') as f:
+            content = f.read().decode('utf8')
+
+    if renderer != 'imagemagick':
+        try:
+            key = text_key('pillow', content, style) if cache else None
+            img = _cache_get(key) if cache else None
+            if img is None:
+                img = render_text_pillow(content, **style)
+                if cache:
+                    _cache_put(key, img)
+            return img.copy()
+        except TextRenderingError:
+            if renderer == 'pillow':
+                raise
+
+    key = text_key('imagemagick', content, style) if cache else None
+    img = _cache_get(key) if cache else None
+    if img is None:
+        img = render_text_imagemagick(txt, filename,
+                                      **dict(style, **(imagemagick_params
+                                                       or {})))
+        if cache:
+            _cache_put(key, img)
+    return img.copy()
@@ -0,0 +1,186 @@
+"""
+This module implements the extraction of thumbnails of video files (for
+contact sheets, scrubbing bars, sprite sheets of web players...).
+
+With ``keyframes=True`` (default), each thumbnail is the keyframe nearest
+to its time. The keyframes are listed without decoding anything (see
+``ffmpeg_keyframes``), then a single ffmpeg process decodes only the
+keyframes (``-skip_frame nokey``) up to the last one wanted, and resizes
+and sends only the keyframes wanted.
+
+With ``keyframes=False``, each thumbnail is the exact frame at its time,
+fetched by its own ffmpeg process, which seeks in the file and decodes
+the frames from the keyframe before. The processes run in parallel.
+"""
+
+import os
+import bisect
+import subprocess as sp
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from imageio import imsave
+
+from moviepy.config import get_setting
+from moviepy.telemetry import count
+from moviepy.video.io.ffmpeg_reader import (ffmpeg_keyframes,
+                                           ffmpeg_parse_infos)
+
+try:
+    from subprocess import DEVNULL  # py3k
+except ImportError:
+    DEVNULL = open(os.devnull, 'wb')
+
+
+def thumbnail_times(duracion, n):
+    """ Times of ``n`` thumbnails equally spaced in a video of duration
+    ``duracion`` (the middles of ``n`` equal parts of the video). """
+    return [(i + 0.5) * duracion / n for i in range(n)]
+
+
+def nearest_keyframes(keyframes, times):
+    """ Indices, in the sorted list ``keyframes``, of the keyframes nearest
+    to each of the ``times``. """
+    result = []
+    for t in times:
+        i = bisect.bisect_left(keyframes, t)
+        if i == len(keyframes) or (i > 0 and
+                                   t - keyframes[i - 1] <= keyframes[i] - t):
+            i -= 1
+        result.append(i)
+    return result
+
+
+def ffmpeg_keyframe_thumbnails(filename, indices, tamano):
+    """ Returns the keyframes number ``indices`` of the file (a list of
+    frames in the order of ``indices``), resized to ``tamano``, decoded
+    in a single pass of ffmpeg. """
+
+    w, h = tamano
+    wanted = sorted(set(indices))
+    # with -skip_frame nokey, the n-th frame decoded is the n-th keyframe
+    select = "+".join(["eq(n\\,%d)" % i for i in wanted])
+    cmd = [get_setting("FFMPEG_BINARY"), '-skip_frame', 'nokey',
+           '-i', filename, '-loglevel', 'error', '-map', '0:v:0',
+           '-vf', "select='%s',scale=%d:%d" % (select, w, h),
+           '-vsync', '0', '-frames:v', '%d' % len(wanted),
+           '-f', 'image2pipe', '-pix_fmt', 'rgb24', '-vcodec', 'rawvideo',
+           '-']
+
+    popen_params = {"stdout": sp.PIPE,
+                    "stderr": sp.PIPE,
+                    "stdin": DEVNULL}
+    if os.name == "nt":
+        popen_params["creationflags"] = 0x08000000
+
+    proc = sp.Popen(cmd, **popen_params)
+    count('decoder_spawns')
+    out, err = proc.communicate()
+    if len(out) != len(wanted) * w * h * 3:
+        raise IOError("MoviePy error: failed to read the keyframes %s of "
+                      "%s:\n\n%s" % (wanted, filename,
+                                      err.decode('utf8', 'replace')))
+    frames = np.frombuffer(out, dtype='uint8').reshape((-1, h, w, 3))
+    position = dict((k, i) for (i, k) in enumerate(wanted))
+    return [frames[position[k]] for k in indices]
+
+
+def ffmpeg_thumbnail(filename, t, tamano, keyframes=True):
+    """ Returns the frame at time ``t`` of the file (or the keyframe before
+    it, if ``keyframes`` is True), resized to ``tamano`` by ffmpeg. """
+
+    w, h = tamano
+    if keyframes:
+        i_arg = ['-skip_frame', 'nokey', '-ss', "%.06f" % t,
+                 '-noaccurate_seek', '-i', filename]
+    else:
+        i_arg = ['-ss', "%.06f" % t, '-i', filename]
+    cmd = ([get_setting("FFMPEG_BINARY")] + i_arg +
+           ['-loglevel', 'error', '-frames:v', '1', '-vsync', '0',
+            '-vf', 'scale=%d:%d' % (w, h),
+            '-f', 'image2pipe', '-pix_fmt', 'rgb24',
+            '-vcodec', 'rawvideo', '-'])
+
+    popen_params = {"stdout": sp.PIPE,
+                    "stderr": sp.PIPE,
+                    "stdin": DEVNULL}
+    if os.name == "nt":
+        popen_params["creationflags"] = 0x08000000
+
+    proc = sp.Popen(cmd, **popen_params)
+    count('decoder_spawns')
+    out, err = proc.communicate()
+    if len(out) != w * h * 3:
+        raise IOError("MoviePy error: failed to read a thumbnail of %s at "
+                      "time %.02f:\n\n%s" % (filename, t,
+                                              err.decode('utf8', 'replace')))
+    return np.frombuffer(out, dtype='uint8').reshape((h, w, 3))
+
+
+def thumbnails(filename, n, width=160, keyframes=True, threads=4):
+    """ Returns ``n`` thumbnails of the video file, equally spaced, as a
+    list of (time, frame), where time is the time of the frame in the
+    file.
+
+    Parameters
+    -----------
+
+    filename
+      Name of the video file.
+
+    n
+      Number of thumbnails.
+
+    width
+      Width of the thumbnails in pixels. The height keeps the proportions
+      of the video.
+
+    keyframes
+      If True, each thumbnail is the keyframe nearest to its time (fast,
+      only keyframes are decoded). If False, it is the exact frame at its
+      time, which requires decoding the frames between the keyframe
+      before and this time.
+
+    threads
+      Number of ffmpeg processes run at the same time (if ``keyframes``
+      is False).
+    """
+
+    infos = ffmpeg_parse_infos(filename)
+    w, h = infos['video_size']
+    tamano = (int(width), max(1, int(round(1.0 * width * h / w))))
+    times = thumbnail_times(infos['video_duration'], n)
+
+    if keyframes:
+        keyframe_times = ffmpeg_keyframes(filename)
+        indices = nearest_keyframes(keyframe_times, times)
+        frames = ffmpeg_keyframe_thumbnails(filename, indices, tamano)
+        return [(keyframe_times[i], f) for (i, f) in zip(indices, frames)]
+
+    def fetch(t):
+        return ffmpeg_thumbnail(filename, t, tamano, keyframes=False)
+
+    with ThreadPoolExecutor(max(1, threads)) as pool:
+        frames = list(pool.map(fetch, times))
+    return list(zip(times, frames))
+
+
+def sprite_sheet(filename, n, columns=10, width=160, keyframes=True,
+                 threads=4, output=None):
+    """ Returns an image (array) of ``n`` thumbnails of the video file (see
+    ``thumbnails``), laid out in a grid of ``columns`` columns, from left
+    to right then from top to bottom. If ``output`` is provided, the
+    image is also written in this file (e.g. a PNG or JPEG file). """
+
+    frames = [f for (t, f) in thumbnails(filename, n, width, keyframes,
+                                         threads)]
+    th, tw = frames[0].shape[:2]
+    columns = min(columns, n)
+    rows = (n + columns - 1) // columns
+    sheet = np.zeros((rows * th, columns * tw, 3), dtype='uint8')
+    for i, frame in enumerate(frames):
+        y, x = (i // columns) * th, (i % columns) * tw
+        sheet[y:y + th, x:x + tw] = frame
+    if output is not None:
+        imsave(output, sheet)
+    return sheet
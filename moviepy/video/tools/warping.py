@@ -0,0 +1,303 @@
+"""
+This module implements the affine warps (rotations...) of frames used by
+``fx.rotate``.
+
+An ``AffineWarp`` computes once, for a given source size, transformation
+and output size, where each pixel of the result is taken in the original
+frame (the index of the pixel and the interpolation weights of its
+neighbours). Warping a frame is then only a few gathers (``np.take``) in a
+bordered copy of the frame, made in a buffer allocated once per thread.
+The frame and its mask are warped together, as one array with an
+additional channel.
+
+The sampling follows Pillow's ``Image.transform``: the transformation
+maps the centers of the pixels of the result to coordinates in the
+original frame, the pixels out of the original frame are black (and
+transparent), and the interpolation near the edges repeats the pixels
+of the edges. When OpenCV is installed, the warps are done by
+``cv2.warpAffine``. Else, the bilinear and bicubic warps are done by
+Pillow (if installed), faster than Numpy for them, with the transformation
+computed once.
+"""
+
+import math
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+try:
+    import cv2
+    CV2_FOUND = True
+except ImportError:
+    CV2_FOUND = False
+
+try:
+    from PIL import Image
+    PIL_FOUND = True
+except ImportError:
+    PIL_FOUND = False
+
+
+# Number of AffineWarps kept by ``get_warp``. A warp of a 1920x1080 frame
+# takes up to 80Mb: the warps changing at each frame are not worth
+# keeping, only a few constant ones.
+WARPS_CACHE_SIZE = 4
+
+# Border around the frames (black for the nearest interpolation, a copy
+# of the edges for the others), wide enough for the bicubic interpolation
+# of the pixels near the edges.
+BORDER = 3
+
+_warps = OrderedDict()
+_warps_lock = threading.Lock()
+
+
+def _cubic(d, a=-1.0):
+    """ Weights of the bicubic interpolation (same as Pillow's
+    ``Image.transform``). """
+    d = np.abs(d)
+    return np.where(d <= 1, ((a + 2) * d - (a + 3)) * d * d + 1,
+                    np.where(d < 2, ((a * d - 5 * a) * d + 8 * a) * d - 4 * a,
+                             0))
+
+
+class AffineWarp:
+    """ Warps frames of size ``src_size`` into frames of size
+    ``dst_size`` (sizes given as (width, height)).
+
+    Parameters
+    -----------
+
+    src_size
+      Size (width, height) of the frames to warp.
+
+    matrix
+      Coefficients (a, b, c, d, e, f) of the transformation: the center
+      (x, y) of a pixel of the result comes from the point
+      (a*x + b*y + c, d*x + e*y + f) of the original frame, in pixels
+      (as in Pillow's ``Image.transform``).
+
+    dst_size
+      Size (width, height) of the warped frames.
+
+    resample
+      One of "nearest", "bilinear", or "bicubic".
+    """
+
+    def __init__(self, src_size, matrix, dst_size, resample='bicubic'):
+        if resample not in ('nearest', 'bilinear', 'bicubic'):
+            raise ValueError("MoviePy error: resample should be 'nearest', "
+                             "'bilinear' or 'bicubic', not %s." % resample)
+        self.src_size = tuple(src_size)
+        self.matrix = tuple(matrix)
+        self.dst_size = tuple(dst_size)
+        self.resample = resample
+        self._buffers = threading.local()
+        self.index = None  # taps of the Numpy warps, computed when needed
+
+    def _compute_taps(self):
+        (w, h), (nw, nh) = self.src_size, self.dst_size
+        a, b, c, d, e, f = self.matrix
+        x = np.arange(nw, dtype='float64')[None, :] + 0.5
+        y = np.arange(nh, dtype='float64')[:, None] + 0.5
+        # coordinates in pixel indices of the original frame
+        sx = (a * x + b * y + c - 0.5).ravel()
+        sy = (d * x + e * y + f - 0.5).ravel()
+        wp = w + 2 * BORDER
+
+        if self.resample == 'nearest':
+            ix = np.floor(sx + 0.5)
+            iy = np.floor(sy + 0.5)
+            out = (ix < -1) | (ix > w) | (iy < -1) | (iy > h)
+            ix[out] = iy[out] = -1
+            self.index = ((iy + BORDER) * wp + ix + BORDER).astype(np.intp)
+            return
+
+        # as in Pillow, a pixel is out if its center is out of the frame
+        out = (sx < -0.5) | (sx >= w - 0.5) | (sy < -0.5) | (sy >= h - 0.5)
+        sx[out] = sy[out] = 0
+        self.out = np.flatnonzero(out)
+        x0, y0 = np.floor(sx), np.floor(sy)
+        fx, fy = sx - x0, sy - y0
+        if self.resample == 'bilinear':
+            self.offsets = (0, 1)
+            self.x_weights = np.array([1 - fx, fx], dtype='float32')
+            self.y_weights = np.array([1 - fy, fy], dtype='float32')
+        else:
+            self.offsets = (-1, 0, 1, 2)
+            self.x_weights = np.array([_cubic(fx - o) for o in self.offsets],
+                                      dtype='float32')
+            self.y_weights = np.array([_cubic(fy - o) for o in self.offsets],
+                                      dtype='float32')
+        self.index = ((y0 + BORDER) * wp + x0 + BORDER).astype(np.intp)
+
+    def _buffer(self, name, shape, dtype='float32'):
+        buf = getattr(self._buffers, name, None)
+        if buf is None or buf.shape != shape or buf.dtype != dtype:
+            buf = np.zeros(shape, dtype=dtype)
+            setattr(self._buffers, name, buf)
+        return buf
+
+    def _bordered(self, pic, mask):
+        """ Copies the frame (and the mask as an additional channel) in a
+        buffer with black borders. Returns the buffer as a
+        (pixels x channels) array. """
+        w, h = self.src_size
+        channels = (1 if pic.ndim == 2 else pic.shape[2])
+        total = channels + (0 if mask is None else 1)
+        dtype = (pic.dtype if (self.resample == 'nearest' and mask is None)
+                 else np.dtype('float32'))
+        buf = self._buffer('src', (h + 2 * BORDER, w + 2 * BORDER, total),
+                           dtype)
+        inside = buf[BORDER:BORDER + h, BORDER:BORDER + w]
+        inside[:, :, :channels] = pic.reshape((h, w, channels))
+        if mask is not None:
+            inside[:, :, channels] = mask
+        if self.resample != 'nearest':
+            # the interpolation repeats the edges (the border of the
+            # nearest interpolation stays black)
+            buf[:BORDER] = buf[BORDER]
+            buf[BORDER + h:] = buf[BORDER + h - 1]
+            buf[:, :BORDER] = buf[:, BORDER:BORDER + 1]
+            buf[:, BORDER + w:] = buf[:, BORDER + w - 1:BORDER + w]
+        return buf.reshape((-1, total))
+
+    def _gather(self, src):
+        """ Warps the (pixels x channels) bordered frame ``src``. """
+        n, channels = len(self.index), src.shape[1]
+        if self.resample == 'nearest':
+            return np.take(src, self.index, axis=0, mode='clip')
+
+        wp = self.src_size[0] + 2 * BORDER
+        tmp = self._buffer('tmp', (n, channels))
+        row = self._buffer('row', (n, channels))
+        acc = self._buffer('acc', (n, channels))
+        acc[...] = 0
+        for i, oy in enumerate(self.offsets):
+            row[...] = 0
+            for j, ox in enumerate(self.offsets):
+                np.take(src, self.index + (oy * wp + ox), axis=0, out=tmp,
+                        mode='clip')
+                tmp *= self.x_weights[j][:, None]
+                row += tmp
+            row *= self.y_weights[i][:, None]
+            acc += row
+        acc[self.out] = 0
+        return acc
+
+    def _cv2_warp(self, src):
+        a, b, c, d, e, f = self.matrix
+        # the same transformation, in pixel indices
+        M = np.array([[a, b, c + 0.5 * (a + b - 1)],
+                      [d, e, f + 0.5 * (d + e - 1)]])
+        flags = {'nearest': cv2.INTER_NEAREST, 'bilinear': cv2.INTER_LINEAR,
+                 'bicubic': cv2.INTER_CUBIC}[self.resample]
+        return cv2.warpAffine(src, M, self.dst_size,
+                              flags=flags | cv2.WARP_INVERSE_MAP,
+                              borderMode=cv2.BORDER_CONSTANT, borderValue=0)
+
+    def _pil_warp(self, pic):
+        """ Warps an uint8 frame or a float frame (HxW) with Pillow. """
+        resample = {'bilinear': Image.BILINEAR,
+                    'bicubic': Image.BICUBIC}[self.resample]
+        if pic.dtype != np.uint8:
+            pic = pic.astype('float32')
+        return np.array(Image.fromarray(pic).transform(
+            self.dst_size, Image.AFFINE, self.matrix, resample))
+
+    def __call__(self, pic, mask=None):
+        """ Returns the warped frame (same type as the frame), or the
+        warped frame and mask (float32) if a mask is given. """
+        pic = np.asarray(pic)
+        if pic.shape[1::-1] != self.src_size:
+            raise ValueError("MoviePy error: this warp transforms frames "
+                             "of size %s, not %s." % (self.src_size,
+                                                      pic.shape[1::-1]))
+        nw, nh = self.dst_size
+        channels = (1 if pic.ndim == 2 else pic.shape[2])
+
+        if CV2_FOUND:
+            if mask is None and pic.dtype == np.uint8:
+                src = pic
+            else:
+                total = channels + (0 if mask is None else 1)
+                src = np.empty(pic.shape[:2] + (total,), 'float32')
+                src[:, :, :channels] = pic.reshape(pic.shape[:2] +
+                                                   (channels,))
+                if mask is not None:
+                    src[:, :, channels] = mask
+            result = self._cv2_warp(src).reshape((nh, nw, -1))
+        elif (PIL_FOUND and self.resample != 'nearest' and
+              ((pic.dtype == np.uint8 and channels in (1, 3, 4))
+               or pic.ndim == 2)):
+            # Faster than Numpy for these interpolations
+            frame = self._pil_warp(pic)
+            if mask is None:
+                return frame
+            return frame, np.clip(self._pil_warp(np.asarray(mask)), 0, 1)
+        else:
+            if self.index is None:
+                self._compute_taps()
+            result = self._gather(self._bordered(pic, mask))
+            result = result.reshape((nh, nw, -1))
+
+        frame = result[:, :, :channels]
+        if pic.dtype == np.uint8:
+            # truncated, as Pillow does
+            frame = (frame if frame.dtype == np.uint8 else
+                     np.clip(frame, 0, 255).astype('uint8'))
+        else:
+            frame = frame.astype('float32')  # a new array
+        frame = frame.reshape((nh, nw) + pic.shape[2:])
+        if mask is None:
+            return frame
+        return frame, np.clip(result[:, :, channels], 0, 1)
+
+
+def rotation(src_size, angle, expand=True):
+    """ Returns the matrix (see ``AffineWarp``) and the size of the
+    result of the rotation of frames of size ``src_size`` by ``angle``
+    degrees (counterclockwise) around their center, as computed by
+    Pillow's ``Image.rotate``. If ``expand`` is True, the result is big
+    enough to hold the whole rotated frame. """
+    w, h = src_size
+    angle = -math.radians(angle)
+    a, b = round(math.cos(angle), 15), round(math.sin(angle), 15)
+    d, e = -b, a
+    transform = lambda x, y, c, f: (a * x + b * y + c, d * x + e * y + f)
+    c, f = transform(-w / 2.0, -h / 2.0, 0, 0)
+    c, f = c + w / 2.0, f + h / 2.0
+    if expand:
+        corners = [transform(x, y, c, f)
+                   for (x, y) in ((0, 0), (w, 0), (w, h), (0, h))]
+        xx, yy = zip(*corners)
+        nw = int(math.ceil(max(xx)) - math.floor(min(xx)))
+        nh = int(math.ceil(max(yy)) - math.floor(min(yy)))
+        c, f = transform(-(nw - w) / 2.0, -(nh - h) / 2.0, c, f)
+        w, h = nw, nh
+    return (a, b, c, d, e, f), (w, h)
+
+
+def get_warp(src_size, matrix, dst_size, resample='bicubic'):
+    """ Returns an AffineWarp, reusing the warps used recently. """
+    key = (tuple(map(int, src_size)), tuple(matrix),
+           tuple(map(int, dst_size)), resample)
+    with _warps_lock:
+        warp = _warps.get(key, None)
+        if warp is not None:
+            _warps.move_to_end(key)
+            return warp
+    warp = AffineWarp(*key)
+    with _warps_lock:
+        _warps[key] = warp
+        while len(_warps) > WARPS_CACHE_SIZE:
+            _warps.popitem(last=False)
+    return warp
+
+
+def get_rotation(src_size, angle, expand=True, resample='bicubic'):
+    """ Returns the AffineWarp of the rotation of frames of size
+    ``src_size`` by ``angle`` degrees (see ``rotation``). """
+    matrix, dst_size = rotation(src_size, angle, expand)
+    return get_warp(src_size, matrix, dst_size, resample)
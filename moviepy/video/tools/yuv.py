@@ -0,0 +1,196 @@
+"""
+This module implements YUVFrame, a planar YUV 4:2:0 (yuv420p) frame
+which can be read from video files and written to video files without
+any colorspace conversion, and the conversions between YUV and RGB.
+
+A YUVFrame looks like a HxWx3 RGB array to the rest of MoviePy: it has
+the ``shape`` and ``dtype`` of the corresponding RGB frame, and it is
+converted to RGB (once, lazily) as soon as an operation needs the RGB
+pixels. Cuts, concatenations, crops on even boundaries and fades do not
+need the RGB pixels and keep the frame in YUV.
+
+The conversions use the BT.601 'limited range' coefficients, which are
+the ones used by ffmpeg for rgb24 <-> yuv420p.
+"""
+
+import numpy as np
+
+
+def yuv_to_rgb(y, u, v):
+    """ Converts Y, U, V planes into a HxWx3 RGB array.
+
+    The chroma planes ``u`` and ``v`` can be subsampled horizontally
+    and/or vertically (4:2:0, 4:2:2, 4:4:4), they are upsampled by
+    pixel repetition.
+    """
+    h, w = y.shape
+    fy = 2 if u.shape[0] < h else 1
+    fx = 2 if u.shape[1] < w else 1
+    if fy == fx == 1:
+        uu, vv = u, v
+    else:
+        uu = u.repeat(fy, axis=0).repeat(fx, axis=1)[:h, :w]
+        vv = v.repeat(fy, axis=0).repeat(fx, axis=1)[:h, :w]
+
+    luma = 1.164 * (y.astype('float32') - 16)
+    uu = uu.astype('float32') - 128
+    vv = vv.astype('float32') - 128
+
+    rgb = np.empty((h, w, 3), dtype='float32')
+    rgb[:, :, 0] = luma + 1.596 * vv
+    rgb[:, :, 1] = luma - 0.392 * uu - 0.813 * vv
+    rgb[:, :, 2] = luma + 2.017 * uu
+    np.clip(rgb, 0, 255, out=rgb)
+    return (rgb + 0.5).astype('uint8')
+
+
+def rgb_to_yuv(color):
+    """ Converts a RGB color (or array of colors) into Y, U, V values. """
+    r, g, b = [1.0 * np.asarray(color)[..., i] for i in range(3)]
+    y = 16 + 0.257 * r + 0.504 * g + 0.098 * b
+    u = 128 - 0.148 * r - 0.291 * g + 0.439 * b
+    v = 128 + 0.439 * r - 0.368 * g - 0.071 * b
+    return y, u, v
+
+
+def _to_uint8(arr):
+    return np.clip(arr + 0.5, 0, 255).astype('uint8')
+
+
+class YUVFrame:
+    """ A video frame stored as three yuv420p planes.
+
+    Parameters
+    -----------
+
+    y
+      HxW array (uint8) of the luma.
+
+    u, v
+      ceil(H/2)xceil(W/2) arrays (uint8) of the chroma.
+    """
+
+    def __init__(self, y, u, v):
+        self.y = y
+        self.u = u
+        self.v = v
+        self._rgb = None
+
+    @staticmethod
+    def from_buffer(s, w, h):
+        """ Makes a YUVFrame from the raw yuv420p bytes of a frame. """
+        cw, ch = (w + 1) // 2, (h + 1) // 2
+        arr = np.frombuffer(s, dtype='uint8')
+        y = arr[:w * h].reshape((h, w))
+        u = arr[w * h: w * h + cw * ch].reshape((ch, cw))
+        v = arr[w * h + cw * ch:].reshape((ch, cw))
+        return YUVFrame(y, u, v)
+
+    @staticmethod
+    def from_rgb(img):
+        """ Makes a YUVFrame from a HxWx3 RGB array (2x2-averaged chroma). """
+        img = np.asarray(img)[:, :, :3]
+        h, w = img.shape[:2]
+        y, u, v = rgb_to_yuv(img)
+        if (h % 2) or (w % 2):
+            pad = ((0, h % 2), (0, w % 2))
+            u, v = np.pad(u, pad, 'edge'), np.pad(v, pad, 'edge')
+        u = u.reshape((u.shape[0] // 2, 2, u.shape[1] // 2, 2)).mean(axis=(1, 3))
+        v = v.reshape((v.shape[0] // 2, 2, v.shape[1] // 2, 2)).mean(axis=(1, 3))
+        return YUVFrame(_to_uint8(y), _to_uint8(u), _to_uint8(v))
+
+    @property
+    def shape(self):
+        return self.y.shape + (3,)
+
+    @property
+    def dtype(self):
+        return self.y.dtype
+
+    @property
+    def ndim(self):
+        return 3
+
+    @property
+    def nbytes(self):
+        return self.y.nbytes + self.u.nbytes + self.v.nbytes
+
+    def to_rgb(self):
+        """ Returns the frame as a HxWx3 RGB array (computed only once). """
+        if self._rgb is None:
+            self._rgb = yuv_to_rgb(self.y, self.u, self.v)
+        return self._rgb
+
+    def to_bytes(self):
+        """ Returns the raw yuv420p bytes of the frame, for ffmpeg. """
+        return b"".join([np.ascontiguousarray(plane).tobytes()
+                         for plane in (self.y, self.u, self.v)])
+
+    def fade(self, factor, color=(0, 0, 0)):
+        """ Returns the frame faded towards ``color``: the result is
+        ``factor*frame + (1-factor)*color``, computed on the planes. """
+        cy, cu, cv = rgb_to_yuv(color)
+        return YUVFrame(_to_uint8(factor * self.y + (1 - factor) * cy),
+                        _to_uint8(factor * self.u + (1 - factor) * cu),
+                        _to_uint8(factor * self.v + (1 - factor) * cv))
+
+    def __getitem__(self, key):
+        """ Crops on even boundaries stay in YUV, anything else is
+        performed on the RGB frame. """
+        if not isinstance(key, tuple):
+            key = (key,)
+        if (len(key) <= 2 and
+                all(isinstance(k, slice) and k.step in (None, 1) for k in key)):
+            h, w = self.y.shape
+            (r0, r1, _) = key[0].indices(h)
+            (c0, c1, _) = key[1].indices(w) if len(key) == 2 else (0, w, 1)
+            if (r0 % 2 == 0 and c0 % 2 == 0 and r1 > r0 and c1 > c0 and
+                    (r1 % 2 == 0 or r1 == h) and (c1 % 2 == 0 or c1 == w)):
+                chroma = (slice(r0 // 2, (r1 + 1) // 2),
+                          slice(c0 // 2, (c1 + 1) // 2))
+                return YUVFrame(self.y[r0:r1, c0:c1],
+                                self.u[chroma], self.v[chroma])
+        return self.to_rgb()[key]
+
+    def __array__(self, dtype=None, copy=None):
+        rgb = self.to_rgb()
+        return rgb if dtype is None else rgb.astype(dtype)
+
+    def __getattr__(self, name):
+        # All the other array methods (astype, max, flatten...) are
+        # those of the RGB frame.
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return getattr(self.to_rgb(), name)
+
+    def __len__(self):
+        return self.y.shape[0]
+
+    def __pos__(self):
+        return +self.to_rgb()
+
+    def __neg__(self):
+        return -self.to_rgb()
+
+    def __add__(self, other):
+        return self.to_rgb() + other
+
+    def __radd__(self, other):
+        return other + self.to_rgb()
+
+    def __sub__(self, other):
+        return self.to_rgb() - other
+
+    def __rsub__(self, other):
+        return other - self.to_rgb()
+
+    def __mul__(self, other):
+        return self.to_rgb() * other
+
+    def __rmul__(self, other):
+        return other * self.to_rgb()
+
+    def __truediv__(self, other):
+        return self.to_rgb() / other
+
+    __div__ = __truediv__
@@ -25,5 +25,5 @@ setup(name='moviepy',
     url='http://zulko.github.io/moviepy/',
     license='MIT License',
     keywords="video editing audio compositing ffmpeg",
-    packages= find_packages(exclude='docs'),
+    packages= find_packages(exclude=['docs', 'benchmarks']),
     install_requires= ['numpy', 'decorator', 'imageio', 'tqdm'])
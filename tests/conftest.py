@@ -0,0 +1,67 @@
+"""
+Fixtures of the tests: small media files generated with ffmpeg.
+"""
+
+import subprocess as sp
+
+import pytest
+
+from moviepy.config import get_setting
+
+# test_install.py is an old script (Python 2), not a test module.
+collect_ignore = ['test_install.py']
+
+
+def ffmpeg(*args):
+    """ Runs ffmpeg with the given arguments, raises an error if it fails. """
+    cmd = [get_setting("FFMPEG_BINARY"), '-y', '-loglevel', 'error']
+    sp.check_call(cmd + list(args))
+
+
+@pytest.fixture(scope='session')
+def media_dir(tmp_path_factory):
+    return tmp_path_factory.mktemp('media')
+
+
+@pytest.fixture(scope='session')
+def index_video(media_dir):
+    """ A 64x48 video of 6 seconds at 30fps (lossless, a keyframe every 12
+    frames) where the gray level of frame N is (N * 7) % 256. """
+    filename = str(media_dir / 'index.mp4')
+    ffmpeg('-f', 'lavfi', '-i', "color=black:s=64x48:r=30:d=6,"
+           "geq=lum='mod(N*7,256)':cb=128:cr=128",
+           '-c:v', 'libx264', '-qp', '0', '-g', '12', '-bf', '2',
+           '-pix_fmt', 'yuv420p', filename)
+    return filename
+
+
+@pytest.fixture(scope='session')
+def sine_wav(media_dir):
+    """ A stereo WAV file of 12 seconds (a sine whose frequency changes
+    with time, so that no two parts of the sound are the same). """
+    filename = str(media_dir / 'sine.wav')
+    ffmpeg('-f', 'lavfi', '-i',
+           "aevalsrc='0.5*sin(2*PI*(200+20*t)*t)|0.5*cos(2*PI*300*t)'"
+           ":s=44100:d=12", '-c:a', 'pcm_s16le', filename)
+    return filename
+
+
+@pytest.fixture(scope='session')
+def short_mp3(media_dir):
+    """ An mp3 file of 3 seconds, whose duration found by ffmpeg is a bit
+    longer than its sound. """
+    filename = str(media_dir / 'short.mp3')
+    ffmpeg('-f', 'lavfi', '-i', "sine=frequency=300:duration=3", '-ac', '2',
+           filename)
+    return filename
+
+
+@pytest.fixture(scope='session')
+def av_video(media_dir):
+    """ A 64x48 video of 4 seconds with an AAC soundtrack. """
+    filename = str(media_dir / 'av.mp4')
+    ffmpeg('-f', 'lavfi', '-i', "testsrc=s=64x48:r=24:d=4",
+           '-f', 'lavfi', '-i', "sine=frequency=440:duration=4",
+           '-c:v', 'libx264', '-pix_fmt', 'yuv420p', '-c:a', 'aac', '-ac', '2',
+           filename)
+    return filename
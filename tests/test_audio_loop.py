@@ -0,0 +1,75 @@
+"""
+Tests of AudioLoopClip and of the buffers of FFMPEG_AudioReader.
+"""
+
+import numpy as np
+
+from moviepy.audio.AudioClip import (AudioClip, AudioLoopClip,
+                                     concatenate_audioclips)
+from moviepy.audio.io.AudioFileClip import AudioFileClip
+import moviepy.audio.fx.all as afx
+
+FPS = 44100
+
+
+def whole_sound(filename):
+    """ The sound of the file, read at once. """
+    return AudioFileClip(filename, buffersize=10 ** 7).reader.buffer
+
+
+def test_sequential_chunks(sine_wav):
+    whole = whole_sound(sine_wav)
+    clip = AudioFileClip(sine_wav)
+    chunks = list(clip.iter_chunks(fps=FPS, chunksize=50000))
+    sound = np.vstack(chunks)
+    n = len(sound)
+    assert np.array_equal(sound, whole[:n])
+
+
+def test_loop_synthetic():
+    make_frame = lambda t: np.array([np.sin(2 * np.pi * 440 * t),
+                                     np.cos(2 * np.pi * 220 * t)]).T
+    clip = AudioClip(make_frame, duracion=1.3)
+    looped = AudioLoopClip(clip, nloops=4)
+    assert looped.duracion == 4 * 1.3
+    concatenated = concatenate_audioclips(4 * [clip])
+    # chunks crossing the ends of loops, forward and backward
+    tt = np.arange(1.0, 3.0, 1.0 / FPS)
+    for times in (tt, tt[::-1]):
+        assert abs(looped.get_frame(times) -
+                   make_frame(times % 1.3)).max() < 1e-9
+    times = np.arange(0.1, 5.1, 1.0 / FPS)
+    assert abs(looped.get_frame(times) -
+               concatenated.get_frame(times)).max() < 1e-9
+
+
+def test_loop_subclip(sine_wav):
+    whole = whole_sound(sine_wav)
+    source = AudioFileClip(sine_wav)
+    start, end = 6, 11.5
+    looped = afx.audio_loop(source.subclip(start, end), nloops=4)
+    sound = looped.to_soundarray(fps=FPS)
+    period = whole[int(start * FPS):int(end * FPS)]
+    assert np.array_equal(sound, np.vstack(4 * [period]))
+    # the buffer at the start of the loop was kept
+    reader = source.reader
+    assert reader.head[0] == int(start * FPS) - reader.buffersize // 2
+
+
+def test_loop_short_mp3(short_mp3):
+    bed = AudioFileClip(short_mp3)
+    looped = afx.audio_loop(bed, duracion=10)
+    sound = looped.to_soundarray(fps=FPS)
+    assert sound.shape == (10 * FPS, 2)
+    concatenated = concatenate_audioclips(4 * [bed]).set_duracion(10)
+    assert np.array_equal(sound, concatenated.to_soundarray(fps=FPS))
+
+
+def test_read_past_the_end(short_mp3):
+    bed = AudioFileClip(short_mp3)
+    reader = bed.reader
+    # the duration found by ffmpeg is a bit longer than the sound
+    assert len(reader.buffer) == reader.buffersize
+    times = np.arange(bed.duracion - 0.1, bed.duracion, 1.0 / FPS)
+    sound = bed.get_frame(times)
+    assert sound.shape == (len(times), 2)
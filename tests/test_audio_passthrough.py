@@ -0,0 +1,42 @@
+"""
+Tests of the copy of unmodified soundtracks from their source file.
+"""
+
+from moviepy.audio.io.AudioFileClip import AudioFileClip
+from moviepy.video.io.VideoFileClip import VideoFileClip
+from moviepy.video.io.ffmpeg_reader import ffmpeg_parse_infos
+from moviepy.video.io.ffmpeg_writer import FFMPEG_VideoWriter
+import moviepy.audio.fx.all as afx
+
+
+def test_source_of_subclips(sine_wav):
+    clip = AudioFileClip(sine_wav)
+    assert clip.passthrough_source() == (sine_wav, 0, 'pcm_s16le')
+    sub = clip.subclip(2, 8)
+    assert sub.passthrough_source() == (sine_wav, 2, 'pcm_s16le')
+    assert sub.subclip(1, 3).passthrough_source() == (sine_wav, 3,
+                                                      'pcm_s16le')
+    assert sub.fx(afx.volumex, 0.5).passthrough_source() is None
+
+
+def test_writer_maps_the_audio_file(av_video, tmp_path):
+    writer = FFMPEG_VideoWriter(str(tmp_path / 'out.mp4'), (64, 48), 24,
+                                audiofile=av_video, audio_start=1,
+                                audio_duration=2)
+    cmd = writer.proc.args
+    writer.close()
+    i = cmd.index(av_video)
+    assert cmd[i - 5:i] == ['-ss', '1.000', '-t', '2.000', '-i']
+    assert cmd[i + 1:i + 7] == ['-map', '0:v:0', '-map', '1:a:0',
+                                '-acodec', 'copy']
+
+
+def test_passthrough_is_opt_in(av_video, tmp_path):
+    clip = VideoFileClip(av_video).subclip(1, 3)
+    assert clip.audio.passthrough_source()[1:] == (1, 'aac')
+    copied = str(tmp_path / 'copied.mp4')
+    clip.write_videofile(copied, audio_passthrough=True, verbose=False)
+    assert ffmpeg_parse_infos(copied)['audio_codec'] == 'aac'
+    encoded = str(tmp_path / 'encoded.mp4')
+    clip.write_videofile(encoded, verbose=False)
+    assert ffmpeg_parse_infos(encoded)['audio_codec'] == 'mp3'
@@ -0,0 +1,29 @@
+"""
+Tests of the benchmark runner.
+"""
+
+from benchmarks import runner
+
+
+def broken(fixtures, size):
+    raise ValueError("broken benchmark")
+
+
+def working(fixtures, size):
+    def run():
+        return size
+    return run
+
+
+def test_failures_are_recorded(tmp_path, monkeypatch):
+    monkeypatch.setattr(runner, 'BENCHMARKS',
+                        [('broken', broken, {'size': [1]}),
+                         ('working', working, {'size': [1, 2]})])
+    results = runner.run_benchmarks(str(tmp_path), repeat=2, verbose=False)
+    assert [r['params'] for r in results['results']] == [{'size': 1},
+                                                         {'size': 2}]
+    [failure] = results['failures']
+    assert failure['name'] == 'broken'
+    assert "broken benchmark" in failure['error']
+    table = runner.compare_results(results, results)
+    assert "broken size=1" in table and "FAILED" in table
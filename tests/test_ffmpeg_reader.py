@@ -0,0 +1,79 @@
+"""
+Tests of the access patterns of FFMPEG_VideoReader (decimated sparse reads,
+backward reads by chunks, loop heads): whatever the order of the reads,
+the frames must be those of a plain sequential read of the file.
+"""
+
+import numpy as np
+import pytest
+
+from moviepy import telemetry
+from moviepy.video.io.ffmpeg_reader import FFMPEG_VideoReader
+
+FPS = 30
+NFRAMES = 180  # see the index_video fixture
+
+
+@pytest.fixture(scope='module')
+def sequential(index_video):
+    """ The frames of the file, read one after the other. """
+    reader = FFMPEG_VideoReader(index_video)
+    frames = [reader.get_frame(1.0 * n / FPS) for n in range(NFRAMES)]
+    reader.close()
+    # The gray level of frame N is (N * 7) % 256, so the frames differ
+    # (except for the levels out of the video range 16-235, clipped).
+    levels = [frame[0, 0, 0] for frame in frames]
+    assert len(set(levels[3:32])) == 29
+    return frames
+
+
+def check_reads(filename, sequential, indices):
+    """ Reads the frames ``indices`` with a new reader, compares them with
+    the sequential read and returns the number of decoders started. """
+    spawns = telemetry.counters['decoder_spawns']
+    reader = FFMPEG_VideoReader(filename)
+    for n in indices:
+        frame = reader.get_frame(1.0 * n / FPS)
+        assert np.array_equal(frame, sequential[n]), "frame %d" % n
+    reader.close()
+    return telemetry.counters['decoder_spawns'] - spawns
+
+
+@pytest.mark.parametrize('step', [2, 3, 5, 12])
+@pytest.mark.parametrize('start', [0, 7])
+def test_strided(index_video, sequential, step, start):
+    check_reads(index_video, sequential, range(start, NFRAMES, step))
+
+
+@pytest.mark.parametrize('step', [1, 2, 3])
+def test_reverse(index_video, sequential, step):
+    spawns = check_reads(index_video, sequential,
+                         range(NFRAMES - 1, -1, -step))
+    # A few seeks before the pattern is detected, then chunks of 2 seconds
+    # (instead of one decoder per frame).
+    assert spawns <= 10
+
+
+def test_reverse_after_forward(index_video, sequential):
+    indices = list(range(0, 100)) + list(range(99, 20, -3))
+    check_reads(index_video, sequential, indices)
+
+
+def test_loop(index_video, sequential):
+    loop = list(range(40, 70))
+    spawns = check_reads(index_video, sequential, 5 * loop)
+    # the head of the loop is kept: no seek back for each loop
+    assert spawns <= 4
+
+
+def test_loop_longer_than_head(index_video, sequential):
+    check_reads(index_video, sequential, 3 * list(range(10, 100)))
+
+
+def test_mixed(index_video, sequential):
+    rng = np.random.RandomState(0)
+    indices = (list(range(0, 30)) + list(range(150, 60, -1)) +
+               list(range(60, 180, 4)) + 3 * list(range(90, 110)) +
+               list(range(179, 0, -2)) +
+               list(rng.randint(0, NFRAMES, size=40)))
+    check_reads(index_video, sequential, indices)
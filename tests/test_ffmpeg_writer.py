@@ -0,0 +1,73 @@
+"""
+Tests of ffmpeg_write_video with the sound piped to ffmpeg by a thread
+while the frames are written.
+"""
+
+import os
+import threading
+
+import numpy as np
+import pytest
+
+from moviepy.editor import AudioClip, VideoClip
+from moviepy.video.io import ffmpeg_writer
+from moviepy.video.io.ffmpeg_reader import ffmpeg_parse_infos
+
+pytestmark = pytest.mark.skipif(os.name == 'nt',
+                                reason="the audio is not piped on Windows")
+
+
+def sine(t):
+    return 0.5 * np.sin(2 * np.pi * 440 * t)
+
+
+def clip_with_audio(make_frame, duracion):
+    clip = VideoClip(make_frame, duracion=duracion)
+    return clip.set_audio(AudioClip(sine, duracion=duracion))
+
+
+@pytest.fixture
+def writers(monkeypatch):
+    """ The FFMPEG_VideoWriters created. """
+    created = []
+    base = ffmpeg_writer.FFMPEG_VideoWriter
+
+    class Writer(base):
+        def __init__(self, *args, **kwargs):
+            base.__init__(self, *args, **kwargs)
+            self.process = self.proc
+            created.append(self)
+
+    monkeypatch.setattr(ffmpeg_writer, 'FFMPEG_VideoWriter', Writer)
+    return created
+
+
+def test_audio_pipe(tmp_path, writers):
+    filename = str(tmp_path / 'out.mp4')
+    clip = clip_with_audio(lambda t: np.zeros((48, 64, 3), dtype='uint8'),
+                           duracion=2)
+    clip.write_videofile(filename, fps=10, verbose=False)
+    [writer] = writers
+    assert writer.process.returncode == 0
+    infos = ffmpeg_parse_infos(filename)
+    assert infos['audio_found']
+    assert abs(infos['duracion'] - 2) < 0.1
+
+
+def test_failed_frame(tmp_path, writers):
+    def make_frame(t):
+        if t >= 1:
+            raise RuntimeError("broken frame")
+        return np.zeros((48, 64, 3), dtype='uint8')
+
+    # a long sound: the thread is blocked on the pipe when the frame fails
+    clip = clip_with_audio(make_frame, duracion=30)
+    threads = threading.active_count()
+    with pytest.raises(RuntimeError):
+        clip.write_videofile(str(tmp_path / 'out.mp4'), fps=10,
+                             verbose=False)
+    # ffmpeg was stopped, and the audio thread is over
+    [writer] = writers
+    assert not hasattr(writer, 'proc')
+    assert writer.process.returncode is not None
+    assert threading.active_count() == threads
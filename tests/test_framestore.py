@@ -0,0 +1,72 @@
+"""
+Tests of the frame stores.
+"""
+
+import numpy as np
+import pytest
+
+from moviepy.editor import ColorClip, FrameStoreClip, VideoClip, vfx
+
+
+def gradient(t):
+    """ An RGB frame which changes with t. """
+    frame = np.zeros((48, 64, 3), dtype='uint8')
+    frame[:, :, 0] = int(100 * t)
+    frame[:, :, 1] = np.arange(64)
+    return frame
+
+
+def float_mask(t):
+    return np.outer(np.linspace(0, 1, 48), np.linspace(0, 1, 64)) * t / 3.0
+
+
+@pytest.mark.parametrize('compression', [None, 'zlib'])
+def test_round_trip(tmp_path, compression):
+    clip = VideoClip(gradient, duracion=2).set_mask(
+        VideoClip(float_mask, ismask=True, duracion=2))
+    filename = str(tmp_path / 'clip.frames')
+    clip.write_framestore(filename, fps=10, chunk_frames=4,
+                          compression=compression, verbose=False)
+    stored = FrameStoreClip(filename)
+    for t in np.arange(0, 2, 0.1):
+        assert np.array_equal(stored.get_frame(t), gradient(t))
+        assert np.array_equal(stored.mask.get_frame(t),
+                              float_mask(t).astype('float32'))
+
+
+def test_frames_are_copies(tmp_path):
+    filename = str(tmp_path / 'clip.frames')
+    VideoClip(gradient, duracion=1).write_framestore(filename, fps=10,
+                                                     verbose=False)
+    stored = FrameStoreClip(filename)
+    frame = stored.get_frame(0.5)
+    frame[:10] = 255
+    frame += 1
+    assert np.array_equal(stored.get_frame(0.5), gradient(0.5))
+
+
+def test_float_mask_clip(tmp_path):
+    filename = str(tmp_path / 'mask.frames')
+    mask = VideoClip(float_mask, ismask=True, duracion=2)
+    mask.write_framestore(filename, fps=10, verbose=False)
+    stored = FrameStoreClip(filename)
+    assert stored.ismask
+    for t in np.arange(0, 2, 0.1):
+        frame = stored.get_frame(t)
+        assert frame.dtype == np.float32
+        assert np.array_equal(frame, float_mask(t).astype('float32'))
+
+
+@pytest.mark.parametrize('effect', [vfx.fadein, vfx.fadeout])
+def test_faded_clip(tmp_path, effect):
+    # the frames of the fade are floats, the other frames are integers
+    clip = ColorClip((64, 48), col=(200, 100, 50), duracion=2).fx(effect, 1)
+    filename = str(tmp_path / 'faded.frames')
+    clip.write_framestore(filename, fps=10, verbose=False)
+    stored = FrameStoreClip(filename)
+    assert stored.reader.dtype == np.uint8
+    for t in np.arange(0, 2, 0.1):
+        frame = stored.get_frame(t)
+        assert frame.dtype == np.uint8
+        expected = np.clip(clip.get_frame(t) + 0.5, 0, 255).astype('uint8')
+        assert np.array_equal(frame, expected)
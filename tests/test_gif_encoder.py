@@ -0,0 +1,85 @@
+"""
+Tests of the Numpy GIF encoder: the GIFs written are decoded with Pillow.
+"""
+
+import numpy as np
+import pytest
+from PIL import Image, ImageSequence
+
+from moviepy.editor import VideoClip
+from moviepy.video.io.gif_encoder import write_gif_with_numpy
+
+COLORS = np.array([[0, 0, 0], [255, 0, 0], [0, 0, 255], [255, 255, 255]],
+                  dtype='uint8')
+
+
+def moving_square(t):
+    """ A still image until t=0.5, then a square moving right. """
+    frame = np.zeros((24, 32, 3), dtype='uint8')
+    frame[:, :16] = COLORS[1]
+    frame[20:] = COLORS[2]
+    x = 2 * max(0, int(round(10 * t)) - 4)
+    frame[5:11, x:x + 6] = COLORS[3]
+    return frame
+
+
+def decode(filename):
+    """ The frames (RGB), durations (ms) and loop count of a GIF. """
+    with Image.open(filename) as im:
+        loop = im.info.get('loop', None)
+        frames, durations = [], []
+        for frame in ImageSequence.Iterator(im):
+            durations.append(frame.info['duration'])
+            frames.append(np.array(frame.convert('RGB')))
+    return frames, durations, loop
+
+
+@pytest.mark.parametrize('processes', [1, 2])
+@pytest.mark.parametrize('optimize', [True, False])
+def test_round_trip(tmp_path, processes, optimize):
+    clip = VideoClip(moving_square, duracion=2)
+    filename = str(tmp_path / 'square.gif')
+    write_gif_with_numpy(clip, filename, fps=10, optimize=optimize,
+                         processes=processes, verbose=False)
+    frames, durations, loop = decode(filename)
+    # the 5 first frames are identical: merged into one frame
+    assert durations == [500] + 15 * [100]
+    assert loop == 0
+    starts = [0] + [0.5 + 0.1 * i for i in range(15)]
+    for frame, t in zip(frames, starts):
+        assert np.array_equal(frame, moving_square(t))
+
+
+@pytest.mark.parametrize('loop', [None, 3])
+def test_loop(tmp_path, loop):
+    clip = VideoClip(moving_square, duracion=1)
+    filename = str(tmp_path / 'loop.gif')
+    write_gif_with_numpy(clip, filename, fps=10, loop=loop, processes=1,
+                         verbose=False)
+    assert decode(filename)[2] == loop
+
+
+def test_timing(tmp_path):
+    # at 15fps the delays alternate between 6 and 7 hundredths of seconds
+    clip = VideoClip(lambda t: np.full((4, 4, 3), int(240 * t), 'uint8'),
+                     duracion=1)
+    filename = str(tmp_path / 'timing.gif')
+    write_gif_with_numpy(clip, filename, fps=15, processes=1, verbose=False)
+    durations = decode(filename)[1]
+    assert len(durations) == 15
+    assert sum(durations) == 1000
+    assert set(durations) == set([60, 70])
+
+
+def test_many_codes(tmp_path):
+    # noise: the 4096 codes of the LZW table are used (several times)
+    rng = np.random.RandomState(0)
+    image = COLORS[rng.randint(0, 4, size=(192, 256))]
+    clip = VideoClip(lambda t: image if t < 0.5 else image[::-1],
+                     duracion=1)
+    filename = str(tmp_path / 'noise.gif')
+    write_gif_with_numpy(clip, filename, fps=2, processes=1, verbose=False)
+    frames, durations, loop = decode(filename)
+    assert durations == [500, 500]
+    assert np.array_equal(frames[0], image)
+    assert np.array_equal(frames[1], image[::-1])
@@ -0,0 +1,89 @@
+"""
+Tests of write_gif(program='ffmpeg_palette'): the GIFs written are decoded
+with Pillow.
+"""
+
+import numpy as np
+import pytest
+from PIL import Image, ImageSequence
+
+from moviepy.editor import ColorClip, ImageClip, VideoClip
+from moviepy.video.io import gif_writers
+
+RED, BLUE = [255, 0, 0], [0, 0, 255]
+
+
+def decode(filename, mode='RGB'):
+    with Image.open(filename) as im:
+        return [np.array(frame.convert(mode))
+                for frame in ImageSequence.Iterator(im)]
+
+
+def two_colors(calls):
+    """ A clip where the left of the frame is red until t=1, then blue. """
+    def make_frame(t):
+        calls.append(t)
+        frame = np.zeros((16, 24, 3), dtype='uint8')
+        frame[:, :12] = RED if t < 1 else BLUE
+        return frame
+    clip = VideoClip(make_frame, duracion=2)
+    del calls[:]  # the first frame, computed for the size of the clip
+    return clip
+
+
+def test_palette_fps(tmp_path):
+    calls = []
+    filename = str(tmp_path / 'palette_fps.gif')
+    two_colors(calls).write_gif(filename, fps=10, program='ffmpeg_palette',
+                                palette_fps=2, dither='none', verbose=False)
+    # 4 frames for the palette, 20 for the GIF
+    assert len(calls) == 24
+    frames = decode(filename)
+    assert np.array_equal(frames[0][0, 0], RED)
+    assert np.array_equal(frames[-1][0, 0], BLUE)
+    assert np.array_equal(frames[-1][0, -1], [0, 0, 0])
+
+
+def test_cache_frames(tmp_path):
+    calls = []
+    filename = str(tmp_path / 'cache_frames.gif')
+    two_colors(calls).write_gif(filename, fps=10, program='ffmpeg_palette',
+                                cache_frames=str(tmp_path), dither='none',
+                                verbose=False)
+    # the frames are only computed once
+    assert len(calls) == 20
+    assert sorted(p.name for p in tmp_path.iterdir()) == ['cache_frames.gif']
+    frames = decode(filename)
+    assert np.array_equal(frames[0][0, 0], RED)
+    assert np.array_equal(frames[-1][0, 0], BLUE)
+
+
+@pytest.mark.parametrize('withmask', [True, False])
+def test_mask_transparency(tmp_path, withmask):
+    mask = np.zeros((16, 24))
+    mask[:, 12:] = 1
+    clip = (ColorClip((24, 16), col=RED, duracion=0.5)
+            .set_mask(ImageClip(mask, ismask=True, duracion=0.5)))
+    filename = str(tmp_path / 'mask.gif')
+    clip.write_gif(filename, fps=10, program='ffmpeg_palette',
+                   withmask=withmask, verbose=False)
+    frame = decode(filename, 'RGBA')[0]
+    assert np.array_equal(frame[0, -1], RED + [255])
+    assert frame[0, 0, 3] == (0 if withmask else 255)
+
+
+def test_palette_options(tmp_path, monkeypatch):
+    commands = []
+    popen = gif_writers.sp.Popen
+    monkeypatch.setattr(gif_writers.sp, 'Popen',
+                        lambda cmd, **k: commands.append(cmd) or
+                        popen(cmd, **k))
+    filename = str(tmp_path / 'options.gif')
+    two_colors([]).write_gif(filename, fps=10, program='ffmpeg_palette',
+                             dither='bayer', bayer_scale=4,
+                             stats_mode='diff', diff_mode=None,
+                             verbose=False)
+    palettegen, paletteuse = [' '.join(cmd) for cmd in commands]
+    assert 'palettegen=stats_mode=diff' in palettegen
+    assert 'paletteuse=dither=bayer:bayer_scale=4' in paletteuse
+    assert 'diff_mode' not in paletteuse
@@ -0,0 +1,119 @@
+"""
+Tests of ImageSequenceClip and of its ImageLoader.
+"""
+
+import os
+import threading
+import time
+
+import numpy as np
+import pytest
+from imageio import imwrite
+
+from moviepy.editor import ImageSequenceClip
+from moviepy.video.io import ImageSequenceClip as image_sequence
+from moviepy.video.io.ImageSequenceClip import ImageLoader
+from moviepy.video.io.render_cache import clip_hash
+
+NIMAGES = 30
+
+
+def write_image(filename, level, alpha=None):
+    image = np.full((6, 8, 4 if alpha is not None else 3), level, 'uint8')
+    if alpha is not None:
+        image[:, :, 3] = alpha
+    imwrite(filename, image)
+
+
+@pytest.fixture
+def images(tmp_path):
+    """ PNG files where the gray level of image i is 5 * i. """
+    filenames = [str(tmp_path / ('%03d.png' % i)) for i in range(NIMAGES)]
+    for i, filename in enumerate(filenames):
+        write_image(filename, 5 * i, alpha=200 - 5 * i)
+    return filenames
+
+
+def test_durations(images):
+    durations = [0.5 if (i % 3) else 1.5 for i in range(NIMAGES)]
+    clip = ImageSequenceClip(images, durations=durations)
+    starts = np.cumsum([0] + durations)
+    for i in list(range(NIMAGES)) + list(range(NIMAGES - 1, -1, -1)):
+        for t in [starts[i], starts[i] + 0.4 * durations[i]]:
+            assert clip.get_frame(t)[0, 0, 0] == 5 * i
+            assert clip.mask.get_frame(t)[0, 0] == (200 - 5 * i) / 255.0
+    assert clip.get_frame(clip.duracion + 1)[0, 0, 0] == 5 * (NIMAGES - 1)
+
+
+def test_prefetch(images):
+    loader = ImageLoader(images, cache_size=10, prefetch=4)
+    assert loader.get(10)[0, 0, 0] == 50
+    assert sorted(loader.cache) == [10, 11, 12, 13, 14]
+    # backwards: the images before are prefetched
+    loader.get(9)
+    assert sorted(loader.cache) == list(range(5, 15))
+    assert list(loader.cache)[-1] == 9
+    for future in loader.cache.values():
+        future.result()
+    loader.close()
+
+
+def test_eviction(images):
+    loader = ImageLoader(images, cache_size=5, prefetch=2)
+    for i in range(NIMAGES):
+        assert loader.get(i)[0, 0, 0] == 5 * i
+        assert len(loader.cache) <= 5
+    assert sorted(loader.cache) == list(range(NIMAGES - 5, NIMAGES))
+    loader.close()
+
+
+def test_evicted_images_are_not_cancelled(images, monkeypatch):
+    release = threading.Event()
+    imread = image_sequence.imread
+
+    def slow_imread(filename):
+        release.wait()
+        return imread(filename)
+
+    monkeypatch.setattr(image_sequence, 'imread', slow_imread)
+    loader = ImageLoader(images, cache_size=3, prefetch=2, threads=1)
+    results = {}
+
+    def get(i):
+        results[i] = loader.get(i)
+
+    # thread 1 waits for image 5 (decoding), image 6 is in the queue
+    first = threading.Thread(target=get, args=(5,))
+    first.start()
+    while 7 not in loader.cache:
+        time.sleep(0.01)
+    waited = loader.cache[6]
+    # thread 2 evicts images 5, 6 and 7 while thread 1 waits
+    second = threading.Thread(target=get, args=(20,))
+    second.start()
+    while 20 not in loader.cache:
+        time.sleep(0.01)
+    assert 6 not in loader.cache
+    release.set()
+    first.join()
+    second.join()
+    assert results[5][0, 0, 0] == 25 and results[20][0, 0, 0] == 100
+    assert waited.result()[0, 0, 0] == 30
+    loader.close()
+
+
+def test_render_key(images, monkeypatch):
+    clip = ImageSequenceClip(images, fps=10)
+    stats = []
+    file_key = image_sequence.file_key
+    monkeypatch.setattr(image_sequence, 'file_key',
+                        lambda f: stats.append(f) or file_key(f))
+    first = clip_hash(clip, 0.05, 0.95)
+    second = clip_hash(clip, 1.05, 1.95)
+    # only the files of each range are looked at
+    assert sorted(stats) == images[:20]
+    # modifying an image only changes the hash of its range
+    write_image(images[15], 0, alpha=0)
+    os.utime(images[15], (0, 0))
+    assert clip_hash(clip, 0.05, 0.95) == first
+    assert clip_hash(clip, 1.05, 1.95) != second
@@ -0,0 +1,127 @@
+"""
+Tests of RenderProfiler: instrumentation of the clip graphs, figures of
+the reports, and profiles of the renders of write_videofile.
+"""
+
+import os
+
+import numpy as np
+import pytest
+
+from moviepy.editor import CompositeVideoClip, VideoClip, vfx
+from moviepy.profiler import RenderProfiler, get_profiler, profiling
+from moviepy.video.io.render_spool import RenderSpool
+
+
+def counting_clip(level, calls, duracion=1):
+    def frame(t):
+        calls.append(t)
+        return np.full((48, 64, 3), level, dtype='uint8')
+    return VideoClip(frame, duracion=duracion)
+
+
+def composite():
+    background = counting_clip(10, [], duracion=2)
+    small = counting_clip(200, [], duracion=2).fx(vfx.resize, 0.5)
+    return CompositeVideoClip([background, small.set_pos((5, 5))])
+
+
+def test_session():
+    clip = composite()
+    profiler = RenderProfiler()
+    with profiler.session(clip, 'frames'):
+        assert 'get_frame' in clip.__dict__
+        for t in [0, 0.5, 1]:
+            clip.get_frame(t)
+    # the original methods are back
+    assert 'get_frame' not in clip.__dict__
+    clip.get_frame(1.5)
+
+    nodes = dict([(node.label, node) for node in profiler.nodes])
+    assert nodes['frames'].calls == 1
+    assert profiler.total == pytest.approx(nodes['frames'].inclusive)
+    [main] = [n for n in nodes.values() if n.label.startswith(
+        'CompositeVideoClip') and not n.label.endswith('blit_on')]
+    assert main.calls == 3
+    assert main.nbytes == 3 * 48 * 64 * 3
+    for node in profiler.nodes:
+        assert node.inclusive >= node.exclusive >= 0
+    # the time of the render contains the time of the composite clip
+    assert nodes['frames'].inclusive >= main.inclusive
+    assert ('frames', main.label) in profiler.paths
+
+    report = profiler.report()
+    assert report.splitlines()[1].split()[-1] == 'frames'
+    assert main.label in report
+    for line in profiler.folded().splitlines():
+        stack, us = line.rsplit(' ', 1)
+        assert stack.split(';')[0] == 'frames' and int(us) > 0
+
+
+def test_get_profiler():
+    assert get_profiler(None, 'out') == (None, None)
+    assert get_profiler(False, 'out') == (None, None)
+    profiler = RenderProfiler()
+    assert get_profiler(profiler, 'out') == (profiler, None)
+    new, prefix = get_profiler(True, 'out')
+    assert isinstance(new, RenderProfiler) and prefix == 'out'
+    assert get_profiler(True)[1] is True
+    assert get_profiler('other')[1] == 'other'
+
+
+def test_profiling(tmp_path, capsys):
+    clip = composite()
+    with profiling(None, clip) as profiler:
+        assert profiler is None
+
+    prefix = str(tmp_path / 'profile')
+    with profiling(RenderProfiler(), clip, 'frames', prefix) as profiler:
+        clip.get_frame(0)
+    with open(prefix + '.txt') as f:
+        assert f.read() == profiler.report() + '\n'
+    with open(prefix + '.folded') as f:
+        assert f.read() == profiler.folded()
+
+    with profiling(RenderProfiler(), clip, 'frames', True) as profiler:
+        clip.get_frame(0)
+    assert capsys.readouterr().out == profiler.report() + '\n'
+
+
+def test_write_videofile(tmp_path):
+    filename = str(tmp_path / 'out.mp4')
+    composite().write_videofile(filename, fps=10, profile=True,
+                                verbose=False)
+    with open(filename + '.profile.txt') as f:
+        report = f.read()
+    assert 'write_videofile' in report and 'ffmpeg encoder pipe' in report
+    assert os.path.exists(filename + '.profile.folded')
+
+
+def test_render_cache(tmp_path):
+    cache = str(tmp_path / 'cache')
+    filename = str(tmp_path / 'out.mp4')
+    calls = []
+
+    def render(profile):
+        clip = counting_clip(50, calls, duracion=2)
+        del calls[:]
+        clip.write_videofile(filename, fps=10, render_cache=cache,
+                             segment_duration=1, profile=profile,
+                             verbose=False)
+
+    profiler = RenderProfiler()
+    render(profiler)
+    # one writer per segment
+    pipes = [n for n in profiler.nodes if n.label == 'ffmpeg encoder pipe']
+    assert [n.calls for n in pipes] == [10, 10]
+    # the profiling doesn't change the hashes of the segments
+    render(None)
+    assert calls == []
+
+
+def test_render_spool(tmp_path):
+    spool = RenderSpool(str(tmp_path / 'spool'))
+    with pytest.raises(ValueError, match='profiled'):
+        counting_clip(50, []).write_videofile(
+            str(tmp_path / 'out.mp4'), fps=10, render_spool=spool,
+            profile=True, verbose=False)
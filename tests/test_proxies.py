@@ -0,0 +1,57 @@
+"""
+Tests of the proxies of video files.
+"""
+
+import gc
+import sys
+import threading
+
+import pytest
+
+from moviepy.video.io.VideoFileClip import VideoFileClip
+from moviepy.video.io.proxies import VideoProxy, proxy_mode
+
+
+def test_proxy_mode_is_thread_local(index_video, tmp_path):
+    proxy = VideoProxy(index_video, (64, 48), 0.5, str(tmp_path))
+    proxy.wait()
+    assert proxy.is_ready() and not proxy.is_active()
+
+    seen = []
+    inside, done = threading.Event(), threading.Event()
+
+    def other_thread():
+        inside.wait()
+        seen.append(proxy.is_active())
+        done.set()
+
+    thread = threading.Thread(target=other_thread)
+    thread.start()
+    with proxy_mode():
+        assert proxy.is_active()
+        inside.set()
+        done.wait()
+    thread.join()
+    assert seen == [False]
+    assert not proxy.is_active()
+
+
+def test_proxy_frames(index_video, tmp_path):
+    clip = VideoFileClip(index_video, proxy=True, proxy_scale=0.5,
+                         proxy_dir=str(tmp_path))
+    clip.proxy.wait()
+    original = clip.get_frame(1)
+    with proxy_mode():
+        frame = clip.get_frame(1)
+    assert frame.shape == original.shape
+    assert abs(frame.astype(int) - original).mean() < 8
+
+
+def test_proxy_with_mask(index_video, monkeypatch):
+    errors = []
+    monkeypatch.setattr(sys, 'unraisablehook', errors.append)
+    with pytest.raises(ValueError):
+        VideoFileClip(index_video, proxy=True, has_mask=True)
+    gc.collect()
+    # the clip which wasn't made is deleted without errors
+    assert errors == []
@@ -0,0 +1,118 @@
+"""
+Tests of RawVideoClip: raw files written by ffmpeg in each pix_fmt are
+read back and compared with the RGB frames they were made from.
+"""
+
+import numpy as np
+import pytest
+
+from conftest import ffmpeg
+from moviepy.video.io.RawVideoClip import RawVideoClip, frame_nbytes
+from moviepy.video.tools.yuv import YUVFrame
+
+W, H, FPS, NFRAMES = 16, 8, 10, 6
+
+
+@pytest.fixture(scope='module')
+def rgb_frames(tmp_path_factory):
+    """ Frames made of 2x2 blocks (so that the chroma subsampling loses
+    nothing), where the colors of frame i depend on i. """
+    rng = np.random.RandomState(0)
+    blocks = rng.randint(40, 200, size=(NFRAMES, H // 2, W // 2, 3))
+    blocks += 8 * np.arange(NFRAMES).reshape((-1, 1, 1, 1))
+    frames = blocks.repeat(2, axis=1).repeat(2, axis=2).astype('uint8')
+    filename = str(tmp_path_factory.mktemp('raw') / 'frames.rgb')
+    frames.tofile(filename)
+    return filename, frames
+
+
+def convert(rgb_frames, pix_fmt):
+    """ The file of the frames converted by ffmpeg into ``pix_fmt`` (the
+    chroma is subsampled without filtering, as RawVideoClip upsamples it
+    by pixel repetition). """
+    source = rgb_frames[0]
+    filename = source[:-4] + '.' + pix_fmt
+    ffmpeg('-f', 'rawvideo', '-pix_fmt', 'rgb24', '-s', '%dx%d' % (W, H),
+           '-i', source, '-sws_flags', 'neighbor', '-f', 'rawvideo',
+           '-pix_fmt', pix_fmt, filename)
+    return filename
+
+
+def rgb(frame):
+    return frame.to_rgb() if isinstance(frame, YUVFrame) else frame
+
+
+@pytest.mark.parametrize('pix_fmt,tolerance', [
+    ('rgb24', 0), ('bgr24', 0), ('rgba', 0), ('gray', 0), ('yuv420p', 3),
+    ('nv12', 3), ('yuv422p', 3), ('yuv444p', 3), ('yuyv422', 3)])
+def test_pix_fmt(rgb_frames, pix_fmt, tolerance):
+    filename = convert(rgb_frames, pix_fmt)
+    frames = rgb_frames[1]
+    if pix_fmt == 'gray':
+        # ffmpeg keeps the luma (full range): compare with its own gray
+        gray = np.fromfile(filename, dtype='uint8').reshape((NFRAMES, H, W))
+        frames = np.repeat(gray[..., None], 3, axis=3)
+    clip = RawVideoClip(filename, (W, H), pix_fmt, fps=FPS)
+    assert clip.tamano == (W, H)
+    assert clip.duracion == 1.0 * NFRAMES / FPS
+    # any order of the reads, and times between the frames
+    for i in [3, 0, 5, 1, 4, 2, 2]:
+        for t in [1.0 * i / FPS, (i + 0.7) / FPS]:
+            frame = rgb(clip.get_frame(t))
+            assert frame.shape == (H, W, 3)
+            diff = np.abs(frame.astype(int) - frames[i])
+            assert diff.max() <= tolerance, "frame %d" % i
+    # after the end: the last frame
+    assert np.array_equal(rgb(clip.get_frame(10)), rgb(clip.get_frame(0.5)))
+    # several frames at once
+    block = clip.get_frames(0.2, 0.45)
+    assert len(block) == 3
+    for i, frame in zip([2, 3, 4], block):
+        assert np.array_equal(rgb(frame), rgb(clip.get_frame(1.0 * i / FPS)))
+    clip.reader.close()
+
+
+@pytest.mark.parametrize('pix_fmt', ['rgb24', 'bgr24', 'gray', 'rgba'])
+def test_packed_frames_are_views(rgb_frames, pix_fmt):
+    clip = RawVideoClip(convert(rgb_frames, pix_fmt), (W, H), pix_fmt,
+                        fps=FPS)
+    assert np.shares_memory(clip.get_frame(0.3), clip.reader.data)
+    assert np.shares_memory(clip.get_frames(), clip.reader.data)
+
+
+def test_offset(rgb_frames, tmp_path):
+    header = b'HEADER' * 5
+    filename = str(tmp_path / 'header.rgb')
+    with open(filename, 'wb') as f:
+        f.write(header)
+        f.write(rgb_frames[1].tobytes())
+        f.write(b'\x00' * 10)  # an incomplete frame at the end
+    clip = RawVideoClip(filename, (W, H), fps=FPS, offset=len(header))
+    assert clip.reader.nframes == NFRAMES
+    assert np.array_equal(clip.get_frame(0.4), rgb_frames[1][4])
+
+
+@pytest.mark.parametrize('pix_fmt', ['rgba', 'bgra'])
+def test_alpha_mask(rgb_frames, tmp_path, pix_fmt):
+    frames = rgb_frames[1]
+    alpha = np.arange(NFRAMES * H * W).reshape((NFRAMES, H, W, 1)) % 256
+    channels = frames if pix_fmt == 'rgba' else frames[..., ::-1]
+    filename = str(tmp_path / ('alpha.' + pix_fmt))
+    np.concatenate([channels, alpha.astype('uint8')], axis=3).tofile(filename)
+
+    clip = RawVideoClip(filename, (W, H), pix_fmt, fps=FPS)
+    assert clip.mask.ismask and clip.mask.duracion == clip.duracion
+    for i in range(NFRAMES):
+        t = 1.0 * i / FPS
+        assert np.array_equal(clip.get_frame(t), frames[i])
+        assert np.allclose(clip.mask.get_frame(t), alpha[i, :, :, 0] / 255.0)
+    assert RawVideoClip(filename, (W, H), pix_fmt, fps=FPS,
+                        with_mask=False).mask is None
+
+
+def test_errors(rgb_frames):
+    with pytest.raises(ValueError):
+        frame_nbytes((W, H), 'p010le')
+    # a file smaller than a frame
+    with pytest.raises(IOError):
+        RawVideoClip(rgb_frames[0], (W * 10, H * 10), 'rgb24')
@@ -0,0 +1,89 @@
+"""
+Tests of the render cache of write_videofile.
+"""
+
+import os
+import threading
+
+import numpy as np
+import pytest
+
+from moviepy.video.VideoClip import VideoClip
+from moviepy.video.compositing.concatenate import concatenate_videoclips
+from moviepy.video.io.render_cache import clip_hash
+
+PARAMS = {'level': 10}
+LEVELS = [10, 20]
+
+
+def make_frame(t):
+    return np.full((48, 64, 3), PARAMS['level'], dtype='uint8')
+
+
+def make_frame_nested(t):
+    return (lambda: np.full((48, 64, 3), LEVELS[-1], dtype='uint8'))()
+
+
+def test_hash_follows_global_values():
+    clip = VideoClip(make_frame, duracion=1)
+    before = clip_hash(clip)
+    PARAMS['level'] = 200
+    try:
+        assert clip_hash(clip) != before
+    finally:
+        PARAMS['level'] = 10
+    assert clip_hash(clip) == before
+
+
+def test_hash_follows_globals_of_nested_code():
+    clip = VideoClip(make_frame_nested, duracion=1)
+    before = clip_hash(clip)
+    LEVELS.append(30)
+    try:
+        assert clip_hash(clip) != before
+    finally:
+        LEVELS.pop()
+
+
+def test_unhashable_object():
+    lock = threading.Lock()
+
+    def locked_frame(t):
+        with lock:
+            return np.zeros((48, 64, 3), dtype='uint8')
+
+    with pytest.raises(ValueError):
+        clip_hash(VideoClip(locked_frame, duracion=1))
+
+
+def counting_clip(level, calls, duracion=1):
+    def frame(t):
+        calls.append(t)
+        return np.full((48, 64, 3), level, dtype='uint8')
+    return VideoClip(frame, duracion=duracion)
+
+
+def test_segments_are_reused(tmp_path):
+    cache = str(tmp_path / 'cache')
+    filename = str(tmp_path / 'out.mp4')
+    calls_a, calls_b = [], []
+
+    def render(level_b):
+        clip = concatenate_videoclips([counting_clip(50, calls_a),
+                                       counting_clip(level_b, calls_b)])
+        del calls_a[:], calls_b[:]
+        clip.write_videofile(filename, fps=10, render_cache=cache,
+                             segment_duration=1, verbose=False)
+
+    render(100)
+    assert (len(calls_a), len(calls_b)) == (10, 10)
+    assert len(os.listdir(cache)) == 2
+
+    # nothing changed: all the segments are reused
+    render(100)
+    assert (len(calls_a), len(calls_b)) == (0, 0)
+
+    # the second clip changed: only its segment is rendered
+    render(150)
+    assert (len(calls_a), len(calls_b)) == (0, 10)
+    assert len(os.listdir(cache)) == 3
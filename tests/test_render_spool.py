@@ -0,0 +1,161 @@
+"""
+Tests of RenderSpool: claims of the segments, requeuing and retries.
+"""
+
+import os
+import time
+
+import numpy as np
+import pytest
+
+from moviepy.editor import (ColorClip, Timeline, VideoClip, VideoFileClip,
+                            recording, register_function)
+from moviepy.video.io.render_spool import RenderSpool, _write_json
+
+JOB = 'job'
+
+
+@register_function
+def fails_after_one_second(t):
+    if t >= 1:
+        raise RuntimeError("broken frame")
+    return np.zeros((48, 64, 3), dtype='uint8')
+
+
+def make_job(directory, ntasks=1):
+    """ A job folder with ``ntasks`` segments waiting for a worker. """
+    jobdir = os.path.join(directory, JOB)
+    for folder in ['todo', 'claimed', 'failed', 'pieces']:
+        os.makedirs(os.path.join(jobdir, folder))
+    for i in range(ntasks):
+        task = os.path.join(jobdir, 'todo', '%05d.json' % i)
+        _write_json(task, {'index': i, 'n_start': 0, 'n_end': 1,
+                           'attempts': 0})
+        os.utime(task, (0, 0))  # queued long ago
+    return jobdir
+
+
+def files(jobdir, folder):
+    return sorted(os.listdir(os.path.join(jobdir, folder)))
+
+
+def test_render(index_video, tmp_path):
+    with recording():
+        clip = VideoFileClip(index_video).subclip(0, 2)
+    spool = RenderSpool(str(tmp_path / 'spool'), local_workers=2, poll=0.05)
+    os.makedirs(spool.directory)
+    filename = str(tmp_path / 'out.mp4')
+    spool.render(clip, filename, fps=30, segment_duration=0.5,
+                 ffmpeg_params=['-qp', '0'], verbose=False)
+    assert os.listdir(spool.directory) == []
+    frames = list(VideoFileClip(filename).iter_frames())
+    assert len(frames) == 60
+    # The RGB/YUV conversions round the gray levels (which are 7 or more
+    # apart from one frame to the next).
+    for n, frame in enumerate(frames):
+        expected = clip.get_frame(1.0 * n / 30)
+        assert abs(1.0 * frame - expected).max() <= 2
+
+
+def test_claim(tmp_path):
+    jobdir = make_job(str(tmp_path), ntasks=2)
+    worker1, worker2 = RenderSpool(str(tmp_path)), RenderSpool(str(tmp_path))
+    claim1, claim2 = worker1._claim(JOB), worker2._claim(JOB)
+    assert worker1.worker_id in claim1 and worker2.worker_id in claim2
+    assert claim1.split('.')[0] != claim2.split('.')[0]
+    assert worker1._claim(JOB) is None
+    assert files(jobdir, 'claimed') == sorted([claim1, claim2])
+    # The claims are fresh, although the tasks were queued long ago.
+    assert RenderSpool(str(tmp_path), timeout=60)._requeue(jobdir)
+    assert files(jobdir, 'todo') == []
+
+
+@pytest.mark.parametrize('fails', [False, True])
+def test_requeued_claim_is_left_alone(tmp_path, fails):
+    jobdir = make_job(str(tmp_path))
+    coordinator = RenderSpool(str(tmp_path), timeout=60)
+    worker1, worker2 = RenderSpool(str(tmp_path)), RenderSpool(str(tmp_path))
+    claims = [worker1._claim(JOB)]
+
+    def render_segment(clip, settings, jobdir, task):
+        # worker1 stops answering: its segment goes to worker2
+        os.utime(os.path.join(jobdir, 'claimed', claims[0]), (0, 0))
+        assert not coordinator._requeue(jobdir)
+        assert files(jobdir, 'todo') == ['00000.json']
+        claims.append(worker2._claim(JOB))
+        if fails:
+            raise RuntimeError("late failure")
+
+    worker1._render_segment = render_segment
+    worker1._render_task(JOB, claims[0], {JOB: (None, {})})
+    assert files(jobdir, 'claimed') == [claims[1]]
+    assert files(jobdir, 'failed') == []
+
+
+def test_retry(tmp_path):
+    jobdir = make_job(str(tmp_path))
+    coordinator = RenderSpool(str(tmp_path), max_retries=1)
+    worker = RenderSpool(str(tmp_path))
+    clips = {JOB: (None, {})}
+
+    def fail(clip, settings, jobdir, task):
+        raise RuntimeError("broken frame")
+
+    worker._render_segment = fail
+    for attempt in [1, 2]:
+        worker._render_task(JOB, worker._claim(JOB), clips)
+        assert files(jobdir, 'claimed') == []
+        assert files(jobdir, 'failed') == ['00000.json']
+        if attempt == 1:
+            coordinator._requeue(jobdir)
+            assert files(jobdir, 'todo') == ['00000.json']
+    with pytest.raises(IOError) as err:
+        coordinator._requeue(jobdir)
+    assert "2 attempts" in str(err.value)
+    assert "broken frame" in str(err.value)
+
+
+def test_heartbeat_follows_the_coordinator(tmp_path):
+    jobdir = make_job(str(tmp_path))
+    coordinator = RenderSpool(str(tmp_path), timeout=0.4)
+    with recording():
+        clip = ColorClip((8, 8), col=(0, 0, 0), duracion=1)
+    _write_json(os.path.join(jobdir, 'job.json'),
+                {'timeline': Timeline.from_clip(clip).to_dict(),
+                 'settings': {'timeout': coordinator.timeout}})
+    worker = RenderSpool(str(tmp_path))  # default timeout (60s)
+    claim = worker._claim(JOB)
+    requeued = []
+
+    def render_segment(clip, settings, jobdir, task):
+        # a segment rendered during several timeouts of the coordinator
+        for i in range(12):
+            time.sleep(0.1)
+            coordinator._requeue(jobdir)
+            requeued.extend(files(jobdir, 'todo'))
+
+    worker._render_segment = render_segment
+    worker._render_task(JOB, claim, {})
+    assert requeued == []
+    assert files(jobdir, 'claimed') == []
+
+
+def test_failing_segment(tmp_path):
+    with recording():
+        clip = VideoClip(fails_after_one_second, duracion=2)
+    spool = RenderSpool(str(tmp_path), local_workers=1, max_retries=1,
+                        poll=0.05)
+    with pytest.raises(IOError) as err:
+        spool.render(clip, str(tmp_path / 'out.mp4'), fps=10,
+                     segment_duration=1, verbose=False)
+    assert "segment 1 of the video" in str(err.value)
+    assert "broken frame" in str(err.value)
+
+
+def test_no_worker(index_video, tmp_path):
+    with recording():
+        clip = VideoFileClip(index_video).subclip(0, 1)
+    spool = RenderSpool(str(tmp_path), poll=0.05, idle_timeout=0.5)
+    with pytest.raises(IOError) as err:
+        spool.render(clip, str(tmp_path / 'out.mp4'), fps=30, verbose=False)
+    assert "no worker" in str(err.value)
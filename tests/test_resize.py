@@ -0,0 +1,39 @@
+"""
+Tests of the resizing of clips, and of the zooms on images.
+"""
+
+import numpy as np
+
+from moviepy.editor import ColorClip, CompositeVideoClip, ImageClip
+from moviepy.video.tools import resampling
+from moviepy.video.tools.resampling import resample
+
+
+def image():
+    return (np.random.RandomState(0).rand(60, 80, 3) * 255).astype('uint8')
+
+
+def test_zoom_with_a_fade():
+    faded = ImageClip(image()).set_duracion(3).crossfadein(1)
+    zoom = faded.resize(lambda t: 0.5 + 0.1 * t)
+    for t in [0, 0.5, 2]:
+        frame, mask = zoom.get_frame(t), zoom.mask.get_frame(t)
+        h, w = frame.shape[:2]
+        assert (w, h) == (int(80 * (0.5 + 0.1 * t)), int(60 * (0.5 + 0.1 * t)))
+        assert np.array_equal(mask, resample(faded.mask.get_frame(t),
+                                             (w, h)))
+    composite = CompositeVideoClip([ColorClip((100, 100), col=(0, 0, 0),
+                                              duracion=3),
+                                    zoom.set_position((10, 20))])
+    assert composite.get_frame(0.5).shape == (100, 100, 3)
+
+
+def test_crop_of_zoom(monkeypatch):
+    # the windows are never resized by OpenCV: compare with the same library
+    monkeypatch.setattr(resampling, 'CV2_FOUND', False)
+    zoom = ImageClip(image()).set_duracion(3).resize(lambda t: 1 + 0.3 * t)
+    cropped = zoom.crop(x1=7, y1=5, x2=50, y2=40)
+    for t in [0, 0.7, 1.9]:
+        full = zoom.get_frame(t)[5:40, 7:50]
+        # (only the rounding of the last step can differ)
+        assert abs(cropped.get_frame(t) - 1.0 * full).max() <= 1
@@ -0,0 +1,107 @@
+"""
+Tests of the rotations (fx.rotate and the AffineWarps of
+moviepy.video.tools.warping), compared with Pillow's Image.rotate.
+"""
+
+import threading
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from moviepy.editor import ImageClip, VideoClip, vfx
+from moviepy.video.tools import warping
+from moviepy.video.tools.warping import AffineWarp, rotation
+
+RESAMPLE = {'nearest': Image.NEAREST, 'bilinear': Image.BILINEAR,
+            'bicubic': Image.BICUBIC}
+
+rng = np.random.RandomState(0)
+PICTURE = rng.randint(0, 256, size=(30, 40, 3)).astype('uint8')
+MASK = rng.uniform(0, 1, size=(30, 40)).astype('float32')
+
+
+@pytest.fixture(params=['pillow', 'numpy'])
+def path(request, monkeypatch):
+    """ The warps are done by Pillow, or by Numpy. """
+    monkeypatch.setattr(warping, 'CV2_FOUND', False)
+    monkeypatch.setattr(warping, 'PIL_FOUND', request.param == 'pillow')
+    return request.param
+
+
+def pillow_rotate(pic, angle, resample, expand):
+    return np.array(Image.fromarray(pic).rotate(angle, RESAMPLE[resample],
+                                                expand=expand))
+
+
+def check(result, expected, path, resample, tolerance=1):
+    assert result.shape == expected.shape
+    assert result.dtype == expected.dtype
+    diff = np.abs(result.astype('float64') - expected)
+    if resample == 'nearest' or path == 'pillow':
+        tolerance = 0
+    # Numpy computes in float32 where Pillow computes in float64
+    assert diff.max() <= tolerance
+    if expected.dtype == np.uint8:
+        assert (diff > 0).mean() < 0.01
+
+
+@pytest.mark.parametrize('expand', [True, False])
+@pytest.mark.parametrize('resample', ['nearest', 'bilinear', 'bicubic'])
+@pytest.mark.parametrize('angle', [30, -123, 90.5, 0.3])
+def test_warp_parity(path, angle, resample, expand):
+    matrix, size = rotation((40, 30), angle, expand)
+    warp = AffineWarp((40, 30), matrix, size, resample)
+    expected = pillow_rotate(PICTURE, angle, resample, expand)
+    check(warp(PICTURE), expected, path, resample)
+    # the warp is computed once and used again
+    check(warp(PICTURE[::-1].copy()),
+          pillow_rotate(PICTURE[::-1].copy(), angle, resample, expand),
+          path, resample)
+
+
+@pytest.mark.parametrize('expand', [True, False])
+@pytest.mark.parametrize('resample', ['nearest', 'bilinear', 'bicubic'])
+def test_rotate_frame_and_mask(path, resample, expand):
+    clip = ImageClip(PICTURE).set_mask(ImageClip(MASK, ismask=True))
+    rotated = clip.fx(vfx.rotate, 24, resample=resample, expand=expand)
+    check(rotated.get_frame(0),
+          pillow_rotate(PICTURE, 24, resample, expand), path, resample)
+    # the bicubic interpolation overshoots: the masks are clipped
+    check(rotated.mask.get_frame(0),
+          np.clip(pillow_rotate(MASK, 24, resample, expand), 0, 1), path,
+          resample, tolerance=1e-5)
+    assert rotated.tamano == rotated.mask.tamano
+
+
+@pytest.mark.parametrize('angle', [90, -90, 180])
+def test_right_angles(angle):
+    clip = ImageClip(PICTURE).set_mask(ImageClip(MASK, ismask=True))
+    rotated = clip.fx(vfx.rotate, angle)
+    assert np.array_equal(rotated.get_frame(0),
+                          pillow_rotate(PICTURE, angle, 'nearest', True))
+    assert np.array_equal(rotated.mask.get_frame(0),
+                          pillow_rotate(MASK, angle, 'nearest', True))
+
+
+def test_rotation_by_thread():
+    computed = []
+
+    def make_frame(t):
+        computed.append(t)
+        return PICTURE
+
+    clip = VideoClip(make_frame, duracion=2)
+    clip.mask = VideoClip(lambda t: MASK, ismask=True, duracion=2)
+    rotated = clip.fx(vfx.rotate, lambda t: 10 + 20 * t, resample='bilinear')
+    del computed[:]
+
+    frame = rotated.get_frame(0.5)
+    # another thread rotates another frame in the meantime
+    thread = threading.Thread(target=rotated.get_frame, args=(1,))
+    thread.start()
+    thread.join()
+    mask = rotated.mask.get_frame(0.5)
+    # the rotation at t=0.5 was computed once, for the frame and the mask
+    assert computed == [0.5, 1]
+    assert mask.shape == frame.shape[:2]
@@ -0,0 +1,114 @@
+"""
+Tests of SubtitlesClip: lookup of the subtitles (which may overlap) and
+generation of their text clips (lookahead, cache).
+"""
+
+import threading
+import time
+
+import numpy as np
+
+from moviepy.editor import ImageClip
+from moviepy.video.tools.subtitles import SubtitlesClip
+
+
+def make_textclip(made, gates=None):
+    """ A generator of text clips which records the texts, and waits for
+    the event ``gates[txt]`` if there is one. The clip of 'sub i' is a
+    little picture of level i. """
+    def make(txt):
+        if gates and txt in gates:
+            gates[txt].wait()
+        made.append(txt)
+        level = int(txt.split()[-1]) if txt != 'T' else 0
+        return ImageClip(np.full((2, 4, 3), level, dtype='uint8'))
+    return make
+
+
+def level(clip, t):
+    return clip.get_frame(t)[0, 0, 0]
+
+
+def one_per_second(n):
+    return [((i, i + 1), 'sub %d' % i) for i in range(n)]
+
+
+def test_find_subtitle_with_overlaps():
+    rng = np.random.RandomState(0)
+    starts = rng.uniform(0, 50, size=40)
+    durations = rng.exponential(3, size=40)
+    durations[5] = 40  # a long subtitle, overlapping many others
+    subtitles = [((ta, ta + d), 'sub %d' % i)
+                 for i, (ta, d) in enumerate(zip(starts, durations))]
+    clip = SubtitlesClip(subtitles, make_textclip([]), lookahead=0)
+    for t in np.linspace(-1, 100, 2000):
+        shown = [i for i, ((ta, tb), txt) in enumerate(clip.subtitles)
+                 if ta <= t < tb]
+        # the subtitle which starts first
+        assert clip.find_subtitle(t) == (shown[0] if shown else None)
+
+    clip = SubtitlesClip([((0, 10), 'sub 1'), ((2, 3), 'sub 2'),
+                          ((2, 12), 'sub 3'), ((11, 14), 'sub 4')],
+                         make_textclip([]), lookahead=0)
+    for t, expected in [(2.5, 0), (3, 0), (10, 2), (11.5, 2), (12, 3),
+                        (14, None)]:
+        assert clip.find_subtitle(t) == expected
+
+
+def test_lookahead():
+    made = []
+    clip = SubtitlesClip(one_per_second(10), make_textclip(made),
+                         lookahead=2)
+    del made[:]
+    assert level(clip, 3.5) == 3
+    clip.pool.shutdown(wait=True)
+    assert made == ['sub 3', 'sub 4', 'sub 5']
+
+    made = []
+    clip = SubtitlesClip(one_per_second(10), make_textclip(made),
+                         lookahead=0)
+    del made[:]
+    assert clip.pool is None
+    assert [level(clip, t) for t in [3.5, 3.7, 4.5]] == [3, 3, 4]
+    assert made == ['sub 3', 'sub 4']
+
+
+def test_evict():
+    made = []
+    clip = SubtitlesClip(one_per_second(12), make_textclip(made),
+                         lookahead=2, cache_size=4)
+    assert level(clip, 0.5) == 0
+    for i in range(1, 10):
+        assert level(clip, i + 0.5) == i
+        # the subtitles which are over are dropped first
+        assert sorted(clip.textclips) == [i - 1, i, i + 1, i + 2]
+    # back to the start: nothing is over, the least recently used go
+    assert level(clip, 0.5) == 0
+    assert sorted(clip.textclips) == [0, 1, 2, 9]
+    clip.pool.shutdown(wait=True)
+    # the clips are only generated again after being dropped
+    assert sorted(made[1:]) == sorted(['sub %d' % i for i in
+                                       list(range(12)) + [0, 1, 2]])
+
+
+def test_evicted_clips_are_not_cancelled():
+    made = []
+    gates = {'sub 1': threading.Event()}
+    clip = SubtitlesClip(one_per_second(20), make_textclip(made, gates),
+                         lookahead=2, cache_size=3)
+    # the background thread generates 'sub 1' (blocked), 'sub 2' waits
+    assert level(clip, 0.5) == 0
+    results = {}
+    waiting = threading.Thread(target=lambda: results.update(
+        sub2=level(clip, 2.5)))
+    waiting.start()
+    while 4 not in clip.textclips:
+        time.sleep(0.01)
+    future = clip.textclips[2]
+    # this evicts the clip of 'sub 2', which the other thread waits for
+    assert level(clip, 10.5) == 10
+    assert 2 not in clip.textclips
+    gates['sub 1'].set()
+    waiting.join()
+    assert not future.cancelled()
+    assert results == {'sub2': 2}
@@ -0,0 +1,72 @@
+"""
+Tests of the telemetry of the exports.
+"""
+
+import threading
+
+from moviepy.editor import ColorClip, VideoFileClip, concatenate_videoclips
+from moviepy.telemetry import EVENT_KEYS, RenderMonitor, count
+
+
+def jumpy_clip(filename):
+    """ A clip which seeks backwards in its video file (twice). """
+    video = VideoFileClip(filename)
+    return concatenate_videoclips([video.subclip(t, t + 0.5)
+                                   for t in [5, 3, 1]])
+
+
+def export(clip, filename, respawns):
+    events = []
+    clip.write_videofile(filename, telemetry=events.append, verbose=False)
+    # the last event is the message "Video ready"
+    assert [e['event'] for e in events[-2:]] == ['done', 'message']
+    respawns[filename] = events[-2]['decoder_respawns']
+
+
+def test_respawns_of_parallel_exports(index_video, tmp_path):
+    jumpy = str(tmp_path / 'jumpy.mp4')
+    straight = str(tmp_path / 'straight.mp4')
+    clips = {jumpy: jumpy_clip(index_video),
+             straight: VideoFileClip(index_video).subclip(0, 3)}
+    respawns = {}
+    threads = [threading.Thread(target=export, args=(clip, filename,
+                                                     respawns))
+               for (filename, clip) in clips.items()]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert respawns == {jumpy: 2, straight: 0}
+
+
+def test_attached_threads(tmp_path):
+    events = []
+    monitor = RenderMonitor(events.append, 'video', 'out.mp4', 1)
+
+    def spawn(attach):
+        if attach:
+            monitor.attach()
+        count('decoder_spawns', 3)
+
+    for attach in [False, True]:
+        thread = threading.Thread(target=spawn, args=(attach,))
+        thread.start()
+        thread.join()
+    count('decoder_spawns')
+    monitor.close()
+    count('decoder_spawns')
+    assert events[-1]['decoder_respawns'] == 4
+    assert monitor.counters == {'decoder_spawns': 4}
+
+
+def test_messages_are_events(tmp_path, capsys):
+    events = []
+    clip = ColorClip((16, 16), col=(255, 0, 0), duracion=0.5)
+    clip.write_videofile(str(tmp_path / 'red.mp4'), fps=10,
+                         telemetry=events.append)
+    messages = [e['message'] for e in events if e['event'] == 'message']
+    assert "Building video" in messages[0]
+    assert "Video ready" in messages[-1]
+    assert set(events[0]) == set(EVENT_KEYS)
+    # with telemetry, nothing is printed
+    assert capsys.readouterr().out == ""
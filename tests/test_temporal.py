@@ -0,0 +1,39 @@
+"""
+Tests of the temporal filters (``VideoClip.fl_temporal``).
+"""
+
+import numpy as np
+
+from moviepy.editor import Timeline, VideoClip, recording, register_function
+import moviepy.video.fx.all as vfx
+
+
+@register_function
+def ramp(t):
+    return np.full((4, 6, 3), int(50 * t), dtype='uint8')
+
+
+def test_supersample_without_interval():
+    with recording():
+        clip = VideoClip(ramp, duracion=2)
+        same = [vfx.supersample(clip, 0, 5), vfx.supersample(clip, 0.1, 1)]
+    assert all(s is clip for s in same)
+    rebuilt = Timeline.from_clip(same[0]).build()
+    assert np.array_equal(rebuilt.get_frame(1), clip.get_frame(1))
+
+
+def test_supersample():
+    clip = VideoClip(ramp, duracion=2)
+    blurred = vfx.supersample(clip, 0.2, 5)
+    assert np.array_equal(blurred.get_frame(1), ramp(1))
+    assert blurred.get_frame(1.05).dtype == np.uint8
+
+
+def test_mask_frames_are_not_the_running_sum():
+    mask = VideoClip(lambda t: np.full((4, 6), t), ismask=True, duracion=2)
+    summed = mask.fl_temporal(lambda window, t: window.sum(), 3, 0.1)
+    first = summed.get_frame(0.5)
+    expected = first.copy()
+    second = summed.get_frame(0.6)
+    assert np.array_equal(first, expected)
+    assert np.allclose(second, expected + 0.3)
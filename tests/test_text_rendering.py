@@ -0,0 +1,170 @@
+"""
+Tests of the rendering of the texts of TextClip (Pillow, cache, fonts, and
+the fallback on ImageMagick, which is replaced by a fake command).
+"""
+
+from collections import OrderedDict
+
+import numpy as np
+import pytest
+from imageio import imwrite
+from PIL import ImageFont
+
+from moviepy.editor import TextClip
+from moviepy.video.tools import text_rendering
+from moviepy.video.tools.text_rendering import (TextRenderingError,
+                                                find_font, render_text)
+
+
+@pytest.fixture
+def fonts(tmp_path, monkeypatch):
+    """ A folder of fonts containing only Pillow's default font (saved as
+    Liberation Sans), and empty caches. """
+    default = ImageFont.load_default()
+    if not hasattr(default, 'font_bytes'):
+        pytest.skip("Pillow has no FreeType default font")
+    folder = tmp_path / 'fonts'
+    folder.mkdir()
+    fontfile = folder / 'LiberationSans-Regular.ttf'
+    fontfile.write_bytes(default.font_bytes)
+    monkeypatch.setattr(text_rendering, 'FONT_DIRS', [str(folder)])
+    monkeypatch.setattr(text_rendering, '_fonts', {})
+    monkeypatch.setattr(text_rendering, '_cache', OrderedDict())
+    monkeypatch.setattr(text_rendering, 'TEXT_CACHE_DIR', None)
+    return str(fontfile)
+
+
+@pytest.fixture
+def imagemagick(monkeypatch):
+    """ Replaces ImageMagick: the commands run are recorded, and the
+    picture "rendered" is a blue 10x20 rectangle. """
+    commands = []
+
+    def convert(cmd, verbose=False):
+        commands.append(cmd)
+        picture = np.zeros((10, 20, 4), dtype='uint8')
+        picture[:, :, 2:] = 255
+        imwrite(cmd[-1].split(':', 1)[1], picture, format='png')
+
+    monkeypatch.setattr(text_rendering, 'subprocess_call', convert)
+    return commands
+
+
+@pytest.fixture
+def renders(monkeypatch):
+    """ The texts rendered by Pillow. """
+    texts = []
+    render = text_rendering.render_text_pillow
+
+    def render_text_pillow(txt, **style):
+        texts.append(txt)
+        return render(txt, **style)
+
+    monkeypatch.setattr(text_rendering, 'render_text_pillow',
+                        render_text_pillow)
+    return texts
+
+
+def test_font_aliases(fonts):
+    for name in ['Arial', 'Helvetica', 'liberation sans',
+                 'Liberation-Sans-Regular', fonts]:
+        assert find_font(name) == fonts
+    with pytest.raises(TextRenderingError):
+        find_font('Courier')
+
+
+def test_render_text(fonts):
+    label = render_text('Hello', font='Arial', color='red', fontsize=20)
+    h, w, depth = label.shape
+    assert depth == 4 and w > h > 10
+    opaque = label[:, :, 3] == 255
+    assert opaque.any() and (label[:, :, 3] == 0).any()
+    assert (label[opaque][:, :3] == [255, 0, 0]).all()
+
+    # a caption is wrapped in its width, and the fontsize is found
+    caption = render_text('Hello world ' * 4, font='Arial', tamano=(w, None),
+                          method='caption', fontsize=20)
+    assert caption.shape[1] == w and caption.shape[0] >= 4 * h
+    fitted = render_text('Hello', font='Arial', tamano=(200, 50),
+                         bg_color='white')
+    assert fitted.shape == (50, 200, 4) and (fitted[:, :, 3] == 255).all()
+
+
+def test_memory_cache(fonts, renders, monkeypatch):
+    first = render_text('Hello', font='Arial', fontsize=20)
+    second = render_text('Hello', font='Arial', fontsize=20)
+    assert renders == ['Hello']
+    assert np.array_equal(first, second)
+    # the pictures returned are copies of the cached ones
+    first[:] = 0
+    assert np.array_equal(render_text('Hello', font='Arial', fontsize=20),
+                          second)
+    # another style is another picture
+    render_text('Hello', font='Arial', fontsize=20, color='red')
+    render_text('Hello', font='Arial', fontsize=20, cache=False)
+    assert renders == ['Hello', 'Hello', 'Hello']
+
+    # only the most recent pictures are kept
+    monkeypatch.setattr(text_rendering, 'TEXT_CACHE_SIZE', 2)
+    for txt in ['a', 'b', 'c', 'b', 'a']:
+        render_text(txt, font='Arial', fontsize=20)
+    assert renders[3:] == ['a', 'b', 'c', 'a']
+    assert len(text_rendering._cache) == 2
+
+
+def test_disk_cache(fonts, renders, tmp_path, monkeypatch):
+    folder = tmp_path / 'cache'
+    monkeypatch.setattr(text_rendering, 'TEXT_CACHE_DIR', str(folder))
+    first = render_text('Hello', font='Arial', fontsize=20)
+    assert len(list(folder.iterdir())) == 1
+    text_rendering.clear_text_cache()
+    second = render_text('Hello', font='Arial', fontsize=20)
+    assert renders == ['Hello']
+    assert np.array_equal(first, second)
+    # the font file is part of the key
+    with open(fonts, 'ab') as f:
+        f.write(b'\0')
+    text_rendering.clear_text_cache()
+    render_text('Hello', font='Arial', fontsize=20)
+    assert renders == ['Hello', 'Hello']
+
+
+def test_imagemagick_fallback(fonts, imagemagick):
+    # Pillow doesn't find the font: ImageMagick renders the text
+    img = render_text('Hello', font='Courier', fontsize=20)
+    assert img.shape == (10, 20, 4) and (img[:, :, 2] == 255).all()
+    [cmd] = imagemagick
+    assert cmd[cmd.index('-font') + 1] == 'Courier'
+    assert cmd[cmd.index('-pointsize') + 1] == '20'
+    # its pictures are cached too
+    render_text('Hello', font='Courier', fontsize=20)
+    assert len(imagemagick) == 1
+
+    with pytest.raises(TextRenderingError):
+        render_text('Hello', font='Courier', renderer='pillow')
+    render_text('Hello', font='Arial', renderer='imagemagick')
+    assert len(imagemagick) == 2
+    with pytest.raises(ValueError):
+        render_text('Hello', renderer='cairo')
+
+
+def test_imagemagick_missing(fonts, monkeypatch):
+    def convert(cmd, verbose=False):
+        raise OSError("no such file: convert")
+    monkeypatch.setattr(text_rendering, 'subprocess_call', convert)
+    with pytest.raises(IOError) as err:
+        render_text('Hello', font='Courier')
+    assert "ImageMagick is not installed" in str(err.value)
+
+
+def test_batch(fonts, renders):
+    texts = ['line %d' % i for i in range(12)] + ['line 3']
+    clips = TextClip.batch(texts, threads=4, font='Arial', fontsize=15,
+                           color='white')
+    assert [clip.txt for clip in clips] == texts
+    assert set(renders) == set(texts)
+    for txt, clip in zip(texts, clips):
+        single = TextClip(txt, font='Arial', fontsize=15, color='white')
+        assert np.array_equal(clip.get_frame(0), single.get_frame(0))
+        assert np.array_equal(clip.mask.get_frame(0),
+                              single.mask.get_frame(0))
@@ -0,0 +1,111 @@
+"""
+Tests of the keyframes: listing of the keyframes of a file, reads of the
+keyframes only, thumbnails and sprite sheets.
+"""
+
+import numpy as np
+import pytest
+from imageio import imread
+
+from moviepy import telemetry
+from moviepy.editor import VideoFileClip
+from moviepy.video.io.ffmpeg_reader import (FFMPEG_VideoReader,
+                                            ffmpeg_keyframes,
+                                            parse_keyframes)
+from moviepy.video.tools.thumbnails import (nearest_keyframes, sprite_sheet,
+                                            thumbnail_times, thumbnails)
+
+FRAMECRC = """#software: Lavf61.1.100
+#tb 0: 1/1000
+#media_type 0: video
+0,        -80,          0,       40,      593, 0x27d5d324
+0,        -40,        160,       40,      120, 0x1a2b3c4d, F=0x0
+0,          0,         80,       40,      110, 0x1a2b3c4d, F=0x0
+0,        400,      NOPTS,       40,      600, 0x27d5d324
+0,        440,        480,       40,      120, 0x1a2b3c4d, F=0x0
+0, -9223372036854775808, -9223372036854775808, 40, 590, 0x27d5d324
+0,        800, -9223372036854775808, 40,  600, 0x27d5d324
+0,       1240,       1200,       40,      601, 0x27d5d324
+"""
+
+
+def test_parse_keyframes():
+    # without pts, the time of a keyframe is its dts
+    assert parse_keyframes(FRAMECRC) == pytest.approx([0, 0.4, 0.8, 1.2])
+    assert parse_keyframes("#tb 0: 1/25\n") == []
+
+
+def test_nearest_keyframes():
+    keyframes = [0, 1.0, 1.5, 4.0]
+    times = [-1, 0.4, 0.5, 0.6, 1.2, 2.74, 2.76, 9]
+    # a time half way between two keyframes gets the first one
+    assert nearest_keyframes(keyframes, times) == [0, 0, 0, 1, 1, 2, 3, 3]
+
+
+@pytest.fixture(scope='module')
+def keyframes(index_video):
+    return ffmpeg_keyframes(index_video)
+
+
+@pytest.fixture(scope='module')
+def reference(index_video):
+    """ A reader of all the frames of the file. """
+    reader = FFMPEG_VideoReader(index_video)
+    yield reader
+    reader.close()
+
+
+def test_ffmpeg_keyframes(keyframes):
+    # a keyframe at least every 12 frames (x264 adds some at scene cuts)
+    assert keyframes[:3] == pytest.approx([0, 0.4, 0.8])
+    assert keyframes == sorted(keyframes)
+    assert max(np.diff(keyframes)) <= 0.4 + 1e-6
+    assert keyframes[-1] < 6
+
+
+def test_keyframes_only(index_video, keyframes, reference):
+    clip = VideoFileClip(index_video, keyframes_only=True, audio=False)
+    spawns = telemetry.counters['decoder_spawns']
+    times = list(np.arange(0, 6, 1.0 / 30)) + [5.5, 1.0, 3.1, 0.2, 4.9]
+    frames = [clip.get_frame(t) for t in times]
+    # one decoder for the forward reads, one per jump backwards
+    assert telemetry.counters['decoder_spawns'] - spawns <= 6
+    clip.reader.close()
+    for t, frame in zip(times, frames):
+        # the last keyframe before t
+        k = max([kt for kt in keyframes if kt <= t + 1e-5])
+        assert np.array_equal(frame, reference.get_frame(k)), t
+
+
+def test_thumbnails(index_video, keyframes, reference):
+    spawns = telemetry.counters['decoder_spawns']
+    result = thumbnails(index_video, 7, width=32)
+    # a single decoder for all the thumbnails
+    assert telemetry.counters['decoder_spawns'] - spawns == 1
+    times = thumbnail_times(6, 7)
+    assert [t for (t, frame) in result] == [
+        keyframes[i] for i in nearest_keyframes(keyframes, times)]
+    for t, frame in result:
+        assert frame.shape == (24, 32, 3)
+        # the frames are uniform: their color doesn't change when resized
+        expected = reference.get_frame(t)[0, 0].astype(int)
+        assert np.abs(frame.astype(int) - expected).max() <= 3
+
+    exact = thumbnails(index_video, 7, width=32, keyframes=False, threads=3)
+    assert [t for (t, frame) in exact] == times
+    for t, frame in exact:
+        expected = reference.get_frame(t)[0, 0].astype(int)
+        assert np.abs(frame.astype(int) - expected).max() <= 3
+
+
+def test_sprite_sheet(index_video, tmp_path):
+    output = str(tmp_path / 'sheet.png')
+    sheet = sprite_sheet(index_video, 5, columns=3, width=32, output=output)
+    assert sheet.shape == (2 * 24, 3 * 32, 3)
+    frames = [frame for (t, frame) in thumbnails(index_video, 5, width=32)]
+    for i, frame in enumerate(frames):
+        y, x = 24 * (i // 3), 32 * (i % 3)
+        assert np.array_equal(sheet[y:y + 24, x:x + 32], frame)
+    # the last cell is empty
+    assert not sheet[24:, 64:].any()
+    assert np.array_equal(imread(output)[:, :, :3], sheet)
@@ -0,0 +1,48 @@
+"""
+Tests of the Timeline descriptions of clip graphs.
+"""
+
+import pickle
+
+import numpy as np
+import pytest
+
+from moviepy.editor import (ColorClip, CompositeVideoClip, Timeline,
+                            VideoFileClip, concatenate_videoclips, recording,
+                            register_function, vfx)
+
+
+@register_function
+def invert_red(im):
+    im = im.copy()
+    im[:, :, 0] = 255 - im[:, :, 0]
+    return im
+
+
+def make_clip(filename):
+    video = VideoFileClip(filename)
+    small = video.subclip(1, 3).resize(0.5).set_position((5, 10))
+    background = ColorClip((64, 48), col=(0, 0, 255), duracion=2)
+    composite = CompositeVideoClip([background, small.crossfadein(0.5)])
+    return concatenate_videoclips([composite,
+                                   video.subclip(4, 5).fl_image(invert_red),
+                                   video.fx(vfx.time_mirror).subclip(0, 1)])
+
+
+def test_recording_is_opt_in(index_video):
+    clip = VideoFileClip(index_video).subclip(1, 2)
+    with pytest.raises(ValueError):
+        Timeline.from_clip(clip)
+
+
+def test_round_trip(index_video):
+    with recording():
+        clip = make_clip(index_video)
+    data = Timeline.from_clip(clip).to_json()
+    rebuilt = Timeline.from_json(data).build()
+    assert rebuilt.duracion == clip.duracion
+    for t in np.arange(0, clip.duracion, 0.25):
+        assert np.array_equal(rebuilt.get_frame(t), clip.get_frame(t))
+    # the rebuilt clip is recorded, and can be described again
+    rebuilt = pickle.loads(pickle.dumps(Timeline.from_clip(rebuilt))).build()
+    assert np.array_equal(rebuilt.get_frame(2.2), clip.get_frame(2.2))
@@ -0,0 +1,40 @@
+"""
+Tests of the planar YUV read and write path.
+"""
+
+import numpy as np
+
+from moviepy.video.VideoClip import VideoClip
+from moviepy.video.io.VideoFileClip import VideoFileClip
+from moviepy.video.tools.yuv import YUVFrame
+
+LOSSLESS = ['-qp', '0']
+
+
+def test_write_renders_each_frame_once(tmp_path):
+    times = []
+
+    def make_frame(t):
+        times.append(t)
+        return np.full((48, 64, 3), int(100 * t), dtype='uint8')
+
+    clip = VideoClip(make_frame, duracion=1)
+    times[:] = []
+    clip.write_videofile(str(tmp_path / 'out.mp4'), fps=10, verbose=False)
+    assert len(times) == 10
+
+
+def test_yuv_roundtrip(index_video, tmp_path):
+    clip = VideoFileClip(index_video, audio=False, yuv=True).subclip(0, 1)
+    assert isinstance(clip.get_frame(0.5), YUVFrame)
+    for name, kwargs in [('out.mp4', {}),
+                         ('cached.mp4', {'render_cache': str(tmp_path)})]:
+        filename = str(tmp_path / name)
+        clip.write_videofile(filename, ffmpeg_params=LOSSLESS, verbose=False,
+                             **kwargs)
+        copy = VideoFileClip(filename, audio=False, yuv=True)
+        for t in [0, 0.5, 0.9]:
+            a, b = clip.get_frame(t), copy.get_frame(t)
+            # written without any conversion to RGB
+            for plane in 'yuv':
+                assert np.array_equal(getattr(a, plane), getattr(b, plane))